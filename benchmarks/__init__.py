@@ -0,0 +1,6 @@
+"""Offline performance benchmarks for the Command Center backend.
+
+Each module is runnable on its own, e.g.:
+
+    python -m benchmarks.bench_deal_sync
+"""
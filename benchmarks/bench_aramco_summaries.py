@@ -0,0 +1,365 @@
+"""Benchmark: row-loading vs set-based SQL Aramco CEO radar summaries.
+
+Seeds a synthetic cache (deals, facts, stage spans, notes) into a file-backed
+SQLite database and runs the overdue, stuck and Order Received summaries two
+ways: the previous path (load every fact row, bucket in Python, per-PM span
+queries and per-deal note queries) and the grouped SQL path. Reports query
+counts and latency, and checks both paths return identical responses.
+
+    python -m benchmarks.bench_aramco_summaries --deals 20000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from statistics import median
+from unittest.mock import patch
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, select
+
+from cmd_center.backend import db
+from cmd_center.backend.db import Deal, DealFact, DealStageSpan, Note, Pipeline, Stage
+from cmd_center.backend.models import (
+    BlockersChecklistSummary,
+    CEOInterventionDeal,
+    FastWinDeal,
+    OrderReceivedSnapshot,
+    OrderReceivedSummaryResponse,
+    OverdueSnapshot,
+    OverdueSummaryResponse,
+    PMOverduePerformance,
+    PMPipelineAcceleration,
+    PMStuckControl,
+    StageBottleneck,
+    StuckSnapshot,
+    StuckSummaryResponse,
+    WorstStuckDeal,
+)
+from cmd_center.backend.services.aramco_summary_service import (
+    OVERDUE_STAGE_IDS,
+    ORDER_RECEIVED_STAGE_IDS,
+    STUCK_STAGE_IDS,
+    AramcoSummaryService,
+)
+from cmd_center.backend.services.bulk_upsert import bulk_upsert
+from cmd_center.backend.services.deal_facts import END_USER_FIELD_KEY, refresh_deal_facts
+
+ARAMCO = 5
+STAGE_IDS = sorted(set(OVERDUE_STAGE_IDS + [26, 31]))
+OWNERS = [f"PM {i}" for i in range(12)] + [None]
+
+
+def seed(engine, count: int, now: datetime) -> None:
+    """Deals across the Aramco stages with spans and notes for a subset."""
+    rng = random.Random(42)
+    with Session(engine) as session:
+        session.add(Pipeline(id=ARAMCO, name="Aramco Projects", order_nr=1))
+        for order, stage_id in enumerate(STAGE_IDS):
+            session.add(Stage(id=stage_id, pipeline_id=ARAMCO, name=f"Stage {stage_id}", order_nr=order))
+        session.commit()
+
+        deals, spans, notes = [], [], []
+        for deal_id in range(1, count + 1):
+            stage_id = rng.choice(STAGE_IDS)
+            # Keep day boundaries an hour away so both paths see the same day counts
+            in_stage = timedelta(days=rng.randint(0, 120), seconds=rng.randint(3600, 82800))
+            since_update = timedelta(days=rng.randint(0, 60), seconds=rng.randint(3600, 82800))
+            next_activity = now + timedelta(days=rng.randint(-5, 30)) if rng.random() < 0.5 else None
+            raw = f'{{"{END_USER_FIELD_KEY}": "Site {deal_id % 17}"}}' if rng.random() < 0.6 else "{}"
+            deals.append(dict(
+                id=deal_id, title=f"Deal {deal_id}", pipeline_id=ARAMCO, stage_id=stage_id,
+                status="open" if rng.random() < 0.9 else "won", owner_name=rng.choice(OWNERS),
+                value=float(rng.randint(1, 200) * 1000), update_time=now - since_update,
+                stage_change_time=now - in_stage, next_activity_date=next_activity,
+                notes_count=0, raw_json=raw,
+            ))
+            if rng.random() < 0.3:
+                entered = now - timedelta(days=rng.randint(10, 90))
+                left = entered + timedelta(days=rng.randint(1, 40)) if rng.random() < 0.5 else None
+                spans.append(dict(
+                    deal_id=deal_id, stage_id=rng.choice(STAGE_IDS), entered_at=entered, left_at=left,
+                    from_stage_id=rng.choice(ORDER_RECEIVED_STAGE_IDS), created_at=now,
+                ))
+            for n in range(rng.randint(0, 3)):
+                notes.append(dict(
+                    id=deal_id * 10 + n, deal_id=deal_id, content=f"Note {n} for {deal_id}",
+                    add_time=now - timedelta(days=n, minutes=deal_id % 60),
+                ))
+        bulk_upsert(session, Deal, deals, change_column=None)
+        bulk_upsert(session, Note, notes, change_column=None)
+        session.add_all(DealStageSpan(**span) for span in spans)
+        session.commit()
+
+
+class LegacyAramcoSummaryService(AramcoSummaryService):
+    """The previous row-loading implementation (facts scanned in deal id order)."""
+
+    def __init__(self):
+        super().__init__()
+        self.session = Session(db.read_engine)
+
+    def generate_overdue_summary(self, pipeline_name: str = "Aramco Projects") -> OverdueSummaryResponse:
+        today = datetime.now()
+        week_ago = today - timedelta(days=7)
+        overdue = self.session.exec(select(DealFact).where(
+            DealFact.status == "open", DealFact.update_time < week_ago,
+            DealFact.stage_id.in_(OVERDUE_STAGE_IDS),
+        ).order_by(DealFact.deal_id)).all()
+        if not overdue:
+            return OverdueSummaryResponse(
+                snapshot=OverdueSnapshot(overdue_now_count=0, overdue_now_sar=0.0, overdue_soon_count=0,
+                                         overdue_soon_sar=0.0, worst_overdue=[]),
+                pm_performance=[], intervention_list=[],
+            )
+        metrics = [(d, (today - d.update_time).days) for d in overdue if d.update_time]
+        overdue_now = [m for m in metrics if m[1] >= 7]
+        soon = self.session.exec(select(DealFact).where(
+            DealFact.status == "open", DealFact.next_activity_date.is_not(None),
+            DealFact.next_activity_date >= today, DealFact.next_activity_date <= today + timedelta(days=14),
+        ).order_by(DealFact.deal_id)).all()
+        ranked = sorted(metrics, key=lambda m: m[1], reverse=True)
+
+        pm = defaultdict(lambda: {"overdue": [], "soon": [], "updated": 0, "next": 0})
+        for deal, _ in overdue_now:
+            pm[deal.owner_name or "Unknown"]["overdue"].append(deal)
+        for deal in soon:
+            pm[deal.owner_name or "Unknown"]["soon"].append(deal)
+        for deal in self.session.exec(
+            select(DealFact).where(DealFact.status == "open").order_by(DealFact.deal_id)
+        ).all():
+            if deal.update_time and deal.update_time >= week_ago:
+                pm[deal.owner_name or "Unknown"]["updated"] += 1
+            if deal.next_activity_date:
+                pm[deal.owner_name or "Unknown"]["next"] += 1
+        performance = []
+        for name, m in pm.items():
+            count = len(m["overdue"])
+            avg = sum((today - d.update_time).days for d in m["overdue"]) / count if count else 0.0
+            performance.append(PMOverduePerformance(
+                pm_name=name, overdue_now_count=count, overdue_now_sar=sum(d.value for d in m["overdue"]),
+                due_soon_count=len(m["soon"]), due_soon_sar=sum(d.value for d in m["soon"]),
+                avg_days_overdue=avg, updated_this_week_count=m["updated"], has_next_activity_count=m["next"],
+                risk_score=self._calculate_risk_score(count, len(m["soon"]), max(0, count - m["next"])),
+            ))
+        performance.sort(key=lambda x: x.risk_score, reverse=True)
+        return OverdueSummaryResponse(
+            snapshot=OverdueSnapshot(
+                overdue_now_count=len(overdue_now), overdue_now_sar=sum(d.value for d, _ in overdue_now),
+                overdue_soon_count=len(soon), overdue_soon_sar=sum(d.value for d in soon),
+                worst_overdue=[{"deal_id": d.deal_id, "title": d.title, "days": days, "sar": d.value}
+                               for d, days in ranked[:5]],
+            ),
+            pm_performance=performance,
+            intervention_list=[CEOInterventionDeal(
+                deal_id=d.deal_id, title=d.title, pm_name=d.owner_name or "Unknown",
+                stage=d.stage_name or "Unknown", overdue_by_days=days, days_since_update=days,
+                last_note_snippet=d.last_note_snippet,
+                next_activity_date=d.next_activity_date.isoformat() if d.next_activity_date else None,
+                next_activity_exists=d.next_activity_date is not None,
+            ) for d, days in ranked[:10]],
+        )
+
+    def generate_stuck_summary(self, pipeline_name: str = "Aramco Projects") -> StuckSummaryResponse:
+        today = datetime.now()
+        thirty_days_ago = today - timedelta(days=30)
+        stuck = self.session.exec(select(DealFact).where(
+            DealFact.status == "open", DealFact.stage_id.in_(STUCK_STAGE_IDS),
+            DealFact.stage_change_time.is_not(None), DealFact.stage_change_time < thirty_days_ago,
+        ).order_by(DealFact.deal_id)).all()
+        if not stuck:
+            return StuckSummaryResponse(
+                snapshot=StuckSnapshot(
+                    stuck_no_updates_count=0, stuck_no_updates_sar=0.0, bucket_30_45_count=0,
+                    bucket_30_45_sar=0.0, bucket_46_60_count=0, bucket_46_60_sar=0.0,
+                    bucket_60_plus_count=0, bucket_60_plus_sar=0.0, no_activity_count=0, oldest_stuck=[],
+                ),
+                pm_control=[], worst_deals=[], stage_bottlenecks=[], top_bottleneck_stage="N/A",
+            )
+        metrics = [
+            (d, (today - d.stage_change_time).days, (today - d.update_time).days if d.update_time else 0)
+            for d in stuck
+        ]
+        no_updates = [m for m in metrics if m[2] > 30]
+        b1 = [m for m in metrics if 30 <= m[1] < 46]
+        b2 = [m for m in metrics if 46 <= m[1] < 61]
+        b3 = [m for m in metrics if m[1] >= 61]
+        ranked = sorted(metrics, key=lambda m: m[1], reverse=True)
+        snapshot = StuckSnapshot(
+            stuck_no_updates_count=len(no_updates), stuck_no_updates_sar=sum(m[0].value for m in no_updates),
+            bucket_30_45_count=len(b1), bucket_30_45_sar=sum(m[0].value for m in b1),
+            bucket_46_60_count=len(b2), bucket_46_60_sar=sum(m[0].value for m in b2),
+            bucket_60_plus_count=len(b3), bucket_60_plus_sar=sum(m[0].value for m in b3),
+            no_activity_count=sum(1 for m in metrics if m[0].next_activity_date is None),
+            oldest_stuck=[{"deal_id": d.deal_id, "title": d.title, "days_in_stage": days, "sar": d.value}
+                          for d, days, _ in ranked[:5]],
+        )
+
+        pm = defaultdict(list)
+        for m in metrics:
+            pm[m[0].owner_name or "Unknown"].append(m)
+        control = []
+        for name, items in pm.items():
+            control.append(PMStuckControl(
+                pm_name=name, stuck_count=len(items), stuck_sar=sum(m[0].value for m in items),
+                stuck_no_activity_sar=sum((m[0].value for m in items if m[0].next_activity_date is None), 0.0),
+                avg_days_in_stage=sum(m[1] for m in items) / len(items),
+                median_days_since_update=median(m[2] for m in items),
+                recovery_rate_30d=self._legacy_recovery_rate(name, list({m[0].stage_id for m in items})),
+            ))
+        control.sort(key=lambda x: x.stuck_sar, reverse=True)
+
+        worst = []
+        for d, days, update_age in ranked[:10]:
+            self.session.exec(
+                select(Note).where(Note.deal_id == d.deal_id).order_by(Note.add_time.desc()).limit(5)
+            ).all()
+            worst.append(WorstStuckDeal(
+                deal_id=d.deal_id, title=d.title, pm_name=d.owner_name or "Unknown",
+                stage=d.stage_name or "Unknown", days_in_stage=days, last_update_age=update_age,
+                last_note_snippet=d.last_note_snippet,
+            ))
+
+        stages = defaultdict(lambda: {"count": 0, "sar": 0.0})
+        for d, _, _ in metrics:
+            stages[d.stage_name or "Unknown"]["count"] += 1
+            stages[d.stage_name or "Unknown"]["sar"] += d.value
+        bottlenecks = [StageBottleneck(stage_name=n, stuck_count=s["count"], stuck_sar=s["sar"])
+                       for n, s in stages.items()]
+        bottlenecks.sort(key=lambda x: x.stuck_sar, reverse=True)
+        return StuckSummaryResponse(
+            snapshot=snapshot, pm_control=control, worst_deals=worst, stage_bottlenecks=bottlenecks,
+            top_bottleneck_stage=bottlenecks[0].stage_name,
+        )
+
+    def generate_order_received_summary(self, pipeline_name: str = "Aramco Projects") -> OrderReceivedSummaryResponse:
+        today = datetime.now()
+        deals = self.session.exec(select(DealFact).where(
+            DealFact.status == "open", DealFact.stage_id.in_(ORDER_RECEIVED_STAGE_IDS),
+        ).order_by(DealFact.deal_id)).all()
+        metrics = [
+            (d, (today - d.stage_change_time).days if d.stage_change_time else 0, d.end_user is not None)
+            for d in deals
+        ]
+        buckets = [
+            [m for m in metrics if 0 <= m[1] <= 7], [m for m in metrics if 8 <= m[1] <= 14],
+            [m for m in metrics if 15 <= m[1] <= 30], [m for m in metrics if m[1] > 30],
+        ]
+        oldest = sorted(metrics, key=lambda m: m[1], reverse=True)[0]
+        snapshot = OrderReceivedSnapshot(
+            open_count=len(deals), open_sar=sum(d.value for d in deals),
+            bucket_0_7_count=len(buckets[0]), bucket_0_7_sar=sum(m[0].value for m in buckets[0]),
+            bucket_8_14_count=len(buckets[1]), bucket_8_14_sar=sum(m[0].value for m in buckets[1]),
+            bucket_15_30_count=len(buckets[2]), bucket_15_30_sar=sum(m[0].value for m in buckets[2]),
+            bucket_30_plus_count=len(buckets[3]), bucket_30_plus_sar=sum(m[0].value for m in buckets[3]),
+            oldest_deal={"deal_id": oldest[0].deal_id, "title": oldest[0].title, "age_days": oldest[1]},
+            conversion_rate_30d=self._calculate_conversion_rate_30d(self.session, ORDER_RECEIVED_STAGE_IDS, 28),
+        )
+        pm = defaultdict(list)
+        for m in metrics:
+            pm[m[0].owner_name or "Unknown"].append(m)
+        acceleration = []
+        for name, items in pm.items():
+            count, total = self._legacy_approved(name)
+            acceleration.append(PMPipelineAcceleration(
+                pm_name=name, open_count=len(items), open_sar=sum(m[0].value for m in items),
+                avg_age_days=sum(m[1] for m in items) / len(items),
+                pct_end_user_identified=sum(1 for m in items if m[2]) / len(items) * 100,
+                pct_next_activity_scheduled=sum(1 for m in items if m[0].next_activity_date is not None) / len(items) * 100,
+                approved_30d_count=count, approved_30d_sar=total,
+            ))
+        fast_wins = []
+        for d, age, has_end_user in metrics:
+            missing = (["End user"] if not has_end_user else []) + (["Next activity"] if d.next_activity_date is None else [])
+            if 1 <= len(missing) <= 2 and (d.value > 50000 or age > 15):
+                fast_wins.append(FastWinDeal(
+                    deal_id=d.deal_id, title=d.title, pm_name=d.owner_name or "Unknown", value_sar=d.value,
+                    age_days=age, missing_items=missing,
+                    suggested_action=f"Add {', '.join(missing).lower()} to unlock deal",
+                ))
+        fast_wins.sort(key=lambda x: x.value_sar, reverse=True)
+        return OrderReceivedSummaryResponse(
+            snapshot=snapshot, pm_acceleration=acceleration,
+            blockers_checklist=BlockersChecklistSummary(
+                missing_end_user_count=sum(1 for m in metrics if not m[2]),
+                missing_next_activity_count=sum(1 for d in deals if d.next_activity_date is None),
+            ),
+            fast_wins=fast_wins[:10],
+        )
+
+    def _legacy_recovery_rate(self, pm_name: str, stage_ids: list[int]):
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        recovered = self.session.exec(select(DealStageSpan).join(Deal).where(
+            DealStageSpan.stage_id.in_(stage_ids), DealStageSpan.left_at.is_not(None),
+            DealStageSpan.left_at >= thirty_days_ago, Deal.owner_name == pm_name,
+        )).all()
+        total = self.session.exec(select(DealStageSpan).join(Deal).where(
+            DealStageSpan.stage_id.in_(stage_ids), DealStageSpan.entered_at <= thirty_days_ago,
+            Deal.owner_name == pm_name,
+        ).where((DealStageSpan.left_at.is_(None)) | (DealStageSpan.left_at >= thirty_days_ago))).all()
+        return len(recovered) / len(total) * 100 if total else None
+
+    def _legacy_approved(self, pm_name: str):
+        thirty_days_ago = datetime.now() - timedelta(days=30)
+        spans = self.session.exec(select(DealStageSpan).join(Deal).where(
+            DealStageSpan.stage_id == 28, DealStageSpan.entered_at >= thirty_days_ago,
+            Deal.owner_name == pm_name,
+        )).all()
+        deal_ids = {span.deal_id for span in spans}
+        if not deal_ids:
+            return (0, 0.0)
+        deals = self.session.exec(select(Deal).where(Deal.id.in_(deal_ids))).all()
+        return (len(deals), sum(d.value for d in deals))
+
+
+def measure(engine, service: AramcoSummaryService, method: str):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        started = time.perf_counter()
+        result = getattr(service, method)()
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, elapsed, len(statements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=20000, help="Synthetic deals to seed")
+    args = parser.parse_args()
+
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = db.create_sqlite_engine(os.path.join(tmp, "bench.db"))
+        SQLModel.metadata.create_all(engine)
+        seed(engine, args.deals, now)
+        with patch.object(db, "engine", engine), patch.object(db, "read_engine", engine):
+            refresh_deal_facts()
+            legacy, current = LegacyAramcoSummaryService(), AramcoSummaryService()
+
+            print(f"{args.deals} synthetic deals")
+            print(f"{'summary':<18}{'legacy s':>10}{'queries':>9}{'sql s':>10}{'queries':>9}{'speedup':>9}  identical")
+            for name, method in [
+                ("overdue", "generate_overdue_summary"),
+                ("stuck", "generate_stuck_summary"),
+                ("order received", "generate_order_received_summary"),
+            ]:
+                old, old_s, old_q = measure(engine, legacy, method)
+                new, new_s, new_q = measure(engine, current, method)
+                same = old.model_dump() == new.model_dump()
+                print(f"{name:<18}{old_s:>10.3f}{old_q:>9}{new_s:>10.3f}{new_q:>9}{old_s / new_s:>8.1f}x  {same}")
+            legacy.session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: per-row session.merge() vs the bulk UPSERT write path.
+
+Writes N synthetic deals into a fresh file-backed SQLite database three ways:
+merge() per row (the old sync path), bulk_upsert on an empty table, and
+bulk_upsert again with unchanged update_time (the common re-sync case).
+
+    python -m benchmarks.bench_bulk_upsert --deals 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from cmd_center.backend.db import Deal
+from cmd_center.backend.services.bulk_upsert import bulk_upsert
+from cmd_center.backend.services.pipedrive_sync import _deal_row
+
+
+def synthetic_deals(count: int) -> list[dict]:
+    """Deal payloads in the /v1/deals response shape."""
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "title": f"Deal {i}",
+            "pipeline_id": 1 + i % 3,
+            "stage_id": 10 + i % 8,
+            "owner_id": {"id": 100 + i % 9, "name": f"Owner {i % 9}"},
+            "org_id": {"value": 500 + i % 40, "name": f"Org {i % 40}"},
+            "value": 1000.0 + i,
+            "currency": "SAR",
+            "status": "open",
+            "add_time": (base - timedelta(days=i % 300)).strftime("%Y-%m-%d %H:%M:%S"),
+            "update_time": (base + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            "stage_change_time": base.strftime("%Y-%m-%d %H:%M:%S"),
+            "notes_count": i % 5,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def fresh_engine(directory: str, name: str):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def time_merge(engine, payloads: list[dict]) -> float:
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for d in payloads:
+            session.merge(Deal(**_deal_row(d)))
+        session.commit()
+    return time.perf_counter() - started
+
+
+def time_bulk(engine, payloads: list[dict]) -> tuple[float, int]:
+    started = time.perf_counter()
+    with Session(engine) as session:
+        written = bulk_upsert(session, Deal, [_deal_row(d) for d in payloads])
+        session.commit()
+    return time.perf_counter() - started, written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=10000, help="Synthetic deals to write")
+    args = parser.parse_args()
+
+    payloads = synthetic_deals(args.deals)
+    with tempfile.TemporaryDirectory() as tmp:
+        merge_engine = fresh_engine(tmp, "merge.db")
+        merge_s = time_merge(merge_engine, payloads)
+        merge_again_s = time_merge(merge_engine, payloads)
+        merge_engine.dispose()
+
+        bulk_engine = fresh_engine(tmp, "bulk.db")
+        bulk_s, bulk_written = time_bulk(bulk_engine, payloads)
+        bulk_again_s, bulk_again_written = time_bulk(bulk_engine, payloads)
+        bulk_engine.dispose()
+
+    print(f"{args.deals} synthetic deals")
+    print(f"{'path':<34}{'seconds':>10}{'rows written':>14}")
+    print(f"{'merge() initial load':<34}{merge_s:>10.3f}{args.deals:>14}")
+    print(f"{'merge() unchanged re-sync':<34}{merge_again_s:>10.3f}{args.deals:>14}")
+    print(f"{'bulk_upsert initial load':<34}{bulk_s:>10.3f}{bulk_written:>14}")
+    print(f"{'bulk_upsert unchanged re-sync':<34}{bulk_again_s:>10.3f}{bulk_again_written:>14}")
+    print(f"speedup: {merge_s / bulk_s:.1f}x initial, {merge_again_s / bulk_again_s:.1f}x re-sync")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark: per-deal vs columnar (NumPy) cashflow prediction.
+
+Seeds synthetic open deals (mixed stages, stuck and invoiced deals, Aramco
+and commercial titles, a few notes each) into a file-backed SQLite database
+and forecasts them two ways: the previous path (DealForPrediction per deal
+with a notes query each, predict_deal + apply_overrides per deal, Python
+horizon filter and bucket counting) and the batch path (one query into NumPy
+columns, array rules, grouped sum, models only for returned rows). Checks
+both return the same per-deal predictions and period counts, then times a
+what-if run under alternate stage durations.
+
+    python -m benchmarks.bench_cashflow_batch --deals 50000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlmodel import Session, SQLModel, select
+
+from cmd_center.backend import db
+from cmd_center.backend.db import Deal, DealFact, Note, Pipeline, Stage
+from cmd_center.backend.models.cashflow_models import CashflowPredictionInput, DealForPrediction, PredictionOptions
+from cmd_center.backend.services.bulk_upsert import bulk_upsert
+from cmd_center.backend.services.cashflow_prediction_service import CashflowPredictionService
+from cmd_center.backend.services.db_queries import get_notes_for_deal
+from cmd_center.backend.services.deal_facts import refresh_deal_facts
+
+ARAMCO = 5
+STAGES = {
+    27: "Order Received", 28: "Approved", 29: "Awaiting Payment", 30: "Under Progress",
+    31: "Awaiting MDD", 32: "Awaiting GR", 33: "Invoice Issued", 34: "Site Survey",
+}
+HORIZON_DAYS = 90
+
+
+def seed(engine, count: int, now: datetime) -> None:
+    """Open deals across named stages, with notes for one deal in four."""
+    rng = random.Random(7)
+    with Session(engine) as session:
+        session.add(Pipeline(id=ARAMCO, name="Aramco Projects", order_nr=1))
+        for stage_id, name in STAGES.items():
+            session.add(Stage(id=stage_id, pipeline_id=ARAMCO, name=name, order_nr=stage_id))
+        session.commit()
+
+        deals, notes = [], []
+        for deal_id in range(1, count + 1):
+            in_stage = timedelta(days=rng.randint(0, 120), seconds=rng.randint(3600, 82800))
+            deals.append(dict(
+                id=deal_id, title=f"{'Aramco' if rng.random() < 0.7 else 'Retail'} deal {deal_id}",
+                pipeline_id=ARAMCO, stage_id=rng.choice(list(STAGES)), status="open",
+                owner_name=f"PM {deal_id % 9}", value=float(rng.randint(1, 300) * 1000),
+                update_time=now - timedelta(days=rng.randint(0, 30)),
+                stage_change_time=now - in_stage if rng.random() < 0.95 else None,
+            ))
+            if deal_id % 4 == 0:
+                notes += [dict(id=deal_id * 10 + n, deal_id=deal_id, content=f"note {n}",
+                               add_time=now - timedelta(days=n)) for n in range(3)]
+        bulk_upsert(session, Deal, deals)
+        bulk_upsert(session, Note, notes)
+        session.commit()
+
+
+class LegacyCashflow:
+    """The per-deal path this benchmark replaces."""
+
+    def __init__(self, service: CashflowPredictionService):
+        self.service = service
+
+    def load_deals(self, today: datetime) -> list[DealForPrediction]:
+        with Session(db.read_engine) as session:
+            facts = session.exec(
+                select(DealFact).where(DealFact.pipeline_id == ARAMCO).where(DealFact.status == "open")
+                .order_by(DealFact.deal_id)
+            ).all()
+        deals = []
+        for fact in facts:
+            notes = get_notes_for_deal(fact.deal_id, limit=5)
+            deals.append(DealForPrediction(
+                deal_id=fact.deal_id, title=fact.title, stage=fact.stage_name or f"Stage {fact.stage_id}",
+                stage_id=fact.stage_id, value_sar=fact.value or 0.0, owner_name=fact.owner_name or "Unknown",
+                days_in_stage=(today - fact.stage_change_time).days if fact.stage_change_time else 0,
+                last_stage_change_date=fact.stage_change_time, last_update_date=fact.update_time,
+                recent_notes=[note.content for note in notes if note.content],
+                activities_count=fact.activities_count, done_activities_count=fact.done_activities_count,
+            ))
+        return deals
+
+    def forecast(self, today: datetime):
+        deals = self.load_deals(today)
+        predictions = asyncio.run(self.service.predict_deal_dates(deals, PredictionOptions(), today))
+        cutoff = today + timedelta(days=HORIZON_DAYS)
+        predictions = [
+            p for p in predictions
+            if p.predicted_invoice_date <= cutoff or p.predicted_payment_date <= cutoff
+        ]
+        counts = defaultdict(int)
+        for p in predictions:
+            counts[self.service._get_period_label(p.predicted_invoice_date, "week")] += 1
+        return predictions, sorted(counts.items())
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=50000, help="Synthetic open deals to seed")
+    args = parser.parse_args()
+
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = db.create_sqlite_engine(os.path.join(tmp, "bench.db"))
+        SQLModel.metadata.create_all(engine)
+        seed(engine, args.deals, now)
+        with patch.object(db, "engine", engine), patch.object(db, "read_engine", engine):
+            refresh_deal_facts()
+            service = CashflowPredictionService()
+            input_data = CashflowPredictionInput(
+                pipeline_name="Aramco Projects", horizon_days=HORIZON_DAYS, today_date=now,
+            )
+
+            (legacy, legacy_buckets), legacy_ms = timed(lambda: LegacyCashflow(service).forecast(now))
+
+            def batch_forecast():
+                deals = service.load_pipeline_deals.uncached(service, "Aramco Projects")
+                return service._build_result(input_data, service._predict_batch(deals, now))
+
+            result, batch_ms = timed(batch_forecast)
+            deals = service.load_pipeline_deals("Aramco Projects")
+            _, predict_ms = timed(lambda: service._predict_batch(deals, now))
+            _, what_if_ms = timed(lambda: asyncio.run(service.predict_cashflow_what_if(
+                input_data, {"Order Received": 30, "Approved": 20},
+            )))
+        engine.dispose()
+
+    identical = (
+        [p.model_dump() for p in legacy] == [p.model_dump() for p in result.per_deal_predictions]
+        and legacy_buckets == [(b.period, b.deal_count) for b in result.aggregated_forecast]
+    )
+    print(f"{args.deals} open deals, {len(legacy)} predictions within {HORIZON_DAYS} days")
+    print(f"{'per-deal path (load + predict + aggregate)':<46}{legacy_ms:>10.0f} ms")
+    print(f"{'batch path (load + predict + aggregate)':<46}{batch_ms:>10.0f} ms  ({legacy_ms / batch_ms:.1f}x)")
+    print(f"{'batch predict only (columns cached)':<46}{predict_ms:>10.1f} ms")
+    print(f"{'what-if forecast (columns cached)':<46}{what_if_ms:>10.0f} ms")
+    print(f"identical predictions and period counts: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: Monte-Carlo cashflow simulation over synthetic pipelines.
+
+Builds an invoice path of nine stages with lognormal duration histories (two
+stages left on their point estimates), spreads synthetic open deals over it,
+and times run_simulation for one pipeline, then several pipelines in-process
+versus fanned out to a process pool.
+
+    python -m benchmarks.bench_cashflow_simulation --deals 2000 --trials 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from cmd_center.backend.services.cashflow_simulation import (
+    SimulationJob,
+    StageDurations,
+    run_simulation,
+    run_simulations,
+)
+
+STAGES = [
+    ("Order Received", 13), ("Approved", 2), ("Awaiting Payment", 5), ("Awaiting Site Readiness", 5),
+    ("Everything Ready", 5), ("Under Progress", 0), ("Awaiting MDD", 2), ("Awaiting GCC", 3), ("Awaiting GR", 7),
+]
+HORIZON_DAYS = 90
+
+
+def synthetic_job(deals: int, trials: int, seed: int) -> SimulationJob:
+    """One pipeline: 500 spans per stage except two, deals spread over the path."""
+    rng = np.random.default_rng(seed)
+    samples = tuple(
+        np.sort(rng.lognormal(np.log(max(days, 1)), 0.6, size=500)) if i not in (3, 5) else np.empty(0)
+        for i, (_, days) in enumerate(STAGES)
+    )
+    durations = StageDurations(
+        stage_ids=tuple(range(len(STAGES))),
+        stage_names=tuple(name for name, _ in STAGES),
+        samples=samples,
+        fallback_days=np.array([days for _, days in STAGES], dtype=np.float64),
+    )
+    position = rng.integers(-1, len(STAGES), size=deals)
+    weeks = np.arange(HORIZON_DAYS + 1) // 7
+    return SimulationJob(
+        durations=durations,
+        position=position,
+        elapsed_days=rng.uniform(0, 60, size=deals),
+        fixed_invoice_days=rng.integers(-30, 30, size=deals).astype(np.float64),
+        fixed_payment_days=rng.integers(-20, 80, size=deals).astype(np.float64),
+        payment_days=np.where(rng.random(deals) < 0.7, 7.0, 45.0),
+        value=rng.integers(1, 300, size=deals) * 1000.0,
+        day_to_period=weeks,
+        n_periods=int(weeks[-1]) + 1,
+        trials=trials,
+        seed=seed,
+    )
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=2000, help="Open deals per pipeline")
+    parser.add_argument("--trials", type=int, default=10000, help="Trials per pipeline")
+    parser.add_argument("--pipelines", type=int, default=4, help="Pipelines for the fan-out comparison")
+    parser.add_argument("--processes", type=int, default=4, help="Process-pool workers")
+    args = parser.parse_args()
+
+    job = synthetic_job(args.deals, args.trials, seed=0)
+    result, single_ms = timed(lambda: run_simulation(job))
+    jobs = [synthetic_job(args.deals, args.trials, seed=seed) for seed in range(args.pipelines)]
+    inline, inline_ms = timed(lambda: run_simulations(jobs))
+    pooled, pooled_ms = timed(lambda: run_simulations(jobs, processes=args.processes))
+
+    identical = all(
+        np.array_equal(a.invoice_bands, b.invoice_bands) and np.array_equal(a.payment_bands, b.payment_bands)
+        for a, b in zip(inline, pooled)
+    )
+    p10, p50, p90 = result.invoice_totals
+    print(f"{args.trials} trials x {args.deals} deals, {job.n_periods} weekly periods")
+    print(f"invoiced within {HORIZON_DAYS} days: P10 {p10:,.0f}  P50 {p50:,.0f}  P90 {p90:,.0f} SAR")
+    print(f"{'one pipeline':<40}{single_ms:>10.0f} ms")
+    print(f"{f'{args.pipelines} pipelines in-process':<40}{inline_ms:>10.0f} ms")
+    print(f"{f'{args.pipelines} pipelines, {args.processes} processes':<40}{pooled_ms:>10.0f} ms"
+          f"  ({inline_ms / pooled_ms:.1f}x)")
+    print(f"identical bands: {identical}")
+
+
+if __name__ == "__main__":
+    main()
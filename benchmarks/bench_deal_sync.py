@@ -0,0 +1,165 @@
+"""Benchmark: full pipeline sweep vs /recents incremental deal sync.
+
+Replays a recorded-style Pipedrive fixture (deterministic synthetic payloads in
+the same shape as /v1/deals and /v1/recents) through an httpx MockTransport
+with a fixed per-request latency, and reports request counts and wall time.
+
+    python -m benchmarks.bench_deal_sync --deals 3000 --changed 40
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import httpx
+from sqlmodel import SQLModel, create_engine
+
+from cmd_center.backend import db  # noqa: F401 - registers all tables
+from cmd_center.backend.integrations.pipedrive_transport import PipedriveTransport, PipedriveTransportConfig
+from cmd_center.backend.services import pipedrive_sync
+
+BASE_URL = "https://pipedrive.test/v1"
+PIPELINES = [1, 5, 9]
+
+
+def build_fixture(deals_per_pipeline: int, changed: int, now: datetime) -> dict:
+    """Build deal payloads per pipeline plus the subset changed after the cursor."""
+    stale = (now - timedelta(days=3)).strftime("%Y-%m-%d %H:%M:%S")
+    fresh = (now - timedelta(minutes=5)).strftime("%Y-%m-%d %H:%M:%S")
+
+    deals = {}
+    next_id = 1
+    for pipeline_id in PIPELINES:
+        rows = []
+        for i in range(deals_per_pipeline):
+            rows.append({
+                "id": next_id,
+                "title": f"Deal {next_id}",
+                "pipeline_id": pipeline_id,
+                "stage_id": pipeline_id * 10 + i % 6,
+                "owner_id": {"id": 100 + i % 7, "name": f"Owner {i % 7}"},
+                "org_id": {"value": 500 + i % 50, "name": f"Org {i % 50}"},
+                "value": 1000.0 + i,
+                "currency": "SAR",
+                "status": "open",
+                "add_time": stale,
+                "update_time": fresh if i < changed else stale,
+                "stage_change_time": stale,
+                "notes_count": i % 4,
+                "custom_field_blob": "x" * 400,
+            })
+            next_id += 1
+        deals[pipeline_id] = rows
+    recents = [d for rows in deals.values() for d in rows if d["update_time"] == fresh]
+    return {"deals": deals, "recents": recents, "last_timestamp": fresh}
+
+
+def make_transport(fixture: dict, latency_s: float, counter: dict) -> httpx.MockTransport:
+    """Serve /deals and /recents pages from the fixture."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency_s)
+        counter["requests"] += 1
+        params = request.url.params
+        start = int(params.get("start", 0))
+        limit = int(params.get("limit", 100))
+
+        if request.url.path.endswith("/deals"):
+            rows = fixture["deals"][int(params["pipeline_id"])]
+            page = rows[start:start + limit]
+            more = start + limit < len(rows)
+            return httpx.Response(200, json={
+                "success": True,
+                "data": page,
+                "additional_data": {"pagination": {
+                    "start": start, "limit": limit,
+                    "more_items_in_collection": more, "next_start": start + limit,
+                }},
+            })
+
+        if request.url.path.endswith("/recents"):
+            rows = fixture["recents"]
+            page = rows[start:start + limit]
+            more = start + limit < len(rows)
+            return httpx.Response(200, json={
+                "success": True,
+                "data": [{"item": "deal", "id": d["id"], "data": d} for d in page],
+                "additional_data": {
+                    "since_timestamp": params.get("since_timestamp"),
+                    "last_timestamp_on_page": fixture["last_timestamp"],
+                    "pagination": {
+                        "start": start, "limit": limit,
+                        "more_items_in_collection": more, "next_start": start + limit,
+                    },
+                },
+            })
+
+        return httpx.Response(404, json={"success": False})
+
+    return httpx.MockTransport(handler)
+
+
+async def run(deals_per_pipeline: int, changed: int, latency_ms: float) -> None:
+    now = datetime.now(timezone.utc)
+    fixture = build_fixture(deals_per_pipeline, changed, now)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+
+        counter = {"requests": 0}
+        transport = PipedriveTransport(
+            # Unthrottled so the comparison measures request counts, not the rate limiter
+            PipedriveTransportConfig(rate_per_second=1e6, burst=10**6),
+            transport=make_transport(fixture, latency_ms / 1000, counter),
+        )
+
+        with patch.object(pipedrive_sync, "engine", engine), \
+                patch.object(pipedrive_sync, "get_pipedrive_transport", lambda: transport), \
+                patch.object(pipedrive_sync, "_get_token_and_base", lambda: ("bench-token", BASE_URL)):
+
+            # Warm the cache and establish cursor + reconciliation time
+            await pipedrive_sync.sync_deals(PIPELINES, force_full=True)
+            pipedrive_sync.update_sync_metadata(
+                pipedrive_sync.DEALS_RECENTS_CURSOR, "success",
+                sync_time=now - timedelta(hours=1),
+            )
+
+            # Before: hourly run fetching every open deal per pipeline
+            counter["requests"] = 0
+            started = time.perf_counter()
+            for pipeline_id in PIPELINES:
+                await pipedrive_sync.sync_deals_for_pipeline(pipeline_id, status="open", incremental=True)
+            before = (counter["requests"], time.perf_counter() - started)
+
+            # After: /recents incremental run
+            counter["requests"] = 0
+            started = time.perf_counter()
+            result = await pipedrive_sync.sync_deals(PIPELINES)
+            after = (counter["requests"], time.perf_counter() - started)
+
+        engine.dispose()
+
+    total = deals_per_pipeline * len(PIPELINES)
+    print(f"Deals cached: {total}, changed since cursor: {len(fixture['recents'])}, "
+          f"simulated latency: {latency_ms:.0f}ms/request")
+    print(f"{'mode':<28}{'requests':>10}{'wall time':>12}")
+    print(f"{'full sweep (before)':<28}{before[0]:>10}{before[1]:>11.3f}s")
+    print(f"{'recents ' + result['mode'] + ' (after)':<28}{after[0]:>10}{after[1]:>11.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=3000, help="Deals per pipeline")
+    parser.add_argument("--changed", type=int, default=40, help="Changed deals per pipeline")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="Simulated API latency")
+    args = parser.parse_args()
+    asyncio.run(run(args.deals, args.changed, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
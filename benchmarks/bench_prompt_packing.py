@@ -0,0 +1,73 @@
+"""Benchmark: prompt tokens before and after context packing.
+
+Renders the deal summary and deal health prompts with Pipedrive-style
+notes (HTML, pasted email threads, repeated status lines) and reports
+prompt tokens before and after packing, the compact structured-output
+schema against the full one, and the render cost of packing.
+
+    python -m benchmarks.bench_prompt_packing --notes 25
+"""
+
+import argparse
+import time
+
+from cmd_center.backend.integrations.llm_client import compact_schema
+from cmd_center.backend.integrations.token_counter import count_tokens
+from cmd_center.backend.models.writer_models import DealHealthResult, DealSummaryResult
+from cmd_center.backend.services.prompt_registry import PromptRegistry
+
+THREAD = "<p>From: site@example.com<br>Sent: Monday<br>Subject: RE: Site readiness</p>" + (
+    "<div>Dear team,&nbsp;please find the updated drawings attached and confirm the access dates "
+    "for the installation crew.</div>" * 12
+)
+STATUS = "<p>Followed up with the client, <b>awaiting PO amendment</b>.</p>"
+
+
+def make_notes(count: int) -> list[str]:
+    """Every third note a pasted thread; status lines repeat every other day."""
+    return [f"<p>Day {i}</p>{THREAD}" if i % 3 == 0 else STATUS + f"<p>Next call day {i // 2}</p>"
+            for i in range(count)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=25, help="Notes per deal")
+    parser.add_argument("--renders", type=int, default=500, help="Renders for the timing")
+    args = parser.parse_args()
+
+    registry = PromptRegistry()
+    notes = make_notes(args.notes)
+    cases = {
+        "deal.summarize.v1": {"deal_title": "Pump station", "stage": "Awaiting Payment", "days_in_stage": 19,
+                              "owner_name": "Sara", "notes": notes},
+        "deal.health_analysis.v1": {"deal_id": 1042, "deal_title": "Pump station", "stage": "Awaiting Payment",
+                                    "stage_code": "AP", "days_in_stage": 19, "owner_name": "Sara",
+                                    "value_sar": 480000.0, "days_since_last_note": 6, "stage_history": [],
+                                    "notes": [{"date": f"2026-03-{i % 28 + 1:02d}", "author": "Sara", "content": n}
+                                              for i, n in enumerate(notes)]},
+    }
+
+    for prompt_id, variables in cases.items():
+        prompt = registry.get_prompt(prompt_id)
+        _, _, report = registry.render_prompt_with_report(prompt_id, variables)
+
+        started = time.perf_counter()
+        for _ in range(args.renders):
+            prompt.render(variables)
+        plain_ms = (time.perf_counter() - started) * 1000 / args.renders
+        started = time.perf_counter()
+        for _ in range(args.renders):
+            registry.render_prompt_with_report(prompt_id, variables)
+        packed_ms = (time.perf_counter() - started) * 1000 / args.renders
+
+        print(f"{prompt_id:<24} tokens {report.tokens_before:6,} -> {report.tokens_after:5,} "
+              f"(budget {prompt.token_budget}, {report.duplicates} duplicate, {report.truncated} truncated, "
+              f"{report.dropped} dropped)   render {plain_ms:.2f} ms -> packed {packed_ms:.2f} ms")
+
+    for schema in (DealSummaryResult, DealHealthResult):
+        full = count_tokens(str(schema.model_json_schema()))
+        print(f"{schema.__name__:<24} schema tokens {full:4} -> {count_tokens(compact_schema(schema)):4}")
+
+
+if __name__ == "__main__":
+    main()
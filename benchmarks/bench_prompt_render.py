@@ -0,0 +1,84 @@
+"""Benchmark: prompt render throughput with and without compiled templates.
+
+Renders the email follow-up and deal-health prompts with representative
+variables, comparing the previous per-call jinja2.Template(source) against
+PromptTemplate.render() on the template compiled at registration. Also
+times PromptRegistry construction now that default prompts are built on
+first use.
+
+    python -m benchmarks.bench_prompt_render --renders 2000
+"""
+
+import argparse
+import time
+
+from jinja2 import Template
+
+from cmd_center.backend.services.prompt_registry import PromptRegistry
+
+EMAIL_VARIABLES = {
+    "recipients": ["pm@example.com", "sales@example.com"],
+    "subject_intent": "Overdue site readiness confirmations",
+    "language": "en",
+    "tone": "professional",
+    "deal_contexts": [
+        {"title": f"Deal {i}", "pipeline": "Aramco Projects", "stage": "Awaiting Site Readiness",
+         "issue": "No update for 21 days"}
+        for i in range(8)
+    ],
+}
+
+HEALTH_VARIABLES = {
+    "deal_id": 1042,
+    "deal_title": "Ras Tanura pump station",
+    "stage": "Awaiting Payment",
+    "stage_code": "AP",
+    "days_in_stage": 19,
+    "owner_name": "Sara",
+    "value_sar": 480000.0,
+    "days_since_last_note": 6,
+    "stage_history": [
+        {"stage_name": f"Stage {i}", "entered_at": "2026-01-01T00:00:00", "duration_hours": 36.5 * i}
+        for i in range(9)
+    ],
+    "notes": [
+        {"date": "2026-03-01", "author": "Sara", "content": "Customer confirmed the PO amendment. " * 8}
+        for _ in range(15)
+    ],
+}
+
+CASES = [("email.followup.v1", EMAIL_VARIABLES), ("deal.health_analysis.v1", HEALTH_VARIABLES)]
+
+
+def per_second(fn, renders: int) -> float:
+    started = time.perf_counter()
+    for _ in range(renders):
+        fn()
+    return renders / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=2000, help="Renders per prompt and mode")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    registry = PromptRegistry()
+    construct_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    registry.list_prompts()  # builds and compiles every lazy prompt
+    build_all_ms = (time.perf_counter() - started) * 1000
+    print(f"registry construction {construct_ms:.2f} ms; building all prompts {build_all_ms:.1f} ms")
+
+    for prompt_id, variables in CASES:
+        prompt = registry.get_prompt(prompt_id)
+        assert prompt.render(variables)[1] == Template(prompt.user_prompt_template).render(**variables)
+
+        uncompiled = per_second(lambda: Template(prompt.user_prompt_template).render(**variables), args.renders)
+        compiled = per_second(lambda: prompt.render(variables), args.renders)
+        print(f"{prompt_id:<26} per-call Template {uncompiled:9,.0f}/s   compiled {compiled:9,.0f}/s   "
+              f"x{compiled / uncompiled:.1f}")
+
+
+if __name__ == "__main__":
+    main()
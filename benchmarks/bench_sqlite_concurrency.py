@@ -0,0 +1,135 @@
+"""Benchmark: API read latency while a sync job writes, default vs tuned SQLite.
+
+Runs one writer thread that keeps upserting batches of deals (like the hourly
+deal sync) alongside N reader threads issuing the open-deals query the
+dashboard endpoints use, and reports read latency percentiles for:
+
+- default: rollback journal, readers share a plain read-write engine
+- tuned:   SQLiteProfile (WAL + pragmas) and a separate mode=ro read engine
+
+    python -m benchmarks.bench_sqlite_concurrency --readers 8 --seconds 5
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlmodel import Session, SQLModel, select
+
+from cmd_center.backend.db import Deal, SQLiteProfile, create_sqlite_engine
+from cmd_center.backend.services.bulk_upsert import bulk_upsert
+
+
+def deal_rows(count: int, version: int) -> list[dict]:
+    stamp = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=version)
+    return [
+        dict(
+            id=i,
+            title=f"Deal {i}",
+            pipeline_id=1 + i % 3,
+            stage_id=10 + i % 8,
+            owner_name=f"Owner {i % 9}",
+            value=1000.0 + i,
+            status="open",
+            update_time=stamp,
+            raw_json="x" * 300,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(path: str, tuned: bool, deals: int, readers: int, seconds: float, write_pause: float) -> dict:
+    profile = SQLiteProfile() if tuned else None
+    writer_engine = create_sqlite_engine(path, profile)
+    SQLModel.metadata.create_all(writer_engine)
+    with Session(writer_engine) as session:
+        bulk_upsert(session, Deal, deal_rows(deals, 0))
+        session.commit()
+    reader_engine = create_sqlite_engine(path, profile, read_only=True) if tuned else writer_engine
+
+    stop = threading.Event()
+    latencies: list[float] = []
+    errors = [0]
+    writes = [0]
+    lock = threading.Lock()
+
+    def writer():
+        version = 1
+        while not stop.is_set():
+            with Session(writer_engine) as session:
+                bulk_upsert(session, Deal, deal_rows(deals, version))
+                session.commit()
+            version += 1
+            writes[0] += 1
+            # Sync jobs spend most of their time waiting on the Pipedrive API
+            time.sleep(write_pause)
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with Session(reader_engine) as session:
+                    session.exec(
+                        select(Deal)
+                        .where(Deal.pipeline_id == 1, Deal.status == "open")
+                        .order_by(Deal.update_time)
+                        .limit(50)
+                    ).all()
+                local.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    writer_engine.dispose()
+    reader_engine.dispose()
+    return {
+        "reads": len(latencies),
+        "errors": errors[0],
+        "writes": writes[0],
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": percentile(latencies, 99) if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=3000, help="Deals rewritten per writer batch")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent API reader threads")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per scenario")
+    parser.add_argument("--write-pause-ms", type=float, default=100.0, help="Writer idle time between batches")
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, writer upserting {args.deals} deals per batch, {args.seconds:.0f}s each")
+    print(f"{'profile':<10}{'reads':>8}{'errors':>8}{'write batches':>15}{'p50 ms':>10}{'p99 ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, tuned in (("default", False), ("tuned", True)):
+            r = run_scenario(
+                os.path.join(tmp, f"{name}.db"), tuned,
+                args.deals, args.readers, args.seconds, args.write_pause_ms / 1000,
+            )
+            print(f"{name:<10}{r['reads']:>8}{r['errors']:>8}{r['writes']:>15}{r['p50']:>10.1f}{r['p99']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: process RSS across repeated Aramco summary requests.
+
+Seeds a synthetic cache and calls the shared AramcoSummaryService (the
+instance the API uses) for the overdue, stuck and Order Received summaries in
+rotation, sampling resident memory at checkpoints. The summaries are called
+uncached so every request queries the cache database. With one short-lived
+session per call, RSS should level off after warm-up instead of growing
+with the request count.
+
+    python -m benchmarks.bench_summary_memory --requests 10000 --deals 500
+"""
+
+import argparse
+import gc
+import os
+import resource
+import tempfile
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlmodel import SQLModel
+
+from benchmarks.bench_aramco_summaries import seed
+from cmd_center.backend import db
+from cmd_center.backend.services.aramco_summary_service import get_aramco_summary_service
+from cmd_center.backend.services.deal_facts import refresh_deal_facts
+
+SUMMARIES = ("generate_overdue_summary", "generate_stuck_summary", "generate_order_received_summary")
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=10000, help="Summary requests to issue")
+    parser.add_argument("--deals", type=int, default=500, help="Synthetic deals to seed")
+    parser.add_argument("--checkpoints", type=int, default=10, help="RSS samples to report")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = db.create_sqlite_engine(os.path.join(tmp, "bench.db"))
+        SQLModel.metadata.create_all(engine)
+        seed(engine, args.deals, datetime.now())
+        with patch.object(db, "engine", engine), patch.object(db, "read_engine", engine):
+            refresh_deal_facts()
+            service = get_aramco_summary_service()
+            every = max(1, args.requests // args.checkpoints)
+
+            print(f"{args.requests} summary requests over {args.deals} synthetic deals")
+            print(f"{'requests':>10}{'rss MB':>10}{'req/s':>10}")
+            started = time.perf_counter()
+            samples = []
+            for i in range(1, args.requests + 1):
+                getattr(type(service), SUMMARIES[i % len(SUMMARIES)]).uncached(service)
+                if i % every == 0:
+                    gc.collect()
+                    samples.append(rss_mb())
+                    rate = i / (time.perf_counter() - started)
+                    print(f"{i:>10}{samples[-1]:>10.1f}{rate:>10.0f}")
+        engine.dispose()
+
+    if len(samples) > 1:
+        print(f"growth after first checkpoint: {samples[-1] - samples[0]:+.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
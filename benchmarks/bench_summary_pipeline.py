@@ -0,0 +1,98 @@
+"""Benchmark: lock-step batches vs the streaming summary worker pool.
+
+Simulates an LLM whose latencies are heavy-tailed (Pareto, most responses
+around the median with occasional very slow ones) and summarizes the same
+deals twice with the same latencies:
+- lock-step: groups of max_concurrent awaited with asyncio.gather (the old
+  batch_summarize_deals)
+- streaming: summary_pipeline.stream_summaries
+
+Reports wall time, time to the first result and the mean time until a
+deal's summary is available to the caller.
+
+    python -m benchmarks.bench_summary_pipeline --deals 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from cmd_center.backend.models.writer_models import DealSummaryContext, DealSummaryResult
+from cmd_center.backend.services.summary_pipeline import stream_summaries
+
+
+def latencies(deals: int, median_s: float, alpha: float, seed: int) -> dict[int, float]:
+    """Pareto latencies per deal with the given median."""
+    rng = np.random.default_rng(seed)
+    scale = median_s / 2 ** (1 / alpha)
+    return {deal_id: float(scale * (1 + rng.pareto(alpha))) for deal_id in range(1, deals + 1)}
+
+
+def fake_llm(delays: dict[int, float]):
+    async def summarize(context: DealSummaryContext) -> DealSummaryResult:
+        await asyncio.sleep(delays[context.deal_id])
+        return DealSummaryResult(deal_id=context.deal_id, summary="ok", confidence=0.9)
+    return summarize
+
+
+async def lock_step(summarize, contexts, max_concurrent: int, started: float) -> list[float]:
+    """Previous implementation: results become available only per finished group."""
+    ready = []
+    for i in range(0, len(contexts), max_concurrent):
+        await asyncio.gather(*(summarize(context) for context in contexts[i:i + max_concurrent]))
+        ready.extend([time.perf_counter() - started] * len(contexts[i:i + max_concurrent]))
+    # The caller received the list only once every group finished
+    return ready[-1:] * len(ready)
+
+
+async def streaming(summarize, contexts, max_concurrent: int, started: float) -> list[float]:
+    return [
+        time.perf_counter() - started
+        async for _ in stream_summaries(summarize, contexts, max_concurrent=max_concurrent)
+    ]
+
+
+async def measure(mode, summarize, contexts, max_concurrent: int) -> dict:
+    started = time.perf_counter()
+    ready = await mode(summarize, contexts, max_concurrent, started)
+    return {
+        "wall_s": time.perf_counter() - started,
+        "first_s": min(ready),
+        "mean_ready_s": sum(ready) / len(ready),
+    }
+
+
+async def run(deals: int, max_concurrent: int, median_ms: float, alpha: float, seed: int) -> None:
+    delays = latencies(deals, median_ms / 1000, alpha, seed)
+    contexts = [
+        DealSummaryContext(deal_id=deal_id, deal_title=f"Deal {deal_id}", stage="Approved",
+                           owner_name="Owner", days_in_stage=5, notes=["note"])
+        for deal_id in delays
+    ]
+    values = np.array(list(delays.values()))
+    print(f"{deals} deals, {max_concurrent} in flight, latency p50 {np.median(values) * 1000:.0f} ms, "
+          f"p99 {np.percentile(values, 99) * 1000:.0f} ms, max {values.max() * 1000:.0f} ms")
+    print(f"ideal (total latency / concurrency): {values.sum() / max_concurrent:.2f} s")
+
+    for name, mode in (("lock-step", lock_step), ("streaming", streaming)):
+        stats = await measure(mode, fake_llm(delays), contexts, max_concurrent)
+        print(f"{name:<10} wall {stats['wall_s']:6.2f} s   first result {stats['first_s']:6.2f} s   "
+              f"mean time to result {stats['mean_ready_s']:6.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deals", type=int, default=200, help="Deals to summarize")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--median-ms", type=float, default=40, help="Median simulated LLM latency")
+    parser.add_argument("--alpha", type=float, default=1.3, help="Pareto shape (lower is heavier-tailed)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.deals, args.concurrency, args.median_ms, args.alpha, args.seed))
+
+
+if __name__ == "__main__":
+    main()
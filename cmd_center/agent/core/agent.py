@@ -11,6 +11,9 @@ from .errors import format_error_response
 import httpx
 
 from ...backend.integrations.config import get_config
+from ...backend.integrations.llm_circuit_breaker import LLMPriority, estimate_tokens, get_llm_resilience
+from ...backend.integrations.llm_client import retry_after_seconds
+from ...backend.integrations.openrouter_transport import get_openrouter_transport
 from ..tools.registry import ToolRegistry
 from ..tools.base import PendingAction
 
@@ -62,6 +65,8 @@ class OmniousAgent:
 
     MAX_RETRIES = 3
     RETRY_DELAYS = [0.1, 0.5, 1.0]
+    # Completion allowance reserved from the shared token budget per call
+    COMPLETION_TOKENS_ESTIMATE = 1000
 
     def __init__(self, persist: bool = False):
         """Initialize the agent with configuration, tools, and metrics.
@@ -320,11 +325,15 @@ class OmniousAgent:
             payload["tool_choice"] = "auto"
 
         last_error = None
+        # Chats share the LLM budget with the backend services but go first
+        resilience = get_llm_resilience()
+        estimated = estimate_tokens(json.dumps(messages), self.COMPLETION_TOKENS_ESTIMATE)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            for attempt in range(self.MAX_RETRIES):
-                try:
-                    response = await client.post(
+        transport = get_openrouter_transport()
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                async with resilience.guard(LLMPriority.INTERACTIVE, estimated) as permit:
+                    response = await transport.post(
                         f"{self.config.openrouter_api_url}/chat/completions",
                         headers=headers,
                         json=payload
@@ -332,20 +341,24 @@ class OmniousAgent:
 
                     # Handle rate limiting
                     if response.status_code == 429:
-                        if attempt < self.MAX_RETRIES - 1:
-                            await asyncio.sleep(self.RETRY_DELAYS[attempt])
-                            continue
+                        # Hold back every caller sharing the budget for as long as the server asks
+                        resilience.rate_limiter.pause(retry_after_seconds(response))
+                        permit.fail("Rate limit exceeded")
+                        if attempt == self.MAX_RETRIES - 1:
+                            response.raise_for_status()
+                    else:
                         response.raise_for_status()
+                        permit.record_tokens(_total_tokens(response.json(), estimated))
+                        return response
 
-                    response.raise_for_status()
-                    return response
+                await asyncio.sleep(self.RETRY_DELAYS[attempt])
 
-                except httpx.HTTPError as e:
-                    last_error = e
-                    if attempt < self.MAX_RETRIES - 1:
-                        await asyncio.sleep(self.RETRY_DELAYS[attempt])
-                    else:
-                        raise
+            except httpx.HTTPError as e:
+                last_error = e
+                if attempt < self.MAX_RETRIES - 1:
+                    await asyncio.sleep(self.RETRY_DELAYS[attempt])
+                else:
+                    raise
 
         raise last_error  # type: ignore
 
@@ -582,74 +595,79 @@ class OmniousAgent:
         accumulated_content = ""
         accumulated_tool_calls: List[Dict[str, Any]] = []
         current_tool_call: Optional[Dict[str, Any]] = None
+        estimated = estimate_tokens(json.dumps(messages), self.COMPLETION_TOKENS_ESTIMATE)
+        transport = get_openrouter_transport()
+
+        async with get_llm_resilience().guard(LLMPriority.INTERACTIVE, estimated) as permit, transport.stream(
+            "POST",
+            f"{self.config.openrouter_api_url}/chat/completions",
+            headers=headers,
+            json=payload
+        ) as response:
+            if response.status_code != 200:
+                error_text = await response.aread()
+                permit.fail(f"API error {response.status_code}")
+                yield StreamChunk(
+                    type="error",
+                    error=f"API error {response.status_code}: {error_text.decode()}"
+                )
+                return
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            async with client.stream(
-                "POST",
-                f"{self.config.openrouter_api_url}/chat/completions",
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status_code != 200:
-                    error_text = await response.aread()
-                    yield StreamChunk(
-                        type="error",
-                        error=f"API error {response.status_code}: {error_text.decode()}"
-                    )
-                    return
-
-                async for line in response.aiter_lines():
-                    if not line or not line.startswith("data: "):
-                        continue
+            async for line in response.aiter_lines():
+                if not line or not line.startswith("data: "):
+                    continue
 
-                    data = line[6:]  # Remove "data: " prefix
+                data = line[6:]  # Remove "data: " prefix
 
-                    if data == "[DONE]":
-                        break
+                if data == "[DONE]":
+                    break
 
-                    try:
-                        chunk_data = json.loads(data)
-                    except json.JSONDecodeError:
-                        continue
-
-                    if not chunk_data.get("choices"):
-                        continue
-
-                    delta = chunk_data["choices"][0].get("delta", {})
-
-                    # Handle text content
-                    if "content" in delta and delta["content"]:
-                        accumulated_content += delta["content"]
-                        yield StreamChunk(type="text", content=delta["content"])
-
-                    # Handle tool calls
-                    if "tool_calls" in delta:
-                        for tool_call_delta in delta["tool_calls"]:
-                            index = tool_call_delta.get("index", 0)
-
-                            # Extend accumulated_tool_calls if needed
-                            while len(accumulated_tool_calls) <= index:
-                                accumulated_tool_calls.append({
-                                    "id": "",
-                                    "type": "function",
-                                    "function": {"name": "", "arguments": ""}
-                                })
-
-                            tc = accumulated_tool_calls[index]
-
-                            if "id" in tool_call_delta:
-                                tc["id"] = tool_call_delta["id"]
-
-                            if "function" in tool_call_delta:
-                                func = tool_call_delta["function"]
-                                if "name" in func:
-                                    tc["function"]["name"] = func["name"]
-                                    yield StreamChunk(
-                                        type="tool_call",
-                                        tool_name=func["name"]
-                                    )
-                                if "arguments" in func:
-                                    tc["function"]["arguments"] += func["arguments"]
+                try:
+                    chunk_data = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+
+                if chunk_data.get("usage"):
+                    permit.record_tokens(_total_tokens(chunk_data, estimated))
+
+                if not chunk_data.get("choices"):
+                    continue
+
+                delta = chunk_data["choices"][0].get("delta", {})
+
+                # Handle text content
+                if "content" in delta and delta["content"]:
+                    accumulated_content += delta["content"]
+                    yield StreamChunk(type="text", content=delta["content"])
+
+                # Handle tool calls
+                if "tool_calls" in delta:
+                    for tool_call_delta in delta["tool_calls"]:
+                        index = tool_call_delta.get("index", 0)
+
+                        # Extend accumulated_tool_calls if needed
+                        while len(accumulated_tool_calls) <= index:
+                            accumulated_tool_calls.append({
+                                "id": "",
+                                "type": "function",
+                                "function": {"name": "", "arguments": ""}
+                            })
+
+                        tc = accumulated_tool_calls[index]
+
+                        if "id" in tool_call_delta:
+                            tc["id"] = tool_call_delta["id"]
+
+                        if "function" in tool_call_delta:
+                            func = tool_call_delta["function"]
+                            if "name" in func:
+                                tc["function"]["name"] = func["name"]
+                                yield StreamChunk(
+                                    type="tool_call",
+                                    tool_name=func["name"]
+                                )
+                            if "arguments" in func:
+                                tc["function"]["arguments"] += func["arguments"]
 
         # Process accumulated tool calls
         if accumulated_tool_calls:
@@ -690,6 +708,14 @@ class OmniousAgent:
             yield StreamChunk(type="done")
 
 
+def _total_tokens(response_data: Any, default: int) -> int:
+    """Prompt + completion tokens from an API response's usage block."""
+    usage = response_data.get("usage") if isinstance(response_data, dict) else None
+    if not isinstance(usage, dict):
+        return default
+    return usage.get("total_tokens") or (usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0))
+
+
 # Singleton instance
 _agent: Optional[OmniousAgent] = None
 
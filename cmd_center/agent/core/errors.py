@@ -2,6 +2,8 @@
 
 from typing import Optional
 
+from ...backend.integrations.llm_circuit_breaker import CircuitBreakerOpen
+
 
 class AgentError(Exception):
     """Base exception for all agent errors."""
@@ -74,6 +76,12 @@ def format_error_response(error: Exception) -> str:
             "Could you try rephrasing or ask something else?"
         )
 
+    if isinstance(error, CircuitBreakerOpen):
+        return (
+            "I'm experiencing some technical difficulties at the moment. "
+            "Please try again in a few moments."
+        )
+
     if isinstance(error, ContextLimitError):
         return (
             "Our conversation has gotten quite long! "
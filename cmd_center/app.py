@@ -17,6 +17,7 @@ from .screens import (
     CEODashboardScreen,
 )
 from .screens.agent_screen import AgentScreen
+from .backend.integrations.openrouter_transport import get_openrouter_transport
 
 
 class CommandCenterApp(App):
@@ -70,6 +71,10 @@ class CommandCenterApp(App):
 
         # Start with CEO Dashboard (default on launch)
         self.push_screen("ceo_dashboard")
+
+    async def on_unmount(self) -> None:
+        """Close the agent's pooled OpenRouter connections on exit."""
+        await get_openrouter_transport().aclose()
     
     def action_switch_screen(self, screen_name: str) -> None:
         """Switch to a different screen."""
@@ -5,6 +5,7 @@ from . import health, dashboard, aramco, commercial, owners, deals, emails, sync
 from . import employees, interventions, reminders, tasks, notes
 from . import documents, bonuses, employee_logs, skills
 from . import loops
+from . import experiments
 from . import ceo_dashboard
 
 # Create main API router
@@ -36,6 +37,9 @@ api_router.include_router(skills.router)
 # Loop Engine routers
 api_router.include_router(loops.router)
 
+# Prompt A/B experiment routers
+api_router.include_router(experiments.router)
+
 # CEO Dashboard router
 api_router.include_router(ceo_dashboard.router)
 
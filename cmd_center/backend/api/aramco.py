@@ -10,6 +10,9 @@ from ..models import (
     ComplianceStatus,
     CashflowBucket,
     CashflowPredictionInput,
+    CashflowSimulation,
+    CashflowWhatIfInput,
+    CashflowWhatIfResult,
     DealPrediction,
     OverdueSummaryResponse,
     StuckSummaryResponse,
@@ -101,6 +104,42 @@ async def get_aramco_cashflow_critical_deals(
     return critical_deals
 
 
+@router.get("/cashflow_simulation", response_model=CashflowSimulation)
+async def get_aramco_cashflow_simulation(
+    period_type: str = Query("week", pattern="^(week|month)$"),
+    horizon_days: int = Query(90, ge=7, le=365),
+    trials: int = Query(10000, ge=100, le=100000),
+):
+    """Get P10/P50/P90 cashflow bands simulated from historical stage durations."""
+    service = get_cashflow_prediction_service()
+    simulations = await service.simulate_cashflow([CashflowPredictionInput(
+        pipeline_name="Aramco Projects",
+        horizon_days=horizon_days,
+        granularity=period_type,
+        trials=trials,
+    )])
+    return simulations[0]
+
+
+@router.post("/cashflow_what_if", response_model=CashflowWhatIfResult)
+async def get_aramco_cashflow_what_if(scenario: CashflowWhatIfInput):
+    """Compare the cashflow projection under alternate stage durations."""
+    service = get_cashflow_prediction_service()
+    input_data = CashflowPredictionInput(
+        pipeline_name="Aramco Projects",
+        horizon_days=scenario.horizon_days,
+        granularity=scenario.granularity,
+    )
+    baseline = await service.predict_cashflow(input_data)
+    what_if = await service.predict_cashflow_what_if(input_data, scenario.stage_days_to_invoice)
+    return CashflowWhatIfResult(
+        baseline=baseline.aggregated_forecast,
+        scenario=what_if.aggregated_forecast,
+        baseline_total_sar=sum(b.expected_invoice_value_sar for b in baseline.aggregated_forecast),
+        scenario_total_sar=sum(b.expected_invoice_value_sar for b in what_if.aggregated_forecast),
+    )
+
+
 # ============================================================================
 # CEO RADAR SUMMARY ENDPOINTS
 # ============================================================================
@@ -5,9 +5,10 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 
 from ..models import DealBase, DealNote, DealStageHistory, StagePerformanceMetrics
-from ..models import DealHealthContext, DealHealthResult
+from ..models import DealHealthContext, DealHealthResult, SummaryRunProgress
 from ..services import get_deal_health_service, get_llm_analysis_service
 from ..services.pipedrive_sync import sync_stage_history_for_deal
+from ..services.summary_pipeline import get_summary_run
 from ..services.writer_service import get_writer_service
 
 # Stage name to code mapping
@@ -28,6 +29,17 @@ STAGE_NAME_TO_CODE = {
 router = APIRouter()
 
 
+@router.get("/summary-runs/{run_id}", response_model=SummaryRunProgress)
+async def get_summary_run_progress(run_id: int, after: int = Query(0, ge=0)):
+    """Get a batch summary run's status and the summaries completed after cursor `after`."""
+    progress = get_summary_run(run_id, after=after)
+
+    if not progress:
+        raise HTTPException(status_code=404, detail="Summary run not found")
+
+    return progress
+
+
 @router.get("/{deal_id}/detail", response_model=DealBase)
 async def get_deal_detail(deal_id: int):
     """Get detailed information for a single deal."""
@@ -0,0 +1,70 @@
+"""API endpoints for prompt A/B experiments."""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..services.experiment_store import get_experiment_store
+from ..services.prompt_registry import PromptRegistry, get_prompt_registry
+
+router = APIRouter(prefix="/experiments", tags=["experiments"])
+
+# Seconds between keep-alive comments on an idle stats stream
+HEARTBEAT_SECONDS = 15.0
+
+
+@router.get("")
+def list_experiments() -> dict:
+    """List experiments, plus the state of the batched result writer."""
+    return {
+        "experiments": get_prompt_registry().list_experiments(),
+        "writer": get_experiment_store().get_stats(),
+    }
+
+
+@router.get("/{experiment_id}")
+def get_experiment_stats(experiment_id: str) -> dict:
+    """Per-variant stats, p-values against the leader and the winner, if any."""
+    stats = get_prompt_registry().get_experiment_stats(experiment_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"Experiment '{experiment_id}' not found")
+    return stats
+
+
+@router.get("/{experiment_id}/stream")
+async def stream_experiment_stats(
+    experiment_id: str,
+    interval: float = Query(1.0, ge=0.1, le=60.0),
+) -> StreamingResponse:
+    """Server-sent events: the experiment's stats whenever new results arrive."""
+    registry = get_prompt_registry()
+    if registry.get_experiment(experiment_id) is None:
+        raise HTTPException(status_code=404, detail=f"Experiment '{experiment_id}' not found")
+
+    return StreamingResponse(
+        experiment_events(registry, experiment_id, interval),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def experiment_events(registry: PromptRegistry, experiment_id: str, interval: float) -> AsyncIterator[str]:
+    """SSE frames: stats on connect and after each change, comments while idle."""
+    last_version = None
+    idle = 0.0
+    while True:
+        experiment = registry.get_experiment(experiment_id)
+        if experiment is None:
+            return
+        if experiment.version != last_version:
+            last_version = experiment.version
+            idle = 0.0
+            yield f"event: stats\ndata: {json.dumps(registry.get_experiment_stats(experiment_id))}\n\n"
+        elif idle >= HEARTBEAT_SECONDS:
+            idle = 0.0
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(interval)
+        idle += interval
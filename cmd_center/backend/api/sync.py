@@ -1,7 +1,14 @@
 """Sync API endpoints."""
 
 from fastapi import APIRouter, HTTPException
-from ..services.sync_scheduler import manual_sync_stages
+from ..integrations.llm_circuit_breaker import get_llm_resilience
+from ..integrations.llm_client import get_llm_client
+from ..integrations.openrouter_transport import get_openrouter_transport
+from ..integrations.pipedrive_transport import get_pipedrive_transport
+from ..services.prompt_registry import get_prompt_registry
+from ..services.result_cache import get_result_cache
+from ..services.sync_scheduler import get_scheduler, manual_sync_stages, startup_sync_state
+from ..services.sync_status import get_sync_status
 
 router = APIRouter()
 
@@ -15,4 +22,49 @@ async def sync_stages():
             raise HTTPException(status_code=500, detail=result["error"])
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/status")
+def sync_status():
+    """Readiness and freshness of the local cache, from SyncMetadata."""
+    return {"startup_sync": startup_sync_state(), **get_sync_status()}
+
+
+@router.get("/transport")
+async def transport_metrics():
+    """Per-endpoint latency/error metrics and rate limiter state for Pipedrive calls."""
+    return get_pipedrive_transport().metrics()
+
+
+@router.get("/llm")
+def llm_metrics():
+    """Shared LLM budget, client usage, OpenRouter connection reuse/TTFT and prompt packing totals."""
+    return {
+        **get_llm_resilience().get_stats(),
+        "client": get_llm_client().get_metrics(),
+        "transport": get_openrouter_transport().metrics(),
+        "prompt_packing": get_prompt_registry().get_packing_stats(),
+    }
+
+
+@router.get("/result_cache")
+async def result_cache_metrics():
+    """Hit/miss/coalesced counters and size of the dashboard result cache."""
+    return get_result_cache().stats()
+
+
+@router.get("/jobs")
+async def sync_jobs():
+    """Sync job queue depth, running jobs, schedule and run durations."""
+    return get_scheduler().status()
+
+
+@router.post("/jobs/{job_name}/run")
+async def run_sync_job(job_name: str):
+    """Queue a sync job now; duplicate triggers are coalesced."""
+    try:
+        result = get_scheduler().trigger(job_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown sync job: {job_name}")
+    return {"job": job_name, "status": result}
@@ -195,24 +195,12 @@ class ActionType(str, Enum):
 # Pipeline Mappings
 # ============================================================================
 
-PIPELINE_NAME_TO_ID = {
-    "Pipeline": 1,              # Commercial
-    "Prospecting": 2,
-    "Aramco Inquiries": 3,
-    "Aramco PO": 4,
-    "Aramco Projects": 5,
-    "Bidding Projects": 6,
-    "Design Development": 10,
-    "Problematic & Stuck Orders": 11,
-}
-
-PIPELINE_ID_TO_NAME = {v: k for k, v in PIPELINE_NAME_TO_ID.items()}
-
-# Pipelines to sync regularly
-SYNC_PIPELINES = [
-    PIPELINE_NAME_TO_ID["Aramco Projects"],
-    PIPELINE_NAME_TO_ID["Pipeline"],  # Commercial
-    PIPELINE_NAME_TO_ID["Aramco PO"],
+# Pipelines to sync regularly, by Pipedrive name. Ids and names are resolved
+# from the synced Pipeline/Stage tables via services/dimension_cache.py.
+SYNC_PIPELINE_NAMES = [
+    "Aramco Projects",
+    "Pipeline",  # Commercial
+    "Aramco PO",
 ]
 
 
@@ -254,9 +242,7 @@ __all__ = [
     "FindingSeverity",
     "ActionType",
     # Pipeline mappings
-    "PIPELINE_NAME_TO_ID",
-    "PIPELINE_ID_TO_NAME",
-    "SYNC_PIPELINES",
+    "SYNC_PIPELINE_NAMES",
     # Utility functions
     "build_stage_key_to_id",
     "get_stage_name",
@@ -1,15 +1,102 @@
 """SQLite cache setup and SQLModel tables for Pipedrive data."""
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Union
 
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
 from sqlmodel import SQLModel, Field, create_engine, Index
 
 # Import agent persistence models so they're registered with SQLModel.metadata
 from cmd_center.agent.persistence.models import AgentConversation, AgentMessage
 
+from .integrations.config import get_config
+
 # SQLite cache file; adjust path if needed
-engine = create_engine("sqlite:///pipedrive_cache.db", echo=False, connect_args={"check_same_thread": False})
+DATABASE_FILE = "pipedrive_cache.db"
+
+
+@dataclass(frozen=True)
+class SQLiteProfile:
+    """Connection pragmas applied to every SQLite connection an engine opens.
+
+    WAL lets the FastAPI readers keep reading while a sync job writes, and
+    synchronous=NORMAL is safe under WAL (a power loss can only drop the last
+    commits, never corrupt the cache).
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kb: int = 64 * 1024
+    mmap_size_mb: int = 256
+    temp_store: str = "MEMORY"
+    busy_timeout_ms: int = 5000
+
+    @classmethod
+    def from_config(cls) -> "SQLiteProfile":
+        config = get_config()
+        return cls(
+            journal_mode=config.sqlite_journal_mode,
+            synchronous=config.sqlite_synchronous,
+            cache_size_kb=config.sqlite_cache_size_kb,
+            mmap_size_mb=config.sqlite_mmap_size_mb,
+            temp_store=config.sqlite_temp_store,
+            busy_timeout_ms=config.sqlite_busy_timeout_ms,
+        )
+
+    def apply(self, dbapi_connection, read_only: bool = False) -> None:
+        """Run the PRAGMA statements on a raw DBAPI connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            if not read_only:
+                # journal_mode is persisted in the file, so only the writer sets it
+                cursor.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+                cursor.execute(f"PRAGMA synchronous = {self.synchronous}")
+            # Negative cache_size is in KiB rather than pages
+            cursor.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+            cursor.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+            cursor.execute(f"PRAGMA temp_store = {self.temp_store}")
+        finally:
+            cursor.close()
+
+
+def create_sqlite_engine(
+    path: str,
+    profile: Optional[SQLiteProfile] = None,
+    read_only: bool = False,
+    **kwargs,
+) -> Engine:
+    """Create an engine for a SQLite file with the profile applied on connect.
+
+    Args:
+        path: Database file path
+        profile: Pragmas to apply (None leaves SQLite defaults)
+        read_only: Open connections with mode=ro so they can never take the write lock
+    """
+    url = f"sqlite:///file:{path}?mode=ro&uri=true" if read_only else f"sqlite:///{path}"
+    new_engine = create_engine(
+        url,
+        echo=False,
+        connect_args={"check_same_thread": False},
+        **kwargs,
+    )
+    if profile is not None:
+        @event.listens_for(new_engine, "connect")
+        def _apply_profile(dbapi_connection, connection_record):
+            profile.apply(dbapi_connection, read_only=read_only)
+
+    return new_engine
+
+
+_profile = SQLiteProfile.from_config()
+
+# Read-write engine used by sync jobs and services that modify data
+engine = create_sqlite_engine(DATABASE_FILE, _profile)
+
+# Read-only engine for dashboard and API reads; never queues behind sync writers
+read_engine = create_sqlite_engine(DATABASE_FILE, _profile, read_only=True)
+
 
 # Pipeline saving
 class Pipeline(SQLModel, table=True):
@@ -37,6 +124,14 @@ class Stage(SQLModel, table=True):
 
 # this for the deal
 class Deal(SQLModel, table=True):
+    __table_args__ = (
+        # Hot read paths (see tests/unit/test_query_plans.py); overdue/stuck
+        # lists read deal_facts, which carries their indexes
+        Index("ix_deal_status_stage", "status", "stage_id"),
+        Index("ix_deal_owner_status", "owner_name", "status"),
+        Index("ix_deal_owner_id_status", "owner_id", "status"),
+    )
+
     id: int = Field(primary_key=True)
     title: str
     pipeline_id: int = Field(index=True)
@@ -73,6 +168,10 @@ class Deal(SQLModel, table=True):
 
 class Note(SQLModel, table=True):
     """Deal note for LLM analysis."""
+    __table_args__ = (
+        Index("ix_note_deal_add_time", "deal_id", text("add_time DESC")),
+    )
+
     id: int = Field(primary_key=True)
     deal_id: int = Field(index=True)
     active_flag: bool = True
@@ -159,7 +258,7 @@ class DealChangeEvent(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
 
     # Event identification
-    pipedrive_event_id: int = Field(index=True)  # data.id from Pipedrive
+    pipedrive_event_id: int = Field(index=True, unique=True)  # data.id from Pipedrive
     deal_id: int = Field(index=True, foreign_key="deal.id")
 
     # Event metadata
@@ -186,6 +285,12 @@ class DealChangeEvent(SQLModel, table=True):
 class DealStageSpan(SQLModel, table=True):
     """Derived table: time spent in each stage."""
     __tablename__ = "deal_stage_span"
+    __table_args__ = (
+        # Open span lookup (deal_id, left_at IS NULL); a stage_id column in
+        # between would keep it from seeking on left_at
+        Index("ix_deal_stage_span_deal_left", "deal_id", "left_at"),
+        Index("ix_deal_stage_span_stage_entered", "stage_id", "entered_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -213,6 +318,99 @@ class DealStageSpan(SQLModel, table=True):
     updated_at: Optional[datetime] = None
 
 
+class SyncJobState(SQLModel, table=True):
+    """Persisted schedule and last run of each background sync job."""
+    __tablename__ = "sync_job_state"
+
+    job_name: str = Field(primary_key=True)
+    next_run_at: datetime
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: int = 0
+    last_status: Optional[str] = None  # "success", "failed"
+    last_error: Optional[str] = None
+
+
+class SchemaMigration(SQLModel, table=True):
+    """Applied schema migration steps (see migrations.py)."""
+    __tablename__ = "schema_migration"
+
+    version: int = Field(primary_key=True)
+    name: str
+    applied_at: datetime
+    duration_ms: int = 0
+
+
+class DealSyncState(SQLModel, table=True):
+    """Compact per-deal sync state, one row per deal.
+
+    Records what the deal looked like at its last notes sync so a run can
+    skip deals whose notes_count and update_time have not changed.
+    """
+    __tablename__ = "deal_sync_state"
+
+    deal_id: int = Field(primary_key=True)
+    notes_synced_at: Optional[datetime] = None
+    notes_count: Optional[int] = None  # Deal.notes_count at the last notes sync
+    notes_deal_update_time: Optional[datetime] = None  # Deal.update_time at the last notes sync
+    notes_status: Optional[str] = None  # "success", "failed"
+    notes_error: Optional[str] = None
+
+
+class DealFact(SQLModel, table=True):
+    """Denormalized, precomputed view of a cached deal for the read services.
+
+    Refreshed by the sync jobs for changed deals only (see services/deal_facts.py)
+    so dashboards read resolved names, extracted custom fields and the latest
+    note without joins, per-deal lookups or raw_json parsing.
+    """
+    __tablename__ = "deal_facts"
+    __table_args__ = (
+        # Overdue and stuck lists filter and sort on these (db_queries.get_*_deal_facts)
+        Index("ix_deal_facts_status_pipeline_update", "status", "pipeline_id", "update_time"),
+        Index("ix_deal_facts_status_pipeline_stage_entered", "status", "pipeline_id", "stage_entered_at"),
+    )
+
+    deal_id: int = Field(primary_key=True)
+    title: str
+    pipeline_id: int = Field(index=True)
+    pipeline_name: Optional[str] = None
+    stage_id: int = Field(index=True)
+    stage_name: Optional[str] = None
+    status: str = Field(default="open", index=True)
+    value: float = 0.0
+
+    # Ownership
+    owner_id: Optional[int] = None
+    owner_name: Optional[str] = Field(default=None, index=True)
+    employee_id: Optional[int] = None  # Employee linked via pipedrive_owner_id
+    org_name: Optional[str] = None
+
+    # Timestamps ready for bucketing
+    add_time: Optional[datetime] = None
+    update_time: Optional[datetime] = Field(default=None, index=True)
+    stage_change_time: Optional[datetime] = None
+    stage_entered_at: Optional[datetime] = Field(default=None, index=True)  # stage_change_time or update_time
+    next_activity_date: Optional[datetime] = None
+    last_activity_date: Optional[datetime] = None
+    won_time: Optional[datetime] = None
+
+    # Counters
+    file_count: int = 0
+    notes_count: int = 0
+    email_messages_count: int = 0
+    activities_count: int = 0
+    done_activities_count: int = 0
+
+    # Extracted custom fields
+    end_user: Optional[str] = None
+
+    # Latest note
+    last_note_at: Optional[datetime] = None
+    last_note_snippet: Optional[str] = None
+
+    refreshed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
 # ============================================================================
 # CEO Dashboard - New Feature Tables
 # ============================================================================
@@ -616,6 +814,9 @@ class LoopRun(SQLModel, table=True):
 class LoopFinding(SQLModel, table=True):
     """Findings/alerts generated by monitoring loops."""
     __tablename__ = "loop_finding"
+    __table_args__ = (
+        Index("ix_loop_finding_signature_created", "signature", "created_at"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -690,6 +891,7 @@ class CachedEmail(SQLModel, table=True):
     # Composite unique constraint via __table_args__
     __table_args__ = (
         Index("ix_cached_email_graph_mailbox", "graph_id", "mailbox", unique=True),
+        Index("ix_cached_email_mailbox_received", "mailbox", text("received_at DESC")),
     )
 
 
@@ -745,14 +947,133 @@ class CachedMailFolder(SQLModel, table=True):
     )
 
 
+class LLMResponseCacheEntry(SQLModel, table=True):
+    """Cached LLM response keyed by a hash of the request (integrations/llm_response_cache.py)."""
+    __tablename__ = "llm_response_cache"
+
+    key: str = Field(primary_key=True)  # sha256 of model, prompt id/version, prompts, temperature
+    prompt_id: str = Field(index=True)
+    prompt_version: str
+    model: str
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    size_bytes: int = 0
+    hit_count: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_used_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), index=True)
+
+
+class PromptExperimentRecord(SQLModel, table=True):
+    """Prompt A/B experiment definition (services/experiment_store.py)."""
+    __tablename__ = "prompt_experiment"
+
+    experiment_id: str = Field(primary_key=True)
+    base_prompt_id: str
+    variants_json: str  # variant_id -> PromptTemplate fields
+    traffic_split_json: str  # variant_id -> share of traffic
+    active: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class PromptExperimentResult(SQLModel, table=True):
+    """One request served by an experiment variant; append-only."""
+    __tablename__ = "prompt_experiment_result"
+    __table_args__ = (
+        Index("ix_prompt_experiment_result_experiment_variant", "experiment_id", "variant_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    experiment_id: str
+    variant_id: str
+    success: bool
+    confidence: Optional[float] = None
+    cost_usd: Optional[float] = None
+    latency_ms: Optional[int] = None
+    recorded_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+# ============================================================================
+# Batch Summary Tables
+# ============================================================================
+
+class SummaryRun(SQLModel, table=True):
+    """Batch deal summarization run (services/summary_pipeline.py)."""
+    __tablename__ = "summary_run"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Status: running, completed, cancelled, failed
+    status: str = Field(default="running", index=True)
+    total: int = 0
+
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+
+class DealSummaryRecord(SQLModel, table=True):
+    """Per-deal outcome of a summary run, written as each summary completes."""
+    __tablename__ = "deal_summary_record"
+    __table_args__ = (
+        Index("ix_deal_summary_record_run_deal", "run_id", "deal_id", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_id: int = Field(foreign_key="summary_run.id")
+    deal_id: int = Field(index=True)
+    result_json: Optional[str] = None  # DealSummaryResult, None on error
+    error: Optional[str] = None
+    completed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def ensure_indexes(bind: Union[Engine, Connection]) -> list[str]:
+    """Create declared indexes missing from existing tables.
+
+    create_all() only creates indexes together with a new table, so indexes
+    added to a model never reach an existing cache without this step.
+
+    Returns:
+        Names of the indexes created
+    """
+    if isinstance(bind, Engine):
+        with bind.begin() as connection:
+            return ensure_indexes(connection)
+
+    created = []
+    existing_tables = set(inspect(bind).get_table_names())
+    # sqlite_master also lists expression indexes, which the inspector skips
+    existing = set(bind.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind)
+                created.append(index.name)
+    return created
+
+
 def init_db() -> None:
-    """Create tables if they do not exist."""
+    """Create tables if they do not exist, then apply pending schema migrations.
+
+    Background migrations (index builds, ANALYZE) are left for
+    migrations.run_background_migrations() unless
+    schema_migrations_background is off.
+    """
+    from .migrations import MigrationRunner
+
     SQLModel.metadata.create_all(engine)
+    MigrationRunner(engine).run(background=not get_config().schema_migrations_background)
 
 
 __all__ = [
+    "DATABASE_FILE",
+    "SQLiteProfile",
+    "create_sqlite_engine",
     "engine",
+    "read_engine",
     "init_db",
+    "ensure_indexes",
     # Pipedrive-synced tables
     "Pipeline",
     "Stage",
@@ -764,6 +1085,10 @@ __all__ = [
     "SyncMetadata",
     "DealChangeEvent",
     "DealStageSpan",
+    "SyncJobState",
+    "SchemaMigration",
+    "DealSyncState",
+    "DealFact",
     # CEO Dashboard tables
     "Employee",
     "Intervention",
@@ -785,6 +1110,14 @@ __all__ = [
     "CachedEmail",
     "CachedEmailAttachment",
     "CachedMailFolder",
+    # LLM response cache
+    "LLMResponseCacheEntry",
+    # Prompt experiment tables
+    "PromptExperimentRecord",
+    "PromptExperimentResult",
+    # Batch summary tables
+    "SummaryRun",
+    "DealSummaryRecord",
     # Agent Persistence tables
     "AgentConversation",
     "AgentMessage",
@@ -18,6 +18,25 @@ class Config(BaseSettings):
     openrouter_api_key: str = Field(default="", alias="OPENROUTER_API_KEY")
     openrouter_api_url: str = "https://openrouter.ai/api/v1"
     llm_model: str = Field(default="anthropic/claude-3.5-sonnet", alias="OPENROUTER_MODEL")
+    # Response cache for prompts marked cacheable (integrations/llm_response_cache.py)
+    llm_response_cache_enabled: bool = True
+    llm_response_cache_ttl_hours: float = 24.0
+    llm_response_cache_max_mb: int = 64
+    # Shared budget for every OpenRouter call (integrations/llm_circuit_breaker.py);
+    # llm_tokens_per_minute = 0 disables the token bucket
+    llm_requests_per_minute: int = 60
+    llm_tokens_per_minute: int = 200_000
+    llm_max_concurrent_requests: int = 8
+    # Shared OpenRouter connection pool (integrations/openrouter_transport.py);
+    # HTTP/2 needs the h2 package. Streams must send their first token within
+    # openrouter_first_token_timeout_seconds
+    openrouter_http2: bool = True
+    openrouter_max_connections: int = 20
+    openrouter_max_keepalive_connections: int = 10
+    openrouter_keepalive_expiry_seconds: float = 60.0
+    openrouter_connect_timeout_seconds: float = 10.0
+    openrouter_read_timeout_seconds: float = 60.0
+    openrouter_first_token_timeout_seconds: float = 30.0
 
     # microsoft onedrive configurtation
     onedrive_file_id: str = Field(default="", alias="ONEDRIVE_FILE_ID")
@@ -42,6 +61,38 @@ class Config(BaseSettings):
     # For Odoo integration
 
 
+    # SQLite cache tuning (see db.SQLiteProfile)
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size_mb: int = 256
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Background sync job scheduler
+    sync_max_concurrent_jobs: int = 2
+    sync_max_db_writer_jobs: int = 1
+    # Wait for the bootstrap sync before serving requests (default: serve the
+    # existing cache immediately and sync in the background)
+    sync_blocking_startup: bool = False
+
+    # Result cache for the dashboard/summary service methods (services/result_cache.py)
+    result_cache_ttl_seconds: float = 300.0
+    result_cache_max_entries: int = 256
+
+    # Cashflow simulation (services/cashflow_simulation.py): process-pool
+    # workers for multi-pipeline runs (0 or 1 runs in-process)
+    cashflow_simulation_processes: int = 0
+
+    # Schema migrations (migrations.py): run heavy steps (index builds,
+    # ANALYZE) in a background task after startup instead of inside init_db()
+    schema_migrations_background: bool = True
+
+    # Prompt A/B experiment results (services/experiment_store.py): appended
+    # in memory and written in batches by a background flusher
+    experiment_flush_interval_seconds: float = 2.0
+    experiment_flush_batch_size: int = 200
+
     # FastAPI
     api_host: str = "127.0.0.1"
     api_port: int = 8000
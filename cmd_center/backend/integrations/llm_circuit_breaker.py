@@ -2,19 +2,31 @@
 
 This module provides:
 - Circuit breaker to prevent cascading failures
-- Rate limiting to stay within API limits
-- Request timeout handling
+- Request and token (RPM/TPM) rate limiting to stay within API limits
+- A process-wide concurrency budget with priority lanes, so interactive
+  agent chats go ahead of background batch work
 - Fallback strategies
+
+Every OpenRouter call (LLMClient, the agent's tool loop and its streaming
+path) goes through get_llm_resilience().guard(), so they share one budget
+and one breaker.
 """
 
+import heapq
+import itertools
 import time
 import logging
 import asyncio
-from enum import Enum
-from typing import Optional, Callable, Any, TypeVar
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import Enum, IntEnum
+from typing import AsyncIterator, Iterator, Optional, Callable, Any, TypeVar
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 
+from .config import get_config
+from .token_counter import count_tokens
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
@@ -91,6 +103,20 @@ class CircuitBreaker:
             CircuitBreakerOpen: If circuit is open
             Exception: Original exception from func
         """
+        self.before_call()
+
+        # Execute function
+        try:
+            result = await func()
+            self._on_success()
+            return result
+
+        except self.config.expected_exception as e:
+            self._on_failure(e)
+            raise
+
+    def before_call(self) -> None:
+        """Count a request, raising CircuitBreakerOpen while the circuit is open."""
         self.stats.total_requests += 1
 
         # Check circuit state
@@ -109,16 +135,6 @@ class CircuitBreaker:
                     f"Will retry after {self.config.timeout_seconds}s timeout."
                 )
 
-        # Execute function
-        try:
-            result = await func()
-            self._on_success()
-            return result
-
-        except self.config.expected_exception as e:
-            self._on_failure(e)
-            raise
-
     def _on_success(self):
         """Handle successful request."""
         self.stats.total_successes += 1
@@ -202,72 +218,205 @@ class CircuitBreaker:
 
 
 class RateLimiter:
-    """Token bucket rate limiter for LLM requests.
+    """Request and token rate limiter for LLM requests.
 
-    Limits requests per minute to stay within API rate limits.
+    Two buckets refill continuously: requests per minute and (when
+    tokens_per_minute > 0) prompt + completion tokens per minute. acquire()
+    reserves a request and the estimated tokens up front, letting the
+    buckets go negative, and sleeps until they are paid back, so waiters
+    are served in arrival order without a lock. Once the real usage is
+    known, adjust_tokens() corrects the estimate.
 
     Usage:
-        limiter = RateLimiter(requests_per_minute=60)
-        await limiter.acquire()  # Blocks until token available
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=200_000)
+        await limiter.acquire(tokens=1500)  # Blocks until both budgets allow it
     """
 
-    def __init__(self, requests_per_minute: int = 60):
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        tokens_per_minute: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.requests_per_minute = requests_per_minute
-        self.tokens = requests_per_minute
-        self.last_refill = time.time()
-        self.lock = asyncio.Lock()
-
-    async def acquire(self):
-        """Acquire a token for making a request.
-
-        Blocks if no tokens available until refill.
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = float(requests_per_minute)
+        self.tokens = float(tokens_per_minute)
+        self.clock = clock
+        self.updated_at = clock()
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.requests = min(self.requests_per_minute, self.requests + elapsed * self.requests_per_minute / 60.0)
+        if self.tokens_per_minute:
+            self.tokens = min(self.tokens_per_minute, self.tokens + elapsed * self.tokens_per_minute / 60.0)
+        self.updated_at = now
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Take a request and `tokens` from the buckets; seconds to wait before sending."""
+        now = self.clock()
+        self._refill(now)
+        self.requests -= 1
+        wait = max(0.0, self.paused_until - now, -self.requests * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # A single request larger than the whole budget waits for a full bucket
+            self.tokens -= min(tokens, self.tokens_per_minute)
+            wait = max(wait, -self.tokens * 60.0 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, tokens: int = 0):
+        """Acquire a request (and `tokens` of the token budget).
+
+        Blocks until both budgets allow the request.
         """
-        async with self.lock:
-            # Refill tokens
-            now = time.time()
-            elapsed = now - self.last_refill
-            refill_amount = int(elapsed * (self.requests_per_minute / 60.0))
-
-            if refill_amount > 0:
-                self.tokens = min(self.requests_per_minute, self.tokens + refill_amount)
-                self.last_refill = now
-
-            # Wait if no tokens
-            while self.tokens <= 0:
-                wait_time = 60.0 / self.requests_per_minute
-                logger.debug(f"Rate limit reached, waiting {wait_time:.2f}s")
-                await asyncio.sleep(wait_time)
-
-                # Refill after waiting
-                now = time.time()
-                elapsed = now - self.last_refill
-                refill_amount = int(elapsed * (self.requests_per_minute / 60.0))
-                if refill_amount > 0:
-                    self.tokens = min(self.requests_per_minute, self.tokens + refill_amount)
-                    self.last_refill = now
-
-            # Consume token
-            self.tokens -= 1
+        wait = self.reserve(tokens)
+        if wait > 0:
+            self.throttled += 1
+            self.total_wait_seconds += wait
+            logger.debug(f"LLM rate limit reached, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def adjust_tokens(self, delta: int) -> None:
+        """Charge (or refund) the difference between actual and estimated tokens."""
+        if self.tokens_per_minute:
+            self.tokens -= delta
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller, e.g. after a 429 from the API."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
 
     def get_stats(self) -> dict:
         """Get current rate limiter statistics."""
+        self._refill(self.clock())
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "available_requests": round(self.requests, 2),
+            "available_tokens": round(self.tokens) if self.tokens_per_minute else None,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "paused_seconds": round(max(0.0, self.paused_until - self.clock()), 3),
+        }
+
+
+class LLMPriority(IntEnum):
+    """Lanes of the concurrency budget; lower values are served first."""
+    INTERACTIVE = 0  # Agent chat, a user is waiting on the answer
+    STANDARD = 1  # Single service calls (deal summary, email draft, ...)
+    BATCH = 2  # Background batch summarization
+
+
+_llm_priority: ContextVar[LLMPriority] = ContextVar("llm_priority", default=LLMPriority.STANDARD)
+
+
+@contextmanager
+def llm_priority(priority: LLMPriority) -> Iterator[None]:
+    """Run LLM calls made in this context (and tasks it creates) in a lane.
+
+    Usage:
+        with llm_priority(LLMPriority.BATCH):
+            await asyncio.gather(*(writer.summarize_deal(c) for c in contexts))
+    """
+    token = _llm_priority.set(priority)
+    try:
+        yield
+    finally:
+        _llm_priority.reset(token)
+
+
+def current_llm_priority() -> LLMPriority:
+    return _llm_priority.get()
+
+
+class PrioritySemaphore:
+    """Concurrency limit whose waiters are woken by priority, then arrival."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self.acquired = {priority.name.lower(): 0 for priority in LLMPriority}
+        self.queued = {priority.name.lower(): 0 for priority in LLMPriority}
+
+    async def acquire(self, priority: LLMPriority = LLMPriority.STANDARD) -> None:
+        """Wait for a slot."""
+        lane = LLMPriority(priority).name.lower()
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            self.acquired[lane] += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._order), future))
+        self.queued[lane] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation
+                self.release()
+            raise
+        finally:
+            self.queued[lane] -= 1
+        self.acquired[lane] += 1
+
+    def release(self) -> None:
+        """Hand the slot to the best waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_use -= 1
+
+    def get_stats(self) -> dict:
         return {
-            "available_tokens": self.tokens,
-            "max_tokens": self.requests_per_minute,
-            "last_refill": datetime.fromtimestamp(self.last_refill).isoformat(),
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "waiting": dict(self.queued),
+            "acquired": dict(self.acquired),
         }
 
 
+def estimate_tokens(text: str, max_completion_tokens: int = 0) -> int:
+    """Request size for the token budget (local tokenizer approximation)."""
+    return count_tokens(text) + max_completion_tokens
+
+
+class LLMPermit:
+    """Handle for one guarded LLM request."""
+
+    def __init__(self, rate_limiter: RateLimiter, estimated_tokens: int):
+        self.rate_limiter = rate_limiter
+        self.estimated_tokens = estimated_tokens
+        self.error: Optional[str] = None
+
+    def record_tokens(self, total_tokens: int) -> None:
+        """Correct the token budget with the usage the API reported."""
+        self.rate_limiter.adjust_tokens(total_tokens - self.estimated_tokens)
+        self.estimated_tokens = total_tokens
+
+    def fail(self, error: str) -> None:
+        """Count the request as a breaker failure without raising (e.g. streams)."""
+        self.error = error
+
+
 class LLMResilience:
     """Combined resilience wrapper for LLM operations.
 
-    Combines circuit breaker and rate limiting for robust LLM calls.
+    Combines the circuit breaker, rate limiting and the concurrency budget
+    for robust LLM calls.
 
     Usage:
-        resilience = LLMResilience(
-            circuit_breaker_config=CircuitBreakerConfig(failure_threshold=5),
-            rate_limit_rpm=60,
-        )
+        resilience = get_llm_resilience()
+
+        async with resilience.guard(LLMPriority.INTERACTIVE, estimated_tokens=2000) as permit:
+            response = await client.post(...)
+            permit.record_tokens(response.json()["usage"]["total_tokens"])
 
         result = await resilience.execute(
             lambda: llm.generate_completion(...),
@@ -279,20 +428,59 @@ class LLMResilience:
         self,
         circuit_breaker_config: Optional[CircuitBreakerConfig] = None,
         rate_limit_rpm: int = 60,
+        rate_limit_tpm: int = 0,
+        max_concurrent: int = 8,
     ):
         self.circuit_breaker = CircuitBreaker(circuit_breaker_config)
-        self.rate_limiter = RateLimiter(rate_limit_rpm)
+        self.rate_limiter = RateLimiter(rate_limit_rpm, rate_limit_tpm)
+        self.concurrency = PrioritySemaphore(max_concurrent)
+
+    @asynccontextmanager
+    async def guard(
+        self,
+        priority: Optional[LLMPriority] = None,
+        estimated_tokens: int = 0,
+    ) -> AsyncIterator[LLMPermit]:
+        """Hold a concurrency slot and rate budget for one request.
+
+        Args:
+            priority: Lane for the slot (defaults to the llm_priority() context)
+            estimated_tokens: Prompt + completion tokens to reserve
+
+        Raises:
+            CircuitBreakerOpen: If circuit is open
+        """
+        self.circuit_breaker.before_call()
+        await self.concurrency.acquire(current_llm_priority() if priority is None else priority)
+        permit = LLMPermit(self.rate_limiter, estimated_tokens)
+        try:
+            await self.rate_limiter.acquire(estimated_tokens)
+            yield permit
+        except self.circuit_breaker.config.expected_exception as e:
+            self.circuit_breaker._on_failure(e)
+            raise
+        else:
+            if permit.error is not None:
+                self.circuit_breaker._on_failure(RuntimeError(permit.error))
+            else:
+                self.circuit_breaker._on_success()
+        finally:
+            self.concurrency.release()
 
     async def execute(
         self,
         func: Callable[[], T],
         fallback: Optional[Callable[[], T]] = None,
+        priority: Optional[LLMPriority] = None,
+        estimated_tokens: int = 0,
     ) -> T:
         """Execute function with full resilience protection.
 
         Args:
             func: Async function to execute
             fallback: Optional fallback function if circuit is open
+            priority: Concurrency lane (defaults to the llm_priority() context)
+            estimated_tokens: Prompt + completion tokens to reserve
 
         Returns:
             Result from func or fallback
@@ -301,12 +489,9 @@ class LLMResilience:
             CircuitBreakerOpen: If circuit is open and no fallback provided
             Exception: Original exception from func
         """
-        # Apply rate limiting first
-        await self.rate_limiter.acquire()
-
-        # Then circuit breaker
         try:
-            return await self.circuit_breaker.call(func)
+            async with self.guard(priority, estimated_tokens):
+                return await func()
         except CircuitBreakerOpen as e:
             if fallback:
                 logger.warning("Circuit breaker open, using fallback")
@@ -318,6 +503,7 @@ class LLMResilience:
         return {
             "circuit_breaker": self.circuit_breaker.get_stats(),
             "rate_limiter": self.rate_limiter.get_stats(),
+            "concurrency": self.concurrency.get_stats(),
         }
 
 
@@ -330,16 +516,19 @@ def get_llm_resilience() -> LLMResilience:
 
     Default configuration:
     - Circuit breaker: 5 failures trigger open, 60s timeout
-    - Rate limiter: 60 requests per minute
+    - Rate limiter and concurrency budget: llm_* settings in Config
     """
     global _llm_resilience
     if _llm_resilience is None:
+        config = get_config()
         _llm_resilience = LLMResilience(
             circuit_breaker_config=CircuitBreakerConfig(
                 failure_threshold=5,
                 success_threshold=2,
                 timeout_seconds=60.0,
             ),
-            rate_limit_rpm=60,
+            rate_limit_rpm=config.llm_requests_per_minute,
+            rate_limit_tpm=config.llm_tokens_per_minute,
+            max_concurrent=config.llm_max_concurrent_requests,
         )
     return _llm_resilience
@@ -1,13 +1,17 @@
 """LLM client for OpenRouter API - Infrastructure layer only.
 
 This module handles:
-- HTTP transport with connection pooling
+- HTTP transport through the shared OpenRouter connection pool
+  (openrouter_transport.py)
 - Authentication & API key management
 - Retry logic with exponential backoff
 - Timeout handling
-- Rate limiting
+- Rate limiting, concurrency and circuit breaking through the shared
+  LLMResilience gateway (llm_circuit_breaker.py)
 - Observability (logging, metrics)
-- Generic structured output enforcement (JSON schema validation)
+- Generic structured output enforcement (JSON schema validation), with
+  each model's schema serialized once into a compact instruction
+- Response caching for cacheable prompts (see llm_response_cache.py)
 - Error handling
 
 Business logic (prompts, use cases) should be in service layer.
@@ -17,11 +21,15 @@ import httpx
 import json
 import asyncio
 import logging
-from typing import Optional, Type, TypeVar, AsyncIterator
+from functools import lru_cache
+from typing import Any, Optional, Type, TypeVar, AsyncIterator
 from datetime import datetime
 from pydantic import BaseModel, ValidationError
 
 from .config import get_config
+from .llm_circuit_breaker import CircuitBreakerOpen, LLMResilience, estimate_tokens, get_llm_resilience
+from .llm_response_cache import CacheScope, CachedCompletion, LLMResponseCache, cache_key
+from .openrouter_transport import OpenRouterTransport, get_openrouter_transport
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -29,6 +37,36 @@ logger = logging.getLogger(__name__)
 T = TypeVar('T', bound=BaseModel)
 
 
+def _compact_node(node: Any, is_mapping: bool = False) -> Any:
+    """Drop pydantic's generated titles and fold Optional[scalar] into a type list."""
+    if isinstance(node, list):
+        return [_compact_node(value) for value in node]
+    if not isinstance(node, dict):
+        return node
+    if is_mapping:
+        return {key: _compact_node(value) for key, value in node.items()}
+
+    compact = {
+        key: _compact_node(value, is_mapping=key in ("properties", "$defs"))
+        for key, value in node.items()
+        if key != "title"
+    }
+    variants = compact.get("anyOf")
+    if (
+        variants and len(variants) == 2 and {"type": "null"} in variants
+        and all(list(variant) == ["type"] for variant in variants)
+    ):
+        compact.pop("anyOf")
+        compact = {"type": [variant["type"] for variant in variants], **compact}
+    return compact
+
+
+@lru_cache(maxsize=None)
+def compact_schema(schema: Type[BaseModel]) -> str:
+    """A model's JSON schema as compact JSON, built once per model class."""
+    return json.dumps(_compact_node(schema.model_json_schema()), separators=(",", ":"), ensure_ascii=False)
+
+
 class LLMError(Exception):
     """Base exception for LLM-related errors."""
     pass
@@ -73,22 +111,22 @@ class LLMClient:
         api_key: str,
         api_url: str,
         model: str,
-        timeout: float = 60.0,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        response_cache: Optional[LLMResponseCache] = None,
+        resilience: Optional[LLMResilience] = None,
+        transport: Optional[OpenRouterTransport] = None,
     ):
         self.api_key = api_key
         self.api_url = api_url
         self.model = model
-        self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.response_cache = response_cache
+        self.resilience = resilience or get_llm_resilience()
 
-        # HTTP client with connection pooling
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(timeout),
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-        )
+        # Connections (and their timeouts) are shared with the agent
+        self.transport = transport or get_openrouter_transport()
 
         # Metrics tracking
         self._request_count = 0
@@ -96,8 +134,8 @@ class LLMClient:
         self._total_cost_usd = 0.0
 
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the shared transport's connections (reopened on next use)."""
+        await self.transport.aclose()
 
     async def generate_completion(
         self,
@@ -148,6 +186,7 @@ class LLMClient:
         temperature: float = 0.7,
         model: Optional[str] = None,
         fallback_on_validation_error: bool = False,
+        cache_scope: Optional[CacheScope] = None,
     ) -> T:
         """Generate a structured completion that conforms to a Pydantic schema.
 
@@ -159,6 +198,8 @@ class LLMClient:
             temperature: Sampling temperature
             model: Optional model override
             fallback_on_validation_error: If True, return partial data on validation errors
+            cache_scope: Prompt id/version of a cacheable prompt; identical requests
+                are then answered from the response cache
 
         Returns:
             Instance of schema with parsed response
@@ -168,16 +209,34 @@ class LLMClient:
             LLMError: On other API errors
         """
         # Enhance system prompt to request JSON format
-        json_instruction = f"\n\nRespond with valid JSON matching this schema: {schema.model_json_schema()}"
+        json_instruction = f"\n\nRespond with valid JSON matching this schema: {compact_schema(schema)}"
         enhanced_system_prompt = (system_prompt or "") + json_instruction
 
-        response = await self.generate_completion(
-            prompt=prompt,
-            system_prompt=enhanced_system_prompt,
-            max_tokens=max_tokens,
-            temperature=temperature,
-            model=model,
-        )
+        async def fetch() -> CachedCompletion:
+            response = await self.generate_completion(
+                prompt=prompt,
+                system_prompt=enhanced_system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                model=model,
+            )
+            usage = response.usage
+            return CachedCompletion(
+                content=response.content,
+                model=response.model,
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0,
+                cost_usd=(usage.estimated_cost_usd or 0.0) if usage else 0.0,
+            )
+
+        key = None
+        if cache_scope is not None and self.response_cache is not None:
+            key = cache_key(
+                model or self.model, cache_scope, enhanced_system_prompt, prompt, temperature, max_tokens
+            )
+            response, _ = await self.response_cache.get_or_fetch(key, cache_scope, fetch)
+        else:
+            response = await fetch()
 
         # Parse JSON response
         try:
@@ -214,6 +273,10 @@ class LLMClient:
                 except:
                     pass
 
+            if key is not None:
+                # Never replay a response that does not parse
+                await asyncio.to_thread(self.response_cache.discard, key)
+
             raise LLMValidationError(
                 f"Response does not match schema {schema.__name__}: {str(e)}"
             ) from e
@@ -291,7 +354,7 @@ class LLMClient:
             "stream": True,
         }
 
-        async with self.client.stream(
+        async with self.resilience.guard(estimated_tokens=self._estimate_tokens(payload)), self.transport.stream(
             "POST",
             f"{self.api_url}/chat/completions",
             headers=headers,
@@ -329,15 +392,18 @@ class LLMClient:
 
         for attempt in range(self.max_retries):
             try:
-                start_time = datetime.now()
+                async with self.resilience.guard(estimated_tokens=self._estimate_tokens(payload)) as permit:
+                    start_time = datetime.now()
 
-                response = await self._make_api_call(payload)
+                    response = await self._make_api_call(payload)
 
-                end_time = datetime.now()
-                response_time_ms = int((end_time - start_time).total_seconds() * 1000)
+                    end_time = datetime.now()
+                    response_time_ms = int((end_time - start_time).total_seconds() * 1000)
 
-                # Parse successful response
-                llm_response = self._parse_response(response, response_time_ms)
+                    # Parse successful response
+                    llm_response = self._parse_response(response, response_time_ms)
+                    if llm_response.usage:
+                        permit.record_tokens(llm_response.usage.total_tokens)
 
                 # Log request
                 self._log_request(payload, llm_response, success=True)
@@ -347,6 +413,11 @@ class LLMClient:
 
                 return llm_response
 
+            except CircuitBreakerOpen as e:
+                # Don't retry while OpenRouter is failing
+                self._log_request(payload, None, success=False, error=str(e))
+                raise LLMError(str(e)) from e
+
             except LLMRateLimitError as e:
                 # Don't retry on rate limits
                 self._log_request(payload, None, success=False, error=str(e))
@@ -385,7 +456,7 @@ class LLMClient:
         headers = self._build_headers()
 
         try:
-            response = await self.client.post(
+            response = await self.transport.post(
                 f"{self.api_url}/chat/completions",
                 headers=headers,
                 json=payload,
@@ -393,6 +464,8 @@ class LLMClient:
 
             # Check for rate limiting
             if response.status_code == 429:
+                # Hold back every caller sharing the budget, not just this one
+                self.resilience.rate_limiter.pause(retry_after_seconds(response))
                 raise LLMRateLimitError("Rate limit exceeded")
 
             response.raise_for_status()
@@ -408,6 +481,12 @@ class LLMClient:
         except httpx.RequestError as e:
             raise LLMError(f"Request error: {e}") from e
 
+    @staticmethod
+    def _estimate_tokens(payload: dict) -> int:
+        """Token budget to reserve for a request before its usage is known."""
+        text = "".join(message["content"] for message in payload["messages"])
+        return estimate_tokens(text, payload.get("max_tokens", 0))
+
     def _build_headers(self) -> dict:
         """Build HTTP headers for API request."""
         return {
@@ -535,13 +614,16 @@ class LLMClient:
         """Get current metrics.
 
         Returns:
-            Dict with request count, token usage, and cost
+            Dict with request count, token usage, cost and response cache stats
         """
-        return {
+        metrics = {
             "request_count": self._request_count,
             "total_tokens": self._total_tokens,
             "total_cost_usd": self._total_cost_usd,
         }
+        if self.response_cache is not None:
+            metrics["response_cache"] = self.response_cache.stats()
+        return metrics
 
     def reset_metrics(self):
         """Reset metrics counters."""
@@ -550,6 +632,14 @@ class LLMClient:
         self._total_cost_usd = 0.0
 
 
+def retry_after_seconds(response: httpx.Response, default: float = 1.0) -> float:
+    """Seconds a 429 response asks callers to wait (its Retry-After header)."""
+    try:
+        return float(response.headers.get("retry-after", default))
+    except ValueError:
+        return default
+
+
 # Global client instance
 _llm_client: Optional[LLMClient] = None
 
@@ -563,5 +653,9 @@ def get_llm_client() -> LLMClient:
             api_key=config.openrouter_api_key,
             api_url=config.openrouter_api_url,
             model=config.llm_model,
+            response_cache=LLMResponseCache(
+                ttl_seconds=config.llm_response_cache_ttl_hours * 3600,
+                max_bytes=config.llm_response_cache_max_mb * 1024 * 1024,
+            ) if config.llm_response_cache_enabled else None,
         )
     return _llm_client
@@ -0,0 +1,234 @@
+"""Content-addressed cache for LLM completions.
+
+Deal summaries and analyses are re-requested on every view, and for deals
+whose notes have not changed the rendered prompt is byte-identical to one
+answered hours ago. LLMResponseCache stores those responses in the SQLite
+cache (the llm_response_cache table):
+- Keys are a sha256 of the model, prompt id and version, system prompt,
+  rendered user prompt, temperature and max_tokens
+- Only prompts registered as cacheable are looked up (their CacheScope is
+  passed to LLMClient.generate_structured_completion)
+- Entries expire after a TTL and are evicted least-recently-used beyond a
+  size budget
+- Concurrent identical requests share one API call
+- Hits, misses and the USD the hits saved are exposed through stats()
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, func, select
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CacheScope:
+    """Prompt a cached response belongs to."""
+
+    prompt_id: str
+    prompt_version: str
+
+
+@dataclass(frozen=True)
+class CachedCompletion:
+    """Raw completion as stored in the cache."""
+
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class _LeaderCancelled(Exception):
+    """The request fetching a key was cancelled; followers retry the fetch."""
+
+
+def cache_key(
+    model: str,
+    scope: CacheScope,
+    system_prompt: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Content hash of everything that determines the response."""
+    payload = json.dumps(
+        [model, scope.prompt_id, scope.prompt_version, system_prompt, prompt, temperature, max_tokens],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Persistent TTL + LRU response cache with in-flight request sharing."""
+
+    def __init__(self, ttl_seconds: float, max_bytes: int):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_bytes = max_bytes
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._saved_usd = 0.0
+
+    @staticmethod
+    def _engine():
+        # Resolved per call so tests (and engine reconfiguration) swap it
+        from .. import db
+        return db.engine
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        scope: CacheScope,
+        fetch: Callable[[], Awaitable[CachedCompletion]],
+    ) -> tuple[CachedCompletion, bool]:
+        """Return the cached completion for key, or fetch and store it.
+
+        Returns:
+            (completion, True when no API call was made for this request)
+        """
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                completion = await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # The leader's caller went away; the first follower to wake takes over
+                continue
+            self._coalesced += 1
+            self._saved_usd += completion.cost_usd
+            return completion, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            completion = await asyncio.to_thread(self.lookup, key)
+            hit = completion is not None
+            if hit:
+                self._hits += 1
+                self._saved_usd += completion.cost_usd
+            else:
+                self._misses += 1
+                completion = await fetch()
+                await asyncio.to_thread(self.store, key, scope, completion)
+            future.set_result(completion)
+            return completion, hit
+        except asyncio.CancelledError:
+            # Followers were not cancelled themselves, so wake them to retry
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers re-raise it; mark it retrieved so the loop does not warn
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def lookup(self, key: str) -> Optional[CachedCompletion]:
+        """Fresh entry for key (touching its LRU time), or None."""
+        from ..db import LLMResponseCacheEntry
+
+        now = datetime.now(timezone.utc)
+        with self._engine().begin() as connection:
+            entry = connection.execute(
+                select(LLMResponseCacheEntry).where(LLMResponseCacheEntry.key == key)
+            ).first()
+            if entry is None:
+                return None
+            if _aware(entry.created_at) < now - self.ttl:
+                connection.execute(delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.key == key))
+                return None
+            connection.execute(
+                LLMResponseCacheEntry.__table__.update()
+                .where(LLMResponseCacheEntry.key == key)
+                .values(last_used_at=now, hit_count=LLMResponseCacheEntry.hit_count + 1)
+            )
+        return CachedCompletion(
+            content=entry.content,
+            model=entry.model,
+            prompt_tokens=entry.prompt_tokens,
+            completion_tokens=entry.completion_tokens,
+            cost_usd=entry.cost_usd,
+        )
+
+    def store(self, key: str, scope: CacheScope, completion: CachedCompletion) -> None:
+        """Insert or replace an entry, then evict down to the size budget."""
+        from ..db import LLMResponseCacheEntry
+
+        now = datetime.now(timezone.utc)
+        table = LLMResponseCacheEntry.__table__
+        with self._engine().begin() as connection:
+            connection.execute(delete(table).where(table.c.key == key))
+            connection.execute(table.insert().values(
+                key=key,
+                prompt_id=scope.prompt_id,
+                prompt_version=scope.prompt_version,
+                model=completion.model,
+                content=completion.content,
+                prompt_tokens=completion.prompt_tokens,
+                completion_tokens=completion.completion_tokens,
+                cost_usd=completion.cost_usd,
+                size_bytes=len(completion.content.encode("utf-8")),
+                hit_count=0,
+                created_at=now,
+                last_used_at=now,
+            ))
+            self._evict(connection, now)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry (e.g. a response that no longer parses)."""
+        from ..db import LLMResponseCacheEntry
+
+        with self._engine().begin() as connection:
+            connection.execute(delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.key == key))
+
+    def _evict(self, connection, now: datetime) -> None:
+        """Drop expired entries, then least-recently-used ones beyond max_bytes."""
+        from ..db import LLMResponseCacheEntry as Entry
+
+        connection.execute(delete(Entry).where(Entry.created_at < now - self.ttl))
+        excess = connection.execute(select(func.coalesce(func.sum(Entry.size_bytes), 0))).scalar() - self.max_bytes
+        if excess <= 0:
+            return
+
+        victims = []
+        for key, size in connection.execute(select(Entry.key, Entry.size_bytes).order_by(Entry.last_used_at)):
+            if excess <= 0:
+                break
+            victims.append(key)
+            excess -= size
+        connection.execute(delete(Entry).where(Entry.key.in_(victims)))
+        logger.debug(f"LLM response cache evicted {len(victims)} entries")
+
+    def stats(self) -> dict:
+        """Hit ratio and savings since start, plus the stored entries."""
+        from ..db import LLMResponseCacheEntry as Entry
+
+        with self._engine().connect() as connection:
+            entries, size = connection.execute(
+                select(func.count(), func.coalesce(func.sum(Entry.size_bytes), 0))
+            ).one()
+        served = self._hits + self._coalesced
+        lookups = served + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "hit_ratio": served / lookups if lookups else 0.0,
+            "saved_usd": self._saved_usd,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+def _aware(value: datetime) -> datetime:
+    """SQLite drops tzinfo; stored times are UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,250 @@
+"""Shared HTTP transport for all OpenRouter traffic.
+
+This module provides:
+- One long-lived pooled client (HTTP/2 multiplexing when the h2 package is
+  installed), shared by LLMClient and the Omnious agent, so ReAct
+  iterations and stream continuations reuse a warm TLS connection
+- Explicit connect, read, write and pool timeouts, plus a first-token
+  timeout for streams: headers and the first data line must arrive within
+  it, after which only the read timeout applies
+- Connection-reuse and time-to-first-token metrics
+
+Callers keep their own headers, retries and LLM budget (LLMResilience);
+the transport only owns connections. It is closed by the FastAPI lifespan
+and when the TUI exits.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Recent time-to-first-token samples kept for percentiles
+TTFT_SAMPLES = 256
+
+
+def _http2_available() -> bool:
+    """httpx needs the optional h2 package for HTTP/2."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class FirstTokenTimeout(httpx.TimeoutException):
+    """A stream produced no data within the first-token timeout."""
+
+
+@dataclass
+class OpenRouterTransportConfig:
+    """Configuration for the shared OpenRouter transport."""
+    http2: bool = True  # Falls back to HTTP/1.1 keep-alive without h2
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 60.0  # Between bytes; bounds a whole non-streamed completion
+    write_timeout: float = 10.0
+    pool_timeout: float = 10.0  # Waiting for a free connection
+    first_token_timeout: float = 30.0
+
+
+class TransportStats:
+    """Request, connection and time-to-first-token counters."""
+
+    def __init__(self):
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.first_token_timeouts = 0
+        self.ttft_ms: Deque[float] = deque(maxlen=TTFT_SAMPLES)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ttft = sorted(self.ttft_ms)
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "streams": self.streams,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            "first_token_timeouts": self.first_token_timeouts,
+            "ttft_p50_ms": round(ttft[len(ttft) // 2], 1) if ttft else None,
+            "ttft_p95_ms": round(ttft[int(len(ttft) * 0.95)], 1) if ttft else None,
+        }
+
+
+class OpenRouterStream:
+    """A streamed response whose first data line is held to the first-token timeout."""
+
+    def __init__(self, transport: "OpenRouterTransport", response: httpx.Response, deadline: float, started: float):
+        self._transport = transport
+        self._response = response
+        self._deadline = deadline
+        self._started = started
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self._response.headers
+
+    async def aread(self) -> bytes:
+        return await self._response.aread()
+
+    async def aiter_lines(self) -> AsyncIterator[str]:
+        """Response lines; SSE comments before the first data line don't count as tokens."""
+        lines = self._response.aiter_lines()
+        waiting = True
+        while waiting:
+            try:
+                line = await asyncio.wait_for(lines.__anext__(), timeout=self._deadline - time.perf_counter())
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError as e:
+                self._transport.stats.first_token_timeouts += 1
+                raise FirstTokenTimeout(
+                    "No data within the first-token timeout", request=self._response.request
+                ) from e
+            if line.startswith("data:"):
+                waiting = False
+                self._transport.stats.ttft_ms.append((time.perf_counter() - self._started) * 1000)
+            yield line
+
+        async for line in lines:
+            yield line
+
+
+class OpenRouterTransport:
+    """Process-wide pooled HTTP transport for the OpenRouter API.
+
+    Usage:
+        transport = get_openrouter_transport()
+        response = await transport.post(f"{api_url}/chat/completions", headers=..., json=payload)
+        async with transport.stream("POST", url, headers=..., json=payload) as response:
+            async for line in response.aiter_lines():
+                ...
+    """
+
+    def __init__(
+        self,
+        config: Optional[OpenRouterTransportConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.config = config or OpenRouterTransportConfig()
+        self.http2 = self.config.http2 and _http2_available()
+        self.stats = TransportStats()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, recreating it if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    connect=self.config.connect_timeout,
+                    read=self.config.read_timeout,
+                    write=self.config.write_timeout,
+                    pool=self.config.pool_timeout,
+                ),
+                transport=self._transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        """httpcore trace hook: counts connections opened for a request."""
+        if event_name == "connection.connect_tcp.complete":
+            self.stats.connections_opened += 1
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST on a pooled connection; callers decide whether to raise_for_status."""
+        self.stats.requests += 1
+        try:
+            return await self._get_client().post(url, extensions={"trace": self._trace}, **kwargs)
+        except httpx.HTTPError:
+            self.stats.errors += 1
+            raise
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[OpenRouterStream]:
+        """Stream a response; headers and the first data line must arrive within first_token_timeout.
+
+        Raises:
+            FirstTokenTimeout: If the server sends no data in time
+        """
+        client = self._get_client()
+        self.stats.requests += 1
+        self.stats.streams += 1
+        started = time.perf_counter()
+        deadline = started + self.config.first_token_timeout
+        request = client.build_request(method, url, extensions={"trace": self._trace}, **kwargs)
+        try:
+            response = await asyncio.wait_for(client.send(request, stream=True), timeout=self.config.first_token_timeout)
+        except asyncio.TimeoutError as e:
+            self.stats.errors += 1
+            self.stats.first_token_timeouts += 1
+            raise FirstTokenTimeout("No response within the first-token timeout", request=request) from e
+        except httpx.HTTPError:
+            self.stats.errors += 1
+            raise
+
+        try:
+            yield OpenRouterStream(self, response, deadline, started)
+        except httpx.HTTPError:
+            self.stats.errors += 1
+            raise
+        finally:
+            await response.aclose()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool settings, connection reuse and time-to-first-token."""
+        return {
+            "http2": self.http2,
+            "max_connections": self.config.max_connections,
+            **self.stats.to_dict(),
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global transport instance
+_openrouter_transport: Optional[OpenRouterTransport] = None
+
+
+def get_openrouter_transport() -> OpenRouterTransport:
+    """Get or create the shared OpenRouter transport singleton."""
+    global _openrouter_transport
+    if _openrouter_transport is None:
+        config = get_config()
+        _openrouter_transport = OpenRouterTransport(OpenRouterTransportConfig(
+            http2=config.openrouter_http2,
+            max_connections=config.openrouter_max_connections,
+            max_keepalive_connections=config.openrouter_max_keepalive_connections,
+            keepalive_expiry=config.openrouter_keepalive_expiry_seconds,
+            connect_timeout=config.openrouter_connect_timeout_seconds,
+            read_timeout=config.openrouter_read_timeout_seconds,
+            first_token_timeout=config.openrouter_first_token_timeout_seconds,
+        ))
+    return _openrouter_transport
@@ -1,11 +1,11 @@
 """Pipedrive API client."""
 
-import httpx
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from .config import get_config
+from .pipedrive_transport import PipedriveTransport, get_pipedrive_transport
 
 
 class PipedriveDealDTO(BaseModel):
@@ -115,20 +115,27 @@ class PipedriveDealFlowDTO(BaseModel):
 
     success: bool
     data: List[PipedriveDealChangeDTO] = []
+    additional_data: Optional[Dict[str, Any]] = None
 
 
 class PipedriveClient:
     """Client for Pipedrive API operations."""
     
-    def __init__(self, api_token: str, api_url: str,api_url_v2: str):
+    def __init__(
+        self,
+        api_token: str,
+        api_url: str,
+        api_url_v2: str,
+        transport: Optional[PipedriveTransport] = None,
+    ):
         self.api_token = api_token
         self.api_url = api_url
         self.api_url_v2 = api_url_v2
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Shared with the sync jobs so all Pipedrive calls draw on one rate limit
+        self.client = transport or get_pipedrive_transport()
     
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """No-op: the shared transport is closed at API shutdown, not per client."""
     
     async def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make GET request to Pipedrive API."""
@@ -0,0 +1,307 @@
+"""Shared HTTP transport for all Pipedrive traffic.
+
+This module provides:
+- One pooled keep-alive client (HTTP/2 when the h2 package is installed)
+- A token bucket that adapts to Pipedrive's x-ratelimit-* response headers
+- Retry with jittered exponential backoff on 429/5xx, honouring Retry-After
+- Per-endpoint latency and error metrics
+
+Every sync job and PipedriveClient share the same transport, so concurrent
+jobs draw from one rate-limit budget instead of colliding on it.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Methods that are safe to resend after a 5xx or a dropped connection; the
+# rest are only retried on 429, which Pipedrive returns before doing any work
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Numeric path segments collapse to {id} so metrics group by endpoint
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def _http2_available() -> bool:
+    """httpx needs the optional h2 package for HTTP/2."""
+    return importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class PipedriveTransportConfig:
+    """Configuration for the shared Pipedrive transport."""
+    http2: bool = True  # Falls back to HTTP/1.1 keep-alive without h2
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout_seconds: float = 30.0
+    rate_per_second: float = 10.0  # Steady rate until headers say otherwise
+    burst: int = 20  # Bucket capacity
+    max_retries: int = 4
+    backoff_base: float = 0.5  # Seconds, doubled per attempt
+    backoff_max: float = 30.0
+
+
+@dataclass
+class EndpointStats:
+    """Latency and error counters for one endpoint."""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+    def record(self, latency_ms: float, error: bool) -> None:
+        self.requests += 1
+        self.errors += int(error)
+        self.total_latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "avg_latency_ms": round(self.total_latency_ms / self.requests, 2) if self.requests else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 2),
+        }
+
+
+class AdaptiveTokenBucket:
+    """Token bucket whose rate follows the server's rate-limit headers.
+
+    Pipedrive reports the remaining budget of the current window in
+    x-ratelimit-remaining and the seconds until it resets in
+    x-ratelimit-reset. The bucket never holds more tokens than the server
+    says remain, spreads the remaining budget over the rest of the window,
+    and pauses entirely when the budget is exhausted or on Retry-After.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.updated_at = clock()
+        self.paused_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _wait_time(self) -> float:
+        """Seconds until a token is available, taking one if there is."""
+        now = self.clock()
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                wait = self._wait_time()
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def update_from_headers(self, headers: httpx.Headers) -> None:
+        """Adapt to x-ratelimit-remaining / x-ratelimit-reset."""
+        remaining = _header_float(headers, "x-ratelimit-remaining")
+        reset = _header_float(headers, "x-ratelimit-reset")
+        if remaining is None:
+            return
+
+        self._refill(self.clock())
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0:
+            self.pause(reset if reset is not None else 1.0)
+        elif reset:
+            # Spread what is left over the rest of the window
+            self.rate = max(0.1, min(self.max_rate, remaining / reset))
+        else:
+            self.rate = self.max_rate
+
+    def reset_loop(self) -> None:
+        """Drop the lock bound to a previous event loop."""
+        self._lock = None
+
+
+def _header_float(headers: httpx.Headers, name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Metric key for a request, e.g. 'GET deals/{id}/flow'."""
+    path = httpx.URL(url).path
+    path = _ID_SEGMENT.sub("/{id}", path)
+    # Drop the /v1 or /api/v2 prefix
+    path = re.sub(r"^/(api/)?v\d+/", "", path).lstrip("/")
+    return f"{method.upper()} {path}"
+
+
+class PipedriveTransport:
+    """Process-wide pooled HTTP transport for the Pipedrive API.
+
+    Usage:
+        transport = get_pipedrive_transport()
+        response = await transport.get(f"{base_url}/deals", params={...})
+    """
+
+    def __init__(
+        self,
+        config: Optional[PipedriveTransportConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.config = config or PipedriveTransportConfig()
+        self.http2 = self.config.http2 and _http2_available()
+        self.bucket = AdaptiveTokenBucket(self.config.rate_per_second, self.config.burst)
+        self.stats: Dict[str, EndpointStats] = {}
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, recreating it if the event loop changed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                timeout=self.config.timeout_seconds,
+                transport=self._transport,
+            )
+            self._loop = loop
+            self.bucket.reset_loop()
+        return self._client
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """Delay before the next attempt; Retry-After wins over backoff."""
+        if response is not None:
+            retry_after = _header_float(response.headers, "retry-after")
+            if retry_after is not None:
+                return retry_after
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)  # Full jitter
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the rate limiter, retrying transient failures.
+
+        Returns the final response; callers decide whether to raise_for_status.
+        Transport errors are re-raised after the last attempt.
+        """
+        client = self._get_client()
+        stats = self.stats.setdefault(endpoint_key(method, url), EndpointStats())
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+
+        for attempt in range(self.config.max_retries + 1):
+            await self.bucket.acquire()
+            started = time.perf_counter()
+            response = None
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                stats.record((time.perf_counter() - started) * 1000, error=True)
+                if not idempotent or attempt == self.config.max_retries:
+                    raise
+                logger.warning(f"Pipedrive {method} {url} failed ({e}), retrying")
+            else:
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in RETRY_STATUS_CODES
+                )
+                stats.record((time.perf_counter() - started) * 1000, error=response.is_error)
+                self.bucket.update_from_headers(response.headers)
+                if not retryable or attempt == self.config.max_retries:
+                    return response
+                logger.warning(f"Pipedrive {method} {url} returned {response.status_code}, retrying")
+
+            delay = self._backoff(attempt, response)
+            if response is not None and response.status_code == 429:
+                stats.rate_limited += 1
+                # Hold back every caller, not just this one
+                self.bucket.pause(delay)
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per-endpoint metrics and the current rate limiter state."""
+        return {
+            "http2": self.http2,
+            "rate_per_second": round(self.bucket.rate, 3),
+            "endpoints": {key: stats.to_dict() for key, stats in sorted(self.stats.items())},
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Global transport instance
+_pipedrive_transport: Optional[PipedriveTransport] = None
+
+
+def get_pipedrive_transport() -> PipedriveTransport:
+    """Get or create the shared Pipedrive transport singleton."""
+    global _pipedrive_transport
+    if _pipedrive_transport is None:
+        _pipedrive_transport = PipedriveTransport()
+    return _pipedrive_transport
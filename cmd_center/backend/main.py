@@ -1,6 +1,8 @@
 """FastAPI main application."""
 
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
@@ -8,6 +10,7 @@ from .api import api_router
 from .integrations import get_config
 from .db import init_db
 from .services.sync_scheduler import lifespan_manager
+from .services.sync_status import freshness_headers
 
 # Create FastAPI app
 app = FastAPI(
@@ -26,6 +29,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Stamp responses with the age of the cached data they were built from
+@app.middleware("http")
+async def add_freshness_headers(request: Request, call_next):
+    response = await call_next(request)
+    # The lookup may read SQLite, so keep it off the event loop
+    response.headers.update(await asyncio.to_thread(freshness_headers))
+    return response
+
+
 # Include API routes
 app.include_router(api_router)
 
@@ -0,0 +1,253 @@
+"""Versioned schema migrations for the SQLite cache.
+
+init_db() only runs create_all(), which creates missing tables but never
+touches existing ones, so indexes, columns and backfills added for
+performance would not reach an existing pipedrive_cache.db. Migrations fill
+that gap:
+- Each step has a version, a name and an idempotent apply(connection);
+  applied versions are recorded in the schema_migration table in the same
+  transaction as the step
+- init_db() applies pending foreground steps in version order at startup
+- Background steps (index builds, backfills, ANALYZE) run after startup in
+  a worker thread, so the API serves from the cache meanwhile
+- After the background steps, ensure_indexes() runs on every startup, so an
+  index declared on a model reaches existing caches without its own step
+- plan() is a dry run: pending steps with the rows they touch and an
+  estimated duration
+
+    python -m cmd_center.backend.migrations --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from . import db
+from .db import DealChangeEvent, SchemaMigration, ensure_indexes
+
+logger = logging.getLogger(__name__)
+
+# Rough SQLite throughput for the dry-run estimate (rows per second)
+INDEX_BUILD_ROWS_PER_SECOND = 500_000
+SCAN_ROWS_PER_SECOND = 2_000_000
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema step."""
+
+    version: int
+    name: str
+    apply: Callable[[Connection], object]
+    background: bool = False
+    tables: tuple[str, ...] = ()    # tables the step reads or rewrites (dry-run estimate)
+    rows_per_second: int = SCAN_ROWS_PER_SECOND
+
+
+@dataclass(frozen=True)
+class MigrationPlan:
+    """Dry-run report for a pending step."""
+
+    version: int
+    name: str
+    background: bool
+    rows: int
+    estimated_seconds: float
+
+
+def _analyze(connection: Connection) -> None:
+    """Refresh planner statistics so SQLite picks the composite indexes."""
+    connection.exec_driver_sql("ANALYZE")
+
+
+def _unique_event_ids(connection: Connection) -> None:
+    """Drop duplicate flow events and make their Pipedrive id index unique.
+
+    Caches created before the unique constraint have a plain index under the
+    same name, which ensure_indexes() skips, so INSERT OR IGNORE never
+    deduplicated their events. The oldest copy of each event is kept.
+    """
+    connection.exec_driver_sql(
+        "DELETE FROM deal_change_event WHERE pipedrive_event_id IS NOT NULL AND id NOT IN "
+        "(SELECT MIN(id) FROM deal_change_event GROUP BY pipedrive_event_id)"
+    )
+    index = next(i for i in DealChangeEvent.__table__.indexes if i.name == "ix_deal_change_event_pipedrive_event_id")
+    connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    index.create(connection)
+
+
+# Ordered steps; append new ones with the next version and never renumber
+MIGRATIONS: list[Migration] = [
+    Migration(
+        version=1,
+        name="Hot read-path indexes on existing caches",
+        apply=ensure_indexes,
+        background=True,
+        tables=("deal", "note", "deal_stage_span", "deal_facts", "loop_finding", "cached_email"),
+        rows_per_second=INDEX_BUILD_ROWS_PER_SECOND,
+    ),
+    Migration(
+        version=2,
+        name="Planner statistics (ANALYZE)",
+        apply=_analyze,
+        background=True,
+        tables=("deal", "note", "activity", "deal_stage_span", "deal_change_event"),
+    ),
+    Migration(
+        version=3,
+        name="Unique deal change event ids",
+        apply=_unique_event_ids,
+        tables=("deal_change_event",),
+        rows_per_second=INDEX_BUILD_ROWS_PER_SECOND,
+    ),
+]
+
+
+class MigrationRunner:
+    """Applies pending migrations against one engine."""
+
+    def __init__(self, bind: Engine, migrations: Optional[list[Migration]] = None):
+        self.bind = bind
+        self.migrations = sorted(MIGRATIONS if migrations is None else migrations, key=lambda m: m.version)
+
+    def applied_versions(self) -> set[int]:
+        with self.bind.connect() as connection:
+            if not self.bind.dialect.has_table(connection, SchemaMigration.__tablename__):
+                return set()
+            return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+    def schema_version(self) -> int:
+        """Highest version with every earlier step applied (0 for none)."""
+        applied = self.applied_versions()
+        version = 0
+        for migration in self.migrations:
+            if migration.version not in applied:
+                break
+            version = migration.version
+        return version
+
+    def pending(self, background: Optional[bool] = None) -> list[Migration]:
+        """Unapplied steps in version order, optionally only (non-)background ones."""
+        applied = self.applied_versions()
+        return [
+            m for m in self.migrations
+            if m.version not in applied and (background is None or m.background == background)
+        ]
+
+    def plan(self) -> list[MigrationPlan]:
+        """Dry run: pending steps with their row counts and estimated durations."""
+        with self.bind.connect() as connection:
+            existing = set(db.SQLModel.metadata.tables) & set(
+                connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'").scalars()
+            )
+            counts = {
+                table: connection.execute(select(func.count()).select_from(db.SQLModel.metadata.tables[table])).scalar()
+                for table in existing
+            }
+
+        plans = []
+        for migration in self.pending():
+            rows = sum(counts.get(table, 0) for table in migration.tables)
+            plans.append(MigrationPlan(
+                version=migration.version,
+                name=migration.name,
+                background=migration.background,
+                rows=rows,
+                estimated_seconds=round(rows / migration.rows_per_second, 2),
+            ))
+        return plans
+
+    def apply(self, migration: Migration) -> bool:
+        """Apply one step and record it; False when it was already applied."""
+        started = time.perf_counter()
+        with self.bind.begin() as connection:
+            # pysqlite only opens transactions before DML; begin explicitly so
+            # DDL rolls back with a failed step (and concurrent runners queue here)
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            if connection.execute(
+                select(SchemaMigration.version).where(SchemaMigration.version == migration.version)
+            ).first():
+                return False
+            migration.apply(connection)
+            connection.execute(insert(SchemaMigration).values(
+                version=migration.version,
+                name=migration.name,
+                applied_at=datetime.now(timezone.utc),
+                duration_ms=int((time.perf_counter() - started) * 1000),
+            ))
+
+        logger.info(
+            f"Applied schema migration {migration.version} ({migration.name}) "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return True
+
+    def ensure_indexes(self) -> list[str]:
+        """Create declared indexes missing from the cache (idempotent)."""
+        created = ensure_indexes(self.bind)
+        if created:
+            logger.info(f"Created missing indexes: {', '.join(created)}")
+        return created
+
+    def run(self, background: bool = False) -> list[int]:
+        """Apply pending foreground steps (and background ones plus the index pass if asked) in order.
+
+        Returns:
+            Versions applied by this call
+        """
+        applied = [
+            migration.version
+            for migration in self.pending(background=None if background else False)
+            if self.apply(migration)
+        ]
+        if background:
+            self.ensure_indexes()
+        return applied
+
+    async def run_background(self) -> list[int]:
+        """Apply pending background steps one at a time, then the index pass, in a worker thread."""
+        applied = []
+        for migration in self.pending(background=True):
+            if await asyncio.to_thread(self.apply, migration):
+                applied.append(migration.version)
+        await asyncio.to_thread(self.ensure_indexes)
+        return applied
+
+
+async def run_background_migrations() -> list[int]:
+    """Startup task: apply background steps, logging instead of raising."""
+    try:
+        return await MigrationRunner(db.engine).run_background()
+    except Exception as e:
+        logger.error(f"Background schema migration failed: {e}")
+        return []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the SQLite cache")
+    parser.add_argument("--dry-run", action="store_true", help="Report pending steps and estimated cost only")
+    args = parser.parse_args()
+
+    runner = MigrationRunner(db.engine)
+    if args.dry_run:
+        plans = runner.plan()
+        print(f"schema version {runner.schema_version()}, {len(plans)} pending")
+        for plan in plans:
+            kind = "background" if plan.background else "startup"
+            print(f"{plan.version:>4}  {plan.name:<45}{kind:<12}{plan.rows:>12,} rows  ~{plan.estimated_seconds:.1f} s")
+        return
+
+    db.SQLModel.metadata.create_all(db.engine)
+    applied = runner.run(background=True)
+    print(f"applied {applied or 'nothing'}; schema version {runner.schema_version()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,10 @@ from .cashflow_models import (
     DealPrediction,
     PredictionMetadata,
     CashflowPredictionResult,
+    CashflowBand,
+    CashflowSimulation,
+    CashflowWhatIfInput,
+    CashflowWhatIfResult,
     ForecastPeriod,
     ForecastTotals,
     ForecastTable,
@@ -67,6 +71,7 @@ from .writer_models import (
     OrderReceivedResult,
     NoteSummaryResult,
     DealHealthResult,
+    SummaryRunProgress,
 )
 from .employee_models import (
     # Employee models
@@ -151,6 +156,10 @@ __all__ = [
     "DealPrediction",
     "PredictionMetadata",
     "CashflowPredictionResult",
+    "CashflowBand",
+    "CashflowSimulation",
+    "CashflowWhatIfInput",
+    "CashflowWhatIfResult",
     "ForecastPeriod",
     "ForecastTotals",
     "ForecastTable",
@@ -170,6 +179,7 @@ __all__ = [
     "OrderReceivedResult",
     "NoteSummaryResult",
     "DealHealthResult",
+    "SummaryRunProgress",
     # Employee Models
     "EmployeeBase",
     "EmployeeCreate",
@@ -53,6 +53,9 @@ class CashflowPredictionInput(BaseModel):
     granularity: str = Field(default="week", description="Grouping: week or month")
     today_date: Optional[datetime] = Field(None, description="Reference date (defaults to now)")
     assumptions_flags: Optional[dict] = Field(None, description="Optional assumptions/overrides")
+    mode: str = Field(default="deterministic", description="deterministic, or simulation to add P10/P50/P90 bands")
+    trials: int = Field(default=10000, ge=100, le=100000, description="Simulation trials")
+    seed: Optional[int] = Field(None, description="Simulation random seed (for reproducible bands)")
 
 
 class ForecastOptions(BaseModel):
@@ -89,6 +92,32 @@ class PredictionMetadata(BaseModel):
     avg_confidence: float = Field(..., description="Average confidence score")
 
 
+class CashflowBand(BaseModel):
+    """Simulated cash for one period (percentiles across trials)."""
+    period: PeriodLabel
+    invoice_p10_sar: float = Field(..., description="Invoiced value, 10th percentile")
+    invoice_p50_sar: float = Field(..., description="Invoiced value, median")
+    invoice_p90_sar: float = Field(..., description="Invoiced value, 90th percentile")
+    payment_p10_sar: float = Field(..., description="Collected value, 10th percentile")
+    payment_p50_sar: float = Field(..., description="Collected value, median")
+    payment_p90_sar: float = Field(..., description="Collected value, 90th percentile")
+
+
+class CashflowSimulation(BaseModel):
+    """Monte-Carlo forecast from historical stage durations."""
+    pipeline_name: str = Field(..., description="Pipeline simulated")
+    trials: int = Field(..., description="Number of trials")
+    deals_simulated: int = Field(..., description="Open deals simulated")
+    stages_with_history: int = Field(..., description="Invoice-path stages sampled from stage history")
+    bands: list[CashflowBand] = Field(..., description="Per-period percentile bands within the horizon")
+    invoice_total_p10_sar: float = Field(..., description="Invoiced value within the horizon, 10th percentile")
+    invoice_total_p50_sar: float = Field(..., description="Invoiced value within the horizon, median")
+    invoice_total_p90_sar: float = Field(..., description="Invoiced value within the horizon, 90th percentile")
+    payment_total_p10_sar: float = Field(..., description="Collected value within the horizon, 10th percentile")
+    payment_total_p50_sar: float = Field(..., description="Collected value within the horizon, median")
+    payment_total_p90_sar: float = Field(..., description="Collected value within the horizon, 90th percentile")
+
+
 class CashflowPredictionResult(BaseModel):
     """Complete cashflow prediction result."""
     per_deal_predictions: list[DealPrediction] = Field(..., description="Individual deal predictions")
@@ -96,6 +125,24 @@ class CashflowPredictionResult(BaseModel):
     warnings: list[str] = Field(default_factory=list, description="Warnings/notes")
     assumptions_used: list[str] = Field(default_factory=list, description="Global assumptions")
     metadata: PredictionMetadata = Field(..., description="Prediction metadata")
+    simulation: Optional[CashflowSimulation] = Field(None, description="Percentile bands (simulation mode)")
+
+
+class CashflowWhatIfInput(BaseModel):
+    """Alternate stage durations for a what-if forecast."""
+    stage_days_to_invoice: dict[str, int] = Field(
+        ..., description="Stage name -> days to invoice (overrides the default table for these stages)"
+    )
+    horizon_days: int = Field(default=90, ge=7, le=365, description="Prediction horizon")
+    granularity: str = Field(default="week", pattern="^(week|month)$", description="Grouping: week or month")
+
+
+class CashflowWhatIfResult(BaseModel):
+    """Baseline vs what-if forecast."""
+    baseline: list[CashflowBucket] = Field(..., description="Forecast with the default stage durations")
+    scenario: list[CashflowBucket] = Field(..., description="Forecast with the alternate stage durations")
+    baseline_total_sar: float = Field(..., description="Expected invoice value within the horizon (default)")
+    scenario_total_sar: float = Field(..., description="Expected invoice value within the horizon (what-if)")
 
 
 # ========== FORECAST TABLE MODELS ==========
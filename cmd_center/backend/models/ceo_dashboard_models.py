@@ -109,3 +109,5 @@ class CEODashboardMetrics(BaseModel):
     # Metadata
     last_updated: str = Field(description="ISO timestamp of when data was fetched")
     data_freshness: str = Field(default="live", description="Indicates if data is live or cached")
+    generation_ms: Optional[float] = Field(default=None, description="Time taken to compute the metrics (ms)")
+    query_count: Optional[int] = Field(default=None, description="SQL queries issued for the dashboard snapshot")
@@ -133,6 +133,22 @@ class NoteSummaryResult(BaseModel):
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score 0-1")
 
 
+# ============================================================================
+# BATCH SUMMARY MODELS
+# ============================================================================
+
+class SummaryRunProgress(BaseModel):
+    """Progress of a batch summary run, for progressive rendering."""
+    run_id: int = Field(..., description="Summary run ID")
+    status: str = Field(..., description="Status: running, completed, cancelled, failed")
+    total: int = Field(..., description="Deals in the run")
+    succeeded: int = Field(default=0, description="Deals summarized so far")
+    failed: int = Field(default=0, description="Deals whose summary failed")
+    results: list[DealSummaryResult] = Field(default_factory=list, description="Summaries completed after the cursor")
+    errors: dict[int, str] = Field(default_factory=dict, description="Errors after the cursor by deal ID")
+    cursor: int = Field(default=0, description="Pass as 'after' to fetch only newer outcomes")
+
+
 # ============================================================================
 # DEAL HEALTH ANALYSIS MODELS
 # ============================================================================
@@ -3,18 +3,27 @@
 MIGRATION NOTE: This service has been enhanced to use WriterService
 for LLM-powered deal summarization and recommendations.
 See docs/LLM_Architecture_Implementation.md for migration details.
+
+The snapshots, PM tables, bottlenecks and top-N lists are computed with a
+handful of grouped queries over deal_facts (CASE bucketing, window-ranked
+medians and notes) instead of loading every deal and looping per PM/deal.
+Ties in ordered lists fall back to deal id order, which is the order the
+rows used to be scanned in.
+
+Each summary runs in its own short-lived session on the read-only engine and
+works on plain rows, so the shared service instance holds no database state.
+Results are memoized in the result cache until the next sync.
 """
 
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
-from collections import defaultdict
-from statistics import median
 
-from sqlmodel import Session, select
+from sqlalchemy import Integer, and_, case, cast, or_
+from sqlmodel import Session, func, select
 
-from ..db import Deal, Note, Stage, DealStageSpan, engine
+from .. import db
+from ..db import Deal, DealFact, Note, DealStageSpan
 from ..models import (
     OverdueSummaryResponse,
     OverdueSnapshot,
@@ -32,19 +41,63 @@ from ..models import (
     FastWinDeal,
     DealSummaryContext,
 )
+from .result_cache import cached_result
 from .writer_service import get_writer_service
 
 logger = logging.getLogger(__name__)
 
 
-# Custom field key for End User (from Pipedrive schema)
-END_USER_FIELD_KEY = "bd7bb3b2758ca81feebf015ca60bf528eafe47f0"
-
 # Order Received stage IDs (from docs/pipedrive_Schema_info.md)
 ORDER_RECEIVED_STAGE_IDS = [27, 28, 29, 45]
 STUCK_STAGE_IDS= [27,28, 29,44,45,30,82,42,43]
 OVERDUE_STAGE_IDS= [27,28,29,44,45,30,82,42,43,49]
 
+# Stage 28 = Approved (from ORDER_RECEIVED_STAGE_IDS)
+APPROVED_STAGE_ID = 28
+
+# Recent notes passed to the stuck-deal analysis
+STUCK_NOTES_LIMIT = 5
+
+
+def _days_since(column, today: datetime):
+    """SQL equivalent of ``(today - column).days`` for a DateTime column.
+
+    SQLite stores DateTime as 'YYYY-MM-DD HH:MM:SS.ffffff', so whole days are
+    the calendar-date difference, minus one when the column's time of day is
+    later than today's (floor semantics, exact to the microsecond).
+    """
+    whole_dates = cast(
+        func.julianday(today.date().isoformat()) - func.julianday(func.substr(column, 1, 10)),
+        Integer,
+    )
+    return whole_dates - case((func.substr(column, 12) > today.strftime("%H:%M:%S.%f"), 1), else_=0)
+
+
+def _or_unknown(column):
+    """SQL equivalent of ``column or "Unknown"``."""
+    return func.coalesce(func.nullif(column, ""), "Unknown")
+
+
+# Fact columns returned for listed deals (plain rows, not tracked ORM objects)
+DEAL_ROW_COLUMNS = (
+    DealFact.deal_id,
+    DealFact.title,
+    DealFact.value,
+    DealFact.owner_name,
+    DealFact.stage_name,
+    DealFact.last_note_snippet,
+    DealFact.next_activity_date,
+    DealFact.end_user,
+)
+
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _sar_if(condition):
+    return func.coalesce(func.sum(case((condition, DealFact.value), else_=0.0)), 0.0)
+
 
 class AramcoSummaryService:
     """Service for generating mode-specific CEO radar summaries.
@@ -56,9 +109,9 @@ class AramcoSummaryService:
     """
 
     def __init__(self):
-        self.session = Session(engine)
         self.writer = get_writer_service()
 
+    @cached_result("aramco.overdue_summary")
     def generate_overdue_summary(self, pipeline_name: str = "Aramco Projects") -> OverdueSummaryResponse:
         """
         Generate overdue summary modal data.
@@ -66,190 +119,145 @@ class AramcoSummaryService:
         Calculates executive snapshot, PM performance metrics, and CEO intervention list
         for overdue deals.
         """
-        # Get all overdue deals (deals not updated in last 7+ days)
-        today = datetime.now()
-        week_ago = today - timedelta(days=7)
-        two_weeks_ago = today - timedelta(days=14)
-
-        # Fetch overdue deals
-        statement = select(Deal).where(
-            Deal.status == "open",
-            Deal.update_time < week_ago,
-            Deal.stage_id.in_(OVERDUE_STAGE_IDS),
-        )
-        overdue_deals = self.session.exec(statement).all()
-
-        if not overdue_deals:
-            # Return empty response
-            return OverdueSummaryResponse(
-                snapshot=OverdueSnapshot(
-                    overdue_now_count=0,
-                    overdue_now_sar=0.0,
-                    overdue_soon_count=0,
-                    overdue_soon_sar=0.0,
-                    worst_overdue=[]
-                ),
-                pm_performance=[],
-                intervention_list=[]
+        with Session(db.read_engine) as session:
+            # Overdue deals: not updated in the last 7+ days
+            today = datetime.now()
+            week_ago = today - timedelta(days=7)
+
+            days_overdue = _days_since(DealFact.update_time, today)
+            is_overdue = and_(
+                DealFact.update_time < week_ago,
+                DealFact.stage_id.in_(OVERDUE_STAGE_IDS),
             )
-
-        # Calculate days overdue for each deal
-        deals_with_metrics = []
-        for deal in overdue_deals:
-            if deal.update_time:
-                days_overdue = (today - deal.update_time).days
-                deals_with_metrics.append({
-                    "deal": deal,
-                    "days_overdue": days_overdue,
-                    "days_since_update": days_overdue,
-                })
-
-        # === EXECUTIVE SNAPSHOT ===
-
-        # Overdue now (>7 days)
-        overdue_now = [d for d in deals_with_metrics if d["days_overdue"] >= 7]
-        overdue_now_count = len(overdue_now)
-        overdue_now_sar = sum(d["deal"].value for d in overdue_now)
-
-        # Overdue soon (deals with next_activity in next 7-14 days from now)
-        statement_soon = select(Deal).where(
-            Deal.status == "open",
-            Deal.next_activity_date.is_not(None),
-            Deal.next_activity_date >= today,
-            Deal.next_activity_date <= today + timedelta(days=14)
-        )
-        soon_deals = self.session.exec(statement_soon).all()
-        overdue_soon_count = len(soon_deals)
-        overdue_soon_sar = sum(d.value for d in soon_deals)
-
-        # Worst overdue (top 5 by days)
-        sorted_overdue = sorted(deals_with_metrics, key=lambda x: x["days_overdue"], reverse=True)
-        worst_overdue = [
-            {
-                "deal_id": d["deal"].id,
-                "title": d["deal"].title,
-                "days": d["days_overdue"],
-                "sar": d["deal"].value
-            }
-            for d in sorted_overdue[:5]
-        ]
-
-        snapshot = OverdueSnapshot(
-            overdue_now_count=overdue_now_count,
-            overdue_now_sar=overdue_now_sar,
-            overdue_soon_count=overdue_soon_count,
-            overdue_soon_sar=overdue_soon_sar,
-            worst_overdue=worst_overdue
-        )
-
-        # === PM PERFORMANCE TABLE ===
-
-        # Group by PM (owner)
-        pm_metrics = defaultdict(lambda: {
-            "overdue_now": [],
-            "due_soon": [],
-            "updated_this_week": 0,
-            "has_next_activity": 0,
-        })
-
-        for item in deals_with_metrics:
-            deal = item["deal"]
-            pm_name = deal.owner_name or "Unknown"
-
-            if item["days_overdue"] >= 7:
-                pm_metrics[pm_name]["overdue_now"].append(deal)
-
-        # Add soon deals to PM metrics
-        for deal in soon_deals:
-            pm_name = deal.owner_name or "Unknown"
-            pm_metrics[pm_name]["due_soon"].append(deal)
-
-        # Count updated this week and has next activity
-        statement_all = select(Deal).where(Deal.status == "open")
-        all_deals = self.session.exec(statement_all).all()
-
-        for deal in all_deals:
-            pm_name = deal.owner_name or "Unknown"
-            if deal.update_time and deal.update_time >= week_ago:
-                pm_metrics[pm_name]["updated_this_week"] += 1
-            if deal.next_activity_date:
-                pm_metrics[pm_name]["has_next_activity"] += 1
-
-        # Build PM performance list
-        pm_performance = []
-        for pm_name, metrics in pm_metrics.items():
-            overdue_count = len(metrics["overdue_now"])
-            overdue_sar = sum(d.value for d in metrics["overdue_now"])
-            due_soon_count = len(metrics["due_soon"])
-            due_soon_sar = sum(d.value for d in metrics["due_soon"])
-
-            # Calculate average days overdue
-            if metrics["overdue_now"]:
-                avg_days = sum(
-                    (today - d.update_time).days for d in metrics["overdue_now"] if d.update_time
-                ) / len(metrics["overdue_now"])
-            else:
-                avg_days = 0.0
-
-            # Calculate risk score
-            no_activity_count = overdue_count - metrics["has_next_activity"]
-            risk_score = self._calculate_risk_score(
-                overdue_count, due_soon_count, max(0, no_activity_count)
+            overdue_now = and_(is_overdue, days_overdue >= 7)
+            # Overdue soon: next activity within the next 14 days
+            due_soon = and_(
+                DealFact.next_activity_date.is_not(None),
+                DealFact.next_activity_date >= today,
+                DealFact.next_activity_date <= today + timedelta(days=14),
             )
-
-            pm_performance.append(
-                PMOverduePerformance(
-                    pm_name=pm_name,
-                    overdue_now_count=overdue_count,
-                    overdue_now_sar=overdue_sar,
-                    due_soon_count=due_soon_count,
-                    due_soon_sar=due_soon_sar,
-                    avg_days_overdue=avg_days,
-                    updated_this_week_count=metrics["updated_this_week"],
-                    has_next_activity_count=metrics["has_next_activity"],
-                    risk_score=risk_score
+            updated_this_week = DealFact.update_time >= week_ago
+            has_next_activity = DealFact.next_activity_date.is_not(None)
+
+            # === PM PERFORMANCE (one grouped pass over open deals) ===
+
+            pm_name = _or_unknown(DealFact.owner_name)
+            overdue_count = _count_if(overdue_now)
+            soon_count = _count_if(due_soon)
+            updated_count = _count_if(updated_this_week)
+            next_activity_count = _count_if(has_next_activity)
+            first_overdue = func.min(case((overdue_now, DealFact.deal_id)))
+            first_soon = func.min(case((due_soon, DealFact.deal_id)))
+            first_other = func.min(case((or_(updated_this_week, has_next_activity), DealFact.deal_id)))
+            pm_rows = session.exec(
+                select(
+                    pm_name,
+                    overdue_count,
+                    _sar_if(overdue_now),
+                    func.sum(case((overdue_now, days_overdue))),
+                    soon_count,
+                    _sar_if(due_soon),
+                    updated_count,
+                    next_activity_count,
+                )
+                .where(DealFact.status == "open")
+                .group_by(pm_name)
+                .having(or_(overdue_count > 0, soon_count > 0, updated_count > 0, next_activity_count > 0))
+                .order_by(first_overdue.nulls_last(), first_soon.nulls_last(), first_other)
+            ).all()
+
+            if not any(row[1] for row in pm_rows):
+                # Return empty response
+                return OverdueSummaryResponse(
+                    snapshot=OverdueSnapshot(
+                        overdue_now_count=0,
+                        overdue_now_sar=0.0,
+                        overdue_soon_count=0,
+                        overdue_soon_sar=0.0,
+                        worst_overdue=[]
+                    ),
+                    pm_performance=[],
+                    intervention_list=[]
                 )
-            )
-
-        # Sort by risk score descending
-        pm_performance.sort(key=lambda x: x.risk_score, reverse=True)
-
-        # === CEO INTERVENTION LIST ===
 
-        intervention_list = []
-        for item in sorted_overdue[:10]:  # Top 10
-            deal = item["deal"]
+            pm_performance = []
+            for name, count, sar, days_total, soon, soon_sar, updated, with_activity in pm_rows:
+                avg_days = days_total / count if count else 0.0
+
+                # Calculate risk score
+                no_activity_count = count - with_activity
+                risk_score = self._calculate_risk_score(count, soon, max(0, no_activity_count))
+
+                pm_performance.append(
+                    PMOverduePerformance(
+                        pm_name=name,
+                        overdue_now_count=count,
+                        overdue_now_sar=sar,
+                        due_soon_count=soon,
+                        due_soon_sar=soon_sar,
+                        avg_days_overdue=avg_days,
+                        updated_this_week_count=updated,
+                        has_next_activity_count=with_activity,
+                        risk_score=risk_score
+                    )
+                )
 
-            # Get last note snippet
-            note_stmt = select(Note).where(Note.deal_id == deal.id).order_by(Note.add_time.desc()).limit(1)
-            notes = self.session.exec(note_stmt).all()
-            last_note = notes[0].content[:100] if notes else None
+            # Sort by risk score descending
+            pm_performance.sort(key=lambda x: x.risk_score, reverse=True)
+
+            # === TOP OVERDUE DEALS ===
+
+            top_overdue = session.exec(
+                select(*DEAL_ROW_COLUMNS, days_overdue.label("days"))
+                .where(DealFact.status == "open", is_overdue)
+                .order_by(days_overdue.desc(), DealFact.deal_id)
+                .limit(10)
+            ).all()
+
+            # === EXECUTIVE SNAPSHOT ===
+
+            worst_overdue = [
+                {
+                    "deal_id": deal.deal_id,
+                    "title": deal.title,
+                    "days": deal.days,
+                    "sar": deal.value
+                }
+                for deal in top_overdue[:5]
+            ]
+
+            snapshot = OverdueSnapshot(
+                overdue_now_count=sum(row[1] for row in pm_rows),
+                overdue_now_sar=sum(row[2] for row in pm_rows),
+                overdue_soon_count=sum(row[4] for row in pm_rows),
+                overdue_soon_sar=sum(row[5] for row in pm_rows),
+                worst_overdue=worst_overdue
+            )
 
-            # Get stage name
-            stage_stmt = select(Stage).where(Stage.id == deal.stage_id)
-            stage = self.session.exec(stage_stmt).first()
-            stage_name = stage.name if stage else "Unknown"
+            # === CEO INTERVENTION LIST ===
 
-            intervention_list.append(
+            intervention_list = [
                 CEOInterventionDeal(
-                    deal_id=deal.id,
+                    deal_id=deal.deal_id,
                     title=deal.title,
                     pm_name=deal.owner_name or "Unknown",
-                    stage=stage_name,
-                    overdue_by_days=item["days_overdue"],
-                    days_since_update=item["days_since_update"],
-                    last_note_snippet=last_note,
+                    stage=deal.stage_name or "Unknown",
+                    overdue_by_days=deal.days,
+                    days_since_update=deal.days,
+                    last_note_snippet=deal.last_note_snippet,
                     next_activity_date=deal.next_activity_date.isoformat() if deal.next_activity_date else None,
                     next_activity_exists=deal.next_activity_date is not None
                 )
-            )
+                for deal in top_overdue
+            ]
 
-        return OverdueSummaryResponse(
-            snapshot=snapshot,
-            pm_performance=pm_performance,
-            intervention_list=intervention_list
-        )
+            return OverdueSummaryResponse(
+                snapshot=snapshot,
+                pm_performance=pm_performance,
+                intervention_list=intervention_list
+            )
 
+    @cached_result("aramco.stuck_summary")
     def generate_stuck_summary(self, pipeline_name: str = "Aramco Projects") -> StuckSummaryResponse:
         """
         Generate stuck summary modal data.
@@ -257,221 +265,217 @@ class AramcoSummaryService:
         Calculates executive snapshot, PM stuck control metrics, worst stuck deals,
         and stage bottleneck analysis.
         """
-        today = datetime.now()
-        thirty_days_ago = today - timedelta(days=30)
-
-        # Get all stuck deals (days_in_stage > 30)
-        statement = select(Deal).where(
-            Deal.status == "open",
-            Deal.stage_id.in_(STUCK_STAGE_IDS),
-            Deal.stage_change_time.is_not(None),
-            Deal.stage_change_time < thirty_days_ago
-        )
-        stuck_deals = self.session.exec(statement).all()
-
-        if not stuck_deals:
-            return StuckSummaryResponse(
-                snapshot=StuckSnapshot(
-                    stuck_no_updates_count=0,
-                    stuck_no_updates_sar=0.0,
-                    bucket_30_45_count=0,
-                    bucket_30_45_sar=0.0,
-                    bucket_46_60_count=0,
-                    bucket_46_60_sar=0.0,
-                    bucket_60_plus_count=0,
-                    bucket_60_plus_sar=0.0,
-                    no_activity_count=0,
-                    oldest_stuck=[]
-                ),
-                pm_control=[],
-                worst_deals=[],
-                stage_bottlenecks=[],
-                top_bottleneck_stage="N/A"
+        with Session(db.read_engine) as session:
+            today = datetime.now()
+            thirty_days_ago = today - timedelta(days=30)
+
+            # Stuck deals: in a stuck stage for more than 30 days
+            is_stuck = and_(
+                DealFact.status == "open",
+                DealFact.stage_id.in_(STUCK_STAGE_IDS),
+                DealFact.stage_change_time.is_not(None),
+                DealFact.stage_change_time < thirty_days_ago,
             )
+            days_in_stage = _days_since(DealFact.stage_change_time, today)
+            days_since_update = case(
+                (DealFact.update_time.is_(None), 0),
+                else_=_days_since(DealFact.update_time, today),
+            )
+            no_activity = DealFact.next_activity_date.is_(None)
+
+            # === EXECUTIVE SNAPSHOT ===
+
+            bucket_30_45 = and_(days_in_stage >= 30, days_in_stage < 46)
+            bucket_46_60 = and_(days_in_stage >= 46, days_in_stage < 61)
+            bucket_60_plus = days_in_stage >= 61
+            no_updates = days_since_update > 30
+            totals = session.exec(
+                select(
+                    func.count(),
+                    _count_if(no_updates), _sar_if(no_updates),
+                    _count_if(bucket_30_45), _sar_if(bucket_30_45),
+                    _count_if(bucket_46_60), _sar_if(bucket_46_60),
+                    _count_if(bucket_60_plus), _sar_if(bucket_60_plus),
+                    _count_if(no_activity),
+                ).where(is_stuck)
+            ).one()
+
+            if not totals[0]:
+                return StuckSummaryResponse(
+                    snapshot=StuckSnapshot(
+                        stuck_no_updates_count=0,
+                        stuck_no_updates_sar=0.0,
+                        bucket_30_45_count=0,
+                        bucket_30_45_sar=0.0,
+                        bucket_46_60_count=0,
+                        bucket_46_60_sar=0.0,
+                        bucket_60_plus_count=0,
+                        bucket_60_plus_sar=0.0,
+                        no_activity_count=0,
+                        oldest_stuck=[]
+                    ),
+                    pm_control=[],
+                    worst_deals=[],
+                    stage_bottlenecks=[],
+                    top_bottleneck_stage="N/A"
+                )
 
-        # Calculate days in stage
-        deals_with_metrics = []
-        for deal in stuck_deals:
-            if deal.stage_change_time:
-                days_in_stage = (today - deal.stage_change_time).days
-                days_since_update = (today - deal.update_time).days if deal.update_time else 0
-                deals_with_metrics.append({
-                    "deal": deal,
-                    "days_in_stage": days_in_stage,
-                    "days_since_update": days_since_update,
-                })
-
-        # === EXECUTIVE SNAPSHOT ===
-
-        # Stuck >30d & no updates in last 30 days
-        no_updates = [d for d in deals_with_metrics if d["days_since_update"] > 30]
-        stuck_no_updates_count = len(no_updates)
-        stuck_no_updates_sar = sum(d["deal"].value for d in no_updates)
-
-        # Severity buckets
-        bucket_30_45 = [d for d in deals_with_metrics if 30 <= d["days_in_stage"] < 46]
-        bucket_46_60 = [d for d in deals_with_metrics if 46 <= d["days_in_stage"] < 61]
-        bucket_60_plus = [d for d in deals_with_metrics if d["days_in_stage"] >= 61]
-
-        # No next activity
-        no_activity = [d for d in deals_with_metrics if d["deal"].next_activity_date is None]
-
-        # Oldest stuck (top 5)
-        sorted_stuck = sorted(deals_with_metrics, key=lambda x: x["days_in_stage"], reverse=True)
-        oldest_stuck = [
-            {
-                "deal_id": d["deal"].id,
-                "title": d["deal"].title,
-                "days_in_stage": d["days_in_stage"],
-                "sar": d["deal"].value
-            }
-            for d in sorted_stuck[:5]
-        ]
-
-        snapshot = StuckSnapshot(
-            stuck_no_updates_count=stuck_no_updates_count,
-            stuck_no_updates_sar=stuck_no_updates_sar,
-            bucket_30_45_count=len(bucket_30_45),
-            bucket_30_45_sar=sum(d["deal"].value for d in bucket_30_45),
-            bucket_46_60_count=len(bucket_46_60),
-            bucket_46_60_sar=sum(d["deal"].value for d in bucket_46_60),
-            bucket_60_plus_count=len(bucket_60_plus),
-            bucket_60_plus_sar=sum(d["deal"].value for d in bucket_60_plus),
-            no_activity_count=len(no_activity),
-            oldest_stuck=oldest_stuck
-        )
-
-        # === PM STUCK CONTROL TABLE ===
-
-        pm_metrics = defaultdict(lambda: {"deals": [], "no_activity_sar": 0.0})
-
-        for item in deals_with_metrics:
-            deal = item["deal"]
-            pm_name = deal.owner_name or "Unknown"
-            pm_metrics[pm_name]["deals"].append(item)
-            if deal.next_activity_date is None:
-                pm_metrics[pm_name]["no_activity_sar"] += deal.value
-
-        pm_control = []
-        for pm_name, metrics in pm_metrics.items():
-            stuck_count = len(metrics["deals"])
-            stuck_sar = sum(d["deal"].value for d in metrics["deals"])
-            avg_days = sum(d["days_in_stage"] for d in metrics["deals"]) / stuck_count if stuck_count > 0 else 0.0
-            days_since_update_list = [d["days_since_update"] for d in metrics["deals"]]
-            median_days_update = median(days_since_update_list) if days_since_update_list else 0.0
-
-            # Calculate recovery rate using stage history
-            # Get all stage IDs where this PM has stuck deals
-            stuck_stage_ids = list({d["deal"].stage_id for d in metrics["deals"]})
-            recovery_rate = self._calculate_recovery_rate_30d(pm_name, stuck_stage_ids)
-
-            pm_control.append(
-                PMStuckControl(
-                    pm_name=pm_name,
-                    stuck_count=stuck_count,
-                    stuck_sar=stuck_sar,
-                    stuck_no_activity_sar=metrics["no_activity_sar"],
-                    avg_days_in_stage=avg_days,
-                    median_days_since_update=median_days_update,
-                    recovery_rate_30d=recovery_rate
+            worst = session.exec(
+                select(
+                    *DEAL_ROW_COLUMNS,
+                    days_in_stage.label("days_in_stage"),
+                    days_since_update.label("days_since_update"),
                 )
+                .where(is_stuck)
+                .order_by(days_in_stage.desc(), DealFact.deal_id)
+                .limit(10)
+            ).all()
+
+            # Oldest stuck (top 5)
+            oldest_stuck = [
+                {
+                    "deal_id": deal.deal_id,
+                    "title": deal.title,
+                    "days_in_stage": deal.days_in_stage,
+                    "sar": deal.value
+                }
+                for deal in worst[:5]
+            ]
+
+            snapshot = StuckSnapshot(
+                stuck_no_updates_count=totals[1],
+                stuck_no_updates_sar=totals[2],
+                bucket_30_45_count=totals[3],
+                bucket_30_45_sar=totals[4],
+                bucket_46_60_count=totals[5],
+                bucket_46_60_sar=totals[6],
+                bucket_60_plus_count=totals[7],
+                bucket_60_plus_sar=totals[8],
+                no_activity_count=totals[9],
+                oldest_stuck=oldest_stuck
             )
 
-        # Sort by SAR descending
-        pm_control.sort(key=lambda x: x.stuck_sar, reverse=True)
-
-        # === WORST STUCK DEALS LIST ===
-
-        worst_deals = []
-        for item in sorted_stuck[:10]:
-            deal = item["deal"]
-
-            # Get last note
-            note_stmt = select(Note).where(Note.deal_id == deal.id).order_by(Note.add_time.desc()).limit(1)
-            notes = self.session.exec(note_stmt).all()
-            last_note = notes[0].content[:100] if notes else None
-
-            # Get stage name
-            stage_stmt = select(Stage).where(Stage.id == deal.stage_id)
-            stage = self.session.exec(stage_stmt).first()
-            stage_name = stage.name if stage else "Unknown"
-
-            # Get recent notes for LLM analysis
-            recent_notes_stmt = select(Note).where(Note.deal_id == deal.id).order_by(Note.add_time.desc()).limit(5)
-            recent_notes = self.session.exec(recent_notes_stmt).all()
-            notes_content = [note.content for note in recent_notes if note.content]
-
-            # Use WriterService to analyze deal and generate insights
-            blocking_flag = None
-            suggested_next_step = None
-            try:
-                summary_result = self._analyze_stuck_deal_async(
-                    deal_id=deal.id,
-                    deal_title=deal.title,
-                    stage=stage_name,
-                    owner_name=deal.owner_name or "Unknown",
-                    days_in_stage=item["days_in_stage"],
-                    notes=notes_content
-                )
-                if summary_result:
-                    # Extract blockers as blocking_flag
-                    if summary_result.blockers:
-                        blocking_flag = summary_result.blockers[0]  # Primary blocker
-                    # Use next_action as suggested_next_step
-                    suggested_next_step = summary_result.next_action
-            except Exception as e:
-                logger.warning(f"Failed to analyze stuck deal {deal.id} with LLM: {e}")
-                # Continue without LLM insights
-
-            worst_deals.append(
-                WorstStuckDeal(
-                    deal_id=deal.id,
-                    title=deal.title,
-                    pm_name=deal.owner_name or "Unknown",
-                    stage=stage_name,
-                    days_in_stage=item["days_in_stage"],
-                    last_update_age=item["days_since_update"],
-                    last_note_snippet=last_note,
-                    blocking_flag=blocking_flag,
-                    suggested_next_step=suggested_next_step
+            # === PM STUCK CONTROL TABLE ===
+
+            # Rank each PM's deals by days since update to pick the median row(s)
+            pm_name = _or_unknown(DealFact.owner_name)
+            ranked = (
+                select(
+                    DealFact.deal_id,
+                    pm_name.label("pm_name"),
+                    DealFact.value,
+                    no_activity.label("no_activity"),
+                    days_in_stage.label("days_in_stage"),
+                    days_since_update.label("days_since_update"),
+                    func.row_number().over(partition_by=pm_name, order_by=days_since_update).label("rn"),
+                    func.count().over(partition_by=pm_name).label("n"),
                 )
+                .where(is_stuck)
+                .subquery()
             )
+            is_median_row = ranked.c.rn.in_([(ranked.c.n + 1) // 2, (ranked.c.n + 2) // 2])
+            pm_rows = session.exec(
+                select(
+                    ranked.c.pm_name,
+                    func.count(),
+                    func.sum(ranked.c.value),
+                    func.sum(case((ranked.c.no_activity, ranked.c.value), else_=0.0)),
+                    func.sum(ranked.c.days_in_stage),
+                    func.avg(case((is_median_row, ranked.c.days_since_update))),
+                )
+                .group_by(ranked.c.pm_name)
+                .order_by(func.min(ranked.c.deal_id))
+            ).all()
 
-        # === STAGE BOTTLENECK VIEW ===
-
-        stage_metrics = defaultdict(lambda: {"count": 0, "sar": 0.0})
+            recovery_rates = self._recovery_rates_30d(session, is_stuck, thirty_days_ago)
 
-        for item in deals_with_metrics:
-            deal = item["deal"]
-            stage_stmt = select(Stage).where(Stage.id == deal.stage_id)
-            stage = self.session.exec(stage_stmt).first()
-            stage_name = stage.name if stage else "Unknown"
+            pm_control = [
+                PMStuckControl(
+                    pm_name=name,
+                    stuck_count=count,
+                    stuck_sar=sar,
+                    stuck_no_activity_sar=no_activity_sar,
+                    avg_days_in_stage=days_total / count,
+                    median_days_since_update=median_days,
+                    recovery_rate_30d=recovery_rates.get(name)
+                )
+                for name, count, sar, no_activity_sar, days_total, median_days in pm_rows
+            ]
+
+            # Sort by SAR descending
+            pm_control.sort(key=lambda x: x.stuck_sar, reverse=True)
+
+            # === WORST STUCK DEALS LIST ===
+
+            recent_notes = self._recent_notes(session, [deal.deal_id for deal in worst], STUCK_NOTES_LIMIT)
+
+            worst_deals = []
+            for deal in worst:
+                stage_name = deal.stage_name or "Unknown"
+
+                # Use WriterService to analyze deal and generate insights
+                blocking_flag = None
+                suggested_next_step = None
+                try:
+                    summary_result = self._analyze_stuck_deal_async(
+                        deal_id=deal.deal_id,
+                        deal_title=deal.title,
+                        stage=stage_name,
+                        owner_name=deal.owner_name or "Unknown",
+                        days_in_stage=deal.days_in_stage,
+                        notes=recent_notes.get(deal.deal_id, [])
+                    )
+                    if summary_result:
+                        # Extract blockers as blocking_flag
+                        if summary_result.blockers:
+                            blocking_flag = summary_result.blockers[0]  # Primary blocker
+                        # Use next_action as suggested_next_step
+                        suggested_next_step = summary_result.next_action
+                except Exception as e:
+                    logger.warning(f"Failed to analyze stuck deal {deal.deal_id} with LLM: {e}")
+                    # Continue without LLM insights
+
+                worst_deals.append(
+                    WorstStuckDeal(
+                        deal_id=deal.deal_id,
+                        title=deal.title,
+                        pm_name=deal.owner_name or "Unknown",
+                        stage=stage_name,
+                        days_in_stage=deal.days_in_stage,
+                        last_update_age=deal.days_since_update,
+                        last_note_snippet=deal.last_note_snippet,
+                        blocking_flag=blocking_flag,
+                        suggested_next_step=suggested_next_step
+                    )
+                )
 
-            stage_metrics[stage_name]["count"] += 1
-            stage_metrics[stage_name]["sar"] += deal.value
+            # === STAGE BOTTLENECK VIEW ===
 
-        stage_bottlenecks = [
-            StageBottleneck(
-                stage_name=stage_name,
-                stuck_count=metrics["count"],
-                stuck_sar=metrics["sar"]
-            )
-            for stage_name, metrics in stage_metrics.items()
-        ]
+            stage_name = _or_unknown(DealFact.stage_name)
+            stage_bottlenecks = [
+                StageBottleneck(stage_name=name, stuck_count=count, stuck_sar=sar)
+                for name, count, sar in session.exec(
+                    select(stage_name, func.count(), func.sum(DealFact.value))
+                    .where(is_stuck)
+                    .group_by(stage_name)
+                    .order_by(func.min(DealFact.deal_id))
+                ).all()
+            ]
 
-        # Sort by SAR descending
-        stage_bottlenecks.sort(key=lambda x: x.stuck_sar, reverse=True)
+            # Sort by SAR descending
+            stage_bottlenecks.sort(key=lambda x: x.stuck_sar, reverse=True)
 
-        top_bottleneck_stage = stage_bottlenecks[0].stage_name if stage_bottlenecks else "N/A"
+            top_bottleneck_stage = stage_bottlenecks[0].stage_name if stage_bottlenecks else "N/A"
 
-        return StuckSummaryResponse(
-            snapshot=snapshot,
-            pm_control=pm_control,
-            worst_deals=worst_deals,
-            stage_bottlenecks=stage_bottlenecks,
-            top_bottleneck_stage=top_bottleneck_stage
-        )
+            return StuckSummaryResponse(
+                snapshot=snapshot,
+                pm_control=pm_control,
+                worst_deals=worst_deals,
+                stage_bottlenecks=stage_bottlenecks,
+                top_bottleneck_stage=top_bottleneck_stage
+            )
 
+    @cached_result("aramco.order_received_summary")
     def generate_order_received_summary(self, pipeline_name: str = "Aramco Projects") -> OrderReceivedSummaryResponse:
         """
         Generate Order Received summary modal data.
@@ -479,190 +483,180 @@ class AramcoSummaryService:
         Calculates executive snapshot, PM pipeline acceleration metrics,
         blockers checklist, and fast wins opportunities.
         """
-        today = datetime.now()
-
-        # Get all Order Received deals
-        statement = select(Deal).where(
-            Deal.status == "open",
-            Deal.stage_id.in_(ORDER_RECEIVED_STAGE_IDS)
-        )
-        order_deals = self.session.exec(statement).all()
+        with Session(db.read_engine) as session:
+            today = datetime.now()
 
-        if not order_deals:
-            return OrderReceivedSummaryResponse(
-                snapshot=OrderReceivedSnapshot(
-                    open_count=0,
-                    open_sar=0.0,
-                    bucket_0_7_count=0,
-                    bucket_0_7_sar=0.0,
-                    bucket_8_14_count=0,
-                    bucket_8_14_sar=0.0,
-                    bucket_15_30_count=0,
-                    bucket_15_30_sar=0.0,
-                    bucket_30_plus_count=0,
-                    bucket_30_plus_sar=0.0,
-                    oldest_deal={},
-                    conversion_rate_30d=None
-                ),
-                pm_acceleration=[],
-                blockers_checklist=BlockersChecklistSummary(
-                    missing_end_user_count=0,
-                    missing_next_activity_count=0
-                ),
-                fast_wins=[]
+            is_order_received = and_(
+                DealFact.status == "open",
+                DealFact.stage_id.in_(ORDER_RECEIVED_STAGE_IDS),
             )
-
-        # Calculate age (days_in_stage)
-        deals_with_metrics = []
-        for deal in order_deals:
-            if deal.stage_change_time:
-                age_days = (today - deal.stage_change_time).days
-            else:
-                age_days = 0
-
-            # Extract custom fields
-            has_end_user = self._extract_custom_field(deal, END_USER_FIELD_KEY) is not None
-
-            deals_with_metrics.append({
-                "deal": deal,
-                "age_days": age_days,
-                "has_end_user": has_end_user,
-            })
-
-        # === EXECUTIVE SNAPSHOT ===
-
-        open_count = len(order_deals)
-        open_sar = sum(d.value for d in order_deals)
-
-        # Aging buckets
-        bucket_0_7 = [d for d in deals_with_metrics if 0 <= d["age_days"] <= 7]
-        bucket_8_14 = [d for d in deals_with_metrics if 8 <= d["age_days"] <= 14]
-        bucket_15_30 = [d for d in deals_with_metrics if 15 <= d["age_days"] <= 30]
-        bucket_30_plus = [d for d in deals_with_metrics if d["age_days"] > 30]
-
-        # Oldest deal
-        sorted_by_age = sorted(deals_with_metrics, key=lambda x: x["age_days"], reverse=True)
-        oldest_deal = {
-            "deal_id": sorted_by_age[0]["deal"].id,
-            "title": sorted_by_age[0]["deal"].title,
-            "age_days": sorted_by_age[0]["age_days"]
-        } if sorted_by_age else {}
-
-        # Calculate conversion rate: Order Received -> Approved
-        # Stage 28 = Approved (from ORDER_RECEIVED_STAGE_IDS)
-        approved_stage_id = 28
-        conversion_rate = self._calculate_conversion_rate_30d(ORDER_RECEIVED_STAGE_IDS, approved_stage_id)
-
-        snapshot = OrderReceivedSnapshot(
-            open_count=open_count,
-            open_sar=open_sar,
-            bucket_0_7_count=len(bucket_0_7),
-            bucket_0_7_sar=sum(d["deal"].value for d in bucket_0_7),
-            bucket_8_14_count=len(bucket_8_14),
-            bucket_8_14_sar=sum(d["deal"].value for d in bucket_8_14),
-            bucket_15_30_count=len(bucket_15_30),
-            bucket_15_30_sar=sum(d["deal"].value for d in bucket_15_30),
-            bucket_30_plus_count=len(bucket_30_plus),
-            bucket_30_plus_sar=sum(d["deal"].value for d in bucket_30_plus),
-            oldest_deal=oldest_deal,
-            conversion_rate_30d=conversion_rate
-        )
-
-        # === PM PIPELINE ACCELERATION TABLE ===
-
-        pm_metrics = defaultdict(lambda: {"deals": []})
-
-        for item in deals_with_metrics:
-            deal = item["deal"]
-            pm_name = deal.owner_name or "Unknown"
-            pm_metrics[pm_name]["deals"].append(item)
-
-        pm_acceleration = []
-        for pm_name, metrics in pm_metrics.items():
-            deals = metrics["deals"]
-            open_count = len(deals)
-            open_sar = sum(d["deal"].value for d in deals)
-            avg_age = sum(d["age_days"] for d in deals) / open_count if open_count > 0 else 0.0
-
-            # % with end-user identified
-            has_end_user_count = sum(1 for d in deals if d["has_end_user"])
-            pct_end_user = (has_end_user_count / open_count * 100) if open_count > 0 else 0.0
-
-            # % with next activity
-            has_activity_count = sum(1 for d in deals if d["deal"].next_activity_date is not None)
-            pct_next_activity = (has_activity_count / open_count * 100) if open_count > 0 else 0.0
-
-            # Get approved deals in last 30 days
-            approved_count, approved_sar = self._get_approved_deals_30d(pm_name, approved_stage_id)
-
-            pm_acceleration.append(
-                PMPipelineAcceleration(
-                    pm_name=pm_name,
-                    open_count=open_count,
-                    open_sar=open_sar,
-                    avg_age_days=avg_age,
-                    pct_end_user_identified=pct_end_user,
-                    pct_next_activity_scheduled=pct_next_activity,
-                    approved_30d_count=approved_count,
-                    approved_30d_sar=approved_sar
-                )
+            # Age (days in stage), 0 when the stage change time is unknown
+            age_days = case(
+                (DealFact.stage_change_time.is_(None), 0),
+                else_=_days_since(DealFact.stage_change_time, today),
             )
+            # End user custom field, extracted when the fact row was built
+            has_end_user = DealFact.end_user.is_not(None)
+            has_next_activity = DealFact.next_activity_date.is_not(None)
+
+            # === EXECUTIVE SNAPSHOT ===
+
+            bucket_0_7 = and_(age_days >= 0, age_days <= 7)
+            bucket_8_14 = and_(age_days >= 8, age_days <= 14)
+            bucket_15_30 = and_(age_days >= 15, age_days <= 30)
+            bucket_30_plus = age_days > 30
+            totals = session.exec(
+                select(
+                    func.count(),
+                    func.sum(DealFact.value),
+                    _count_if(bucket_0_7), _sar_if(bucket_0_7),
+                    _count_if(bucket_8_14), _sar_if(bucket_8_14),
+                    _count_if(bucket_15_30), _sar_if(bucket_15_30),
+                    _count_if(bucket_30_plus), _sar_if(bucket_30_plus),
+                    _count_if(~has_end_user),
+                    _count_if(~has_next_activity),
+                ).where(is_order_received)
+            ).one()
+
+            if not totals[0]:
+                return OrderReceivedSummaryResponse(
+                    snapshot=OrderReceivedSnapshot(
+                        open_count=0,
+                        open_sar=0.0,
+                        bucket_0_7_count=0,
+                        bucket_0_7_sar=0.0,
+                        bucket_8_14_count=0,
+                        bucket_8_14_sar=0.0,
+                        bucket_15_30_count=0,
+                        bucket_15_30_sar=0.0,
+                        bucket_30_plus_count=0,
+                        bucket_30_plus_sar=0.0,
+                        oldest_deal={},
+                        conversion_rate_30d=None
+                    ),
+                    pm_acceleration=[],
+                    blockers_checklist=BlockersChecklistSummary(
+                        missing_end_user_count=0,
+                        missing_next_activity_count=0
+                    ),
+                    fast_wins=[]
+                )
 
-        # === BLOCKERS CHECKLIST ===
-
-        missing_end_user_count = sum(1 for d in deals_with_metrics if not d["has_end_user"])
-        missing_next_activity_count = sum(1 for d in order_deals if d.next_activity_date is None)
+            # Oldest deal
+            oldest_id, oldest_title, oldest_age = session.exec(
+                select(DealFact.deal_id, DealFact.title, age_days)
+                .where(is_order_received)
+                .order_by(age_days.desc(), DealFact.deal_id)
+                .limit(1)
+            ).one()
+            oldest_deal = {"deal_id": oldest_id, "title": oldest_title, "age_days": oldest_age}
+
+            # Calculate conversion rate: Order Received -> Approved
+            conversion_rate = self._calculate_conversion_rate_30d(session, ORDER_RECEIVED_STAGE_IDS, APPROVED_STAGE_ID)
+
+            snapshot = OrderReceivedSnapshot(
+                open_count=totals[0],
+                open_sar=totals[1],
+                bucket_0_7_count=totals[2],
+                bucket_0_7_sar=totals[3],
+                bucket_8_14_count=totals[4],
+                bucket_8_14_sar=totals[5],
+                bucket_15_30_count=totals[6],
+                bucket_15_30_sar=totals[7],
+                bucket_30_plus_count=totals[8],
+                bucket_30_plus_sar=totals[9],
+                oldest_deal=oldest_deal,
+                conversion_rate_30d=conversion_rate
+            )
 
-        blockers_checklist = BlockersChecklistSummary(
-            missing_end_user_count=missing_end_user_count,
-            missing_site_contact_count=None,  # TODO: field key unknown
-            missing_po_count=None,  # TODO
-            missing_dates_count=None,  # TODO
-            missing_product_type_count=None,  # TODO
-            missing_quantity_count=None,  # TODO
-            missing_next_activity_count=missing_next_activity_count
-        )
+            # === PM PIPELINE ACCELERATION TABLE ===
+
+            pm_name = _or_unknown(DealFact.owner_name)
+            pm_rows = session.exec(
+                select(
+                    pm_name,
+                    func.count(),
+                    func.sum(DealFact.value),
+                    func.sum(age_days),
+                    _count_if(has_end_user),
+                    _count_if(has_next_activity),
+                )
+                .where(is_order_received)
+                .group_by(pm_name)
+                .order_by(func.min(DealFact.deal_id))
+            ).all()
+
+            # Deals moved to Approved in the last 30 days, per PM
+            approved = self._approved_deals_30d(session, [row[0] for row in pm_rows], APPROVED_STAGE_ID)
+
+            pm_acceleration = []
+            for name, open_count, open_sar, age_total, end_user_count, activity_count in pm_rows:
+                approved_count, approved_sar = approved.get(name, (0, 0.0))
+                pm_acceleration.append(
+                    PMPipelineAcceleration(
+                        pm_name=name,
+                        open_count=open_count,
+                        open_sar=open_sar,
+                        avg_age_days=age_total / open_count,
+                        pct_end_user_identified=end_user_count / open_count * 100,
+                        pct_next_activity_scheduled=activity_count / open_count * 100,
+                        approved_30d_count=approved_count,
+                        approved_30d_sar=approved_sar
+                    )
+                )
 
-        # === FAST WINS LIST ===
+            # === BLOCKERS CHECKLIST ===
 
-        # Deals missing only 1-2 items, high value (>50K) OR old (>15 days)
-        fast_wins = []
-        for item in deals_with_metrics:
-            deal = item["deal"]
-            missing_items = []
+            blockers_checklist = BlockersChecklistSummary(
+                missing_end_user_count=totals[10],
+                missing_site_contact_count=None,  # TODO: field key unknown
+                missing_po_count=None,  # TODO
+                missing_dates_count=None,  # TODO
+                missing_product_type_count=None,  # TODO
+                missing_quantity_count=None,  # TODO
+                missing_next_activity_count=totals[11]
+            )
 
-            if not item["has_end_user"]:
-                missing_items.append("End user")
-            if deal.next_activity_date is None:
-                missing_items.append("Next activity")
+            # === FAST WINS LIST ===
 
-            # Check if qualifies as fast win
-            missing_count = len(missing_items)
-            if 1 <= missing_count <= 2 and (deal.value > 50000 or item["age_days"] > 15):
-                suggested_action = f"Add {', '.join(missing_items).lower()} to unlock deal"
+            # Deals missing only 1-2 items, high value (>50K) OR old (>15 days)
+            fast_win_rows = session.exec(
+                select(*DEAL_ROW_COLUMNS, age_days.label("age_days"))
+                .where(
+                    is_order_received,
+                    or_(~has_end_user, ~has_next_activity),
+                    or_(DealFact.value > 50000, age_days > 15),
+                )
+                .order_by(DealFact.value.desc(), DealFact.deal_id)
+                .limit(10)
+            ).all()
+
+            fast_wins = []
+            for deal in fast_win_rows:
+                missing_items = []
+                if deal.end_user is None:
+                    missing_items.append("End user")
+                if deal.next_activity_date is None:
+                    missing_items.append("Next activity")
 
                 fast_wins.append(
                     FastWinDeal(
-                        deal_id=deal.id,
+                        deal_id=deal.deal_id,
                         title=deal.title,
                         pm_name=deal.owner_name or "Unknown",
                         value_sar=deal.value,
-                        age_days=item["age_days"],
+                        age_days=deal.age_days,
                         missing_items=missing_items,
-                        suggested_action=suggested_action
+                        suggested_action=f"Add {', '.join(missing_items).lower()} to unlock deal"
                     )
                 )
 
-        # Sort by value descending, limit to 10
-        fast_wins.sort(key=lambda x: x.value_sar, reverse=True)
-        fast_wins = fast_wins[:10]
-
-        return OrderReceivedSummaryResponse(
-            snapshot=snapshot,
-            pm_acceleration=pm_acceleration,
-            blockers_checklist=blockers_checklist,
-            fast_wins=fast_wins
-        )
+            return OrderReceivedSummaryResponse(
+                snapshot=snapshot,
+                pm_acceleration=pm_acceleration,
+                blockers_checklist=blockers_checklist,
+                fast_wins=fast_wins
+            )
 
     # === LLM-POWERED ANALYSIS METHODS ===
 
@@ -715,43 +709,41 @@ class AramcoSummaryService:
 
     # === HELPER METHODS ===
 
-    def _calculate_recovery_rate_30d(self, pm_name: str, current_stage_ids: list[int]) -> Optional[float]:
+    def _recovery_rates_30d(self, session: Session, is_stuck, thirty_days_ago: datetime) -> dict[str, Optional[float]]:
         """
-        Calculate recovery rate: % of deals that moved OUT of stuck stages in last 30 days.
+        Calculate recovery rate per PM: % of deals that moved OUT of their stuck stages in last 30 days.
 
-        Recovery rate = (deals that left stage in last 30d) / (deals that were in stage 30d ago) * 100
+        Recovery rate = (deals that left stage in last 30d) / (deals that were in stage 30d ago) * 100,
+        over the stages where the PM currently has stuck deals.
         """
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-
-        # Find deals that LEFT the current stuck stages in the last 30 days
-        # These are spans where left_at is within last 30 days and stage_id matches
-        statement = select(DealStageSpan).join(Deal).where(
-            DealStageSpan.stage_id.in_(current_stage_ids),
-            DealStageSpan.left_at.is_not(None),
-            DealStageSpan.left_at >= thirty_days_ago,
-            Deal.owner_name == pm_name
+        # (PM, stage) pairs where the PM has stuck deals
+        stuck_stages = (
+            select(_or_unknown(DealFact.owner_name).label("pm_name"), DealFact.stage_id)
+            .where(is_stuck)
+            .distinct()
+            .subquery()
         )
-        recovered_spans = self.session.exec(statement).all()
-        recovered_count = len(recovered_spans)
-
-        # Find deals that were in these stages 30 days ago
-        # These are spans where entered_at <= 30d ago and (left_at is None OR left_at >= 30d ago)
-        statement_total = select(DealStageSpan).join(Deal).where(
-            DealStageSpan.stage_id.in_(current_stage_ids),
+        left_recently = and_(DealStageSpan.left_at.is_not(None), DealStageSpan.left_at >= thirty_days_ago)
+        in_stage_30d_ago = and_(
             DealStageSpan.entered_at <= thirty_days_ago,
-            Deal.owner_name == pm_name
-        ).where(
-            (DealStageSpan.left_at.is_(None)) | (DealStageSpan.left_at >= thirty_days_ago)
+            or_(DealStageSpan.left_at.is_(None), DealStageSpan.left_at >= thirty_days_ago),
         )
-        total_spans = self.session.exec(statement_total).all()
-        total_count = len(total_spans)
-
-        if total_count == 0:
-            return None
-
-        return (recovered_count / total_count) * 100
-
-    def _calculate_conversion_rate_30d(self, from_stage_ids: list[int], to_stage_id: int) -> Optional[float]:
+        rows = session.exec(
+            select(stuck_stages.c.pm_name, _count_if(left_recently), _count_if(in_stage_30d_ago))
+            .select_from(DealStageSpan)
+            .join(Deal, Deal.id == DealStageSpan.deal_id)
+            .join(stuck_stages, and_(
+                stuck_stages.c.pm_name == Deal.owner_name,
+                stuck_stages.c.stage_id == DealStageSpan.stage_id,
+            ))
+            .group_by(stuck_stages.c.pm_name)
+        ).all()
+        return {
+            pm_name: (recovered / total) * 100 if total else None
+            for pm_name, recovered, total in rows
+        }
+
+    def _calculate_conversion_rate_30d(self, session: Session, from_stage_ids: list[int], to_stage_id: int) -> Optional[float]:
         """
         Calculate conversion rate: % of deals that moved from Order Received stages to Approved in last 30 days.
 
@@ -759,77 +751,75 @@ class AramcoSummaryService:
         """
         thirty_days_ago = datetime.now() - timedelta(days=30)
 
-        # Find spans where deal moved TO the approved stage in last 30 days
-        # These are spans where stage_id = to_stage_id and entered_at is within last 30 days
-        # AND the previous stage was one of the from_stage_ids
-        statement_converted = select(DealStageSpan).where(
+        # Converted: entered the approved stage in the last 30 days from one of from_stage_ids
+        converted = and_(
             DealStageSpan.stage_id == to_stage_id,
             DealStageSpan.entered_at >= thirty_days_ago,
-            DealStageSpan.from_stage_id.in_(from_stage_ids)
+            DealStageSpan.from_stage_id.in_(from_stage_ids),
         )
-        converted_spans = self.session.exec(statement_converted).all()
-        converted_count = len(converted_spans)
-
-        # Find deals that were in from_stage_ids 30 days ago
-        statement_total = select(DealStageSpan).where(
+        # Total: in one of from_stage_ids 30 days ago
+        in_stage_30d_ago = and_(
             DealStageSpan.stage_id.in_(from_stage_ids),
-            DealStageSpan.entered_at <= thirty_days_ago
-        ).where(
-            (DealStageSpan.left_at.is_(None)) | (DealStageSpan.left_at >= thirty_days_ago)
+            DealStageSpan.entered_at <= thirty_days_ago,
+            or_(DealStageSpan.left_at.is_(None), DealStageSpan.left_at >= thirty_days_ago),
         )
-        total_spans = self.session.exec(statement_total).all()
-        total_count = len(total_spans)
+        converted_count, total_count = session.exec(
+            select(_count_if(converted), _count_if(in_stage_30d_ago))
+            .where(or_(converted, in_stage_30d_ago))
+        ).one()
 
         if total_count == 0:
             return None
 
         return (converted_count / total_count) * 100
 
-    def _get_approved_deals_30d(self, pm_name: str, approved_stage_id: int = 28) -> tuple[int, float]:
+    def _approved_deals_30d(self, session: Session, pm_names: list[str], approved_stage_id: int = APPROVED_STAGE_ID) -> dict[str, tuple[int, float]]:
         """
-        Get count and SAR of deals that moved to Approved stage in last 30 days for a specific PM.
+        Get count and SAR of deals that moved to Approved stage in last 30 days, per PM.
 
-        Returns: (count, total_sar)
+        Returns: {pm_name: (count, total_sar)} for PMs with approved deals
         """
         thirty_days_ago = datetime.now() - timedelta(days=30)
 
-        # Find spans where deal entered Approved stage in last 30 days
-        statement = select(DealStageSpan).join(Deal).where(
+        approved_deal_ids = select(DealStageSpan.deal_id).where(
             DealStageSpan.stage_id == approved_stage_id,
             DealStageSpan.entered_at >= thirty_days_ago,
-            Deal.owner_name == pm_name
         )
-        approved_spans = self.session.exec(statement).all()
-
-        # Get unique deals and their values
-        deal_ids = {span.deal_id for span in approved_spans}
-
-        if not deal_ids:
-            return (0, 0.0)
-
-        # Get deal values
-        statement_deals = select(Deal).where(Deal.id.in_(deal_ids))
-        deals = self.session.exec(statement_deals).all()
-
-        count = len(deals)
-        total_sar = sum(deal.value for deal in deals)
-
-        return (count, total_sar)
+        rows = session.exec(
+            select(Deal.owner_name, func.count(Deal.id), func.coalesce(func.sum(Deal.value), 0.0))
+            .where(Deal.id.in_(approved_deal_ids), Deal.owner_name.in_(pm_names))
+            .group_by(Deal.owner_name)
+        ).all()
+        return {pm_name: (count, total_sar) for pm_name, count, total_sar in rows}
+
+    def _recent_notes(self, session: Session, deal_ids: list[int], limit: int) -> dict[int, list[str]]:
+        """Latest non-empty note contents per deal, newest first, in one ranked query."""
+        ranked = (
+            select(
+                Note.deal_id,
+                Note.content,
+                func.row_number().over(
+                    partition_by=Note.deal_id,
+                    order_by=(Note.add_time.desc(), Note.id.desc()),
+                ).label("rn"),
+            )
+            .where(Note.deal_id.in_(deal_ids))
+            .subquery()
+        )
+        notes: dict[int, list[str]] = {}
+        for deal_id, content in session.exec(
+            select(ranked.c.deal_id, ranked.c.content)
+            .where(ranked.c.rn <= limit)
+            .order_by(ranked.c.deal_id, ranked.c.rn)
+        ).all():
+            if content:
+                notes.setdefault(deal_id, []).append(content)
+        return notes
 
     def _calculate_risk_score(self, overdue_count: int, due_soon_count: int, no_activity_count: int) -> float:
         """Calculate PM risk score using weighted formula."""
         return (overdue_count * 3) + (due_soon_count * 2) + (no_activity_count * 5)
 
-    def _extract_custom_field(self, deal: Deal, field_key: str):
-        """Extract custom field from raw_json."""
-        if deal.raw_json:
-            try:
-                data = json.loads(deal.raw_json)
-                return data.get(field_key)
-            except (json.JSONDecodeError, TypeError):
-                return None
-        return None
-
 
 # Global service instance
 _aramco_summary_service: Optional[AramcoSummaryService] = None
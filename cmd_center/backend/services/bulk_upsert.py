@@ -0,0 +1,66 @@
+"""Bulk UPSERT write path for synced Pipedrive entities.
+
+Replaces per-row ``session.merge()`` (a SELECT by primary key plus an ORM
+flush for every record) with SQLite ``INSERT ... ON CONFLICT DO UPDATE``
+statements executed through Core ``executemany`` in chunks.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Type
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session, SQLModel
+
+# Rows per executemany call
+DEFAULT_CHUNK_SIZE = 500
+
+
+def bulk_upsert(
+    session: Session,
+    model: Type[SQLModel],
+    rows: Iterable[Dict[str, Any]],
+    conflict_key: str = "id",
+    change_column: Optional[str] = "update_time",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Insert rows, or update the existing row with the same key.
+
+    Existing rows whose ``change_column`` already holds the incoming value are
+    left untouched, so re-syncing unchanged records costs no writes. The caller
+    owns the transaction and must commit the session.
+
+    Args:
+        session: Open session to execute on
+        model: SQLModel table class to write to
+        rows: Column dicts; every row must have the same keys
+        conflict_key: Unique column identifying an existing row
+        change_column: Column compared to skip unchanged rows (None to always update)
+        chunk_size: Rows per executemany batch
+
+    Returns:
+        Number of rows inserted or updated
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    table = model.__table__
+    columns = list(rows[0].keys())
+
+    stmt = insert(table)
+    set_ = {name: stmt.excluded[name] for name in columns if name != conflict_key}
+    where = None
+    if change_column and change_column in columns:
+        where = table.c[change_column].is_distinct_from(stmt.excluded[change_column])
+    stmt = stmt.on_conflict_do_update(index_elements=[conflict_key], set_=set_, where=where)
+
+    written = 0
+    for start in range(0, len(rows), chunk_size):
+        result = session.execute(stmt, rows[start:start + chunk_size])
+        written += max(result.rowcount, 0)
+    return written
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "bulk_upsert",
+]
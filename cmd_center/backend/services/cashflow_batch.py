@@ -0,0 +1,132 @@
+"""Columnar deal data for batch cashflow prediction.
+
+The per-deal path builds a DealForPrediction and a DealPrediction for every
+open deal. Batch mode instead:
+- Loads a pipeline's open deals with one query into NumPy columns
+  (stage, stage change time, value, owner, Aramco flag)
+- Lets DeterministicRules.predict_batch compute invoice/payment dates and
+  confidences with array operations
+- Aggregates periods with a grouped sum and builds Pydantic models only for
+  the rows a caller returns
+"""
+
+from dataclasses import dataclass, fields, replace
+from datetime import date
+from typing import Callable
+
+import numpy as np
+from sqlmodel import Session, select
+
+from .. import db
+from ..db import DealFact
+
+DAY = np.timedelta64(1, "D")
+
+
+def _take(obj, index):
+    """Copy a columnar dataclass keeping only rows at index (mask or positions)."""
+    return replace(obj, **{
+        f.name: getattr(obj, f.name)[index]
+        for f in fields(obj)
+        if isinstance(getattr(obj, f.name), np.ndarray)
+    })
+
+
+@dataclass(frozen=True)
+class DealColumns:
+    """Open deals of one pipeline as NumPy columns (one row per deal)."""
+
+    deal_id: np.ndarray            # int64
+    title: np.ndarray              # object (str)
+    owner_name: np.ndarray         # object (str)
+    stage_index: np.ndarray        # int64 position in stage_names
+    stage_names: tuple[str, ...]   # distinct stage labels (not per row)
+    value: np.ndarray              # float64 SAR
+    stage_change_time: np.ndarray  # datetime64[us], NaT when unknown
+    is_aramco: np.ndarray          # bool, "aramco" in the title
+
+    def __len__(self) -> int:
+        return len(self.deal_id)
+
+    def take(self, index) -> "DealColumns":
+        return _take(self, index)
+
+
+@dataclass(frozen=True)
+class BatchPrediction:
+    """Deterministic predictions for DealColumns, row-aligned with `deals`."""
+
+    deals: DealColumns
+    invoice_date: np.ndarray       # datetime64[us]
+    payment_date: np.ndarray       # datetime64[us]
+    confidence: np.ndarray         # float64
+    days_in_stage: np.ndarray      # int64
+    stage_days: np.ndarray         # int64 stage estimate before delays
+    unknown_stage: np.ndarray      # bool
+    delay_days: np.ndarray         # int64 (0, 7 or 14)
+    late_stage: np.ndarray         # bool
+    invoiced: np.ndarray           # bool
+    invoice_overridden: np.ndarray  # bool
+    payment_overridden: np.ndarray  # bool
+
+    def __len__(self) -> int:
+        return len(self.confidence)
+
+    def take(self, index) -> "BatchPrediction":
+        taken = _take(self, index)
+        return replace(taken, deals=self.deals.take(index))
+
+
+def load_deal_columns(pipeline_id: int) -> DealColumns:
+    """Load a pipeline's open deals from deal_facts in one query."""
+    with Session(db.read_engine) as session:
+        rows = session.exec(
+            select(
+                DealFact.deal_id,
+                DealFact.title,
+                DealFact.owner_name,
+                DealFact.stage_id,
+                DealFact.stage_name,
+                DealFact.value,
+                DealFact.stage_change_time,
+            )
+            .where(DealFact.pipeline_id == pipeline_id)
+            .where(DealFact.status == "open")
+            .order_by(DealFact.deal_id)
+        ).all()
+
+    stage_positions: dict[str, int] = {}
+    stage_index = np.empty(len(rows), dtype=np.int64)
+    for i, row in enumerate(rows):
+        stage = row.stage_name or f"Stage {row.stage_id}"
+        stage_index[i] = stage_positions.setdefault(stage, len(stage_positions))
+
+    titles = [row.title for row in rows]
+    return DealColumns(
+        deal_id=np.fromiter((row.deal_id for row in rows), dtype=np.int64, count=len(rows)),
+        title=np.array(titles, dtype=object),
+        owner_name=np.array([row.owner_name or "Unknown" for row in rows], dtype=object),
+        stage_index=stage_index,
+        stage_names=tuple(stage_positions),
+        value=np.fromiter((row.value or 0.0 for row in rows), dtype=np.float64, count=len(rows)),
+        stage_change_time=np.array([row.stage_change_time for row in rows], dtype="datetime64[us]"),
+        is_aramco=np.fromiter(
+            (bool(title) and "aramco" in title.lower() for title in titles), dtype=bool, count=len(rows),
+        ),
+    )
+
+
+def aggregate_by_period(
+    dates: np.ndarray,
+    values: np.ndarray,
+    label_for: Callable[[date], str],
+) -> list[tuple[str, float, int]]:
+    """Grouped (period, value sum, count) over datetime64 dates, sorted by period."""
+    if not len(dates):
+        return []
+    days, day_of_row = np.unique(dates.astype("datetime64[D]"), return_inverse=True)
+    periods, period_of_day = np.unique([label_for(day) for day in days.tolist()], return_inverse=True)
+    period_of_row = period_of_day[day_of_row]
+    sums = np.bincount(period_of_row, weights=values, minlength=len(periods))
+    counts = np.bincount(period_of_row, minlength=len(periods))
+    return [(str(p), float(s), int(c)) for p, s, c in zip(periods, sums, counts)]
@@ -8,14 +8,14 @@ This service provides cashflow forecasting by:
 NOTE: LLM-powered predictions have been disabled in favor of pure deterministic rules.
 """
 
+import asyncio
 import logging
+from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
-from sqlmodel import Session, select
 
-from ..db import engine, Deal
-from ..constants import PIPELINE_NAME_TO_ID
+import numpy as np
 from ..models.cashflow_models import (
     DealForPrediction,
     PredictionOptions,
@@ -29,15 +29,39 @@ from ..models.cashflow_models import (
     ForecastTable,
     AssumptionsReport,
     CashflowBucket,
+    CashflowBand,
+    CashflowSimulation,
 )
 # LLM imports disabled - using pure deterministic rules
 # from ..integrations.llm_client import get_llm_client, LLMClient, LLMError
 # from .prompt_registry import get_prompt_registry, PromptRegistry
 from .deterministic_rules import DeterministicRules
-from .db_queries import get_notes_for_deal, get_stage_by_id
+from ..integrations.config import get_config
+from .cashflow_batch import DAY, BatchPrediction, DealColumns, aggregate_by_period, load_deal_columns
+from .cashflow_simulation import (
+    SimulationJob,
+    SimulationResult,
+    StageDurations,
+    load_stage_durations,
+    run_simulations,
+)
+from .dimension_cache import get_dimension_cache
+from .result_cache import cached_result
 
 logger = logging.getLogger(__name__)
 
+# Stage-duration distributions only change with stage history, and the
+# stage-history sync bumps the result cache's data version
+STAGE_DURATIONS_TTL_SECONDS = 3600.0
+
+
+@dataclass(frozen=True)
+class PipelinePredictions:
+    """Horizon-independent predictions for a pipeline's open deals."""
+    today: datetime
+    deals_analyzed: int
+    predictions: BatchPrediction
+
 
 class CashflowPredictionService:
     """Service for deterministic cashflow prediction.
@@ -75,38 +99,181 @@ class CashflowPredictionService:
             ValueError: If pipeline not found
             LLMError: On LLM failures
         """
-        today = input_data.today_date or datetime.now()
+        # Per-deal predictions are horizon independent and shared between callers
+        pipeline_predictions = await self.predict_pipeline(input_data.pipeline_name, input_data.today_date)
+        result = self._build_result(input_data, pipeline_predictions)
+        if input_data.mode == "simulation":
+            result.simulation = (await self.simulate_cashflow([input_data]))[0]
+        return result
 
-        # Get pipeline ID
-        pipeline_id = PIPELINE_NAME_TO_ID.get(input_data.pipeline_name)
-        if not pipeline_id:
-            raise ValueError(f"Unknown pipeline: {input_data.pipeline_name}")
+    async def simulate_cashflow(
+        self,
+        inputs: list[CashflowPredictionInput],
+        processes: Optional[int] = None,
+    ) -> list[CashflowSimulation]:
+        """Monte-Carlo P10/P50/P90 cash-by-period bands, one per input pipeline.
+
+        Args:
+            inputs: One prediction input per pipeline (trials, seed, horizon, granularity)
+            processes: Process-pool workers across pipelines
+                (defaults to config.cashflow_simulation_processes)
+
+        Returns:
+            CashflowSimulation per input, in order
+
+        Raises:
+            ValueError: If a pipeline is not found
+        """
+        if processes is None:
+            processes = get_config().cashflow_simulation_processes
+        jobs = [self._simulation_job(input_data) for input_data in inputs]
+        results = await asyncio.to_thread(run_simulations, [job for job, _ in jobs], processes)
+
+        return [
+            self._simulation_model(input_data, job, periods, result)
+            for input_data, (job, periods), result in zip(inputs, jobs, results)
+        ]
+
+    async def predict_cashflow_what_if(
+        self,
+        input_data: CashflowPredictionInput,
+        stage_days_to_invoice: dict[str, int],
+    ) -> CashflowPredictionResult:
+        """Re-run the forecast with alternate stage durations.
+
+        Args:
+            input_data: Prediction input parameters
+            stage_days_to_invoice: Stage -> days to invoice, overriding
+                DeterministicRules.STAGE_DAYS_TO_INVOICE for the given stages
+
+        Returns:
+            CashflowPredictionResult under the alternate durations
+
+        Raises:
+            ValueError: If pipeline not found
+        """
+        deals = self.load_pipeline_deals(input_data.pipeline_name)
+        table = {**self.rules.STAGE_DAYS_TO_INVOICE, **stage_days_to_invoice}
+        pipeline_predictions = self._predict_batch(deals, input_data.today_date, table)
+        return self._build_result(input_data, pipeline_predictions)
 
-        # Load deals from database
-        deals_for_prediction = await self._load_deals(pipeline_id, today)
+    @cached_result("cashflow.pipeline_deals")
+    def load_pipeline_deals(self, pipeline_name: str) -> DealColumns:
+        """Load a pipeline's open deals as NumPy columns (one query).
+
+        Raises:
+            ValueError: If pipeline not found
+        """
+        pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
+        if not pipeline_id:
+            raise ValueError(f"Unknown pipeline: {pipeline_name}")
 
+        deals = load_deal_columns(pipeline_id)
         logger.info(
-            f"Loaded {len(deals_for_prediction)} deals for cashflow prediction",
-            extra={"pipeline": input_data.pipeline_name}
+            f"Loaded {len(deals)} deals for cashflow prediction",
+            extra={"pipeline": pipeline_name}
         )
+        return deals
 
-        # Make predictions using deterministic rules
-        options = PredictionOptions(
-            horizon_days=input_data.horizon_days,
-            use_deterministic_overrides=True,  # Enable deterministic rules
+    @cached_result("cashflow.stage_durations", ttl=STAGE_DURATIONS_TTL_SECONDS)
+    def load_stage_durations(self, pipeline_name: str) -> StageDurations:
+        """Load a pipeline's invoice path and historical stage durations.
+
+        Raises:
+            ValueError: If pipeline not found
+        """
+        dims = get_dimension_cache()
+        pipeline_id = dims.pipeline_id(pipeline_name)
+        if not pipeline_id:
+            raise ValueError(f"Unknown pipeline: {pipeline_name}")
+
+        stages = [(stage_id, dims.stage_name(stage_id)) for stage_id in dims.stage_ids_for_pipeline(pipeline_id)]
+        durations = load_stage_durations(
+            stages, self.rules.STAGE_DAYS_TO_INVOICE, self.rules.INVOICED_STAGES,
         )
+        logger.info(
+            f"Loaded stage durations for {durations.stages_with_history}/{len(durations.stage_ids)} path stages",
+            extra={"pipeline": pipeline_name}
+        )
+        return durations
+
+    @cached_result("cashflow.pipeline_predictions")
+    async def predict_pipeline(
+        self,
+        pipeline_name: str,
+        today_date: Optional[datetime] = None,
+    ) -> PipelinePredictions:
+        """Predict invoice and payment dates for every open deal of a pipeline.
+
+        The projection and critical-deals endpoints and the CEO dashboard ask
+        for different horizons over the same deals, so this step is cached and
+        each caller only filters and aggregates its result.
+
+        Args:
+            pipeline_name: Pipeline to analyze
+            today_date: Reference date (defaults to now)
 
-        predictions = await self.predict_deal_dates(deals_for_prediction, options, today)
+        Returns:
+            PipelinePredictions with the reference date used
 
-        # Filter by horizon
-        predictions = self._filter_by_horizon(predictions, today, input_data.horizon_days)
+        Raises:
+            ValueError: If pipeline not found
+        """
+        deals = self.load_pipeline_deals(pipeline_name)
+        return self._predict_batch(deals, today_date)
 
-        # Generate aggregated forecast
-        aggregated = self._aggregate_predictions(
-            predictions,
-            input_data.granularity,
+    def _predict_batch(
+        self,
+        deals: DealColumns,
+        today_date: Optional[datetime],
+        stage_days_to_invoice: Optional[dict[str, int]] = None,
+    ) -> PipelinePredictions:
+        """Batch-predict columnar deals with deterministic overrides and the default threshold."""
+        today = today_date or datetime.now()
+        options = PredictionOptions(use_deterministic_overrides=True)
+
+        batch = self.rules.predict_batch(
+            deals,
             today,
+            apply_overrides=options.use_deterministic_overrides,
+            stage_days_to_invoice=stage_days_to_invoice,
         )
+        if options.confidence_threshold > 0:
+            batch = batch.take(batch.confidence >= options.confidence_threshold)
+
+        logger.info(f"Generated {len(batch)} deterministic predictions for {len(deals)} deals")
+        return PipelinePredictions(today=today, deals_analyzed=len(deals), predictions=batch)
+
+    def _build_result(
+        self,
+        input_data: CashflowPredictionInput,
+        pipeline_predictions: PipelinePredictions,
+    ) -> CashflowPredictionResult:
+        """Filter batch predictions to the horizon, aggregate, and build the response models."""
+        today = pipeline_predictions.today
+        batch = pipeline_predictions.predictions
+
+        # Filter by horizon (invoice or payment within it)
+        cutoff = np.datetime64(today.replace(tzinfo=None) + timedelta(days=input_data.horizon_days), "us")
+        batch = batch.take((batch.invoice_date <= cutoff) | (batch.payment_date <= cutoff))
+
+        # Grouped sum of deal value per invoice period
+        aggregated = [
+            CashflowBucket(
+                period=period,
+                expected_invoice_value_sar=value,
+                deal_count=count,
+                comment=f"{count} deals expected to invoice",
+            )
+            for period, value, count in aggregate_by_period(
+                batch.invoice_date,
+                batch.deals.value,
+                lambda day: self._get_period_label(day, input_data.granularity),
+            )
+        ]
+
+        # Pydantic models only for the rows returned
+        predictions = self.rules.batch_to_predictions(batch)
 
         # Collect assumptions
         global_assumptions = self._collect_global_assumptions(predictions)
@@ -116,9 +283,9 @@ class CashflowPredictionService:
         metadata = PredictionMetadata(
             generated_at=datetime.now(),
             horizon_days=input_data.horizon_days,
-            deals_analyzed=len(deals_for_prediction),
-            deals_with_predictions=len([p for p in predictions if p.predicted_invoice_date]),
-            avg_confidence=sum(p.confidence for p in predictions) / len(predictions) if predictions else 0.0,
+            deals_analyzed=pipeline_predictions.deals_analyzed,
+            deals_with_predictions=len(batch),
+            avg_confidence=float(batch.confidence.mean()) if len(batch) else 0.0,
         )
 
         return CashflowPredictionResult(
@@ -129,6 +296,80 @@ class CashflowPredictionService:
             metadata=metadata,
         )
 
+    def _simulation_job(self, input_data: CashflowPredictionInput) -> tuple[SimulationJob, list[str]]:
+        """Build a pipeline's simulation arrays and its period labels."""
+        deals = self.load_pipeline_deals(input_data.pipeline_name)
+        durations = self.load_stage_durations(input_data.pipeline_name)
+        today = (input_data.today_date or datetime.now()).replace(tzinfo=None)
+        today64 = np.datetime64(today, "us")
+
+        # Deterministic dates for deals off the invoice path (invoiced or unknown stages)
+        batch = self.rules.predict_batch(deals, today)
+        position = np.array([durations.position(stage) for stage in deals.stage_names], dtype=np.int64)
+        position = position[deals.stage_index]
+        position = np.where(batch.invoiced, -1, position)
+
+        changed = ~np.isnat(deals.stage_change_time)
+        elapsed = np.where(changed, (today64 - np.where(changed, deals.stage_change_time, today64)) / DAY, 0.0)
+
+        # Period index for each day offset within the horizon
+        labels = [
+            self._get_period_label(today + timedelta(days=day), input_data.granularity)
+            for day in range(input_data.horizon_days + 1)
+        ]
+        periods, day_to_period = np.unique(labels, return_inverse=True)
+
+        job = SimulationJob(
+            durations=durations,
+            position=position,
+            elapsed_days=elapsed,
+            fixed_invoice_days=(batch.invoice_date - today64) / DAY,
+            fixed_payment_days=(batch.payment_date - today64) / DAY,
+            payment_days=np.where(
+                deals.is_aramco, self.rules.ARAMCO_PAYMENT_DAYS, self.rules.COMMERCIAL_PAYMENT_DAYS,
+            ).astype(np.float64),
+            value=deals.value,
+            day_to_period=day_to_period.astype(np.int64),
+            n_periods=len(periods),
+            trials=input_data.trials,
+            seed=input_data.seed,
+        )
+        return job, [str(period) for period in periods]
+
+    def _simulation_model(
+        self,
+        input_data: CashflowPredictionInput,
+        job: SimulationJob,
+        periods: list[str],
+        result: SimulationResult,
+    ) -> CashflowSimulation:
+        """Convert simulation percentiles into the response model."""
+        invoice, payment = result.invoice_bands, result.payment_bands
+        return CashflowSimulation(
+            pipeline_name=input_data.pipeline_name,
+            trials=job.trials,
+            deals_simulated=len(job.position),
+            stages_with_history=job.durations.stages_with_history,
+            bands=[
+                CashflowBand(
+                    period=period,
+                    invoice_p10_sar=float(invoice[0, i]),
+                    invoice_p50_sar=float(invoice[1, i]),
+                    invoice_p90_sar=float(invoice[2, i]),
+                    payment_p10_sar=float(payment[0, i]),
+                    payment_p50_sar=float(payment[1, i]),
+                    payment_p90_sar=float(payment[2, i]),
+                )
+                for i, period in enumerate(periods)
+            ],
+            invoice_total_p10_sar=float(result.invoice_totals[0]),
+            invoice_total_p50_sar=float(result.invoice_totals[1]),
+            invoice_total_p90_sar=float(result.invoice_totals[2]),
+            payment_total_p10_sar=float(result.payment_totals[0]),
+            payment_total_p50_sar=float(result.payment_totals[1]),
+            payment_total_p90_sar=float(result.payment_totals[2]),
+        )
+
     async def predict_deal_dates(
         self,
         deals: list[DealForPrediction],
@@ -298,62 +539,6 @@ class CashflowPredictionService:
     # PRIVATE HELPERS
     # ========================================================================
 
-    async def _load_deals(
-        self,
-        pipeline_id: int,
-        today: datetime,
-    ) -> list[DealForPrediction]:
-        """Load deals from database for prediction.
-
-        Args:
-            pipeline_id: Pipeline ID
-            today: Reference date
-
-        Returns:
-            List of DealForPrediction
-        """
-        with Session(engine) as session:
-            # Query open deals
-            stmt = (
-                select(Deal)
-                .where(Deal.pipeline_id == pipeline_id)
-                .where(Deal.status == "open")
-            )
-            deals = session.exec(stmt).all()
-
-            # Convert to DealForPrediction
-            deals_for_prediction = []
-            for deal in deals:
-                # Calculate days in stage
-                days_in_stage = 0
-                if deal.stage_change_time:
-                    days_in_stage = (today - deal.stage_change_time).days
-
-                # Get recent notes
-                notes = get_notes_for_deal(deal.id, limit=5)
-                recent_notes = [note.content for note in notes if note.content]
-
-                # Look up stage name
-                stage_obj = get_stage_by_id(deal.stage_id)
-                stage_name = stage_obj.name if stage_obj else f"Stage {deal.stage_id}"
-
-                deals_for_prediction.append(DealForPrediction(
-                    deal_id=deal.id,
-                    title=deal.title,
-                    stage=stage_name,
-                    stage_id=deal.stage_id,
-                    value_sar=deal.value or 0.0,
-                    owner_name=deal.owner_name or "Unknown",
-                    days_in_stage=days_in_stage,
-                    last_stage_change_date=deal.stage_change_time,
-                    last_update_date=deal.update_time,
-                    recent_notes=recent_notes,
-                    activities_count=deal.activities_count,
-                    done_activities_count=deal.done_activities_count,
-                ))
-
-        return deals_for_prediction
-
     # ========================================================================
     # LLM METHODS - DISABLED (kept for reference)
     # ========================================================================
@@ -452,80 +637,6 @@ class CashflowPredictionService:
     #         value_sar=deal.value_sar,
     #     )
 
-    def _filter_by_horizon(
-        self,
-        predictions: list[DealPrediction],
-        today: datetime,
-        horizon_days: int,
-    ) -> list[DealPrediction]:
-        """Filter predictions outside horizon.
-
-        Args:
-            predictions: All predictions
-            today: Reference date
-            horizon_days: Horizon in days
-
-        Returns:
-            Filtered predictions
-        """
-        cutoff = today + timedelta(days=horizon_days)
-
-        def safe_compare(pred_date, cutoff_date) -> bool:
-            """Compare dates, handling timezone-naive vs aware mismatches."""
-            if pred_date is None:
-                return False
-            # Strip timezone info for comparison if needed
-            pred_naive = pred_date.replace(tzinfo=None) if pred_date.tzinfo else pred_date
-            cutoff_naive = cutoff_date.replace(tzinfo=None) if cutoff_date.tzinfo else cutoff_date
-            return pred_naive <= cutoff_naive
-
-        filtered = []
-        for pred in predictions:
-            # Keep if invoice or payment within horizon
-            if safe_compare(pred.predicted_invoice_date, cutoff):
-                filtered.append(pred)
-            elif safe_compare(pred.predicted_payment_date, cutoff):
-                filtered.append(pred)
-
-        return filtered
-
-    def _aggregate_predictions(
-        self,
-        predictions: list[DealPrediction],
-        granularity: str,
-        today: datetime,
-    ) -> list[CashflowBucket]:
-        """Aggregate predictions into periods.
-
-        Args:
-            predictions: Deal predictions
-            granularity: "week" or "month"
-            today: Reference date
-
-        Returns:
-            List of CashflowBucket
-        """
-        # Group by period
-        buckets = defaultdict(lambda: {"value": 0.0, "count": 0})
-
-        for pred in predictions:
-            if pred.predicted_invoice_date:
-                period = self._get_period_label(pred.predicted_invoice_date, granularity)
-                # Note: We don't have deal value in prediction
-                buckets[period]["count"] += 1
-
-        # Convert to CashflowBucket
-        result = []
-        for period, data in sorted(buckets.items()):
-            result.append(CashflowBucket(
-                period=period,
-                expected_invoice_value_sar=data["value"],
-                deal_count=data["count"],
-                comment=f"{data['count']} deals expected to invoice",
-            ))
-
-        return result
-
     def _get_period_label(self, date: datetime, granularity: str) -> str:
         """Get period label for a date.
 
@@ -0,0 +1,222 @@
+"""Monte-Carlo cashflow forecasting from empirical stage durations.
+
+DeterministicRules forecasts one invoice date per deal from the fixed
+STAGE_DAYS_TO_INVOICE point estimates. Simulation mode instead samples the
+real stage durations recorded in DealStageSpan:
+- A pipeline's invoice path is its stages in board order, up to the first
+  invoiced stage
+- Each path stage samples its closed span durations; stages with fewer than
+  MIN_SPANS_PER_STAGE spans use their step of STAGE_DAYS_TO_INVOICE (the
+  steps of a full path add up to the point estimate)
+- A deal's current stage samples only durations longer than the time it has
+  already spent there
+- Deals outside the path (invoiced or unknown stages) keep their
+  deterministic dates
+
+Trials run as (trials x deals) NumPy arrays in chunks, and period sums are
+one bincount per chunk. SimulationJob/run_simulation only carry arrays so
+pipelines can fan out to a process pool.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+from sqlmodel import Session, select
+
+from .. import db
+from ..db import DealStageSpan
+
+# Minimum closed spans before a stage's durations are sampled
+MIN_SPANS_PER_STAGE = 5
+
+# Trials per (trials x deals) block, bounding memory for large pipelines
+TRIALS_PER_CHUNK = 1000
+
+PERCENTILES = (10, 50, 90)
+
+
+@dataclass(frozen=True)
+class StageDurations:
+    """Invoice path of one pipeline with empirical durations per stage."""
+
+    stage_ids: tuple[int, ...]       # path stages in board order
+    stage_names: tuple[str, ...]
+    samples: tuple[np.ndarray, ...]  # sorted durations in days (empty: use fallback_days)
+    fallback_days: np.ndarray        # float64 point duration per stage
+
+    def position(self, stage_name: str) -> int:
+        """Path position of a stage, or -1 when the stage is not on the path."""
+        try:
+            return self.stage_names.index(stage_name.strip())
+        except ValueError:
+            return -1
+
+    @property
+    def stages_with_history(self) -> int:
+        return sum(1 for samples in self.samples if len(samples))
+
+
+@dataclass(frozen=True)
+class SimulationJob:
+    """Inputs of one pipeline simulation (picklable)."""
+
+    durations: StageDurations
+    position: np.ndarray          # int64 path position per deal, -1 for fixed dates
+    elapsed_days: np.ndarray      # float64 days already spent in the current stage
+    fixed_invoice_days: np.ndarray  # float64 deterministic invoice offset (fixed rows)
+    fixed_payment_days: np.ndarray  # float64 deterministic payment offset (fixed rows)
+    payment_days: np.ndarray      # float64 invoice -> payment days per deal
+    value: np.ndarray             # float64 SAR
+    day_to_period: np.ndarray     # int64 period index for day offsets 0..horizon
+    n_periods: int
+    trials: int
+    seed: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Percentiles across trials of the per-period and total sums."""
+
+    invoice_bands: np.ndarray    # (len(PERCENTILES), n_periods)
+    payment_bands: np.ndarray    # (len(PERCENTILES), n_periods)
+    invoice_totals: np.ndarray   # (len(PERCENTILES),)
+    payment_totals: np.ndarray   # (len(PERCENTILES),)
+
+
+def load_stage_durations(
+    stages: list[tuple[int, str]],
+    stage_days_to_invoice: dict[str, int],
+    invoiced_stages: list[str],
+) -> StageDurations:
+    """Build a pipeline's invoice path and load its closed span durations.
+
+    Args:
+        stages: (stage id, name) of the pipeline's stages in board order
+        stage_days_to_invoice: Stage name -> days to invoice point estimates
+        invoiced_stages: Lowercase names of stages that end the path
+    """
+    path = []
+    for stage_id, name in stages:
+        if name.strip().lower() in invoiced_stages:
+            break
+        path.append((stage_id, name.strip()))
+
+    with Session(db.read_engine) as session:
+        rows = session.exec(
+            select(DealStageSpan.stage_id, DealStageSpan.duration_hours)
+            .where(DealStageSpan.stage_id.in_([stage_id for stage_id, _ in path]))
+            .where(DealStageSpan.left_at.is_not(None))
+            .where(DealStageSpan.duration_hours > 0)
+        ).all()
+
+    durations: dict[int, list[float]] = {}
+    for stage_id, hours in rows:
+        durations.setdefault(stage_id, []).append(hours / 24.0)
+
+    # Point durations: differences between consecutive estimates on the path
+    fallback = np.zeros(len(path))
+    estimated = [i for i, (_, name) in enumerate(path) if name in stage_days_to_invoice]
+    for current, following in zip(estimated, estimated[1:] + [None]):
+        days = stage_days_to_invoice[path[current][1]]
+        if following is not None:
+            days -= stage_days_to_invoice[path[following][1]]
+        fallback[current] = max(days, 0)
+
+    samples = []
+    for stage_id, _ in path:
+        stage_samples = durations.get(stage_id, [])
+        samples.append(np.sort(np.array(stage_samples)) if len(stage_samples) >= MIN_SPANS_PER_STAGE else np.empty(0))
+
+    return StageDurations(
+        stage_ids=tuple(stage_id for stage_id, _ in path),
+        stage_names=tuple(name for _, name in path),
+        samples=tuple(samples),
+        fallback_days=fallback,
+    )
+
+
+def _sorted_by_position(job: SimulationJob) -> SimulationJob:
+    """Reorder deals by path position so each stage's deals are one column slice."""
+    order = np.argsort(job.position, kind="stable")
+    return replace(job, **{
+        name: getattr(job, name)[order]
+        for name in ("position", "elapsed_days", "fixed_invoice_days", "fixed_payment_days", "payment_days", "value")
+    })
+
+
+def _simulate_chunk(job: SimulationJob, trials: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Per-trial period sums (invoice, payment) for one block of trials (deals sorted by position)."""
+    durations = job.durations
+    invoice_days = np.zeros((trials, len(job.position)))
+    fixed = int(np.searchsorted(job.position, 0))
+
+    for stage, samples in enumerate(durations.samples):
+        # Deals before the stage are [fixed, first); deals in it are [first, last)
+        first, last = np.searchsorted(job.position, [stage, stage + 1])
+        if not len(samples):
+            invoice_days[:, fixed:last] += durations.fallback_days[stage]
+            continue
+
+        # Deals that have not reached the stage yet: unconditional durations
+        if first > fixed:
+            invoice_days[:, fixed:first] += samples[rng.integers(0, len(samples), size=(trials, first - fixed))]
+
+        # Deals in the stage: remaining time, given the time already spent there
+        if last > first:
+            elapsed = job.elapsed_days[first:last]
+            first_longer = np.searchsorted(samples, elapsed, side="right")
+            longer = len(samples) - first_longer
+            draw = rng.random((trials, last - first))
+            index = np.where(
+                longer > 0,
+                first_longer + (draw * longer).astype(np.int64),
+                (draw * len(samples)).astype(np.int64),  # outlasted all history: restart the stage
+            )
+            remaining = samples[np.minimum(index, len(samples) - 1)] - np.where(longer > 0, elapsed, 0.0)
+            invoice_days[:, first:last] += remaining
+
+    invoice_days[:, :fixed] = job.fixed_invoice_days[:fixed]
+    payment_days = invoice_days + job.payment_days
+    payment_days[:, :fixed] = job.fixed_payment_days[:fixed]
+
+    return _period_sums(job, invoice_days, trials), _period_sums(job, payment_days, trials)
+
+
+def _period_sums(job: SimulationJob, days: np.ndarray, trials: int) -> np.ndarray:
+    """(trials, n_periods) value sums; past dates fall in the first period."""
+    overflow = job.n_periods
+    offset = np.clip(np.floor(days).astype(np.int64), 0, len(job.day_to_period))
+    period = np.append(job.day_to_period, overflow)[offset]
+    cells = (np.arange(trials)[:, None] * (overflow + 1) + period).ravel()
+    sums = np.bincount(cells, weights=np.broadcast_to(job.value, days.shape).ravel(), minlength=trials * (overflow + 1))
+    return sums.reshape(trials, overflow + 1)[:, :overflow]
+
+
+def run_simulation(job: SimulationJob) -> SimulationResult:
+    """Run a pipeline's trials in chunks and reduce them to percentile bands."""
+    rng = np.random.default_rng(job.seed)
+    job = _sorted_by_position(job)
+    invoice, payment = [], []
+    for start in range(0, job.trials, TRIALS_PER_CHUNK):
+        chunk_invoice, chunk_payment = _simulate_chunk(job, min(TRIALS_PER_CHUNK, job.trials - start), rng)
+        invoice.append(chunk_invoice)
+        payment.append(chunk_payment)
+    invoice = np.concatenate(invoice) if invoice else np.zeros((0, job.n_periods))
+    payment = np.concatenate(payment) if payment else np.zeros((0, job.n_periods))
+
+    return SimulationResult(
+        invoice_bands=np.percentile(invoice, PERCENTILES, axis=0),
+        payment_bands=np.percentile(payment, PERCENTILES, axis=0),
+        invoice_totals=np.percentile(invoice.sum(axis=1), PERCENTILES),
+        payment_totals=np.percentile(payment.sum(axis=1), PERCENTILES),
+    )
+
+
+def run_simulations(jobs: list[SimulationJob], processes: int = 0) -> list[SimulationResult]:
+    """Run pipeline simulations, fanning out to a process pool when processes > 1."""
+    if processes > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs))) as pool:
+            return list(pool.map(run_simulation, jobs))
+    return [run_simulation(job) for job in jobs]
@@ -1,12 +1,32 @@
-"""CEO Dashboard service for aggregating executive metrics."""
-
+"""CEO Dashboard service for aggregating executive metrics.
+
+Each request loads one snapshot of the data the components share: open-deal
+totals per pipeline, the Aramco deals needing attention, per-stage COUNT(*)
+and duration aggregates, and this month's won value. The loaders run
+concurrently in worker threads (alongside the async cashflow prediction) so
+SQLite work does not block the event loop; the components are then built
+from the snapshot without further queries.
+
+The computed metrics are cached until the next sync (result_cache);
+data_freshness, generation_ms and query_count are stamped per request, so a
+request served from the cache reports "cached", its own (short) latency and
+zero queries.
+"""
+
+import asyncio
 import logging
-from typing import Optional
-from datetime import datetime, timedelta
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
 from sqlmodel import Session, select, func
 
-from ..db import engine, Deal, DealStageSpan, Stage
-from ..constants import PIPELINE_NAME_TO_ID, PIPELINE_ID_TO_NAME
+from .. import db
+from ..db import Deal, DealFact, DealStageSpan
 from ..models.ceo_dashboard_models import (
     CashHealth,
     UrgentDeal,
@@ -18,12 +38,17 @@ from ..models.ceo_dashboard_models import (
     CEODashboardMetrics,
 )
 from ..models.cashflow_models import CashflowPredictionInput
+from ..models import OverdueDeal, StuckDeal
 from .cashflow_prediction_service import get_cashflow_prediction_service
 from .deal_health_service import get_deal_health_service
-from . import db_queries
+from .dimension_cache import get_dimension_cache
+from .result_cache import cached_result
 
 logger = logging.getLogger(__name__)
 
+# Set by _build_metrics in the task that computes the metrics; cache hits leave it unset
+_computed_query_count: ContextVar[Optional[int]] = ContextVar("computed_query_count", default=None)
+
 
 # Configurable targets (can be moved to .env or constants.py)
 class CEODashboardConfig:
@@ -55,6 +80,13 @@ class CEODashboardConfig:
     # Key stages for pipeline velocity (Order Received flow)
     KEY_STAGE_IDS = [27, 28, 29, 45]  # Order Received, Approved, Awaiting Payment, etc.
 
+    # Urgent deal thresholds (Aramco Projects)
+    OVERDUE_MIN_DAYS = 7
+    STUCK_MIN_DAYS = 30
+
+    # Stage duration lookback for pipeline velocity
+    STAGE_DURATION_DAYS = 90
+
 
 def get_status(value: float, green_threshold: float, yellow_threshold: float) -> str:
     """Determine status based on thresholds."""
@@ -76,6 +108,42 @@ def get_runway_status(months: float) -> str:
         return "red"
 
 
+@dataclass
+class DashboardSnapshot:
+    """Data shared by the dashboard components of one request."""
+
+    # pipeline_id -> (open deal count, open deal value)
+    pipeline_totals: dict[int, tuple[int, float]] = field(default_factory=dict)
+    overdue_facts: list[DealFact] = field(default_factory=list)
+    stuck_facts: list[DealFact] = field(default_factory=list)
+    stage_counts: dict[int, int] = field(default_factory=dict)
+    stage_avg_hours: dict[int, float] = field(default_factory=dict)
+    won_value_month: float = 0.0
+
+
+class _QueryCounter:
+    """Counts statements issued by the snapshot loaders (across threads)."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def _record(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        """Read session whose statements are counted."""
+        with Session(db.read_engine) as session:
+            connection = session.connection()
+            event.listen(connection, "before_cursor_execute", self._record)
+            try:
+                yield session
+            finally:
+                event.remove(connection, "before_cursor_execute", self._record)
+
+
 class CEODashboardService:
     """Service for generating CEO Dashboard metrics."""
 
@@ -85,15 +153,47 @@ class CEODashboardService:
 
     async def get_dashboard_metrics(self) -> CEODashboardMetrics:
         """Get all CEO Dashboard metrics in a single call."""
+        started = time.perf_counter()
+        token = _computed_query_count.set(None)
+        try:
+            metrics = await self._build_metrics()
+            query_count = _computed_query_count.get()
+        finally:
+            _computed_query_count.reset(token)
+        return metrics.model_copy(update={
+            "data_freshness": "cached" if query_count is None else "live",
+            "generation_ms": round((time.perf_counter() - started) * 1000, 1),
+            "query_count": query_count or 0,
+        })
+
+    @cached_result("ceo_dashboard.metrics")
+    async def _build_metrics(self) -> CEODashboardMetrics:
+        """Compute the metrics from one snapshot; last_updated is the computation time."""
         now = datetime.now()
+        counter = _QueryCounter()
+
+        dims = get_dimension_cache()
+        aramco_pipeline_id = dims.pipeline_id("Aramco Projects")
+        snapshot = DashboardSnapshot()
+
+        # Independent loaders run concurrently; the cashflow prediction is async
+        cash_health, (snapshot.pipeline_totals, snapshot.overdue_facts, snapshot.stuck_facts), \
+            (snapshot.stage_counts, snapshot.stage_avg_hours), snapshot.won_value_month = await asyncio.gather(
+                self._get_cash_health(),
+                asyncio.to_thread(self._load_open_deals, counter, aramco_pipeline_id),
+                asyncio.to_thread(self._load_stage_stats, counter),
+                asyncio.to_thread(self._load_won_value_month, counter, now),
+            )
 
-        # Fetch all components
-        cash_health = await self._get_cash_health()
-        urgent_deals = self._get_urgent_deals()
-        pipeline_velocity = self._get_pipeline_velocity()
-        strategic_priorities = await self._get_strategic_priorities()
-        department_scorecard = self._get_department_scorecard()
+        # Components are built from the snapshot without further queries
+        overdue_deals = self.deal_health_service.overdue_deals_from_facts(snapshot.overdue_facts)
+        stuck_deals = self.deal_health_service.stuck_deals_from_facts(snapshot.stuck_facts)
+        urgent_deals = self._get_urgent_deals(overdue_deals, stuck_deals)
+        pipeline_velocity = self._get_pipeline_velocity(snapshot)
+        strategic_priorities = self._get_strategic_priorities(snapshot, aramco_pipeline_id)
+        department_scorecard = self._get_department_scorecard(snapshot, len(overdue_deals))
 
+        _computed_query_count.set(counter.count)
         return CEODashboardMetrics(
             cash_health=cash_health,
             urgent_deals=urgent_deals,
@@ -104,6 +204,85 @@ class CEODashboardService:
             data_freshness="live",
         )
 
+    # ========================================================================
+    # SNAPSHOT LOADERS (run in worker threads)
+    # ========================================================================
+
+    def _load_open_deals(
+        self,
+        counter: _QueryCounter,
+        aramco_pipeline_id: Optional[int],
+    ) -> tuple[dict[int, tuple[int, float]], list[DealFact], list[DealFact]]:
+        """Open-deal totals per pipeline and the Aramco overdue/stuck fact rows."""
+        utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+        overdue_cutoff = utc_now - timedelta(days=CEODashboardConfig.OVERDUE_MIN_DAYS)
+        stuck_cutoff = utc_now - timedelta(days=CEODashboardConfig.STUCK_MIN_DAYS)
+
+        with counter.session() as session:
+            totals = {
+                pipeline_id: (count, value or 0.0)
+                for pipeline_id, count, value in session.exec(
+                    select(DealFact.pipeline_id, func.count(), func.sum(DealFact.value))
+                    .where(DealFact.status == "open")
+                    .group_by(DealFact.pipeline_id)
+                ).all()
+            }
+            if not aramco_pipeline_id:
+                return totals, [], []
+
+            facts = session.exec(
+                select(DealFact)
+                .where(DealFact.pipeline_id == aramco_pipeline_id)
+                .where(DealFact.status == "open")
+                .where((DealFact.update_time < overdue_cutoff) | (DealFact.stage_entered_at < stuck_cutoff))
+            ).all()
+
+        overdue = sorted(
+            (f for f in facts if f.update_time and f.update_time < overdue_cutoff),
+            key=lambda f: f.update_time,
+        )
+        stuck = sorted(
+            (f for f in facts if f.stage_entered_at and f.stage_entered_at < stuck_cutoff),
+            key=lambda f: f.stage_entered_at,
+        )
+        return totals, overdue, stuck
+
+    def _load_stage_stats(self, counter: _QueryCounter) -> tuple[dict[int, int], dict[int, float]]:
+        """Open deal COUNT(*) and average span duration for the key stages."""
+        stage_ids = CEODashboardConfig.KEY_STAGE_IDS
+        cutoff = datetime.now(timezone.utc) - timedelta(days=CEODashboardConfig.STAGE_DURATION_DAYS)
+
+        with counter.session() as session:
+            counts = dict(session.exec(
+                select(Deal.stage_id, func.count())
+                .where(Deal.stage_id.in_(stage_ids))
+                .where(Deal.status == "open")
+                .group_by(Deal.stage_id)
+            ).all())
+            avg_hours = dict(session.exec(
+                select(DealStageSpan.stage_id, func.avg(DealStageSpan.duration_hours))
+                .where(DealStageSpan.stage_id.in_(stage_ids))
+                .where(DealStageSpan.entered_at >= cutoff)
+                .where(DealStageSpan.duration_hours != None)  # noqa: E711
+                .where(DealStageSpan.duration_hours != 0)
+                .group_by(DealStageSpan.stage_id)
+            ).all())
+        return counts, avg_hours
+
+    def _load_won_value_month(self, counter: _QueryCounter, now: datetime) -> float:
+        """Value of deals won since the start of the month."""
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        with counter.session() as session:
+            return session.exec(
+                select(func.coalesce(func.sum(Deal.value), 0.0))
+                .where(Deal.status == "won")
+                .where(Deal.won_time >= month_start)
+            ).one()
+
+    # ========================================================================
+    # COMPONENTS
+    # ========================================================================
+
     async def _get_cash_health(self) -> CashHealth:
         """Calculate cash health metrics."""
         # Get Aramco cashflow prediction for next 14 days
@@ -174,22 +353,15 @@ class CEODashboardService:
             velocity_status=velocity_status,
         )
 
-    def _get_urgent_deals(self, limit: int = 5) -> list[UrgentDeal]:
+    def _get_urgent_deals(
+        self,
+        overdue_deals: list[OverdueDeal],
+        stuck_deals: list[StuckDeal],
+        limit: int = 5,
+    ) -> list[UrgentDeal]:
         """Get top urgent deals requiring attention."""
         urgent_deals = []
 
-        # Get overdue deals
-        overdue_deals = self.deal_health_service.get_overdue_deals(
-            pipeline_name="Aramco Projects",
-            min_days=7,
-        )
-
-        # Get stuck deals
-        stuck_deals = self.deal_health_service.get_stuck_deals(
-            pipeline_name="Aramco Projects",
-            min_days=30,
-        )
-
         # Combine and score deals
         scored_deals = []
 
@@ -228,43 +400,31 @@ class CEODashboardService:
 
         return urgent_deals
 
-    def _get_pipeline_velocity(self) -> PipelineVelocity:
+    def _get_pipeline_velocity(self, snapshot: DashboardSnapshot) -> PipelineVelocity:
         """Calculate pipeline velocity metrics."""
         stages = []
         total_avg_days = 0.0
         stage_count = 0
 
         # Get key stages
-        with Session(engine) as session:
-            for stage_id in CEODashboardConfig.KEY_STAGE_IDS:
-                stage = session.exec(
-                    select(Stage).where(Stage.id == stage_id)
-                ).first()
-
-                if not stage:
-                    continue
-
-                # Get duration stats for this stage
-                stats = db_queries.get_stage_duration_stats(stage_id, days=90)
+        dims = get_dimension_cache()
+        for stage_id in CEODashboardConfig.KEY_STAGE_IDS:
+            stage = dims.stage(stage_id)
 
-                # Get current deals in stage
-                deal_count = len(list(session.exec(
-                    select(Deal)
-                    .where(Deal.stage_id == stage_id)
-                    .where(Deal.status == "open")
-                ).all()))
+            if not stage:
+                continue
 
-                avg_days = stats.get("avg_duration_hours", 0) / 24  # Convert hours to days
+            avg_days = snapshot.stage_avg_hours.get(stage_id, 0) / 24  # Convert hours to days
 
-                stages.append(PipelineStage(
-                    name=stage.name,
-                    stage_id=stage_id,
-                    avg_days=round(avg_days, 1),
-                    deal_count=deal_count,
-                ))
+            stages.append(PipelineStage(
+                name=stage.name,
+                stage_id=stage_id,
+                avg_days=round(avg_days, 1),
+                deal_count=snapshot.stage_counts.get(stage_id, 0),
+            ))
 
-                total_avg_days += avg_days
-                stage_count += 1
+            total_avg_days += avg_days
+            stage_count += 1
 
         # Calculate current cycle time
         current_cycle_days = total_avg_days if stage_count > 0 else 0.0
@@ -288,34 +448,18 @@ class CEODashboardService:
             trend_pct=round(trend_pct, 1),
         )
 
-    async def _get_strategic_priorities(self) -> list[StrategicPriority]:
+    def _get_strategic_priorities(
+        self,
+        snapshot: DashboardSnapshot,
+        aramco_pipeline_id: Optional[int],
+    ) -> list[StrategicPriority]:
         """Get strategic priority metrics."""
         priorities = []
 
-        # Get pipeline values for calculations
-        with Session(engine) as session:
-            # Total pipeline value (Aramco + Commercial)
-            aramco_pipeline_id = PIPELINE_NAME_TO_ID.get("Aramco Projects")
-            commercial_pipeline_id = PIPELINE_NAME_TO_ID.get("pipeline")
-
-            aramco_value = 0.0
-            commercial_value = 0.0
-
-            if aramco_pipeline_id:
-                result = session.exec(
-                    select(func.sum(Deal.value))
-                    .where(Deal.pipeline_id == aramco_pipeline_id)
-                    .where(Deal.status == "open")
-                ).first()
-                aramco_value = result or 0.0
-
-            if commercial_pipeline_id:
-                result = session.exec(
-                    select(func.sum(Deal.value))
-                    .where(Deal.pipeline_id == commercial_pipeline_id)
-                    .where(Deal.status == "open")
-                ).first()
-                commercial_value = result or 0.0
+        # Total pipeline value (Aramco + Commercial)
+        commercial_pipeline_id = get_dimension_cache().pipeline_id("pipeline")
+        aramco_value = snapshot.pipeline_totals.get(aramco_pipeline_id, (0, 0.0))[1]
+        commercial_value = snapshot.pipeline_totals.get(commercial_pipeline_id, (0, 0.0))[1]
 
         total_pipeline = aramco_value + commercial_value
 
@@ -361,32 +505,12 @@ class CEODashboardService:
 
         return priorities
 
-    def _get_department_scorecard(self) -> DepartmentScorecard:
+    def _get_department_scorecard(self, snapshot: DashboardSnapshot, overdue_count: int) -> DepartmentScorecard:
         """Get department scorecard metrics (MVP: Sales only)."""
-        with Session(engine) as session:
-            # Get all open deals across pipelines
-            deals = session.exec(
-                select(Deal).where(Deal.status == "open")
-            ).all()
-
-            pipeline_value = sum(deal.value or 0 for deal in deals)
-            active_count = len(deals)
-
-            # Get won deals this month
-            month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            won_deals = session.exec(
-                select(Deal)
-                .where(Deal.status == "won")
-                .where(Deal.won_time >= month_start)
-            ).all()
-            won_value = sum(deal.value or 0 for deal in won_deals)
-
-        # Get overdue count
-        overdue_deals = self.deal_health_service.get_overdue_deals(
-            pipeline_name="Aramco Projects",
-            min_days=7,
-        )
-        overdue_count = len(overdue_deals)
+        # All open deals across pipelines
+        pipeline_value = sum(value for _, value in snapshot.pipeline_totals.values())
+        active_count = sum(count for count, _ in snapshot.pipeline_totals.values())
+        won_value = snapshot.won_value_month
 
         # Determine sales status
         if overdue_count <= 2:
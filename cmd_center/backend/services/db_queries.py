@@ -5,8 +5,9 @@ from typing import List, Optional
 
 from sqlmodel import Session, select, func
 
-from ..db import engine, Pipeline, Stage, Deal, Note, Activity, File, Comment, SyncMetadata
-from ..constants import PIPELINE_NAME_TO_ID
+from .. import db
+from ..db import Pipeline, Stage, Deal, DealFact, Note, Activity, File, Comment, SyncMetadata
+from .dimension_cache import get_dimension_cache
 
 # =============================================================================
 # Pipeline & Stage Queries
@@ -14,7 +15,7 @@ from ..constants import PIPELINE_NAME_TO_ID
 
 def get_pipeline_by_name(name: str) -> Optional[Pipeline]:
     """Get a pipeline by name."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return session.exec(
             select(Pipeline).where(Pipeline.name == name)
         ).first()
@@ -22,7 +23,7 @@ def get_pipeline_by_name(name: str) -> Optional[Pipeline]:
 
 def get_stage_by_id(stage_id: int) -> Optional[Stage]:
     """Get a stage by ID."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return session.exec(
             select(Stage).where(Stage.id == stage_id)
         ).first()
@@ -30,7 +31,7 @@ def get_stage_by_id(stage_id: int) -> Optional[Stage]:
 
 def get_stages_for_pipeline(pipeline_id: int) -> list[Stage]:
     """Get all stages for a pipeline."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Stage)
             .where(Stage.pipeline_id == pipeline_id)
@@ -43,10 +44,10 @@ def get_stages_for_pipeline(pipeline_id: int) -> list[Stage]:
 
 def get_open_deals_for_pipeline(pipeline_name: str) -> List[Deal]:
     """Get all open deals for a pipeline by name."""
-    pipeline_id = PIPELINE_NAME_TO_ID.get(pipeline_name)
+    pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
     if not pipeline_id:
         return []
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         stmt = select(Deal).where(Deal.pipeline_id == pipeline_id).where(Deal.status == "open")
         return list(session.exec(stmt).all())
 
@@ -56,7 +57,7 @@ def get_deals_for_pipeline(
     status: str = "open"
 ) -> list[Deal]:
     """Get all deals for a pipeline."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Deal)
             .where(Deal.pipeline_id == pipeline_id)
@@ -70,11 +71,11 @@ def get_overdue_deals_for_pipeline(pipeline_name: str, min_days: int = 7) -> Lis
     
     "Overdue" = update_time is older than the threshold.
     """
-    pipeline_id = PIPELINE_NAME_TO_ID.get(pipeline_name)
+    pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
     if not pipeline_id:
         return []
     cutoff = datetime.utcnow() - timedelta(days=min_days)
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         stmt = (
             select(Deal)
             .where(Deal.pipeline_id == pipeline_id)
@@ -91,11 +92,11 @@ def get_stuck_deals_for_pipeline(pipeline_name: str, min_days: int = 30) -> List
     
     Uses stage_change_time if available, otherwise falls back to update_time.
     """
-    pipeline_id = PIPELINE_NAME_TO_ID.get(pipeline_name)
+    pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
     if not pipeline_id:
         return []
     cutoff = datetime.utcnow() - timedelta(days=min_days)
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         stmt = (
             select(Deal)
             .where(Deal.pipeline_id == pipeline_id)
@@ -115,20 +116,15 @@ def get_deals_by_stage(
     min_days_in_stage: int = 0
 ) -> list[Deal]:
     """Get deals in a specific stage, optionally filtered by days in stage."""
-    with Session(engine) as session:
-        stage = session.exec(
-            select(Stage)
-            .where(Stage.pipeline_id == pipeline_id)
-            .where(Stage.name == stage_name)
-        ).first()
-        
-        if not stage:
-            return []
-        
+    stage_id = get_dimension_cache().stage_id(pipeline_id, stage_name)
+    if stage_id is None:
+        return []
+
+    with Session(db.read_engine) as session:
         query = (
             select(Deal)
             .where(Deal.pipeline_id == pipeline_id)
-            .where(Deal.stage_id == stage.id)
+            .where(Deal.stage_id == stage_id)
             .where(Deal.status == "open")
         )
         
@@ -147,7 +143,7 @@ def get_deals_by_owner(
     status: str = "open"
 ) -> list[Deal]:
     """Get all deals for a specific owner."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         query = (
             select(Deal)
             .where(Deal.owner_name == owner_name)
@@ -162,7 +158,7 @@ def get_deals_by_owner(
 
 def get_deal_by_id(deal_id: int) -> Optional[Deal]:
     """Get a single deal by ID."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return session.exec(
             select(Deal).where(Deal.id == deal_id)
         ).first()
@@ -173,19 +169,17 @@ def get_deals_near_invoicing(
     stage_names: list[str]
 ) -> list[Deal]:
     """Get deals in stages that are close to invoicing."""
-    with Session(engine) as session:
-        # Get stage IDs for the given names
-        stages = session.exec(
-            select(Stage)
-            .where(Stage.pipeline_id == pipeline_id)
-            .where(Stage.name.in_(stage_names))
-        ).all()
-        
-        stage_ids = [s.id for s in stages]
-        
-        if not stage_ids:
-            return []
-        
+    # Get stage IDs for the given names
+    dims = get_dimension_cache()
+    stage_ids = [
+        stage_id for stage_id in (dims.stage_id(pipeline_id, name) for name in stage_names)
+        if stage_id is not None
+    ]
+
+    if not stage_ids:
+        return []
+
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Deal)
             .where(Deal.pipeline_id == pipeline_id)
@@ -201,7 +195,7 @@ def search_deals(
     limit: int = 50
 ) -> list[Deal]:
     """Search deals by title or org name."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         stmt = (
             select(Deal)
             .where(Deal.status == "open")
@@ -221,13 +215,68 @@ def search_deals(
         
         return list(session.exec(stmt).all())
 
+# =============================================================================
+# Deal Fact Queries (precomputed by services/deal_facts.py)
+# =============================================================================
+
+def get_open_deal_facts(
+    pipeline_id: Optional[int] = None,
+    stage_ids: Optional[list[int]] = None,
+) -> list[DealFact]:
+    """Get fact rows for open deals, optionally filtered by pipeline and stages."""
+    with Session(db.read_engine) as session:
+        stmt = select(DealFact).where(DealFact.status == "open")
+        if pipeline_id is not None:
+            stmt = stmt.where(DealFact.pipeline_id == pipeline_id)
+        if stage_ids is not None:
+            stmt = stmt.where(DealFact.stage_id.in_(stage_ids))
+        return list(session.exec(stmt).all())
+
+
+def get_overdue_deal_facts(pipeline_name: str, min_days: int = 7) -> list[DealFact]:
+    """Fact rows for open deals not updated in `min_days` days."""
+    pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
+    if not pipeline_id:
+        return []
+    cutoff = datetime.utcnow() - timedelta(days=min_days)
+    with Session(db.read_engine) as session:
+        return list(session.exec(
+            select(DealFact)
+            .where(DealFact.pipeline_id == pipeline_id)
+            .where(DealFact.status == "open")
+            .where(DealFact.update_time < cutoff)
+            .order_by(DealFact.update_time)
+        ).all())
+
+
+def get_stuck_deal_facts(pipeline_name: str, min_days: int = 30) -> list[DealFact]:
+    """Fact rows for open deals in the same stage for `min_days` days."""
+    pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
+    if not pipeline_id:
+        return []
+    cutoff = datetime.utcnow() - timedelta(days=min_days)
+    with Session(db.read_engine) as session:
+        return list(session.exec(
+            select(DealFact)
+            .where(DealFact.pipeline_id == pipeline_id)
+            .where(DealFact.status == "open")
+            .where(DealFact.stage_entered_at < cutoff)
+            .order_by(DealFact.stage_entered_at)
+        ).all())
+
+
+def get_deal_fact_by_id(deal_id: int) -> Optional[DealFact]:
+    """Get the fact row for a single deal."""
+    with Session(db.read_engine) as session:
+        return session.get(DealFact, deal_id)
+
 # =============================================================================
 # Note Queries
 # =============================================================================
 
 def get_notes_for_deal(deal_id: int, limit: int) -> list[Note]:
     """Get all notes for a deal, ordered by date."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Note)
             .where(Note.deal_id == deal_id)
@@ -241,7 +290,7 @@ def get_notes_for_deal(deal_id: int, limit: int) -> list[Note]:
 
 def get_activities_for_deal(deal_id: int) -> list[Activity]:
     """Get all activities for a deal, ordered by date."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Activity)
             .where(Activity.deal_id == deal_id)
@@ -252,7 +301,7 @@ def get_activities_for_deal(deal_id: int) -> list[Activity]:
 
 def get_pending_activities_for_deal(deal_id: int) -> list[Activity]:
     """Get pending (not done) activities for a deal."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Activity)
             .where(Activity.deal_id == deal_id)
@@ -268,7 +317,7 @@ def get_pending_activities_for_deal(deal_id: int) -> list[Activity]:
 
 def get_files_for_deal(deal_id: int) -> list[File]:
     """Get all files for a deal."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(File)
             .where(File.deal_id == deal_id)
@@ -283,7 +332,7 @@ def get_files_for_deal(deal_id: int) -> list[File]:
 
 def get_comments_for_object(object_id: int, object_type: str) -> list[Comment]:
     """Get all comments for a specific object (deal, activity, etc.)."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(Comment)
             .where(Comment.object_id == object_id)
@@ -302,7 +351,7 @@ def get_deal_counts_by_owner(
     status: str = "open"
 ) -> dict[str, int]:
     """Get deal counts grouped by owner."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         query = (
             select(Deal.owner_name, func.count(Deal.id))
             .where(Deal.status == status)
@@ -322,7 +371,7 @@ def get_deal_value_by_owner(
     status: str = "open"
 ) -> dict[str, float]:
     """Get total deal value grouped by owner."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         query = (
             select(Deal.owner_name, func.sum(Deal.value))
             .where(Deal.status == status)
@@ -342,7 +391,7 @@ def get_deal_value_by_owner(
 
 def get_sync_status() -> list[SyncMetadata]:
     """Get sync status for all entity types."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(SyncMetadata).order_by(SyncMetadata.entity_type)
         ).all())
@@ -350,7 +399,7 @@ def get_sync_status() -> list[SyncMetadata]:
 
 def get_last_sync_time(entity_type: str) -> Optional[datetime]:
     """Get the last sync time for a specific entity type."""
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         meta = session.exec(
             select(SyncMetadata).where(SyncMetadata.entity_type == entity_type)
         ).first()
@@ -372,7 +421,7 @@ def get_last_sync_time(entity_type: str) -> Optional[datetime]:
 def get_stage_spans_for_deal(deal_id: int):
     """Get all stage spans for a deal, ordered chronologically."""
     from ..db import DealStageSpan
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return list(session.exec(
             select(DealStageSpan)
             .where(DealStageSpan.deal_id == deal_id)
@@ -383,7 +432,7 @@ def get_stage_spans_for_deal(deal_id: int):
 def get_current_stage_span(deal_id: int):
     """Get the current open stage span for a deal."""
     from ..db import DealStageSpan
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         return session.exec(
             select(DealStageSpan)
             .where(
@@ -404,7 +453,7 @@ def get_deals_stuck_in_stage(
     from ..db import DealStageSpan
     cutoff = datetime.now(timezone.utc) - timedelta(hours=min_hours)
 
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         stmt = (
             select(Deal, DealStageSpan)
             .join(DealStageSpan, Deal.id == DealStageSpan.deal_id)
@@ -433,7 +482,7 @@ def get_stage_duration_stats(stage_id: int, days: int = 90) -> dict:
     from ..db import DealStageSpan
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         spans = session.exec(
             select(DealStageSpan)
             .where(
@@ -474,7 +523,7 @@ def get_deal_change_events(
         field_keys: Optional list of field keys to filter (e.g., ["stage_id", "value"])
     """
     from ..db import DealChangeEvent
-    with Session(engine) as session:
+    with Session(db.read_engine) as session:
         stmt = select(DealChangeEvent).where(DealChangeEvent.deal_id == deal_id)
 
         if field_keys:
@@ -498,6 +547,10 @@ __all__ = [
     "get_deal_by_id",
     "get_deals_near_invoicing",
     "search_deals",
+    "get_open_deal_facts",
+    "get_overdue_deal_facts",
+    "get_stuck_deal_facts",
+    "get_deal_fact_by_id",
     "get_notes_for_deal",
     "get_activities_for_deal",
     "get_pending_activities_for_deal",
@@ -0,0 +1,182 @@
+"""Incremental refresh of the denormalized deal_facts table.
+
+The read services (deal health, Aramco summaries, CEO dashboard, cashflow)
+used to resolve stage and pipeline names, parse raw_json for custom fields and
+look up the latest note for every deal on every request. The sync jobs now
+materialize that once per changed deal:
+- refresh_deal_facts() finds deals whose cached row, stage/pipeline names or
+  notes changed since their fact row was written, and rebuilds only those
+- Each rebuild is one joined query per chunk (latest note via a ranked CTE)
+  and one bulk upsert, committed per chunk so a full backfill never holds the
+  SQLite write lock for the whole rebuild
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlmodel import Session, func, select
+
+from .. import db
+from ..db import Deal, DealFact, DealSyncState, Employee, Note, Pipeline, Stage
+from .bulk_upsert import bulk_upsert
+from .result_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# Custom field key for End User (from Pipedrive schema)
+END_USER_FIELD_KEY = "bd7bb3b2758ca81feebf015ca60bf528eafe47f0"
+
+# Length of the stored latest-note snippet
+NOTE_SNIPPET_LENGTH = 100
+
+# Deals rebuilt per query (keeps IN lists under SQLite's variable limit)
+REFRESH_CHUNK_SIZE = 500
+
+
+def _employee_id():
+    """Correlated subquery linking a deal's owner to an Employee."""
+    return (
+        select(func.min(Employee.id))
+        .where(Employee.pipedrive_owner_id == Deal.owner_id)
+        .scalar_subquery()
+    )
+
+
+def _custom_field_text(value: Any) -> Optional[str]:
+    """Flatten a Pipedrive custom field value to text."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, dict):
+        return value.get("name") or value.get("value") or json.dumps(value)
+    return str(value)
+
+
+def _extract_custom_field(raw_json: Optional[str], field_key: str) -> Optional[str]:
+    if not raw_json:
+        return None
+    try:
+        return _custom_field_text(json.loads(raw_json).get(field_key))
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return None
+
+
+def find_stale_deal_ids(session: Session) -> List[int]:
+    """Ids of deals whose fact row is missing or out of date."""
+    return list(session.exec(
+        select(Deal.id)
+        .outerjoin(DealFact, DealFact.deal_id == Deal.id)
+        .outerjoin(Stage, Stage.id == Deal.stage_id)
+        .outerjoin(Pipeline, Pipeline.id == Deal.pipeline_id)
+        .outerjoin(DealSyncState, DealSyncState.deal_id == Deal.id)
+        .where(or_(
+            DealFact.deal_id.is_(None),
+            DealFact.update_time.is_distinct_from(Deal.update_time),
+            DealFact.status.is_distinct_from(Deal.status),
+            DealFact.stage_id.is_distinct_from(Deal.stage_id),
+            DealFact.notes_count.is_distinct_from(Deal.notes_count),
+            DealFact.stage_name.is_distinct_from(Stage.name),
+            DealFact.pipeline_name.is_distinct_from(Pipeline.name),
+            DealFact.employee_id.is_distinct_from(_employee_id()),
+            DealSyncState.notes_synced_at > DealFact.refreshed_at,
+        ))
+    ).all())
+
+
+def build_fact_rows(session: Session, deal_ids: List[int]) -> List[Dict[str, Any]]:
+    """DealFact column values for the given deals, in one query."""
+    refreshed_at = datetime.now(timezone.utc)
+    latest_note = (
+        select(
+            Note.deal_id,
+            Note.content,
+            Note.add_time,
+            func.row_number().over(
+                partition_by=Note.deal_id,
+                order_by=(Note.add_time.desc(), Note.id.desc()),
+            ).label("rn"),
+        )
+        .where(Note.deal_id.in_(deal_ids))
+        .subquery()
+    )
+    rows = session.exec(
+        select(
+            Deal,
+            Stage.name,
+            Pipeline.name,
+            _employee_id(),
+            latest_note.c.content,
+            latest_note.c.add_time,
+        )
+        .outerjoin(Stage, Stage.id == Deal.stage_id)
+        .outerjoin(Pipeline, Pipeline.id == Deal.pipeline_id)
+        .outerjoin(latest_note, and_(latest_note.c.deal_id == Deal.id, latest_note.c.rn == 1))
+        .where(Deal.id.in_(deal_ids))
+    ).all()
+
+    facts = []
+    for deal, stage_name, pipeline_name, employee_id, note_content, note_time in rows:
+        facts.append(dict(
+            deal_id=deal.id,
+            title=deal.title,
+            pipeline_id=deal.pipeline_id,
+            pipeline_name=pipeline_name,
+            stage_id=deal.stage_id,
+            stage_name=stage_name,
+            status=deal.status,
+            value=deal.value or 0.0,
+            owner_id=deal.owner_id,
+            owner_name=deal.owner_name,
+            employee_id=employee_id,
+            org_name=deal.org_name,
+            add_time=deal.add_time,
+            update_time=deal.update_time,
+            stage_change_time=deal.stage_change_time,
+            stage_entered_at=deal.stage_change_time or deal.update_time,
+            next_activity_date=deal.next_activity_date,
+            last_activity_date=deal.last_activity_date,
+            won_time=deal.won_time,
+            file_count=deal.file_count,
+            notes_count=deal.notes_count,
+            email_messages_count=deal.email_messages_count,
+            activities_count=deal.activities_count,
+            done_activities_count=deal.done_activities_count,
+            end_user=_extract_custom_field(deal.raw_json, END_USER_FIELD_KEY),
+            last_note_at=note_time,
+            last_note_snippet=note_content[:NOTE_SNIPPET_LENGTH] if note_content is not None else None,
+            refreshed_at=refreshed_at,
+        ))
+    return facts
+
+
+def refresh_deal_facts(deal_ids: Optional[Iterable[int]] = None) -> int:
+    """Rebuild fact rows for changed deals.
+
+    Args:
+        deal_ids: Deals to rebuild unconditionally; None detects stale deals
+
+    Returns:
+        Number of fact rows written
+    """
+    written = 0
+    with Session(db.engine) as session:
+        ids = sorted(set(deal_ids)) if deal_ids is not None else find_stale_deal_ids(session)
+        for start in range(0, len(ids), REFRESH_CHUNK_SIZE):
+            rows = build_fact_rows(session, ids[start:start + REFRESH_CHUNK_SIZE])
+            written += bulk_upsert(session, DealFact, rows, conflict_key="deal_id", change_column=None)
+            session.commit()
+    if written:
+        logger.info(f"Refreshed {written} deal facts")
+        bump_data_version("deal_facts")
+    return written
+
+
+__all__ = [
+    "END_USER_FIELD_KEY",
+    "NOTE_SNIPPET_LENGTH",
+    "find_stale_deal_ids",
+    "build_fact_rows",
+    "refresh_deal_facts",
+]
@@ -7,10 +7,11 @@ from ..models import (
     DealBase, OverdueDeal, StuckDeal, OrderReceivedAnalysis, DealNote,
     DealStageHistory, StageTransition, StagePerformanceMetrics
 )
-from ..constants import PIPELINE_NAME_TO_ID, PIPELINE_ID_TO_NAME
 from . import db_queries
+from .dimension_cache import get_dimension_cache
 from sqlmodel import Session, select
-from ..db import Deal
+from .. import db
+from ..db import Deal, DealFact
 
 
 class DealHealthService:
@@ -45,14 +46,25 @@ class DealHealthService:
     
     def _get_stage_name(self, stage_id: int) -> str:
         """Helper to get stage name from ID."""
-        stage = db_queries.get_stage_by_id(stage_id)
-        return stage.name if stage else "Unknown"
+        return get_dimension_cache().stage_name(stage_id, "Unknown")
+
+    def _get_pipeline_name(self, pipeline_id: int) -> str:
+        """Helper to get pipeline name from ID."""
+        return get_dimension_cache().pipeline_name(pipeline_id, f"Pipeline {pipeline_id}")
     
     def _deal_to_deal_base(self, deal) -> DealBase:
         """Convert Deal SQLModel to DealBase Pydantic model."""
-        pipeline_name = PIPELINE_ID_TO_NAME.get(deal.pipeline_id, f"Pipeline {deal.pipeline_id}")
+        pipeline_name = self._get_pipeline_name(deal.pipeline_id)
         stage_name = self._get_stage_name(deal.stage_id)
-        
+        return self._build_deal_base(deal, deal.id, pipeline_name, stage_name)
+
+    def _fact_to_deal_base(self, fact: DealFact) -> DealBase:
+        """Convert a precomputed DealFact row to DealBase (no lookups)."""
+        pipeline_name = fact.pipeline_name or f"Pipeline {fact.pipeline_id}"
+        return self._build_deal_base(fact, fact.deal_id, pipeline_name, fact.stage_name or "Unknown")
+
+    def _build_deal_base(self, deal, deal_id: int, pipeline_name: str, stage_name: str) -> DealBase:
+        """Build DealBase from a Deal or DealFact row with resolved names."""
         # Make datetimes timezone-aware if they aren't
         add_time = deal.add_time
         if add_time and add_time.tzinfo is None:
@@ -71,7 +83,7 @@ class DealHealthService:
             next_activity_date = next_activity_date.replace(tzinfo=timezone.utc)
         
         return DealBase(
-            id=deal.id,
+            id=deal_id,
             title=deal.title,
             pipeline=pipeline_name,
             stage=stage_name,
@@ -96,12 +108,14 @@ class DealHealthService:
     ) -> List[OverdueDeal]:
         """Get deals that are overdue (read from database)."""
         # Query database (fast!)
-        deals = db_queries.get_overdue_deals_for_pipeline(pipeline_name, min_days)
-        
-        # Transform to API model
+        deals = db_queries.get_overdue_deal_facts(pipeline_name, min_days)
+        return self.overdue_deals_from_facts(deals)
+
+    def overdue_deals_from_facts(self, deals: List[DealFact]) -> List[OverdueDeal]:
+        """Transform overdue fact rows (oldest update first) to API models."""
         overdue_deals = []
         for deal in deals:
-            deal_base = self._deal_to_deal_base(deal)
+            deal_base = self._fact_to_deal_base(deal)
             overdue_days = self._calculate_overdue_days(deal.update_time)
             
             overdue_deal = OverdueDeal(
@@ -119,12 +133,14 @@ class DealHealthService:
     ) -> List[StuckDeal]:
         """Get deals stuck in the same stage (read from database)."""
         # Query database (fast!)
-        deals = db_queries.get_stuck_deals_for_pipeline(pipeline_name, min_days)
-        
-        # Transform to API model
+        deals = db_queries.get_stuck_deal_facts(pipeline_name, min_days)
+        return self.stuck_deals_from_facts(deals)
+
+    def stuck_deals_from_facts(self, deals: List[DealFact]) -> List[StuckDeal]:
+        """Transform stuck fact rows (oldest stage entry first) to API models."""
         stuck_deals = []
         for deal in deals:
-            deal_base = self._deal_to_deal_base(deal)
+            deal_base = self._fact_to_deal_base(deal)
             days_in_stage = self._calculate_days_in_stage(deal.stage_change_time, deal.update_time)
             
             stuck_deal = StuckDeal(
@@ -140,26 +156,20 @@ class DealHealthService:
         pipeline_name: str = "Aramco Projects"
     ) -> List[OrderReceivedAnalysis]:
         """Get deals in Order Received stages (read from database)."""
-        pipeline_id = PIPELINE_NAME_TO_ID.get(pipeline_name)
+        pipeline_id = get_dimension_cache().pipeline_id(pipeline_name)
         if not pipeline_id:
             return []
 
         # Stage IDs for Order Received stages
         order_received_stage_ids = [27, 28, 29, 45]  # Order Received, Approved, Awaiting Payment, Everything is read but not started
 
-        # Query database for deals in these stages (similar to get_deals_near_invoicing)
-        with Session(db_queries.engine) as session:
-            deals = list(session.exec(
-                select(Deal)
-                .where(Deal.pipeline_id == pipeline_id)
-                .where(Deal.stage_id.in_(order_received_stage_ids))
-                .where(Deal.status == "open")
-            ).all())
+        # Query precomputed facts for deals in these stages
+        deals = db_queries.get_open_deal_facts(pipeline_id, order_received_stage_ids)
 
         # Transform to API model
         order_received_deals = []
         for deal in deals:
-            deal_base = self._deal_to_deal_base(deal)
+            deal_base = self._fact_to_deal_base(deal)
             days_in_stage = self._calculate_days_in_stage(deal.stage_change_time, deal.update_time)
 
             order_received_deal = OrderReceivedAnalysis(
@@ -219,9 +229,9 @@ class DealHealthService:
 
         # Convert spans to transitions
         transitions = []
+        dims = get_dimension_cache()
         for span in spans:
-            stage = db_queries.get_stage_by_id(span.stage_id)
-            stage_name = stage.name if stage else f"Stage {span.stage_id}"
+            stage_name = dims.stage_name(span.stage_id, f"Stage {span.stage_id}")
 
             # Ensure datetimes are timezone-aware
             entered_at = span.entered_at
@@ -245,7 +255,7 @@ class DealHealthService:
             transitions.append(transition)
 
         # Get metadata
-        pipeline_name = PIPELINE_ID_TO_NAME.get(deal.pipeline_id, f"Pipeline {deal.pipeline_id}")
+        pipeline_name = self._get_pipeline_name(deal.pipeline_id)
         current_stage = self._get_stage_name(deal.stage_id)
 
         # Find first and last transition times
@@ -281,7 +291,7 @@ class DealHealthService:
     ) -> Optional[StagePerformanceMetrics]:
         """Get performance metrics for a specific stage."""
         # Get stage details
-        stage = db_queries.get_stage_by_id(stage_id)
+        stage = get_dimension_cache().stage(stage_id)
         if not stage:
             return None
 
@@ -292,7 +302,7 @@ class DealHealthService:
         stuck_deals = db_queries.get_deals_stuck_in_stage(stage_id, stuck_threshold_hours)
 
         # Get current deals in this stage
-        with Session(db_queries.engine) as session:
+        with Session(db.read_engine) as session:
             current_deals_count = session.exec(
                 select(Deal)
                 .where(Deal.stage_id == stage_id)
@@ -8,7 +8,11 @@ Rules are derived from the Cashflow Prediction Reference Document.
 
 from datetime import datetime, timedelta
 from typing import Optional
+
+import numpy as np
+
 from ..models.cashflow_models import DealForPrediction, DealPrediction
+from .cashflow_batch import DAY, BatchPrediction, DealColumns
 
 
 def _normalize_datetime(dt: datetime) -> datetime:
@@ -69,6 +73,10 @@ class DeterministicRules:
     MEDIUM_CONFIDENCE = 0.70
     LOW_CONFIDENCE = 0.50
 
+    # Stage groups
+    LATE_STAGES = ["Awaiting GR", "Awaiting GCC", "Awaiting MDD"]
+    INVOICED_STAGES = ["invoice issued", "invoiced", "payment received"]
+
     def predict_deal(
         self,
         deal: DealForPrediction,
@@ -111,8 +119,7 @@ class DeterministicRules:
             assumptions.append(f"Deal slow ({deal.days_in_stage} days in stage), added {delay} days")
 
         # Step 3: Check if already at late stage
-        late_stages = ["Awaiting GR", "Awaiting GCC", "Awaiting MDD"]
-        if stage_normalized in late_stages:
+        if stage_normalized in self.LATE_STAGES:
             confidence = self.HIGH_CONFIDENCE
             assumptions.append("Late stage - high confidence in estimate")
 
@@ -134,7 +141,7 @@ class DeterministicRules:
         missing_fields = []
 
         # Check for invoice already issued
-        if stage_normalized.lower() in ["invoice issued", "invoiced", "payment received"]:
+        if stage_normalized.lower() in self.INVOICED_STAGES:
             invoice_date = deal.last_stage_change_date or today
             payment_date = invoice_date + timedelta(days=payment_days)
             confidence = 0.95
@@ -154,6 +161,129 @@ class DeterministicRules:
             value_sar=deal.value_sar,
         )
 
+    def predict_batch(
+        self,
+        deals: DealColumns,
+        today: datetime,
+        apply_overrides: bool = True,
+        stage_days_to_invoice: Optional[dict[str, int]] = None,
+    ) -> BatchPrediction:
+        """Vectorized predict_deal (+ apply_overrides) over columnar deals.
+
+        Produces the same dates, confidences and assumptions as the per-deal
+        path; stage_days_to_invoice replaces STAGE_DAYS_TO_INVOICE for
+        what-if forecasts.
+
+        Args:
+            deals: Deals loaded by load_deal_columns
+            today: Reference date
+            apply_overrides: Apply the apply_overrides corrections
+            stage_days_to_invoice: Alternate stage -> days to invoice table
+
+        Returns:
+            BatchPrediction row-aligned with deals
+        """
+        table = self.STAGE_DAYS_TO_INVOICE if stage_days_to_invoice is None else stage_days_to_invoice
+        today64 = np.datetime64(_normalize_datetime(today), "us")
+
+        # Per-stage lookups, expanded to rows through stage_index
+        stages = [name.strip() for name in deals.stage_names]
+        known = np.array([stage in table for stage in stages], dtype=bool)[deals.stage_index]
+        stage_days = np.array([table.get(stage, 45) for stage in stages], dtype=np.int64)[deals.stage_index]
+        late = np.array([stage in self.LATE_STAGES for stage in stages], dtype=bool)[deals.stage_index]
+        invoiced = np.array([stage.lower() in self.INVOICED_STAGES for stage in stages], dtype=bool)[deals.stage_index]
+
+        changed = ~np.isnat(deals.stage_change_time)
+        days_in_stage = ((today64 - np.where(changed, deals.stage_change_time, today64)) // DAY).astype(np.int64)
+
+        # Steps 1-3: stage estimate, staleness delay, late-stage confidence
+        confidence = np.where(known, self.MEDIUM_CONFIDENCE, self.LOW_CONFIDENCE)
+        delay_days = np.select([days_in_stage > 60, days_in_stage > 30], [14, 7], 0).astype(np.int64)
+        confidence = np.select(
+            [days_in_stage > 60, days_in_stage > 30], [confidence - 0.1, confidence - 0.05], confidence,
+        )
+        confidence = np.where(late, self.HIGH_CONFIDENCE, confidence)
+
+        # Step 4: dates
+        payment_days = np.where(deals.is_aramco, self.ARAMCO_PAYMENT_DAYS, self.COMMERCIAL_PAYMENT_DAYS) * DAY
+        invoice_date = today64 + (stage_days + delay_days) * DAY
+
+        # Step 5: invoice already issued
+        invoice_date = np.where(invoiced, np.where(changed, deals.stage_change_time, today64), invoice_date)
+        payment_date = invoice_date + payment_days
+        confidence = np.clip(np.where(invoiced, 0.95, confidence), 0.3, 0.95)
+
+        invoice_overridden = np.zeros(len(deals), dtype=bool)
+        payment_overridden = np.zeros(len(deals), dtype=bool)
+        if apply_overrides:
+            invoice_overridden = (today64 - invoice_date) // DAY > 30
+            invoice_date = np.where(invoice_overridden, today64 + 7 * DAY, invoice_date)
+            confidence = np.where(invoice_overridden, np.maximum(0.3, confidence - 0.2), confidence)
+            payment_overridden = payment_date <= invoice_date
+            payment_date = np.where(
+                payment_overridden, invoice_date + self.COMMERCIAL_PAYMENT_DAYS * DAY, payment_date,
+            )
+
+        return BatchPrediction(
+            deals=deals,
+            invoice_date=invoice_date,
+            payment_date=payment_date,
+            confidence=confidence,
+            days_in_stage=days_in_stage,
+            stage_days=stage_days,
+            unknown_stage=~known,
+            delay_days=delay_days,
+            late_stage=late,
+            invoiced=invoiced,
+            invoice_overridden=invoice_overridden,
+            payment_overridden=payment_overridden,
+        )
+
+    def batch_to_predictions(self, batch: BatchPrediction) -> list[DealPrediction]:
+        """Build DealPrediction models (with assumptions) for every row of a batch."""
+        deals = batch.deals
+        predictions = []
+        for i in range(len(batch)):
+            stage = deals.stage_names[deals.stage_index[i]]
+            stage_normalized = stage.strip()
+
+            if batch.invoiced[i]:
+                assumptions = ["Invoice already issued at stage change"]
+            else:
+                if batch.unknown_stage[i]:
+                    assumptions = [f"Unknown stage '{stage_normalized}', using default 45 days"]
+                else:
+                    assumptions = [f"Stage '{stage_normalized}' estimate: {batch.stage_days[i]} days"]
+                if batch.delay_days[i] == 14:
+                    assumptions.append(f"Deal stuck ({batch.days_in_stage[i]} days in stage), added 14 days")
+                elif batch.delay_days[i] == 7:
+                    assumptions.append(f"Deal slow ({batch.days_in_stage[i]} days in stage), added 7 days")
+                if batch.late_stage[i]:
+                    assumptions.append("Late stage - high confidence in estimate")
+                if deals.is_aramco[i]:
+                    assumptions.append("Aramco deal - quick payment terms")
+                else:
+                    assumptions.append("Commercial payment terms (45 days)")
+            if batch.invoice_overridden[i]:
+                assumptions.append("Override: Invoice date was in past, adjusted to near future")
+            if batch.payment_overridden[i]:
+                assumptions.append("Override: Payment date before invoice, adjusted")
+
+            predictions.append(DealPrediction(
+                deal_id=int(deals.deal_id[i]),
+                deal_title=deals.title[i],
+                predicted_invoice_date=batch.invoice_date[i].item(),
+                predicted_payment_date=batch.payment_date[i].item(),
+                confidence=float(batch.confidence[i]),
+                assumptions=assumptions,
+                missing_fields=[],
+                reasoning=f"Deterministic prediction based on stage '{stage_normalized}'",
+                owner_name=deals.owner_name[i],
+                stage=stage,
+                value_sar=float(deals.value[i]),
+            ))
+        return predictions
+
     def precheck_deal(self, deal: DealForPrediction, today: datetime) -> Optional[DealPrediction]:
         """Check if we can make a deterministic prediction.
 
@@ -0,0 +1,188 @@
+"""Process-wide cache of the Stage and Pipeline dimension tables.
+
+Both tables are tiny and only change when sync_pipelines/sync_stages commit,
+yet services resolved names one SELECT per deal. DimensionCache keeps
+id -> name and name -> id maps in memory:
+- Versioned by the last "pipelines"/"stages" SyncMetadata sync times,
+  re-checked at most every VERSION_CHECK_SECONDS
+- Invalidated immediately by the pipeline and stage syncs
+- Reloaded when db.read_engine is swapped (tests, engine reconfiguration)
+
+Pipeline names are matched case-insensitively ("Pipeline" and "PIPELINE"
+both resolve to the commercial pipeline).
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from .. import db
+from ..constants import SYNC_PIPELINE_NAMES
+from ..db import Pipeline, Stage, SyncMetadata
+
+logger = logging.getLogger(__name__)
+
+# How often the sync-time version is re-read from SyncMetadata
+VERSION_CHECK_SECONDS = 30.0
+
+# SyncMetadata rows whose sync times version the cache
+VERSION_ENTITIES = ("pipelines", "stages")
+
+
+@dataclass(frozen=True)
+class StageDimension:
+    """Cached columns of one stage."""
+    id: int
+    name: str
+    pipeline_id: int
+    order_nr: int
+
+
+@dataclass
+class Dimensions:
+    """One immutable snapshot of the dimension tables."""
+    version: Tuple[Optional[datetime], ...] = ()
+    stages: Dict[int, StageDimension] = field(default_factory=dict)
+    pipeline_names: Dict[int, str] = field(default_factory=dict)
+    pipeline_ids: Dict[str, int] = field(default_factory=dict)  # casefolded name -> id
+
+
+class DimensionCache:
+    """Thread-safe, lazily loaded id/name lookups for stages and pipelines.
+
+    Usage:
+        dims = get_dimension_cache()
+        dims.stage_name(27)                 # "Order Received"
+        dims.pipeline_id("Aramco Projects")  # 5
+    """
+
+    def __init__(self, check_interval: float = VERSION_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._snapshot: Optional[Dimensions] = None
+        self._engine = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def _read_version(self, session: Session) -> Tuple[Optional[datetime], ...]:
+        rows = session.exec(
+            select(SyncMetadata.entity_type, SyncMetadata.last_sync_time)
+            .where(SyncMetadata.entity_type.in_(VERSION_ENTITIES))
+        ).all()
+        times = dict(rows)
+        return tuple(times.get(entity) for entity in VERSION_ENTITIES)
+
+    def _load(self, session: Session, version: Tuple[Optional[datetime], ...]) -> Dimensions:
+        stages = {
+            s.id: StageDimension(s.id, s.name, s.pipeline_id, s.order_nr)
+            for s in session.exec(select(Stage)).all()
+        }
+        pipelines = session.exec(select(Pipeline.id, Pipeline.name)).all()
+        self.loads += 1
+        logger.debug(f"Loaded {len(stages)} stages and {len(pipelines)} pipelines into the dimension cache")
+        return Dimensions(
+            version=version,
+            stages=stages,
+            pipeline_names={pid: name for pid, name in pipelines},
+            pipeline_ids={name.casefold(): pid for pid, name in pipelines},
+        )
+
+    def _current(self) -> Dimensions:
+        """Return the snapshot, reloading it if the engine or version changed."""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and self._engine is db.read_engine
+            and now - self._checked_at < self.check_interval
+        ):
+            return snapshot
+
+        with self._lock:
+            engine = db.read_engine
+            with Session(engine) as session:
+                version = self._read_version(session)
+                if self._snapshot is None or self._engine is not engine or self._snapshot.version != version:
+                    self._snapshot = self._load(session, version)
+                    self._engine = engine
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next lookup reloads it."""
+        with self._lock:
+            self._snapshot = None
+
+    # -------------------------------------------------------------------------
+    # Lookups
+    # -------------------------------------------------------------------------
+
+    def stage(self, stage_id: Optional[int]) -> Optional[StageDimension]:
+        """Cached stage, or None if unknown."""
+        return self._current().stages.get(stage_id)
+
+    def stage_name(self, stage_id: Optional[int], default: Optional[str] = "Unknown") -> Optional[str]:
+        """Stage name for an id."""
+        stage = self._current().stages.get(stage_id)
+        return stage.name if stage else default
+
+    def stage_ids_for_pipeline(self, pipeline_id: int) -> List[int]:
+        """Stage ids of a pipeline in board order."""
+        stages = [s for s in self._current().stages.values() if s.pipeline_id == pipeline_id]
+        return [s.id for s in sorted(stages, key=lambda s: s.order_nr)]
+
+    def stage_id(self, pipeline_id: int, stage_name: str) -> Optional[int]:
+        """Stage id for a (pipeline, stage name) pair."""
+        for stage in self._current().stages.values():
+            if stage.pipeline_id == pipeline_id and stage.name == stage_name:
+                return stage.id
+        return None
+
+    def pipeline_name(self, pipeline_id: Optional[int], default: Optional[str] = None) -> Optional[str]:
+        """Pipeline name for an id."""
+        return self._current().pipeline_names.get(pipeline_id, default)
+
+    def pipeline_id(self, name: Optional[str]) -> Optional[int]:
+        """Pipeline id for a name (case-insensitive), or None if unknown."""
+        if not name:
+            return None
+        return self._current().pipeline_ids.get(name.casefold())
+
+    def pipeline_ids(self, names: List[str]) -> List[int]:
+        """Ids of the named pipelines, skipping unknown names."""
+        ids = [self.pipeline_id(name) for name in names]
+        return [pid for pid in ids if pid is not None]
+
+
+# Global cache instance
+_dimension_cache: Optional[DimensionCache] = None
+
+
+def get_dimension_cache() -> DimensionCache:
+    """Get or create the dimension cache singleton."""
+    global _dimension_cache
+    if _dimension_cache is None:
+        _dimension_cache = DimensionCache()
+    return _dimension_cache
+
+
+def sync_pipeline_ids() -> List[int]:
+    """Ids of the pipelines synced regularly (SYNC_PIPELINE_NAMES)."""
+    return get_dimension_cache().pipeline_ids(SYNC_PIPELINE_NAMES)
+
+
+__all__ = [
+    "StageDimension",
+    "DimensionCache",
+    "get_dimension_cache",
+    "sync_pipeline_ids",
+]
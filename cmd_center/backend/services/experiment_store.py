@@ -0,0 +1,244 @@
+"""Persistent results for prompt A/B experiments.
+
+PromptExperiment keeps its per-variant stats in memory, so every API
+restart (frequent under uvicorn reload) used to wipe them. ExperimentStore
+persists them:
+- Experiment definitions (variants, traffic split, active flag) are saved
+  to prompt_experiment when created or promoted
+- Each recorded result is appended to an in-memory buffer; the hot path
+  takes one lock and does no I/O
+- A background flusher writes the buffer to prompt_experiment_result in
+  one transaction per batch, every flush interval or as soon as a batch
+  fills; stop() flushes what is left
+- At startup load_experiments() rebuilds experiments and their aggregates
+  with one GROUP BY over the results
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import case, func, insert, select
+from sqlmodel import Session
+
+from .. import db
+from ..db import PromptExperimentRecord, PromptExperimentResult
+from ..integrations.config import get_config
+from .prompt_registry import PromptExperiment, PromptTemplate, PromptVariantStats
+
+logger = logging.getLogger(__name__)
+
+
+class ExperimentStore:
+    """Append-only, batched writer and loader for experiment results."""
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 2.0, max_pending: int = 50_000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: list[dict] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def append(
+        self,
+        experiment_id: str,
+        variant_id: str,
+        success: bool,
+        confidence: Optional[float] = None,
+        cost_usd: Optional[float] = None,
+        latency_ms: Optional[int] = None,
+    ) -> None:
+        """Buffer one result for the next flush (no I/O)."""
+        row = {
+            "experiment_id": experiment_id,
+            "variant_id": variant_id,
+            "success": success,
+            "confidence": confidence,
+            "cost_usd": cost_usd,
+            "latency_ms": latency_ms,
+            "recorded_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                # The flusher is failing or not running; keep the newest results
+                self._pending.pop(0)
+                self._dropped += 1
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+
+        if full and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def flush(self) -> int:
+        """Write buffered results in one transaction.
+
+        Returns:
+            Rows written
+        """
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(PromptExperimentResult), rows)
+        except Exception:
+            with self._lock:
+                # Retry with the next flush, ahead of newer results
+                self._pending[:0] = rows[-self.max_pending:]
+            raise
+
+        self._written += len(rows)
+        self._batches += 1
+        return len(rows)
+
+    async def start(self) -> None:
+        """Start the background flusher on the running loop."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.error(f"Final experiment results flush failed: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Experiment results flush failed: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "written": self._written,
+            "batches": self._batches,
+            "dropped": self._dropped,
+            "flusher_running": self._task is not None and not self._task.done(),
+        }
+
+    # ------------------------------------------------------------------
+    # Definitions
+    # ------------------------------------------------------------------
+
+    def save_experiment(self, experiment: PromptExperiment) -> None:
+        """Insert or update an experiment definition."""
+        with Session(db.engine) as session:
+            record = session.get(PromptExperimentRecord, experiment.experiment_id) or PromptExperimentRecord(
+                experiment_id=experiment.experiment_id,
+                created_at=experiment.created_at,
+            )
+            record.base_prompt_id = experiment.base_prompt_id
+            record.variants_json = json.dumps({
+                variant_id: prompt.model_dump() for variant_id, prompt in experiment.variants.items()
+            })
+            record.traffic_split_json = json.dumps(experiment.traffic_split)
+            record.active = experiment.active
+            session.add(record)
+            session.commit()
+
+    def load_experiments(self) -> list[PromptExperiment]:
+        """Saved experiments with their stats aggregated from the stored results."""
+        with Session(db.read_engine) as session:
+            records = session.execute(select(PromptExperimentRecord)).scalars().all()
+            aggregates = session.execute(self._aggregate_query()).all()
+
+        stats: dict[str, dict[str, PromptVariantStats]] = {}
+        for row in aggregates:
+            stats.setdefault(row.experiment_id, {})[row.variant_id] = PromptVariantStats(
+                variant_id=row.variant_id,
+                uses=row.uses,
+                total_confidence=row.total_confidence,
+                successes=row.successes,
+                failures=row.uses - row.successes,
+                total_cost_usd=row.total_cost_usd,
+                total_latency_ms=row.total_latency_ms,
+                total_quality=row.total_quality,
+                total_quality_sq=row.total_quality_sq,
+            )
+
+        experiments = []
+        for record in records:
+            experiments.append(PromptExperiment(
+                experiment_id=record.experiment_id,
+                base_prompt_id=record.base_prompt_id,
+                variants={
+                    variant_id: PromptTemplate(**fields)
+                    for variant_id, fields in json.loads(record.variants_json).items()
+                },
+                traffic_split=json.loads(record.traffic_split_json),
+                stats=stats.get(record.experiment_id, {}),
+                active=record.active,
+                created_at=record.created_at,
+            ))
+        return experiments
+
+    @staticmethod
+    def _aggregate_query():
+        result = PromptExperimentResult
+        quality = case((result.success, func.coalesce(result.confidence, 0.0)), else_=0.0)
+        return (
+            select(
+                result.experiment_id,
+                result.variant_id,
+                func.count().label("uses"),
+                func.sum(case((result.success, 1), else_=0)).label("successes"),
+                func.coalesce(func.sum(result.confidence), 0.0).label("total_confidence"),
+                func.coalesce(func.sum(result.cost_usd), 0.0).label("total_cost_usd"),
+                func.coalesce(func.sum(result.latency_ms), 0).label("total_latency_ms"),
+                func.sum(quality).label("total_quality"),
+                func.sum(quality * quality).label("total_quality_sq"),
+            )
+            .group_by(result.experiment_id, result.variant_id)
+        )
+
+
+# Global store instance
+_experiment_store: Optional[ExperimentStore] = None
+
+
+def get_experiment_store() -> ExperimentStore:
+    """Get or create experiment store singleton."""
+    global _experiment_store
+    if _experiment_store is None:
+        config = get_config()
+        _experiment_store = ExperimentStore(
+            batch_size=config.experiment_flush_batch_size,
+            flush_interval=config.experiment_flush_interval_seconds,
+        )
+    return _experiment_store
@@ -0,0 +1,329 @@
+"""Prioritized scheduler for background sync jobs.
+
+Replaces independent fixed-interval sleep loops with one scheduler that:
+- Starts due jobs in priority order
+- Runs each job on its own cadence plus random jitter
+- Enforces a global job concurrency budget and a separate budget for jobs
+  that write to the SQLite cache
+- Coalesces duplicate triggers for a job that is already queued or running
+- Persists next-run times in SyncJobState so a restart keeps the schedule
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from .. import db
+from ..db import SyncJobState
+from .bulk_upsert import bulk_upsert
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long the timer sleeps before re-checking the schedule
+MAX_TIMER_SLEEP_SECONDS = 60.0
+
+
+@dataclass
+class SyncJob:
+    """A schedulable sync job."""
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: timedelta
+    priority: int = 10  # Lower runs first
+    jitter: timedelta = timedelta(0)  # Random delay added to each interval
+    writes_db: bool = True  # Counts against the DB writer budget
+    description: str = ""
+
+
+@dataclass
+class JobStats:
+    """Run statistics for one job since process start."""
+    runs: int = 0
+    failures: int = 0
+    coalesced: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_s: Optional[float] = None
+    total_duration_s: float = 0.0
+    last_error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "coalesced": self.coalesced,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_duration_s": round(self.last_duration_s, 3) if self.last_duration_s is not None else None,
+            "avg_duration_s": round(self.total_duration_s / self.runs, 3) if self.runs else None,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """Priority queue scheduler for sync jobs.
+
+    Usage:
+        scheduler = JobScheduler(max_concurrency=2, max_db_writers=1)
+        scheduler.register(SyncJob("deals", run_deals_sync, timedelta(hours=1), priority=0))
+        await scheduler.start()
+        scheduler.trigger("deals")  # manual run
+        await scheduler.stop()
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_db_writers: int = 1, persist: bool = True):
+        self.max_concurrency = max_concurrency
+        self.max_db_writers = max_db_writers
+        self.persist = persist
+        self.jobs: Dict[str, SyncJob] = {}
+        self.stats: Dict[str, JobStats] = {}
+        self.next_run: Dict[str, datetime] = {}
+        self._queue: List[Tuple[int, int, str]] = []
+        self._queued: Set[str] = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._rerun: Set[str] = set()
+        self._saving = 0  # Finished jobs whose state write is in flight
+        self._seq = itertools.count()
+        self._timer_task: Optional[asyncio.Task] = None
+        self._timer_wake: Optional[asyncio.Event] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    # -------------------------------------------------------------------------
+    # Registration and triggers
+    # -------------------------------------------------------------------------
+
+    def register(self, job: SyncJob) -> None:
+        """Register a job; it first runs at its persisted next-run time or on start."""
+        self.jobs[job.name] = job
+        self.stats.setdefault(job.name, JobStats())
+
+    def trigger(self, name: str, reason: str = "manual") -> str:
+        """Queue a job to run as soon as budgets allow.
+
+        Returns:
+            "queued", or "coalesced" if the job was already queued or running
+            (a running job is queued once more after it finishes)
+
+        Raises:
+            KeyError: If no job with that name is registered
+        """
+        if name not in self.jobs:
+            raise KeyError(name)
+
+        if name in self._queued or name in self._rerun:
+            self.stats[name].coalesced += 1
+            return "coalesced"
+        if name in self._running:
+            self._rerun.add(name)
+            self.stats[name].coalesced += 1
+            return "coalesced"
+
+        logger.info(f"Queued sync job '{name}' ({reason})")
+        self._enqueue(name)
+        self._dispatch()
+        return "queued"
+
+    def _enqueue(self, name: str) -> None:
+        self._queued.add(name)
+        heapq.heappush(self._queue, (self.jobs[name].priority, next(self._seq), name))
+        self._idle.clear()
+
+    # -------------------------------------------------------------------------
+    # Dispatch
+    # -------------------------------------------------------------------------
+
+    def _writers_running(self) -> int:
+        return sum(1 for name in self._running if self.jobs[name].writes_db)
+
+    def _dispatch(self) -> None:
+        """Start queued jobs in priority order while budgets allow."""
+        deferred = []
+        while self._queue and len(self._running) < self.max_concurrency:
+            item = heapq.heappop(self._queue)
+            job = self.jobs[item[2]]
+            if job.writes_db and self._writers_running() >= self.max_db_writers:
+                # Let a lower-priority job that does not write go first
+                deferred.append(item)
+                continue
+            self._queued.discard(job.name)
+            self._running[job.name] = asyncio.create_task(self._run(job))
+        for item in deferred:
+            heapq.heappush(self._queue, item)
+
+    async def _run(self, job: SyncJob) -> None:
+        stats = self.stats[job.name]
+        started_at = datetime.now(timezone.utc)
+        stats.last_started_at = started_at
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        error: Optional[str] = None
+        try:
+            await job.func()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = str(e)
+            stats.failures += 1
+            logger.error(f"Sync job '{job.name}' failed: {e}")
+        finally:
+            duration = loop.time() - start
+            stats.runs += 1
+            stats.last_duration_s = duration
+            stats.total_duration_s += duration
+            stats.last_error = error
+            self._running.pop(job.name, None)
+
+        if job.name in self._rerun:
+            self._rerun.discard(job.name)
+            self._enqueue(job.name)
+        # Hand the freed slots on before the state write, which may wait on the write lock
+        self._dispatch()
+        self._saving += 1
+        try:
+            await self._save_state(
+                job.name,
+                last_started_at=started_at,
+                last_duration_ms=int(duration * 1000),
+                last_status="failed" if error else "success",
+                last_error=error,
+            )
+        finally:
+            self._saving -= 1
+        if not self._running and not self._queue and not self._saving:
+            self._idle.set()
+
+    # -------------------------------------------------------------------------
+    # Timer
+    # -------------------------------------------------------------------------
+
+    def _next_run_after(self, job: SyncJob, now: datetime) -> datetime:
+        jitter = random.uniform(0, job.jitter.total_seconds())
+        return now + job.interval + timedelta(seconds=jitter)
+
+    async def _timer(self) -> None:
+        """Trigger jobs as their next-run times come due."""
+        while True:
+            now = datetime.now(timezone.utc)
+            due_now = [name for name, due in self.next_run.items() if due <= now]
+            for name in due_now:
+                self.next_run[name] = self._next_run_after(self.jobs[name], now)
+                self.trigger(name, reason="schedule")
+            # Persisted after triggering so due jobs never wait on the write
+            for name in due_now:
+                await self._save_state(name)
+
+            wait = min(
+                [(due - now).total_seconds() for due in self.next_run.values()]
+                + [MAX_TIMER_SLEEP_SECONDS]
+            )
+            self._timer_wake.clear()
+            try:
+                await asyncio.wait_for(self._timer_wake.wait(), timeout=max(wait, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def reschedule(self, name: str, when: datetime) -> None:
+        """Move a job's next scheduled run."""
+        self.next_run[name] = when
+        await self._save_state(name)
+        if self._timer_wake is not None:
+            self._timer_wake.set()
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _load_state(self) -> None:
+        """Load persisted next-run times; unknown jobs are due immediately."""
+        now = datetime.now(timezone.utc)
+        persisted: Dict[str, datetime] = {}
+        if self.persist:
+            with Session(db.engine) as session:
+                for state in session.exec(select(SyncJobState)).all():
+                    next_run_at = state.next_run_at
+                    if next_run_at.tzinfo is None:
+                        next_run_at = next_run_at.replace(tzinfo=timezone.utc)
+                    persisted[state.job_name] = next_run_at
+        for name in self.jobs:
+            self.next_run[name] = persisted.get(name, now)
+
+    def _write_state(self, row: Dict[str, Any]) -> None:
+        with Session(db.engine) as session:
+            bulk_upsert(session, SyncJobState, [row], conflict_key="job_name", change_column=None)
+            session.commit()
+
+    async def _save_state(self, name: str, **fields) -> None:
+        if not self.persist:
+            return
+        row = dict(job_name=name, next_run_at=self.next_run[name], **fields)
+        try:
+            # Off the event loop: a sync writer may hold the SQLite write lock
+            await asyncio.to_thread(self._write_state, row)
+        except Exception as e:
+            # The schedule still works in memory; it just won't survive a restart
+            logger.warning(f"Could not persist state for sync job '{name}': {e}")
+
+    # -------------------------------------------------------------------------
+    # Lifecycle and status
+    # -------------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Load the persisted schedule and start the timer."""
+        if self._timer_task is not None and not self._timer_task.done():
+            return
+        self._timer_wake = asyncio.Event()
+        self._load_state()
+        self._timer_task = asyncio.create_task(self._timer())
+        logger.info(f"Sync job scheduler started with {len(self.jobs)} jobs")
+
+    async def stop(self) -> None:
+        """Stop the timer and cancel running jobs."""
+        tasks = list(self._running.values())
+        if self._timer_task is not None:
+            tasks.append(self._timer_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timer_task = None
+        self._running.clear()
+        self._queue.clear()
+        self._queued.clear()
+        self._rerun.clear()
+        logger.info("Sync job scheduler stopped")
+
+    async def wait_idle(self) -> None:
+        """Wait until no job is queued or running."""
+        await self._idle.wait()
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth, running jobs and per-job schedule and run durations."""
+        return {
+            "queue_depth": len(self._queue),
+            "queued": [name for _, _, name in sorted(self._queue)],
+            "running": sorted(self._running),
+            "max_concurrency": self.max_concurrency,
+            "max_db_writers": self.max_db_writers,
+            "jobs": {
+                name: {
+                    "priority": job.priority,
+                    "interval_s": job.interval.total_seconds(),
+                    "writes_db": job.writes_db,
+                    "next_run_at": self.next_run[name].isoformat() if name in self.next_run else None,
+                    **self.stats[name].to_dict(),
+                }
+                for name, job in sorted(self.jobs.items(), key=lambda item: item[1].priority)
+            },
+        }
+
+
+__all__ = [
+    "SyncJob",
+    "JobStats",
+    "JobScheduler",
+]
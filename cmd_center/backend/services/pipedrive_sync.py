@@ -3,14 +3,31 @@
 import asyncio
 import json
 from typing import Any, Dict, List, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-import httpx
+from sqlalchemy import update
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import Session, select
 
 from ..integrations.config import get_config
-from ..db import engine, Pipeline, Stage, Deal, Note, SyncMetadata
-from ..constants import SYNC_PIPELINES
+from ..integrations.pipedrive_transport import get_pipedrive_transport
+from ..db import engine, Pipeline, Stage, Deal, Note, SyncMetadata, DealSyncState
+from .bulk_upsert import bulk_upsert
+from .dimension_cache import get_dimension_cache, sync_pipeline_ids
+from .result_cache import bump_data_version
+
+
+# SyncMetadata rows used by the /recents driven deal sync
+DEALS_RECENTS_CURSOR = "deals_recents"
+DEALS_RECONCILE = "deals_reconcile"
+# Wall-clock time of the last successful deal sync in either mode
+DEALS_SYNC = "deals"
+
+# How often the incremental deal sync falls back to a full pipeline sweep
+DEALS_RECONCILE_INTERVAL = timedelta(days=7)
+
+# Deals per stage history write transaction
+STAGE_HISTORY_CHUNK_SIZE = 50
 
 
 class PipedriveSyncError(Exception):
@@ -25,9 +42,9 @@ def _get_token_and_base() -> tuple[str, str]:
     return token, config.pipedrive_api_url
 
 
-async def _pd_get(client: httpx.AsyncClient, path: str, token: str, base_url: str, **params) -> Dict[str, Any]:
+async def _pd_get(path: str, token: str, base_url: str, **params) -> Dict[str, Any]:
     params["api_token"] = token
-    res = await client.get(f"{base_url}/{path}", params=params, timeout=30.0)
+    res = await get_pipedrive_transport().get(f"{base_url}/{path}", params=params)
     res.raise_for_status()
     return res.json()
 
@@ -53,22 +70,45 @@ def get_last_sync_time(entity_type: str) -> Optional[datetime]:
         return None
 
 
+def get_sync_cursor(entity_type: str) -> Optional[datetime]:
+    """Get the stored cursor time for an entity type, regardless of last status.
+
+    Unlike get_last_sync_time, a failed run keeps its cursor so the next run
+    can resume from it instead of starting over.
+    """
+    with Session(engine) as session:
+        meta = session.exec(
+            select(SyncMetadata).where(SyncMetadata.entity_type == entity_type)
+        ).first()
+        if meta is None:
+            return None
+        dt = meta.last_sync_time
+        return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
 def update_sync_metadata(
     entity_type: str,
     status: str,
     records_synced: int = 0,
     records_total: int = 0,
     duration_ms: int = 0,
-    error_message: Optional[str] = None
+    error_message: Optional[str] = None,
+    sync_time: Optional[datetime] = None,
 ):
-    """Update sync metadata after a sync operation."""
+    """Update sync metadata after a sync operation.
+
+    Args:
+        sync_time: Time to store as last_sync_time (defaults to now). Cursor
+            based syncs pass the server-side timestamp here.
+    """
+    sync_time = sync_time or datetime.now(timezone.utc)
     with Session(engine) as session:
         meta = session.exec(
             select(SyncMetadata).where(SyncMetadata.entity_type == entity_type)
         ).first()
         
         if meta:
-            meta.last_sync_time = datetime.now(timezone.utc)
+            meta.last_sync_time = sync_time
             meta.status = status
             meta.records_synced = records_synced
             meta.records_total = records_total
@@ -77,7 +117,7 @@ def update_sync_metadata(
         else:
             meta = SyncMetadata(
                 entity_type=entity_type,
-                last_sync_time=datetime.now(timezone.utc),
+                last_sync_time=sync_time,
                 status=status,
                 records_synced=records_synced,
                 records_total=records_total,
@@ -99,24 +139,15 @@ async def sync_pipelines() -> int:
     
     try:
         token, base_url = _get_token_and_base()
-        async with httpx.AsyncClient() as client:
-            payload = await _pd_get(client, "pipelines", token, base_url)
+        payload = await _pd_get("pipelines", token, base_url)
         
         items = payload.get("data") or []
         
         with Session(engine) as session:
-            for p in items:
-                pipeline = Pipeline(
-                    id=p["id"],
-                    name=p["name"],
-                    order_nr=p["order_nr"],
-                    is_deleted=p.get("is_deleted", False),
-                    is_deal_probability_enabled=p.get("is_deal_probability_enabled", False),
-                    add_time=_parse_datetime(p.get("add_time")),
-                    update_time=_parse_datetime(p.get("update_time")),
-                )
-                session.merge(pipeline)
+            bulk_upsert(session, Pipeline, [_pipeline_row(p) for p in items])
             session.commit()
+        get_dimension_cache().invalidate()
+        bump_data_version("dimensions")
         
         duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
         update_sync_metadata("pipelines", "success", len(items), len(items), duration_ms)
@@ -138,27 +169,15 @@ async def sync_stages(pipeline_id: Optional[int] = None) -> int:
         if pipeline_id:
             params["pipeline_id"] = pipeline_id
 
-        async with httpx.AsyncClient() as client:
-            payload = await _pd_get(client, "stages", token, base_url, **params)
+        payload = await _pd_get("stages", token, base_url, **params)
         
         items = payload.get("data") or []
         
         with Session(engine) as session:
-            for s in items:
-                stage = Stage(
-                    id=s["id"],
-                    name=s["name"],
-                    order_nr=s["order_nr"],
-                    pipeline_id=s["pipeline_id"],
-                    deal_probability=s.get("deal_probability", 0),
-                    is_deal_rot_enabled=s.get("is_deal_rot_enabled", False),
-                    days_to_rotten=s.get("days_to_rotten"),
-                    is_deleted=s.get("is_deleted", False),
-                    add_time=_parse_datetime(s.get("add_time")),
-                    update_time=_parse_datetime(s.get("update_time")),
-                )
-                session.merge(stage)
+            bulk_upsert(session, Stage, [_stage_row(s) for s in items])
             session.commit()
+        get_dimension_cache().invalidate()
+        bump_data_version("dimensions")
         
         duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
         update_sync_metadata("stages", "success", len(items), len(items), duration_ms)
@@ -198,31 +217,29 @@ async def sync_deals_for_pipeline(
         start = 0
         limit = 500
         
-        async with httpx.AsyncClient() as client:
-            while True:
-                payload = await _pd_get(
-                    client,
-                    "deals",
-                    token,
-                    base_url,
-                    pipeline_id=pipeline_id,
-                    status=status,
-                    start=start,
-                    limit=limit,
-                )
-                items = payload.get("data") or []
-                if not items:
-                    break
-                
-                all_deals.extend(items)
-                
-                # Check pagination
-                additional = payload.get("additional_data") or {}
-                pagination = additional.get("pagination") or {}
-                if not pagination.get("more_items_in_collection"):
-                    break
-                
-                start = pagination.get("next_start", 0)
+        while True:
+            payload = await _pd_get(
+                "deals",
+                token,
+                base_url,
+                pipeline_id=pipeline_id,
+                status=status,
+                start=start,
+                limit=limit,
+            )
+            items = payload.get("data") or []
+            if not items:
+                break
+            
+            all_deals.extend(items)
+            
+            # Check pagination
+            additional = payload.get("additional_data") or {}
+            pagination = additional.get("pagination") or {}
+            if not pagination.get("more_items_in_collection"):
+                break
+            
+            start = pagination.get("next_start", 0)
         
         # Filter to only updated deals if incremental
         if last_sync and incremental:
@@ -233,118 +250,273 @@ async def sync_deals_for_pipeline(
         else:
             deals_to_upsert = all_deals
         
-        # Upsert deals
+        # Upsert deals (rows with an unchanged update_time are skipped)
         with Session(engine) as session:
-            for d in deals_to_upsert:
-                # Extract owner name
-                owner_name = d.get("owner_name")
-                if not owner_name:
-                    owner = d.get("owner_id") or {}
-                    if isinstance(owner, dict):
-                        owner_name = owner.get("name")
-                
-                # Extract org name
-                org_name = d.get("org_name")
-                if not org_name:
-                    org = d.get("org_id") or {}
-                    if isinstance(org, dict):
-                        org_name = org.get("name")
-                
-                deal = Deal(
-                    id=d["id"],
-                    title=d["title"],
-                    pipeline_id=d["pipeline_id"],
-                    stage_id=d["stage_id"],
-                    owner_name=owner_name,
-                    owner_id=d.get("owner_id") if isinstance(d.get("owner_id"), int) else None,
-                    org_name=org_name,
-                    org_id=d.get("org_id") if isinstance(d.get("org_id"), int) else None,
-                    value=float(d.get("value") or 0.0),
-                    currency=d.get("currency", "SAR"),
-                    status=d["status"],
-                    add_time=_parse_datetime(d.get("add_time")),
-                    update_time=_parse_datetime(d.get("update_time")),
-                    stage_change_time=_parse_datetime(d.get("stage_change_time")),
-                    expected_close_date=_parse_datetime(d.get("expected_close_date")),
-                    last_activity_date=_parse_datetime(d.get("last_activity_date")),
-                    next_activity_date=_parse_datetime(d.get("next_activity_date")),
-                    next_activity_id=d.get("next_activity_id"),
-                    lost_reason=d.get("lost_reason"),
-                    close_time=_parse_datetime(d.get("close_time")),
-                    won_time=_parse_datetime(d.get("won_time")),
-                    lost_time=_parse_datetime(d.get("lost_time")),
-                    file_count=d.get("files_count", 0),
-                    notes_count=d.get("notes_count", 0),
-                    email_messages_count=d.get("email_messages_count", 0),
-                    activities_count=d.get("activities_count", 0),
-                    done_activities_count=d.get("done_activities_count", 0),
-                    last_incoming_mail_time=_parse_datetime(d.get("last_incoming_mail_time")),
-                    last_outgoing_mail_time=_parse_datetime(d.get("last_outgoing_mail_time")),
-                    raw_json=json.dumps(d),
-                )
-                session.merge(deal)
+            synced = bulk_upsert(session, Deal, [_deal_row(d) for d in deals_to_upsert])
             session.commit()
         
         duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
         update_sync_metadata(
             entity_type, "success",
-            records_synced=len(deals_to_upsert),
+            records_synced=synced,
             records_total=len(all_deals),
             duration_ms=duration_ms
         )
         
-        return len(deals_to_upsert), len(all_deals)
+        return synced, len(all_deals)
     
     except Exception as e:
         update_sync_metadata(entity_type, "failed", error_message=str(e))
         raise
 
 
+async def sync_recent_deals(pipeline_ids: List[int], since: datetime) -> dict:
+    """
+    Sync deals changed since a cursor using the Pipedrive /recents feed.
+
+    Only changed deals are transferred. Deals are upserted when they belong to
+    one of the tracked pipelines or are already cached (so deals that were
+    moved out of a tracked pipeline, won, lost or deleted are updated too).
+
+    Args:
+        pipeline_ids: Pipedrive pipeline IDs to track
+        since: Cursor; only deals changed at or after this time are fetched
+
+    Returns:
+        {
+            'synced': int,       # deals inserted or updated
+            'total': int,        # deal changes returned by /recents
+            'requests': int,     # API pages fetched
+            'cursor': datetime,  # new cursor (server time of the last change seen)
+        }
+    """
+    token, base_url = _get_token_and_base()
+    tracked = set(pipeline_ids)
+
+    changed: Dict[int, Dict[str, Any]] = {}
+    cursor = since
+    requests = 0
+    start = 0
+    limit = 500
+
+    while True:
+        payload = await _pd_get(
+            "recents",
+            token,
+            base_url,
+            since_timestamp=since.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            items="deal",
+            start=start,
+            limit=limit,
+        )
+        requests += 1
+
+        for item in payload.get("data") or []:
+            d = item.get("data")
+            if item.get("item") != "deal" or not isinstance(d, dict) or "id" not in d:
+                continue
+            # Later entries win if a deal changed more than once
+            changed[d["id"]] = d
+
+        additional = payload.get("additional_data") or {}
+        last_seen = _parse_datetime(additional.get("last_timestamp_on_page"))
+        if last_seen and last_seen > cursor:
+            cursor = last_seen
+
+        pagination = additional.get("pagination") or {}
+        if not pagination.get("more_items_in_collection"):
+            break
+        start = pagination.get("next_start", 0)
+
+    with Session(engine) as session:
+        cached_ids = set()
+        if changed:
+            cached_ids = set(session.exec(
+                select(Deal.id).where(Deal.id.in_(list(changed.keys())))
+            ).all())
+
+        rows = [
+            _deal_row(d) for deal_id, d in changed.items()
+            if d.get("pipeline_id") in tracked or deal_id in cached_ids
+        ]
+        synced = bulk_upsert(session, Deal, rows)
+        session.commit()
+
+    return {
+        "synced": synced,
+        "total": len(changed),
+        "requests": requests,
+        "cursor": cursor,
+    }
+
+
+async def sync_deals(
+    pipeline_ids: Optional[List[int]] = None,
+    status: str = "open",
+    force_full: bool = False,
+) -> dict:
+    """
+    Sync deals for the tracked pipelines, incrementally where possible.
+
+    Normal runs fetch only changed deals from /recents starting at the cursor
+    stored in SyncMetadata. A full pipeline sweep runs instead when there is
+    no cursor yet, when the weekly reconciliation is due, or when forced.
+
+    Args:
+        pipeline_ids: Pipedrive pipeline IDs (defaults to the SYNC_PIPELINE_NAMES pipelines)
+        status: Deal status filter used by full sweeps
+        force_full: Always run a full sweep
+
+    Returns:
+        {
+            'mode': "incremental" | "full",
+            'synced': int,
+            'total': int,
+            'cursor': datetime,
+        }
+
+    Raises:
+        PipedriveSyncError: If no tracked pipeline is cached yet; the sync
+            metadata is left untouched so the next run sweeps again
+    """
+    pipeline_ids = list(pipeline_ids or sync_pipeline_ids())
+    if not pipeline_ids:
+        raise PipedriveSyncError("No tracked pipelines cached; sync pipelines before deals")
+    start_time = datetime.now(timezone.utc)
+
+    cursor = get_sync_cursor(DEALS_RECENTS_CURSOR)
+    last_reconcile = get_last_sync_time(DEALS_RECONCILE)
+    reconcile_due = last_reconcile is None or start_time - last_reconcile > DEALS_RECONCILE_INTERVAL
+
+    if force_full or cursor is None or reconcile_due:
+        synced = total = 0
+        for pipeline_id in pipeline_ids:
+            pipeline_synced, pipeline_total = await sync_deals_for_pipeline(
+                pipeline_id, status=status, incremental=False
+            )
+            synced += pipeline_synced
+            total += pipeline_total
+
+        duration_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
+        update_sync_metadata(DEALS_RECONCILE, "success", synced, total, duration_ms)
+        # Changes made while the sweep was running are picked up by the next incremental run
+        update_sync_metadata(DEALS_RECENTS_CURSOR, "success", synced, total, duration_ms, sync_time=start_time)
+        update_sync_metadata(DEALS_SYNC, "success", synced, total, duration_ms)
+        return {"mode": "full", "synced": synced, "total": total, "cursor": start_time}
+
+    try:
+        result = await sync_recent_deals(pipeline_ids, since=cursor)
+    except Exception as e:
+        # Keep the old cursor so the next run resumes from it
+        update_sync_metadata(DEALS_RECENTS_CURSOR, "failed", error_message=str(e), sync_time=cursor)
+        raise
+
+    duration_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
+    update_sync_metadata(
+        DEALS_RECENTS_CURSOR, "success",
+        records_synced=result["synced"],
+        records_total=result["total"],
+        duration_ms=duration_ms,
+        sync_time=result["cursor"],
+    )
+    update_sync_metadata(DEALS_SYNC, "success", result["synced"], result["total"], duration_ms)
+    return {
+        "mode": "incremental",
+        "synced": result["synced"],
+        "total": result["total"],
+        "cursor": result["cursor"],
+    }
+
+
 async def sync_notes_for_deal(deal_id: int) -> int:
     """
     Sync notes for a specific deal.
     
     Called on-demand when viewing deal details (not bulk synced).
     """
-    entity_type = f"notes_{deal_id}"
-    start_time = datetime.now()
-    
     try:
         token, base_url = _get_token_and_base()
-        async with httpx.AsyncClient() as client:
-            payload = await _pd_get(client, "notes", token, base_url, deal_id=deal_id)
+        payload = await _pd_get("notes", token, base_url, deal_id=deal_id)
         
         items = payload.get("data") or []
         
         with Session(engine) as session:
-            for n in items:
-                user = n.get("user") or {}
-                note = Note(
-                    id=n["id"],
-                    deal_id=n.get("deal_id"),
-                    active_flag=n.get("active_flag", True),
-                    user_name=user.get("name") if isinstance(user, dict) else None,
-                    user_id=user.get("id") if isinstance(user, dict) else None,
-                    content=n.get("content", ""),
-                    add_time=_parse_datetime(n.get("add_time")),
-                    update_time=_parse_datetime(n.get("update_time")),
-                    lead_id=n.get("lead_id"),
-                )
-                session.merge(note)
+            deal = session.get(Deal, deal_id)
+            bulk_upsert(session, Note, [_note_row(n) for n in items])
+            bulk_upsert(
+                session, DealSyncState,
+                [_notes_state_row(
+                    deal_id,
+                    notes_count=deal.notes_count if deal else None,
+                    deal_update_time=deal.update_time if deal else None,
+                )],
+                conflict_key="deal_id", change_column=None,
+            )
             session.commit()
         
-        duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-        update_sync_metadata(entity_type, "success", len(items), len(items), duration_ms)
-        
         return len(items)
     
     except Exception as e:
-        update_sync_metadata(entity_type, "failed", error_message=str(e))
+        with Session(engine) as session:
+            bulk_upsert(
+                session, DealSyncState,
+                [_notes_state_row(deal_id, status="failed", error=str(e))],
+                conflict_key="deal_id", change_column=None,
+            )
+            session.commit()
         raise
 
 
+def _notes_state_row(
+    deal_id: int,
+    notes_count: Optional[int] = None,
+    deal_update_time: Optional[datetime] = None,
+    status: str = "success",
+    error: Optional[str] = None,
+    synced_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """DealSyncState column values for one deal's notes sync."""
+    return dict(
+        deal_id=deal_id,
+        notes_synced_at=synced_at or datetime.now(timezone.utc),
+        notes_count=notes_count,
+        notes_deal_update_time=deal_update_time,
+        notes_status=status,
+        notes_error=error,
+    )
+
+
+def _notes_sync_due(
+    notes_count: Optional[int],
+    update_time: Optional[datetime],
+    state: Optional[DealSyncState],
+    now: datetime,
+    ttl_minutes: int,
+) -> bool:
+    """Whether a deal's notes must be refetched.
+
+    A deal is due when it has never synced successfully or its notes_count or
+    update_time moved since the last notes sync. Deals cached without an
+    update_time fall back to the TTL.
+    """
+    if state is None or state.notes_status != "success" or state.notes_synced_at is None:
+        return True
+    if state.notes_count != notes_count:
+        return True
+    update_time = _parse_datetime(update_time)
+    if update_time is not None:
+        seen = _parse_datetime(state.notes_deal_update_time)
+        return seen is None or update_time > seen
+    return now - _parse_datetime(state.notes_synced_at) > timedelta(minutes=ttl_minutes)
+
+
 async def sync_notes_for_open_deals(limit_per_deal: int = 5, ttl_minutes: int = 30, concurrency: int = 8) -> dict:
-    """Sync the most recent notes for open deals in specified pipelines."""
+    """Sync the most recent notes for open deals in specified pipelines.
+
+    Candidate deals and their DealSyncState are read in one query, only deals
+    whose notes_count or update_time changed are fetched, and all notes and
+    state rows are written in a single transaction at the end.
+    """
     # 1. Query pipelines
     with Session(engine) as session:
         pipelines = session.exec(
@@ -366,24 +538,25 @@ async def sync_notes_for_open_deals(limit_per_deal: int = 5, ttl_minutes: int =
             "errors": [{"error": "No target pipelines found", "pipelines": pipeline_dict}]
         }
 
-    # 3. Query open deals
+    # 3. Query open deals together with their notes sync state
     with Session(engine) as session:
-        deals = session.exec(
-            select(Deal).where(
+        candidates = session.exec(
+            select(Deal.id, Deal.pipeline_id, Deal.notes_count, Deal.update_time, DealSyncState)
+            .outerjoin(DealSyncState, DealSyncState.deal_id == Deal.id)
+            .where(
                 Deal.status == "open",
                 Deal.pipeline_id.in_(pipeline_ids)
             )
         ).all()
 
-    eligible_open_deals = len(deals)
+    eligible_open_deals = len(candidates)
 
-    # 4. Determine stale deals
-    stale_deals = []
-    for deal in deals:
-        entity_type = f"notes_{deal.id}"
-        last_sync = get_last_sync_time(entity_type)
-        if last_sync is None or (datetime.now(timezone.utc) - last_sync).total_seconds() / 60 > ttl_minutes:
-            stale_deals.append(deal)
+    # 4. Keep deals whose notes may have changed
+    now = datetime.now(timezone.utc)
+    stale_deals = [
+        row for row in candidates
+        if _notes_sync_due(row.notes_count, row.update_time, row.DealSyncState, now, ttl_minutes)
+    ]
 
     skipped_fresh = eligible_open_deals - len(stale_deals)
 
@@ -392,58 +565,50 @@ async def sync_notes_for_open_deals(limit_per_deal: int = 5, ttl_minutes: int =
     sort_value = "add_time DESC"
     semaphore = asyncio.Semaphore(concurrency)
 
-    # 6. Wrap in async with httpx.AsyncClient() as client:
-    async with httpx.AsyncClient() as client:
-        # 7. Define sync_one_deal
-        async def sync_one_deal(deal) -> dict:
-            async with semaphore:
-                try:
-                    start_time = datetime.now()
-                    # Use GET /v1/notes with deal_id, start=0, limit=limit_per_deal, sort="add_time DESC" (sort supports add_time per docs)
-                    payload = await _pd_get(
-                        client, "notes", token, base_url,
-                        deal_id=deal.id, start=0, limit=limit_per_deal, sort=sort_value
-                    )
-                    items = payload.get("data") or []
-
-                    # Upsert notes
-                    with Session(engine) as session:
-                        for n in items:
-                            user = n.get("user") or {}
-                            note = Note(
-                                id=n["id"],
-                                deal_id=n.get("deal_id"),
-                                active_flag=n.get("active_flag", True),
-                                user_name=user.get("name") if isinstance(user, dict) else None,
-                                user_id=user.get("id") if isinstance(user, dict) else None,
-                                content=n.get("content", ""),
-                                add_time=_parse_datetime(n.get("add_time")),
-                                update_time=_parse_datetime(n.get("update_time")),
-                                lead_id=n.get("lead_id"),
-                            )
-                            session.merge(note)
-                        session.commit()
-
-                    duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
-                    update_sync_metadata(f"notes_{deal.id}", "success", len(items), len(items), duration_ms)
-                    return {"deal_id": deal.id, "ok": True, "notes_synced": len(items)}
-                except Exception as e:
-                    update_sync_metadata(f"notes_{deal.id}", "failed", error_message=str(e))
-                    return {
-                        "deal_id": deal.id,
-                        "ok": False,
-                        "error": str(e),
-                        "context": {
-                            "pipeline_id": deal.pipeline_id,
-                            "pipeline_name": pipeline_id_to_name.get(deal.pipeline_id),
-                            "limit_per_deal": limit_per_deal,
-                            "ttl_minutes": ttl_minutes,
-                            "sort": sort_value,
-                        }
+    # 6. Define sync_one_deal (fetch only; writes happen in one batch below)
+    async def sync_one_deal(deal) -> dict:
+        async with semaphore:
+            try:
+                # Use GET /v1/notes with deal_id, start=0, limit=limit_per_deal, sort="add_time DESC" (sort supports add_time per docs)
+                payload = await _pd_get(
+                    "notes", token, base_url,
+                    deal_id=deal.id, start=0, limit=limit_per_deal, sort=sort_value
+                )
+                items = payload.get("data") or []
+                return {"deal_id": deal.id, "ok": True, "notes": [_note_row(n) for n in items]}
+            except Exception as e:
+                return {
+                    "deal_id": deal.id,
+                    "ok": False,
+                    "error": str(e),
+                    "context": {
+                        "pipeline_id": deal.pipeline_id,
+                        "pipeline_name": pipeline_id_to_name.get(deal.pipeline_id),
+                        "limit_per_deal": limit_per_deal,
+                        "ttl_minutes": ttl_minutes,
+                        "sort": sort_value,
                     }
-
-        # 8. Run tasks
-        results = await asyncio.gather(*(sync_one_deal(d) for d in stale_deals))
+                }
+
+    # 7. Run tasks
+    results = await asyncio.gather(*(sync_one_deal(d) for d in stale_deals))
+
+    # 8. Write notes and sync state in one transaction
+    synced_at = datetime.now(timezone.utc)
+    note_rows = [row for r in results if r["ok"] for row in r["notes"]]
+    state_rows = [
+        _notes_state_row(
+            deal.id, deal.notes_count, deal.update_time, synced_at=synced_at
+        ) if r["ok"] else _notes_state_row(
+            deal.id, status="failed", error=r["error"], synced_at=synced_at
+        )
+        for deal, r in zip(stale_deals, results)
+    ]
+    if state_rows:
+        with Session(engine) as session:
+            bulk_upsert(session, Note, note_rows)
+            bulk_upsert(session, DealSyncState, state_rows, conflict_key="deal_id", change_column=None)
+            session.commit()
 
     # 9. Compute
     synced_deals = sum(1 for r in results if r["ok"])
@@ -475,7 +640,7 @@ async def sync_all(incremental: bool = True):
     Sync all entities from Pipedrive.
     
     Args:
-        incremental: If True, only sync deals updated since last sync
+        incremental: If True, only sync deals changed since the last cursor
     
     Returns:
         Dictionary with sync results
@@ -490,14 +655,8 @@ async def sync_all(incremental: bool = True):
     results["pipelines"] = await sync_pipelines()
     results["stages"] = await sync_stages()
     
-    # Sync deals for each tracked pipeline
-    for pipeline_id in SYNC_PIPELINES:
-        synced, total = await sync_deals_for_pipeline(
-            pipeline_id,
-            status="open",
-            incremental=incremental
-        )
-        results["deals"][pipeline_id] = {"synced": synced, "total": total}
+    # Sync deals for the tracked pipelines (changed deals only when incremental)
+    results["deals"] = await sync_deals(status="open", force_full=not incremental)
     
     return results
 
@@ -511,6 +670,101 @@ async def full_sync():
 # Helpers
 # =============================================================================
 
+def _pipeline_row(p: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Pipedrive pipeline payload to Pipeline column values."""
+    return dict(
+        id=p["id"],
+        name=p["name"],
+        order_nr=p["order_nr"],
+        is_deleted=p.get("is_deleted", False),
+        is_deal_probability_enabled=p.get("is_deal_probability_enabled", False),
+        add_time=_parse_datetime(p.get("add_time")),
+        update_time=_parse_datetime(p.get("update_time")),
+    )
+
+
+def _stage_row(s: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Pipedrive stage payload to Stage column values."""
+    return dict(
+        id=s["id"],
+        name=s["name"],
+        order_nr=s["order_nr"],
+        pipeline_id=s["pipeline_id"],
+        deal_probability=s.get("deal_probability", 0),
+        is_deal_rot_enabled=s.get("is_deal_rot_enabled", False),
+        days_to_rotten=s.get("days_to_rotten"),
+        is_deleted=s.get("is_deleted", False),
+        add_time=_parse_datetime(s.get("add_time")),
+        update_time=_parse_datetime(s.get("update_time")),
+    )
+
+
+def _note_row(n: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Pipedrive note payload to Note column values."""
+    user = n.get("user") or {}
+    return dict(
+        id=n["id"],
+        deal_id=n.get("deal_id"),
+        active_flag=n.get("active_flag", True),
+        user_name=user.get("name") if isinstance(user, dict) else None,
+        user_id=user.get("id") if isinstance(user, dict) else None,
+        content=n.get("content", ""),
+        add_time=_parse_datetime(n.get("add_time")),
+        update_time=_parse_datetime(n.get("update_time")),
+        lead_id=n.get("lead_id"),
+    )
+
+
+def _deal_row(d: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a Pipedrive deal payload to Deal column values."""
+    # Extract owner name
+    owner_name = d.get("owner_name")
+    if not owner_name:
+        owner = d.get("owner_id") or {}
+        if isinstance(owner, dict):
+            owner_name = owner.get("name")
+    
+    # Extract org name
+    org_name = d.get("org_name")
+    if not org_name:
+        org = d.get("org_id") or {}
+        if isinstance(org, dict):
+            org_name = org.get("name")
+    
+    return dict(
+        id=d["id"],
+        title=d["title"],
+        pipeline_id=d["pipeline_id"],
+        stage_id=d["stage_id"],
+        owner_name=owner_name,
+        owner_id=d.get("owner_id") if isinstance(d.get("owner_id"), int) else None,
+        org_name=org_name,
+        org_id=d.get("org_id") if isinstance(d.get("org_id"), int) else None,
+        value=float(d.get("value") or 0.0),
+        currency=d.get("currency", "SAR"),
+        status=d["status"],
+        add_time=_parse_datetime(d.get("add_time")),
+        update_time=_parse_datetime(d.get("update_time")),
+        stage_change_time=_parse_datetime(d.get("stage_change_time")),
+        expected_close_date=_parse_datetime(d.get("expected_close_date")),
+        last_activity_date=_parse_datetime(d.get("last_activity_date")),
+        next_activity_date=_parse_datetime(d.get("next_activity_date")),
+        next_activity_id=d.get("next_activity_id"),
+        lost_reason=d.get("lost_reason"),
+        close_time=_parse_datetime(d.get("close_time")),
+        won_time=_parse_datetime(d.get("won_time")),
+        lost_time=_parse_datetime(d.get("lost_time")),
+        file_count=d.get("files_count", 0),
+        notes_count=d.get("notes_count", 0),
+        email_messages_count=d.get("email_messages_count", 0),
+        activities_count=d.get("activities_count", 0),
+        done_activities_count=d.get("done_activities_count", 0),
+        last_incoming_mail_time=_parse_datetime(d.get("last_incoming_mail_time")),
+        last_outgoing_mail_time=_parse_datetime(d.get("last_outgoing_mail_time")),
+        raw_json=json.dumps(d),
+    )
+
+
 def _parse_datetime(value) -> Optional[datetime]:
     """Parse a datetime string from Pipedrive and ensure it's timezone-aware UTC."""
     if not value:
@@ -597,160 +851,402 @@ def _process_stage_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return transitions
 
 
-async def sync_stage_history_for_deal(deal_id: int) -> dict:
-    """Sync stage history for a specific deal.
+def _event_row(event, synced_at: datetime) -> Dict[str, Any]:
+    """Map a flow change event to DealChangeEvent column values."""
+    data = event.data
+    return dict(
+        pipedrive_event_id=data.get("id"),
+        deal_id=data.get("item_id"),
+        timestamp=event.timestamp,
+        log_time=_parse_datetime(data.get("log_time")),
+        field_key=data.get("field_key"),
+        old_value=str(data.get("old_value")) if data.get("old_value") is not None else None,
+        new_value=str(data.get("new_value")) if data.get("new_value") is not None else None,
+        user_id=data.get("user_id"),
+        change_source=data.get("change_source"),
+        origin=data.get("origin"),
+        raw_json=json.dumps(data),
+        synced_at=synced_at,
+    )
+
+
+def _rebuild_stage_spans(
+    deal_id: int,
+    transitions: List[Dict[str, Any]],
+    existing_spans: List[Dict[str, Any]],
+    now: datetime,
+) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Replay transitions over a deal's stored spans in memory.
+
+    Args:
+        existing_spans: Stored spans for the deal (id, stage_id, entered_at, left_at),
+            in insertion order
+
+    Returns:
+        Tuple of (new span rows to insert, updates for stored spans keyed by id)
+    """
+    # First open span per stage, matching the order spans were created in
+    open_spans: Dict[int, Dict[str, Any]] = {}
+    span_keys = set()
+    for span in existing_spans:
+        span_keys.add((span["stage_id"], _parse_datetime(span["entered_at"])))
+        if span["left_at"] is None:
+            open_spans.setdefault(span["stage_id"], dict(span))
+
+    new_spans: List[Dict[str, Any]] = []
+    updated: Dict[int, Dict[str, Any]] = {}
+
+    for transition in sorted(transitions, key=lambda t: t['log_time']):
+        # Close previous stage span
+        if transition['from_stage_id']:
+            prev_span = open_spans.pop(transition['from_stage_id'], None)
+            if prev_span:
+                left_at = transition['log_time']
+                prev_span['left_at'] = left_at
+                prev_span['next_stage_id'] = transition['to_stage_id']
+                prev_span['updated_at'] = now
+                prev_span['duration_hours'] = (
+                    (left_at - _parse_datetime(prev_span['entered_at'])).total_seconds() / 3600
+                )
+                if prev_span.get('id') is not None:
+                    updated[prev_span['id']] = prev_span
+
+        # Create new stage span unless it already exists
+        entered_at = transition.get('entered_new_stage_at') or transition['log_time']
+        key = (transition['to_stage_id'], entered_at)
+        if key in span_keys:
+            continue
+        span_keys.add(key)
+
+        new_span = dict(
+            deal_id=deal_id,
+            stage_id=transition['to_stage_id'],
+            entered_at=entered_at,
+            left_at=None,  # Open span
+            duration_hours=None,
+            from_stage_id=transition['from_stage_id'],
+            next_stage_id=None,
+            transition_user_id=transition['user_id'],
+            transition_source=transition['change_source'],
+            created_at=now,
+            updated_at=None,
+        )
+        new_spans.append(new_span)
+        open_spans.setdefault(transition['to_stage_id'], new_span)
+
+    span_updates = [
+        dict(
+            id=span['id'],
+            left_at=span['left_at'],
+            next_stage_id=span['next_stage_id'],
+            duration_hours=span['duration_hours'],
+            updated_at=span['updated_at'],
+        )
+        for span in updated.values()
+    ]
+    return new_spans, span_updates
+
+
+def _deal_watermark(update_time: Optional[datetime], stage_change_time: Optional[datetime]) -> Optional[datetime]:
+    """Latest of a cached deal's update_time and stage_change_time."""
+    stamps = [_parse_datetime(t) for t in (update_time, stage_change_time) if t]
+    return max(stamps) if stamps else None
+
+
+def _load_stage_history_state(deal_ids: List[int]) -> Dict[str, Any]:
+    """Load what a chunk of deals already has stored, one query per table.
 
     Returns:
         {
-            'deal_id': int,
-            'events_synced': int,
-            'spans_created': int,
-            'spans_updated': int,
-            'errors': list
+            'known_event_ids': set of stored pipedrive_event_id values,
+            'spans_by_deal': {deal_id: [span dicts in insertion order]},
+            'watermarks': {deal_id: current Deal watermark},
+            'synced_watermarks': {deal_id: watermark of the last successful sync},
         }
     """
-    from ..integrations.pipedrive_client import get_pipedrive_client
     from ..db import DealChangeEvent, DealStageSpan
 
-    entity_type = f"stage_history_{deal_id}"
-    start_time = datetime.now(timezone.utc)
+    entity_types = {f"stage_history_{deal_id}": deal_id for deal_id in deal_ids}
 
-    try:
-        # Fetch from Pipedrive
-        client = get_pipedrive_client()
-        flow_dto = await client.get_deal_flow(deal_id)
+    with Session(engine) as session:
+        known_event_ids = set(session.exec(
+            select(DealChangeEvent.pipedrive_event_id).where(DealChangeEvent.deal_id.in_(deal_ids))
+        ).all())
+
+        spans_by_deal: Dict[int, List[Dict[str, Any]]] = {}
+        for span_id, deal_id, stage_id, entered_at, left_at in session.exec(
+            select(
+                DealStageSpan.id,
+                DealStageSpan.deal_id,
+                DealStageSpan.stage_id,
+                DealStageSpan.entered_at,
+                DealStageSpan.left_at,
+            )
+            .where(DealStageSpan.deal_id.in_(deal_ids))
+            .order_by(DealStageSpan.id)
+        ).all():
+            spans_by_deal.setdefault(deal_id, []).append(dict(
+                id=span_id, stage_id=stage_id, entered_at=entered_at, left_at=left_at,
+            ))
+
+        watermarks = {
+            deal_id: _deal_watermark(update_time, stage_change_time)
+            for deal_id, update_time, stage_change_time in session.exec(
+                select(Deal.id, Deal.update_time, Deal.stage_change_time).where(Deal.id.in_(deal_ids))
+            ).all()
+        }
 
-        if not flow_dto or not flow_dto.data:
-            return {
-                'deal_id': deal_id,
-                'events_synced': 0,
-                'spans_created': 0,
-                'spans_updated': 0,
-                'errors': []
-            }
+        synced_watermarks = {
+            entity_types[entity_type]: _parse_datetime(last_sync_time)
+            for entity_type, last_sync_time in session.exec(
+                select(SyncMetadata.entity_type, SyncMetadata.last_sync_time).where(
+                    SyncMetadata.entity_type.in_(list(entity_types)),
+                    SyncMetadata.status == "success",
+                )
+            ).all()
+        }
 
-        # 1. Store raw events
-        events_synced = 0
-        with Session(engine) as session:
-            for event in flow_dto.data:
-                data = event.data
-
-                # Check if already exists
-                existing = session.exec(
-                    select(DealChangeEvent).where(
-                        DealChangeEvent.pipedrive_event_id == data.get("id")
-                    )
-                ).first()
-
-                if not existing:
-                    change_event = DealChangeEvent(
-                        pipedrive_event_id=data.get("id"),
-                        deal_id=data.get("item_id"),
-                        timestamp=event.timestamp,
-                        log_time=_parse_datetime(data.get("log_time")),
-                        field_key=data.get("field_key"),
-                        old_value=str(data.get("old_value")) if data.get("old_value") is not None else None,
-                        new_value=str(data.get("new_value")) if data.get("new_value") is not None else None,
-                        user_id=data.get("user_id"),
-                        change_source=data.get("change_source"),
-                        origin=data.get("origin"),
-                        raw_json=json.dumps(data),
-                    )
-                    session.add(change_event)
-                    events_synced += 1
+    return {
+        'known_event_ids': known_event_ids,
+        'spans_by_deal': spans_by_deal,
+        'watermarks': watermarks,
+        'synced_watermarks': synced_watermarks,
+    }
 
-            session.commit()
 
-        # 2. Process stage transitions
+def _stage_history_unchanged(deal_id: int, state: Dict[str, Any]) -> bool:
+    """True if the cached deal has not moved since its last successful sync."""
+    watermark = state['watermarks'].get(deal_id)
+    synced = state['synced_watermarks'].get(deal_id)
+    return watermark is not None and synced is not None and watermark <= synced
+
+
+async def _fetch_new_flow_events(client, deal_id: int, known_event_ids: set):
+    """Page through a deal's flow until a stored event is reached.
+
+    The flow is returned newest first, so once a page contains an event we
+    already have, everything after it is stored too.
+
+    Raises:
+        PipedriveSyncError: If any page fails; a partial flow would rebuild
+            spans from missing events and advance the deal's watermark
+    """
+    from ..integrations.pipedrive_client import PipedriveDealFlowDTO
+
+    events = []
+    start = 0
+    while True:
+        page = await client.get_deal_flow(deal_id, start=start)
+        if page is None:
+            raise PipedriveSyncError(f"Flow page at offset {start} unavailable for deal {deal_id}")
+        events.extend(page.data)
+        if any(event.data.get("id") in known_event_ids for event in page.data):
+            break
+        pagination = (page.additional_data or {}).get("pagination") or {}
+        if not page.data or not pagination.get("more_items_in_collection"):
+            break
+        start = pagination.get("next_start", start + len(page.data))
+    return PipedriveDealFlowDTO(success=True, data=events)
+
+
+def _write_stage_history_chunk(fetched: List[tuple], state: Dict[str, Any]) -> List[dict]:
+    """Store events and spans for a chunk of deals in one transaction.
+
+    Args:
+        fetched: (deal_id, flow_dto, error, duration_ms) per fetched deal
+        state: Output of _load_stage_history_state for the chunk
+
+    Returns:
+        Per-deal result dicts in the sync_stage_history_for_deal format
+    """
+    from ..db import DealChangeEvent, DealStageSpan
+
+    now = datetime.now(timezone.utc)
+    known_event_ids = set(state['known_event_ids'])
+    results = []
+    event_rows: List[Dict[str, Any]] = []
+    span_rows: List[Dict[str, Any]] = []
+    span_updates: List[Dict[str, Any]] = []
+    meta_rows: List[Dict[str, Any]] = []
+
+    # Rebuild each deal's timeline in memory
+    for deal_id, flow_dto, error, duration_ms in fetched:
+        result = {
+            'deal_id': deal_id,
+            'events_synced': 0,
+            'spans_created': 0,
+            'spans_updated': 0,
+            'skipped': False,
+            'errors': [error] if error else [],
+        }
+        results.append(result)
+
+        if error:
+            meta_rows.append(_sync_meta_row(f"stage_history_{deal_id}", "failed", now, error_message=error))
+            continue
+
+        for event in flow_dto.data:
+            event_id = event.data.get("id")
+            if event_id in known_event_ids:
+                continue
+            known_event_ids.add(event_id)
+            event_rows.append(_event_row(event, now))
+            result['events_synced'] += 1
+
         stage_events = [
             e for e in flow_dto.data
             if e.data.get("field_key") in ["stage_id", "stage_change_time"]
         ]
         transitions = _process_stage_events([e.model_dump() for e in stage_events])
 
-        # 3. Create/update DealStageSpan records
-        spans_created = 0
-        spans_updated = 0
+        new_spans, updates = _rebuild_stage_spans(
+            deal_id, transitions, state['spans_by_deal'].get(deal_id, []), now
+        )
+        span_rows.extend(new_spans)
+        span_updates.extend(updates)
+        # Spans created and closed in the same run count once for each
+        result['spans_created'] = len(new_spans)
+        result['spans_updated'] = len(updates) + sum(1 for span in new_spans if span['left_at'] is not None)
+
+        # The deal watermark doubles as the sync time so unchanged deals are skipped next run
+        meta_rows.append(_sync_meta_row(
+            f"stage_history_{deal_id}", "success", state['watermarks'].get(deal_id) or now,
+            records_synced=result['events_synced'],
+            records_total=len(flow_dto.data),
+            duration_ms=duration_ms,
+        ))
 
-        with Session(engine) as session:
-            # Sort transitions chronologically
-            sorted_transitions = sorted(transitions, key=lambda t: t['log_time'])
-
-            for i, transition in enumerate(sorted_transitions):
-                # Close previous stage span
-                if transition['from_stage_id']:
-                    prev_span = session.exec(
-                        select(DealStageSpan).where(
-                            DealStageSpan.deal_id == deal_id,
-                            DealStageSpan.stage_id == transition['from_stage_id'],
-                            DealStageSpan.left_at == None
-                        )
-                    ).first()
-
-                    if prev_span:
-                        prev_span.left_at = transition['log_time']
-                        prev_span.next_stage_id = transition['to_stage_id']
-                        prev_span.updated_at = datetime.now(timezone.utc)
-
-                        # Compute duration
-                        duration = (prev_span.left_at - prev_span.entered_at).total_seconds() / 3600
-                        prev_span.duration_hours = duration
-
-                        spans_updated += 1
-
-                # Create new stage span
-                entered_at = transition.get('entered_new_stage_at') or transition['log_time']
-
-                # Check if span already exists
-                existing_span = session.exec(
-                    select(DealStageSpan).where(
-                        DealStageSpan.deal_id == deal_id,
-                        DealStageSpan.stage_id == transition['to_stage_id'],
-                        DealStageSpan.entered_at == entered_at
-                    )
-                ).first()
-
-                if not existing_span:
-                    new_span = DealStageSpan(
-                        deal_id=deal_id,
-                        stage_id=transition['to_stage_id'],
-                        entered_at=entered_at,
-                        left_at=None,  # Open span
-                        from_stage_id=transition['from_stage_id'],
-                        transition_user_id=transition['user_id'],
-                        transition_source=transition['change_source'],
-                    )
-                    session.add(new_span)
-                    spans_created += 1
+    # Bulk write; the unique event id index makes duplicate inserts no-ops
+    with Session(engine) as session:
+        if event_rows:
+            session.execute(insert(DealChangeEvent.__table__).prefix_with("OR IGNORE"), event_rows)
+        if span_rows:
+            session.execute(insert(DealStageSpan.__table__), span_rows)
+        if span_updates:
+            session.execute(update(DealStageSpan), span_updates)
+        bulk_upsert(session, SyncMetadata, meta_rows, conflict_key="entity_type", change_column=None)
+        session.commit()
 
-            session.commit()
+    return results
 
-        # 4. Update sync metadata
-        duration_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
-        update_sync_metadata(
-            entity_type, "success",
-            records_synced=events_synced,
-            records_total=len(flow_dto.data),
-            duration_ms=duration_ms
-        )
 
-        return {
-            'deal_id': deal_id,
-            'events_synced': events_synced,
-            'spans_created': spans_created,
-            'spans_updated': spans_updated,
-            'errors': []
-        }
+def _sync_meta_row(
+    entity_type: str,
+    status: str,
+    sync_time: datetime,
+    records_synced: int = 0,
+    records_total: int = 0,
+    duration_ms: int = 0,
+    error_message: Optional[str] = None,
+) -> Dict[str, Any]:
+    """SyncMetadata column values for a batched metadata write."""
+    return dict(
+        entity_type=entity_type,
+        last_sync_time=sync_time,
+        status=status,
+        records_synced=records_synced,
+        records_total=records_total,
+        last_sync_duration_ms=duration_ms,
+        error_message=error_message,
+    )
+
+
+async def sync_stage_history_for_deals(
+    deal_ids: List[int],
+    concurrency: int = 5,
+    chunk_size: int = STAGE_HISTORY_CHUNK_SIZE,
+    force: bool = False,
+) -> List[dict]:
+    """Sync stage history for many deals, writing one transaction per chunk.
+
+    For each chunk, known event IDs, stored spans and deal watermarks are
+    loaded with one query each. Deals whose cached update_time and
+    stage_change_time have not moved since their last successful sync are
+    skipped without calling the API; the rest have their flow fetched
+    concurrently (stopping at the first stored event), the span timeline
+    rebuilt in memory, and all inserts/updates (including the per-deal
+    SyncMetadata rows) written together.
 
-    except Exception as e:
-        update_sync_metadata(entity_type, "failed", error_message=str(e))
-        return {
-            'deal_id': deal_id,
-            'events_synced': 0,
-            'spans_created': 0,
-            'spans_updated': 0,
-            'errors': [str(e)]
+    Args:
+        deal_ids: Deals to sync
+        concurrency: Max concurrent API calls
+        chunk_size: Deals per write transaction
+        force: Fetch flow even for unchanged deals
+
+    Returns:
+        Per-deal result dicts in the sync_stage_history_for_deal format,
+        with 'skipped' set for deals that were not fetched
+    """
+    from ..integrations.pipedrive_client import get_pipedrive_client
+
+    client = get_pipedrive_client()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(deal_id: int, known_event_ids: set) -> tuple:
+        async with semaphore:
+            start_time = datetime.now(timezone.utc)
+            try:
+                flow_dto = await _fetch_new_flow_events(client, deal_id, known_event_ids)
+                error = None
+            except Exception as e:
+                flow_dto, error = None, str(e)
+            duration_ms = int((datetime.now(timezone.utc) - start_time).total_seconds() * 1000)
+            return deal_id, flow_dto, error, duration_ms
+
+    results: List[dict] = []
+    for start in range(0, len(deal_ids), chunk_size):
+        chunk = deal_ids[start:start + chunk_size]
+        try:
+            state = _load_stage_history_state(chunk)
+            changed = [
+                deal_id for deal_id in chunk
+                if force or not _stage_history_unchanged(deal_id, state)
+            ]
+            fetched = await asyncio.gather(
+                *(fetch_one(deal_id, state['known_event_ids']) for deal_id in changed)
+            )
+            written = {r['deal_id']: r for r in _write_stage_history_chunk(list(fetched), state)}
+        except Exception as e:
+            results.extend(
+                {
+                    'deal_id': deal_id,
+                    'events_synced': 0,
+                    'spans_created': 0,
+                    'spans_updated': 0,
+                    'skipped': False,
+                    'errors': [str(e)],
+                }
+                for deal_id in chunk
+            )
+            continue
+
+        for deal_id in chunk:
+            results.append(written.get(deal_id) or {
+                'deal_id': deal_id,
+                'events_synced': 0,
+                'spans_created': 0,
+                'spans_updated': 0,
+                'skipped': True,
+                'errors': [],
+            })
+    return results
+
+
+async def sync_stage_history_for_deal(deal_id: int) -> dict:
+    """Sync stage history for a specific deal.
+
+    Returns:
+        {
+            'deal_id': int,
+            'events_synced': int,
+            'spans_created': int,
+            'spans_updated': int,
+            'skipped': bool,
+            'errors': list
         }
+    """
+    results = await sync_stage_history_for_deals([deal_id], concurrency=1, force=True)
+    return results[0]
 
 
 async def sync_stage_history_for_open_deals(
@@ -768,48 +1264,46 @@ async def sync_stage_history_for_open_deals(
             'total_deals': int,
             'synced_successfully': int,
             'failed': int,
+            'fetched': int,
+            'skipped': int,
             'total_events': int,
             'total_spans': int,
             'errors': list
         }
     """
     # 1. Get pipeline IDs
-    from ..constants import PIPELINE_NAME_TO_ID
-    pipeline_ids = [PIPELINE_NAME_TO_ID[name] for name in pipeline_names if name in PIPELINE_NAME_TO_ID]
+    pipeline_ids = get_dimension_cache().pipeline_ids(pipeline_names)
 
     if not pipeline_ids:
         return {
             'total_deals': 0,
             'synced_successfully': 0,
             'failed': 0,
+            'fetched': 0,
+            'skipped': 0,
             'total_events': 0,
             'total_spans': 0,
             'errors': ['No valid pipelines found']
         }
 
-    # 2. Query open deals
+    # 2. Query open deal IDs
     with Session(engine) as session:
-        deals = session.exec(
-            select(Deal).where(
+        deal_ids = list(session.exec(
+            select(Deal.id).where(
                 Deal.status == "open",
                 Deal.pipeline_id.in_(pipeline_ids)
             )
-        ).all()
-
-    total_deals = len(deals)
+        ).all())
 
-    # 3. Sync with concurrency control
-    semaphore = asyncio.Semaphore(concurrency)
-
-    async def sync_one(deal):
-        async with semaphore:
-            return await sync_stage_history_for_deal(deal.id)
+    total_deals = len(deal_ids)
 
-    results = await asyncio.gather(*[sync_one(d) for d in deals])
+    # 3. Sync changed deals in chunks with concurrency control
+    results = await sync_stage_history_for_deals(deal_ids, concurrency=concurrency)
 
     # 4. Aggregate results
     synced_successfully = sum(1 for r in results if not r['errors'])
     failed = sum(1 for r in results if r['errors'])
+    skipped = sum(1 for r in results if r['skipped'])
     total_events = sum(r['events_synced'] for r in results)
     total_spans = sum(r['spans_created'] + r['spans_updated'] for r in results)
     errors = [
@@ -821,6 +1315,8 @@ async def sync_stage_history_for_open_deals(
         'total_deals': total_deals,
         'synced_successfully': synced_successfully,
         'failed': failed,
+        'fetched': total_deals - skipped,
+        'skipped': skipped,
         'total_events': total_events,
         'total_spans': total_spans,
         'errors': errors
@@ -863,14 +1359,18 @@ __all__ = [
     "sync_pipelines",
     "sync_stages",
     "sync_deals_for_pipeline",
+    "sync_recent_deals",
+    "sync_deals",
     "sync_notes_for_deal",
     "sync_notes_for_open_deals",
     "sync_stage_history_for_deal",
+    "sync_stage_history_for_deals",
     "sync_stage_history_for_open_deals",
     "sync_all",
     "full_sync",
     "PipedriveSyncError",
     "get_last_sync_time",
+    "get_sync_cursor",
     "update_sync_metadata",
     "_test_timezone_handling",
 ]
@@ -0,0 +1,188 @@
+"""Token-budgeted context packing for prompts.
+
+Pipedrive notes reach prompts as raw HTML of any length (often whole
+pasted email threads), so a handful of notes could dominate a request's
+latency and cost. Before a prompt renders, each of its packed list
+variables (PromptTemplate.packed_variables, e.g. "notes" or
+"notes.content" for lists of dicts) is:
+- Stripped of HTML tags and entities, whitespace collapsed
+- Deduplicated, ignoring case and whitespace; the first copy is kept. Items
+  of "notes.content" style lists only match when their other fields (date,
+  author) match too, so repeated dated follow-ups survive
+- Capped per item at the prompt's max_item_tokens
+- Packed into the prompt's token_budget in priority order: lists come
+  newest/most important first, whole items are kept while they fit, the
+  first one that does not is truncated if enough budget remains and the
+  rest are dropped
+
+Token counts come from the local approximation in token_counter.py. Each
+render returns a PackingReport with the prompt tokens before and after.
+"""
+
+import html
+import re
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Hashable, Optional
+
+from ..integrations.token_counter import count_tokens, truncate_to_tokens
+
+if TYPE_CHECKING:
+    from .prompt_registry import PromptTemplate
+
+# Tokens of template text around each list item ("- ", newline, labels)
+ITEM_OVERHEAD_TOKENS = 4
+
+# A partially kept item must keep at least this many tokens
+MIN_TRUNCATED_TOKENS = 24
+
+_BLOCK_TAG = re.compile(r"<\s*(?:br|/p|/div|/h[1-6]|/tr|/li|/blockquote)\b[^>]*>", re.IGNORECASE)
+_LIST_ITEM_TAG = re.compile(r"<\s*li\b[^>]*>", re.IGNORECASE)
+_DROPPED_ELEMENT = re.compile(r"<\s*(script|style|head)\b.*?<\s*/\s*\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\s*\n\s*")
+
+
+@dataclass
+class PackingReport:
+    """Prompt token counts for one render, before and after packing."""
+    prompt_id: str
+    tokens_before: int
+    tokens_after: int
+    token_budget: Optional[int] = None
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "tokens_saved": self.tokens_saved}
+
+
+def strip_html(text: str) -> str:
+    """Plain text from a Pipedrive note's HTML content."""
+    if "<" in text:
+        text = _DROPPED_ELEMENT.sub("", text)
+        text = _LIST_ITEM_TAG.sub("\n- ", text)
+        text = _BLOCK_TAG.sub("\n", text)
+        text = _TAG.sub("", text)
+    if "&" in text:
+        text = html.unescape(text)
+    text = _SPACES.sub(" ", text)
+    return _BLANK_LINES.sub("\n", text).strip()
+
+
+def _dedupe_key(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+class _ListField:
+    """Reads and replaces the text of one packed list variable's items."""
+
+    def __init__(self, spec: str):
+        self.name, _, self.field = spec.partition(".")
+
+    def text(self, item: Any) -> str:
+        if self.field:
+            value = item.get(self.field) if isinstance(item, dict) else getattr(item, self.field, None)
+            return "" if value is None else str(value)
+        return "" if item is None else str(item)
+
+    def replace(self, item: Any, text: str) -> Any:
+        if not self.field:
+            return text
+        if isinstance(item, dict):
+            return {**item, self.field: text}
+        return item.model_copy(update={self.field: text})
+
+    def dedupe_key(self, item: Any, text: str) -> Hashable:
+        """The cleaned text, plus the item's other fields for lists of dicts or models."""
+        if not self.field:
+            return _dedupe_key(text)
+        values = item if isinstance(item, dict) else item.model_dump()
+        others = tuple(sorted((key, str(value)) for key, value in values.items() if key != self.field))
+        return _dedupe_key(text), others
+
+    def cost(self, item: Any) -> int:
+        """Tokens the item adds to the prompt, including its other fields."""
+        if self.field and isinstance(item, dict):
+            tokens = sum(count_tokens(str(value)) for value in item.values() if value is not None)
+        else:
+            tokens = count_tokens(self.text(item))
+        return tokens + ITEM_OVERHEAD_TOKENS
+
+
+def _clean(items: list, field: _ListField, max_item_tokens: int, report: PackingReport) -> list:
+    seen: set[Hashable] = set()
+    cleaned = []
+    for item in items:
+        text = strip_html(field.text(item))
+        if not text:
+            continue
+        key = field.dedupe_key(item, text)
+        if key in seen:
+            report.duplicates += 1
+            continue
+        seen.add(key)
+        capped = truncate_to_tokens(text, max_item_tokens)
+        if capped != text:
+            report.truncated += 1
+        cleaned.append(field.replace(item, capped))
+    return cleaned
+
+
+def _fit(items: list, field: _ListField, available: int, report: PackingReport) -> tuple[list, int]:
+    """Highest-priority (leading) items that fit in available tokens."""
+    kept = []
+    for index, item in enumerate(items):
+        cost = field.cost(item)
+        if cost <= available:
+            kept.append(item)
+            available -= cost
+            continue
+
+        # Partially keep the first item that does not fit
+        room = available - (cost - count_tokens(field.text(item)))
+        if room >= MIN_TRUNCATED_TOKENS:
+            kept.append(field.replace(item, truncate_to_tokens(field.text(item), room)))
+            report.truncated += 1
+            available = 0
+            index += 1
+        report.dropped += len(items) - index
+        break
+    return kept, available
+
+
+def pack_variables(prompt: "PromptTemplate", variables: dict) -> tuple[dict, PackingReport]:
+    """Clean and fit a prompt's packed list variables into its token budget.
+
+    Args:
+        prompt: Prompt whose packed_variables, max_item_tokens and
+            token_budget apply
+        variables: Template variables (not modified)
+
+    Returns:
+        Tuple of (packed variables, report); the report's tokens_after is
+        filled in by the caller once the packed prompt is rendered
+    """
+    report = PackingReport(prompt_id=prompt.id, tokens_before=0, tokens_after=0, token_budget=prompt.token_budget)
+    fields = [_ListField(spec) for spec in prompt.packed_variables]
+    fields = [field for field in fields if isinstance(variables.get(field.name), list)]
+    if not fields:
+        return variables, report
+
+    packed = dict(variables)
+    for field in fields:
+        packed[field.name] = _clean(variables[field.name], field, prompt.max_item_tokens, report)
+
+    if prompt.token_budget is not None:
+        # Everything but the packed lists, rendered once to measure it
+        fixed = count_tokens(prompt.render({**packed, **{field.name: [] for field in fields}})[1])
+        available = prompt.token_budget - fixed
+        for field in fields:
+            packed[field.name], available = _fit(packed[field.name], field, max(available, 0), report)
+
+    return packed, report
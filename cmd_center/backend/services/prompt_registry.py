@@ -3,23 +3,80 @@
 This module provides:
 - Centralized storage of LLM prompts
 - Jinja2 template rendering with variable injection
+- Templates compiled once, when a prompt is registered or an experiment
+  variant is created, through one shared Environment whose bytecode cache
+  lets later processes skip recompilation
+- Lazy registration: default prompts are built on first use
 - Prompt versioning support
 - Validation of required variables
 - A/B testing and prompt variants
-- Performance tracking per variant
+- Performance tracking per variant, persisted through ExperimentStore
+  (services/experiment_store.py) when the registry has one
+- Token budgets: list variables such as notes are cleaned, deduplicated
+  and packed into each prompt's budget before rendering (see
+  prompt_context.py), with prompt tokens reported before and after
 """
 
+import hashlib
+import math
 import random
-from typing import Optional, Dict, Any
+import threading
+from typing import TYPE_CHECKING, Callable, Optional, Dict, Any
 from collections import defaultdict
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from pydantic import BaseModel, Field
-from jinja2 import Template, TemplateError
+from functools import lru_cache
+from pydantic import BaseModel, Field, PrivateAttr
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, Template, TemplateError
 import logging
 
+from ..integrations.llm_response_cache import CacheScope
+from ..integrations.token_counter import count_tokens
+from .prompt_context import PackingReport, pack_variables
+
+if TYPE_CHECKING:
+    from .experiment_store import ExperimentStore
+
 logger = logging.getLogger(__name__)
 
+# Template sources by content hash, served to the shared Environment
+_template_sources: Dict[str, str] = {}
+_template_environment: Optional[Environment] = None
+
+
+def get_template_environment() -> Environment:
+    """Get or create the shared Jinja2 environment for prompt templates."""
+    global _template_environment
+    if _template_environment is None:
+        try:
+            bytecode_cache = FileSystemBytecodeCache()
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Jinja2 bytecode cache unavailable, compiling in memory only: {e}")
+            bytecode_cache = None
+        _template_environment = Environment(
+            loader=DictLoader(_template_sources),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,
+        )
+    return _template_environment
+
+
+def compile_template(source: str) -> Template:
+    """Compile a template source once; identical sources share one Template.
+
+    Sources are named by their hash, so a name never changes content and
+    the bytecode cache can serve it to later processes.
+    """
+    name = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    _template_sources[name] = source
+    return get_template_environment().get_template(name)
+
+
+@lru_cache(maxsize=128)
+def _system_prompt_tokens(system_prompt: str) -> int:
+    """Token count of a system prompt (constant per prompt version)."""
+    return count_tokens(system_prompt)
+
 
 @dataclass
 class PromptVariantStats:
@@ -31,6 +88,9 @@ class PromptVariantStats:
     failures: int = 0
     total_cost_usd: float = 0.0
     total_latency_ms: int = 0
+    # Per-request quality: confidence when the request succeeded, 0 otherwise
+    total_quality: float = 0.0
+    total_quality_sq: float = 0.0
     created_at: datetime = field(default_factory=datetime.now)
 
     def avg_confidence(self) -> float:
@@ -50,17 +110,43 @@ class PromptVariantStats:
         """Calculate average latency."""
         return int(self.total_latency_ms / self.uses) if self.uses > 0 else 0
 
+    def avg_quality(self) -> float:
+        """Mean per-request quality."""
+        return self.total_quality / self.uses if self.uses > 0 else 0.0
+
+    def quality_variance(self) -> float:
+        """Sample variance of per-request quality."""
+        if self.uses < 2:
+            return 0.0
+        mean = self.avg_quality()
+        return max(0.0, (self.total_quality_sq - self.uses * mean * mean) / (self.uses - 1))
+
+
+def quality_p_value(leader: PromptVariantStats, other: PromptVariantStats) -> float:
+    """One-sided p-value that leader's mean quality is not above other's (Welch z-test)."""
+    diff = leader.avg_quality() - other.avg_quality()
+    se = math.sqrt(leader.quality_variance() / leader.uses + other.quality_variance() / other.uses)
+    if se == 0:
+        return 0.0 if diff > 0 else 1.0
+    return 0.5 * math.erfc(diff / se / math.sqrt(2))
+
 
 @dataclass
 class PromptExperiment:
-    """A/B test experiment for prompt variants."""
+    """A/B test experiment for prompt variants.
+
+    record_result() may be called from several tasks and threads; stats
+    updates hold the experiment's lock and bump version.
+    """
     experiment_id: str
     base_prompt_id: str
-    variants: Dict[str, PromptTemplate] = field(default_factory=dict)
+    variants: Dict[str, "PromptTemplate"] = field(default_factory=dict)
     traffic_split: Dict[str, float] = field(default_factory=dict)  # variant_id -> percentage
     stats: Dict[str, PromptVariantStats] = field(default_factory=dict)
     active: bool = True
     created_at: datetime = field(default_factory=datetime.now)
+    version: int = 0  # Bumped on every recorded result
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
 
     def select_variant(self) -> str:
         """Select a variant based on traffic split.
@@ -94,65 +180,84 @@ class PromptExperiment:
             cost_usd: Optional cost
             latency_ms: Optional latency
         """
-        if variant_id not in self.stats:
-            self.stats[variant_id] = PromptVariantStats(variant_id=variant_id)
-
-        stats = self.stats[variant_id]
-        stats.uses += 1
-
-        if success:
-            stats.successes += 1
-        else:
-            stats.failures += 1
-
-        if confidence is not None:
-            stats.total_confidence += confidence
-
-        if cost_usd is not None:
-            stats.total_cost_usd += cost_usd
+        quality = (confidence or 0.0) if success else 0.0
+
+        with self._lock:
+            if variant_id not in self.stats:
+                self.stats[variant_id] = PromptVariantStats(variant_id=variant_id)
+
+            stats = self.stats[variant_id]
+            stats.uses += 1
+
+            if success:
+                stats.successes += 1
+            else:
+                stats.failures += 1
+
+            if confidence is not None:
+                stats.total_confidence += confidence
+
+            if cost_usd is not None:
+                stats.total_cost_usd += cost_usd
+
+            if latency_ms is not None:
+                stats.total_latency_ms += latency_ms
+
+            stats.total_quality += quality
+            stats.total_quality_sq += quality * quality
+            self.version += 1
+
+    def snapshot(self) -> Dict[str, PromptVariantStats]:
+        """Consistent copy of the per-variant stats."""
+        with self._lock:
+            return {variant_id: replace(stats) for variant_id, stats in self.stats.items()}
+
+    def compare(self) -> tuple[Optional[str], Dict[str, float]]:
+        """Variant with the highest mean quality, and its p-value against each other variant."""
+        stats = self.snapshot()
+        if not stats:
+            return None, {}
+        leader = max(stats, key=lambda variant_id: stats[variant_id].avg_quality())
+        p_values = {
+            variant_id: quality_p_value(stats[leader], other)
+            for variant_id, other in stats.items()
+            if variant_id != leader and stats[leader].uses and other.uses
+        }
+        return leader, p_values
 
-        if latency_ms is not None:
-            stats.total_latency_ms += latency_ms
+    def get_winner(self, min_uses: int = 10, alpha: float = 0.05) -> Optional[str]:
+        """Determine the winning variant by a significance test on quality.
 
-    def get_winner(self) -> Optional[str]:
-        """Determine winning variant based on metrics.
+        Quality per request is its confidence when it succeeded and 0 when it
+        failed. The variant with the highest mean quality wins once it is
+        significantly better than every other variant: a one-sided Welch
+        z-test against each, at alpha split over the comparisons
+        (Bonferroni). Cost and latency are reported, not ranked.
 
-        Uses composite score: confidence * success_rate / (cost * latency)
+        Args:
+            min_uses: Uses each variant needs before testing
+            alpha: Significance level
 
         Returns:
-            variant_id of winner, or None if not enough data
+            variant_id of winner, or None if not enough data or no
+            significant difference yet
         """
-        if not self.stats:
+        stats = self.snapshot()
+        variant_ids = set(self.variants) | set(stats)
+        if len(variant_ids) < 2:
             return None
 
-        # Require at least 10 uses per variant
-        if any(s.uses < 10 for s in self.stats.values()):
-            logger.info(f"Experiment {self.experiment_id}: Not enough data for winner")
+        if any(variant_id not in stats or stats[variant_id].uses < min_uses for variant_id in variant_ids):
+            logger.debug(f"Experiment {self.experiment_id}: Not enough data for winner")
             return None
 
-        best_variant = None
-        best_score = 0.0
+        leader, p_values = self.compare()
+        threshold = alpha / len(p_values)
+        logger.debug(f"Experiment {self.experiment_id}: leader {leader}, p-values {p_values}")
 
-        for variant_id, stats in self.stats.items():
-            # Composite score
-            confidence = stats.avg_confidence()
-            success_rate = stats.success_rate() / 100.0
-            cost = max(0.001, stats.avg_cost_usd())  # Avoid division by zero
-            latency = max(100, stats.avg_latency_ms())  # Avoid division by zero
-
-            score = (confidence * success_rate) / (cost * latency / 1000)
-
-            logger.info(
-                f"Variant {variant_id}: score={score:.4f} "
-                f"(confidence={confidence:.2f}, success_rate={success_rate:.2f}, "
-                f"cost=${cost:.4f}, latency={latency}ms)"
-            )
-
-            if score > best_score:
-                best_score = score
-                best_variant = variant_id
-
-        return best_variant
+        if all(p < threshold for p in p_values.values()):
+            return leader
+        return None
 
 
 class PromptTemplate(BaseModel):
@@ -166,8 +271,32 @@ class PromptTemplate(BaseModel):
     max_tokens_estimate: int = Field(default=1000, description="Estimated max tokens needed")
     model_tier: str = Field(default="balanced", description="Model tier: fast, balanced, advanced")
     temperature: float = Field(default=0.7, description="Default temperature")
+    cacheable: bool = Field(default=False, description="Identical requests may be answered from the LLM response cache")
+    token_budget: Optional[int] = Field(None, description="Token budget for the rendered user prompt")
+    packed_variables: list[str] = Field(
+        default_factory=list,
+        description="List variables to clean, dedupe and pack, highest priority first ('notes' or 'notes.content')",
+    )
+    max_item_tokens: int = Field(default=300, description="Token cap per packed list item")
     description: Optional[str] = Field(None, description="Human-readable description")
 
+    _compiled: Optional[Template] = PrivateAttr(default=None)
+    _compiled_source: Optional[str] = PrivateAttr(default=None)
+
+    def compile(self) -> Template:
+        """Compile the user prompt template (once per template source).
+
+        Raises:
+            ValueError: If the template has a syntax error
+        """
+        if self._compiled is None or self._compiled_source != self.user_prompt_template:
+            try:
+                self._compiled = compile_template(self.user_prompt_template)
+            except TemplateError as e:
+                raise ValueError(f"Invalid template for prompt '{self.id}': {e}") from e
+            self._compiled_source = self.user_prompt_template
+        return self._compiled
+
     def validate_variables(self, variables: dict) -> None:
         """Validate that all required variables are present.
 
@@ -194,31 +323,37 @@ class PromptTemplate(BaseModel):
             ValueError: If required variables missing or template error
         """
         self.validate_variables(variables)
+        template = self.compile()
 
         try:
-            template = Template(self.user_prompt_template)
             rendered_user_prompt = template.render(**variables)
             return self.system_prompt, rendered_user_prompt
         except TemplateError as e:
             raise ValueError(f"Failed to render prompt '{self.id}': {e}") from e
 
 
-class PromptRegistry:
-    """Registry for managing LLM prompt templates with A/B testing support."""
+# ============================================================================
+# DEFAULT PROMPTS
+# ============================================================================
 
-    def __init__(self):
-        self._prompts: Dict[str, PromptTemplate] = {}
-        self._experiments: Dict[str, PromptExperiment] = {}
-        self._register_default_prompts()
+# Prompt id -> factory; PromptRegistry builds and compiles each on first use
+DEFAULT_PROMPTS: Dict[str, Callable[[], PromptTemplate]] = {}
+
+
+def _default_prompt(prompt_id: str):
+    def register(factory: Callable[[], PromptTemplate]) -> Callable[[], PromptTemplate]:
+        DEFAULT_PROMPTS[prompt_id] = factory
+        return factory
+    return register
 
-    def _register_default_prompts(self):
-        """Register all default prompts."""
 
-        # Deal summarization
-        self.register_prompt(PromptTemplate(
-            id="deal.summarize.v1",
-            version="v1",
-            system_prompt="""You are an expert sales analyst. Summarize the deal's current status concisely.
+# Deal summarization
+@_default_prompt("deal.summarize.v1")
+def _deal_summarize_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="deal.summarize.v1",
+        version="v1",
+        system_prompt="""You are an expert sales analyst. Summarize the deal's current status concisely.
 Focus on:
 - Current state and progress
 - Key blockers or risks
@@ -226,7 +361,7 @@ Focus on:
 - Missing critical information
 
 Respond in JSON format: {"summary": str, "next_action": str, "blockers": [str], "missing_info": [str], "recommendations": [str]}""",
-            user_prompt_template="""Deal: {{ deal_title }}
+        user_prompt_template="""Deal: {{ deal_title }}
 Stage: {{ stage }}
 Days in stage: {{ days_in_stage }}
 Owner: {{ owner_name }}
@@ -237,18 +372,24 @@ Recent notes (last {{ notes|length }}):
 {% endfor %}
 
 Analyze this deal and provide summary, next action, blockers, missing information, and recommendations.""",
-            required_variables=["deal_title", "stage", "days_in_stage", "owner_name", "notes"],
-            max_tokens_estimate=500,
-            model_tier="balanced",
-            temperature=0.5,
-            description="Summarize a deal with actionable insights"
-        ))
-
-        # Compliance analysis
-        self.register_prompt(PromptTemplate(
-            id="deal.compliance_check.v1",
-            version="v1",
-            system_prompt="""You are an expert at analyzing project compliance documentation.
+        required_variables=["deal_title", "stage", "days_in_stage", "owner_name", "notes"],
+        token_budget=1500,
+        packed_variables=["notes"],
+        max_tokens_estimate=500,
+        model_tier="balanced",
+        temperature=0.5,
+        cacheable=True,
+        description="Summarize a deal with actionable insights"
+    )
+
+
+# Compliance analysis
+@_default_prompt("deal.compliance_check.v1")
+def _deal_compliance_check_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="deal.compliance_check.v1",
+        version="v1",
+        system_prompt="""You are an expert at analyzing project compliance documentation.
 Analyze the provided deal notes and determine:
 1. Is a survey checklist present? (yes/no/unclear)
 2. Are quality documents present? (yes/no/unclear)
@@ -256,7 +397,7 @@ Analyze the provided deal notes and determine:
 4. Brief comment summarizing compliance status
 
 Respond in JSON format: {"survey_checklist_present": bool or null, "quality_docs_present": bool or null, "missing_items": [str], "comment": str}""",
-            user_prompt_template="""Deal: {{ deal_title }}
+        user_prompt_template="""Deal: {{ deal_title }}
 Stage: {{ stage }}
 
 Notes:
@@ -265,24 +406,30 @@ Notes:
 {% endfor %}
 
 Analyze compliance documentation status.""",
-            required_variables=["deal_title", "stage", "notes"],
-            max_tokens_estimate=300,
-            model_tier="balanced",
-            temperature=0.3,
-            description="Check compliance documentation status"
-        ))
-
-        # Order received analysis
-        self.register_prompt(PromptTemplate(
-            id="deal.order_received_analysis.v1",
-            version="v1",
-            system_prompt="""Analyze project notes to determine:
+        required_variables=["deal_title", "stage", "notes"],
+        token_budget=2000,
+        packed_variables=["notes"],
+        max_tokens_estimate=300,
+        model_tier="balanced",
+        temperature=0.3,
+        cacheable=True,
+        description="Check compliance documentation status"
+    )
+
+
+# Order received analysis
+@_default_prompt("deal.order_received_analysis.v1")
+def _deal_order_received_analysis_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="deal.order_received_analysis.v1",
+        version="v1",
+        system_prompt="""Analyze project notes to determine:
 1. Has the end user been identified? (yes/no/unknown)
 2. How many end-user-specific requests have been made?
 3. What items are missing?
 
 Respond in JSON: {"end_user_identified": bool or null, "end_user_requests_count": int, "missing_items": [str]}""",
-            user_prompt_template="""Deal: {{ deal_title }}
+        user_prompt_template="""Deal: {{ deal_title }}
 
 Notes:
 {% for note in notes %}
@@ -290,18 +437,24 @@ Notes:
 {% endfor %}
 
 Analyze end user identification status.""",
-            required_variables=["deal_title", "notes"],
-            max_tokens_estimate=200,
-            model_tier="balanced",
-            temperature=0.3,
-            description="Analyze order received deal for end user identification"
-        ))
-
-        # Email drafting
-        self.register_prompt(PromptTemplate(
-            id="email.followup.v1",
-            version="v1",
-            system_prompt="""You are a helpful sales manager writing professional follow-up emails.
+        required_variables=["deal_title", "notes"],
+        token_budget=1500,
+        packed_variables=["notes"],
+        max_tokens_estimate=200,
+        model_tier="balanced",
+        temperature=0.3,
+        cacheable=True,
+        description="Analyze order received deal for end user identification"
+    )
+
+
+# Email drafting
+@_default_prompt("email.followup.v1")
+def _email_followup_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="email.followup.v1",
+        version="v1",
+        system_prompt="""You are a helpful sales manager writing professional follow-up emails.
 Generate a {{ tone }} email that:
 - Is courteous and professional
 - Clearly states the issues/actions needed
@@ -315,7 +468,7 @@ Constraints:
 {% endif %}
 
 Respond in JSON: {"subject": str, "body": str, "body_html": str or null, "suggested_followups": [str], "confidence": float}""",
-            user_prompt_template="""Recipient(s): {{ recipients|join(', ') }}
+        user_prompt_template="""Recipient(s): {{ recipients|join(', ') }}
 Subject intent: {{ subject_intent }}
 Language: {{ language }}
 Tone: {{ tone }}
@@ -326,18 +479,24 @@ Deal contexts:
 {% endfor %}
 
 Generate the email.""",
-            required_variables=["recipients", "subject_intent", "language", "tone", "deal_contexts"],
-            max_tokens_estimate=500,
-            model_tier="balanced",
-            temperature=0.7,
-            description="Draft a professional follow-up email"
-        ))
-
-        # Reminder drafting (WhatsApp/Email/SMS variants)
-        self.register_prompt(PromptTemplate(
-            id="reminder.whatsapp.v1",
-            version="v1",
-            system_prompt="""You are drafting a WhatsApp reminder message.
+        required_variables=["recipients", "subject_intent", "language", "tone", "deal_contexts"],
+        token_budget=1500,
+        packed_variables=["deal_contexts.issue"],
+        max_item_tokens=120,
+        max_tokens_estimate=500,
+        model_tier="balanced",
+        temperature=0.7,
+        description="Draft a professional follow-up email"
+    )
+
+
+# Reminder drafting (WhatsApp/Email/SMS variants)
+@_default_prompt("reminder.whatsapp.v1")
+def _reminder_whatsapp_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="reminder.whatsapp.v1",
+        version="v1",
+        system_prompt="""You are drafting a WhatsApp reminder message.
 Requirements:
 - Keep it very concise (under 160 characters for short version)
 - Use appropriate tone based on urgency: {{ urgency }}
@@ -346,24 +505,27 @@ Requirements:
 - Recipient role: {{ recipient_role }}
 
 Respond in JSON: {"message_text": str, "short_version": str, "tags": [str], "confidence": float}""",
-            user_prompt_template="""Deal: {{ deal_title }}
+        user_prompt_template="""Deal: {{ deal_title }}
 Stage: {{ deal_stage }}
 {% if due_date %}Due date: {{ due_date }}{% endif %}
 Urgency: {{ urgency }}
 Context: {{ context }}
 
 Draft the WhatsApp reminder.""",
-            required_variables=["deal_title", "deal_stage", "urgency", "recipient_role", "context"],
-            max_tokens_estimate=200,
-            model_tier="fast",
-            temperature=0.6,
-            description="Draft a WhatsApp reminder message"
-        ))
-
-        self.register_prompt(PromptTemplate(
-            id="reminder.email.v1",
-            version="v1",
-            system_prompt="""You are drafting an email reminder.
+        required_variables=["deal_title", "deal_stage", "urgency", "recipient_role", "context"],
+        max_tokens_estimate=200,
+        model_tier="fast",
+        temperature=0.6,
+        description="Draft a WhatsApp reminder message"
+    )
+
+
+@_default_prompt("reminder.email.v1")
+def _reminder_email_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="reminder.email.v1",
+        version="v1",
+        system_prompt="""You are drafting an email reminder.
 Requirements:
 - Professional tone adjusted for urgency: {{ urgency }}
 - Clear subject line
@@ -371,49 +533,59 @@ Requirements:
 - Recipient role: {{ recipient_role }}
 
 Respond in JSON: {"message_text": str, "tags": [str], "confidence": float}""",
-            user_prompt_template="""Deal: {{ deal_title }}
+        user_prompt_template="""Deal: {{ deal_title }}
 Stage: {{ deal_stage }}
 {% if due_date %}Due date: {{ due_date }}{% endif %}
 Urgency: {{ urgency }}
 Context: {{ context }}
 
 Draft the email reminder.""",
-            required_variables=["deal_title", "deal_stage", "urgency", "recipient_role", "context"],
-            max_tokens_estimate=300,
-            model_tier="fast",
-            temperature=0.6,
-            description="Draft an email reminder"
-        ))
-
-        # Notes summarization
-        self.register_prompt(PromptTemplate(
-            id="notes.summarize.v1",
-            version="v1",
-            system_prompt="""Summarize the provided notes/meeting text.
+        required_variables=["deal_title", "deal_stage", "urgency", "recipient_role", "context"],
+        max_tokens_estimate=300,
+        model_tier="fast",
+        temperature=0.6,
+        description="Draft an email reminder"
+    )
+
+
+# Notes summarization
+@_default_prompt("notes.summarize.v1")
+def _notes_summarize_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="notes.summarize.v1",
+        version="v1",
+        system_prompt="""Summarize the provided notes/meeting text.
 Output format: {{ format }}
 Max length: {{ max_length }} characters
 {% if extract_action_items %}Extract action items and assign to owners if mentioned.{% endif %}
 
 Respond in JSON: {"summary": str, "action_items": [str], "owners": [str], "confidence": float}""",
-            user_prompt_template="""Notes to summarize:
+        user_prompt_template="""Notes to summarize:
 {% for note in notes %}
 {{ note }}
 
 {% endfor %}
 
 Provide the summary.""",
-            required_variables=["notes", "format", "max_length", "extract_action_items"],
-            max_tokens_estimate=400,
-            model_tier="balanced",
-            temperature=0.5,
-            description="Summarize notes with action items"
-        ))
-
-        # Cashflow prediction with comprehensive construction/interior design rules
-        self.register_prompt(PromptTemplate(
-            id="cashflow.predict_dates.v1",
-            version="v1",
-            system_prompt="""You are an expert at predicting invoice and payment dates for a construction and interior design company in Saudi Arabia.
+        required_variables=["notes", "format", "max_length", "extract_action_items"],
+        token_budget=4000,
+        packed_variables=["notes"],
+        max_item_tokens=1000,
+        max_tokens_estimate=400,
+        model_tier="balanced",
+        temperature=0.5,
+        cacheable=True,
+        description="Summarize notes with action items"
+    )
+
+
+# Cashflow prediction with comprehensive construction/interior design rules
+@_default_prompt("cashflow.predict_dates.v1")
+def _cashflow_predict_dates_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="cashflow.predict_dates.v1",
+        version="v1",
+        system_prompt="""You are an expert at predicting invoice and payment dates for a construction and interior design company in Saudi Arabia.
 
 # Company Profile
 - Business: Construction and interior design specializing in baffle ceilings, acoustical panels, ceiling tiles, carpet installation, toilet cubicles, and cabinetry
@@ -494,7 +666,7 @@ Use the Realistic estimate for the main predicted_invoice_date.
 
 # Output Format
 Respond in JSON: {"predictions": [{"deal_id": int, "deal_title": str, "predicted_invoice_date": str (ISO format) or null, "predicted_payment_date": str (ISO format) or null, "confidence": float (0.0-1.0), "assumptions": [str], "missing_fields": [str], "reasoning": str}]}""",
-            user_prompt_template="""Today's date: {{ today_date }}
+        user_prompt_template="""Today's date: {{ today_date }}
 Prediction horizon: {{ horizon_days }} days
 
 Deals to analyze:
@@ -522,18 +694,21 @@ For each deal:
 3. Consider any risk factors mentioned in the notes
 4. Provide the Realistic estimate as the main prediction
 5. List key assumptions and any missing information that would improve the prediction""",
-            required_variables=["today_date", "horizon_days", "deals"],
-            max_tokens_estimate=4000,
-            model_tier="advanced",
-            temperature=0.3,
-            description="Predict invoice and payment dates using comprehensive construction industry rules"
-        ))
-
-        # Deal health analysis
-        self.register_prompt(PromptTemplate(
-            id="deal.health_analysis.v1",
-            version="v1",
-            system_prompt="""You are a deal health analyst for a construction/fit-out company. Your job is to analyze deal progress and provide actionable insights for the CEO.
+        required_variables=["today_date", "horizon_days", "deals"],
+        max_tokens_estimate=4000,
+        model_tier="advanced",
+        temperature=0.3,
+        description="Predict invoice and payment dates using comprehensive construction industry rules"
+    )
+
+
+# Deal health analysis
+@_default_prompt("deal.health_analysis.v1")
+def _deal_health_analysis_v1_prompt() -> PromptTemplate:
+    return PromptTemplate(
+        id="deal.health_analysis.v1",
+        version="v1",
+        system_prompt="""You are a deal health analyst for a construction/fit-out company. Your job is to analyze deal progress and provide actionable insights for the CEO.
 
 ## Stage Reference
 
@@ -614,7 +789,7 @@ Respond ONLY with valid JSON:
   "recommended_action": "specific next step",
   "confidence": 0.0-1.0
 }""",
-            user_prompt_template="""Analyze this deal:
+        user_prompt_template="""Analyze this deal:
 
 Deal: {{ deal_title }} (ID: {{ deal_id }})
 Stage: {{ stage }} ({{ stage_code }}) - {{ days_in_stage }} days
@@ -633,24 +808,60 @@ Recent Notes ({{ notes|length }}):
 {% endfor %}
 
 Provide the health analysis JSON.""",
-            required_variables=["deal_id", "deal_title", "stage", "stage_code",
-                                "days_in_stage", "owner_name", "value_sar",
-                                "days_since_last_note", "stage_history", "notes"],
-            max_tokens_estimate=600,
-            model_tier="balanced",
-            temperature=0.5,
-            description="Analyze deal health with attribution and recommendations"
-        ))
+        required_variables=["deal_id", "deal_title", "stage", "stage_code",
+                            "days_in_stage", "owner_name", "value_sar",
+                            "days_since_last_note", "stage_history", "notes"],
+        token_budget=1500,
+        packed_variables=["notes.content"],
+        max_item_tokens=60,
+        max_tokens_estimate=600,
+        model_tier="balanced",
+        temperature=0.5,
+        cacheable=True,
+        description="Analyze deal health with attribution and recommendations"
+    )
+
+
+class PromptRegistry:
+    """Registry for managing LLM prompt templates with A/B testing support."""
+
+    def __init__(self, result_store: Optional["ExperimentStore"] = None):
+        self.result_store = result_store
+        self._prompts: Dict[str, PromptTemplate] = {}
+        self._definitions: Dict[str, Callable[[], PromptTemplate]] = {}
+        self._experiments: Dict[str, PromptExperiment] = {}
+        self._packing_totals: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "tokens_before": 0, "tokens_after": 0}
+        )
+        self._packing_lock = threading.Lock()
+        self._register_default_prompts()
+
+    def _register_default_prompts(self):
+        """Define all default prompts (built and compiled on first use)."""
+        for prompt_id, factory in DEFAULT_PROMPTS.items():
+            self.define_prompt(prompt_id, factory)
+
+    def define_prompt(self, prompt_id: str, factory: Callable[[], PromptTemplate]) -> None:
+        """Register a prompt lazily; factory runs on the first get_prompt().
+
+        Args:
+            prompt_id: Prompt identifier the factory builds
+            factory: Returns the PromptTemplate
+        """
+        self._prompts.pop(prompt_id, None)
+        self._definitions[prompt_id] = factory
 
     def register_prompt(self, prompt: PromptTemplate) -> None:
-        """Register a new prompt template.
+        """Register a new prompt template and compile it.
 
         Args:
             prompt: PromptTemplate to register
 
         Raises:
-            ValueError: If prompt ID already exists with different version
+            ValueError: If the template has a syntax error
         """
+        prompt.compile()
+        self._definitions.pop(prompt.id, None)
         if prompt.id in self._prompts:
             existing = self._prompts[prompt.id]
             if existing.version != prompt.version:
@@ -674,10 +885,16 @@ Provide the health analysis JSON.""",
             KeyError: If prompt not found
         """
         if prompt_id not in self._prompts:
-            raise KeyError(f"Prompt '{prompt_id}' not found in registry")
+            if prompt_id not in self._definitions:
+                raise KeyError(f"Prompt '{prompt_id}' not found in registry")
+            self.register_prompt(self._definitions[prompt_id]())
 
         return self._prompts[prompt_id]
 
+    def has_prompt(self, prompt_id: str) -> bool:
+        """Whether a prompt is registered (without building a lazy one)."""
+        return prompt_id in self._prompts or prompt_id in self._definitions
+
     def render_prompt(self, prompt_id: str, variables: dict) -> tuple[str, str]:
         """Get and render a prompt template.
 
@@ -692,15 +909,63 @@ Provide the health analysis JSON.""",
             KeyError: If prompt not found
             ValueError: If variables invalid or rendering fails
         """
-        prompt = self.get_prompt(prompt_id)
-        return prompt.render(variables)
+        system_prompt, user_prompt, _ = self.render_prompt_with_report(prompt_id, variables)
+        return system_prompt, user_prompt
+
+    def render_prompt_with_report(self, prompt_id: str, variables: dict) -> tuple[str, str, PackingReport]:
+        """Render a prompt with its list variables packed into its token budget.
+
+        Args:
+            prompt_id: Prompt identifier
+            variables: Variables to inject
+
+        Returns:
+            Tuple of (system_prompt, rendered_user_prompt, report) where the
+            report has the prompt tokens before and after packing
+
+        Raises:
+            KeyError: If prompt not found
+            ValueError: If variables invalid or rendering fails
+        """
+        return self._render_packed(self.get_prompt(prompt_id), variables)
+
+    def _render_packed(self, prompt: PromptTemplate, variables: dict) -> tuple[str, str, PackingReport]:
+        packed, report = pack_variables(prompt, variables)
+        system_prompt, user_prompt = prompt.render(packed)
+
+        system_tokens = _system_prompt_tokens(system_prompt)
+        report.tokens_after = system_tokens + count_tokens(user_prompt)
+        if packed is variables:
+            report.tokens_before = report.tokens_after
+        else:
+            report.tokens_before = system_tokens + count_tokens(prompt.render(variables)[1])
+
+        with self._packing_lock:
+            totals = self._packing_totals[prompt.id]
+            totals["requests"] += 1
+            totals["tokens_before"] += report.tokens_before
+            totals["tokens_after"] += report.tokens_after
+
+        if report.tokens_saved:
+            logger.debug(
+                f"Packed prompt '{prompt.id}': {report.tokens_before} -> {report.tokens_after} tokens "
+                f"({report.duplicates} duplicate, {report.truncated} truncated, {report.dropped} dropped)"
+            )
+        return system_prompt, user_prompt, report
+
+    def get_packing_stats(self) -> Dict[str, Dict[str, int]]:
+        """Requests and prompt tokens before/after packing, per prompt."""
+        with self._packing_lock:
+            return {prompt_id: dict(totals) for prompt_id, totals in self._packing_totals.items()}
 
     def list_prompts(self) -> list[dict]:
-        """List all registered prompts.
+        """List all registered prompts (building any lazy ones).
 
         Returns:
             List of prompt metadata
         """
+        for prompt_id in list(self._definitions):
+            self.get_prompt(prompt_id)
         return [
             {
                 "id": p.id,
@@ -708,6 +973,7 @@ Provide the health analysis JSON.""",
                 "description": p.description,
                 "model_tier": p.model_tier,
                 "max_tokens": p.max_tokens_estimate,
+                "token_budget": p.token_budget,
             }
             for p in self._prompts.values()
         ]
@@ -719,13 +985,16 @@ Provide the health analysis JSON.""",
             prompt_id: Prompt identifier
 
         Returns:
-            Dict with max_tokens, temperature, model_tier
+            Dict with max_tokens, temperature, model_tier, token_budget and
+            cache_scope (None unless the prompt is cacheable)
         """
         prompt = self.get_prompt(prompt_id)
         return {
             "max_tokens": prompt.max_tokens_estimate,
             "temperature": prompt.temperature,
             "model_tier": prompt.model_tier,
+            "token_budget": prompt.token_budget,
+            "cache_scope": CacheScope(prompt.id, prompt.version) if prompt.cacheable else None,
         }
 
     # ========================================================================
@@ -772,6 +1041,9 @@ Provide the health analysis JSON.""",
         if not (0.99 <= total <= 1.01):  # Allow small floating point error
             raise ValueError(f"Traffic split must sum to 1.0, got {total}")
 
+        for variant in variants.values():
+            variant.compile()
+
         experiment = PromptExperiment(
             experiment_id=experiment_id,
             base_prompt_id=base_prompt_id,
@@ -780,6 +1052,8 @@ Provide the health analysis JSON.""",
         )
 
         self._experiments[experiment_id] = experiment
+        if self.result_store is not None:
+            self.result_store.save_experiment(experiment)
         logger.info(
             f"Created experiment '{experiment_id}' with {len(variants)} variants: "
             f"{list(variants.keys())}"
@@ -791,6 +1065,24 @@ Provide the health analysis JSON.""",
         """Get an experiment by ID."""
         return self._experiments.get(experiment_id)
 
+    def load_experiments(self) -> int:
+        """Restore saved experiments and their stats from the result store.
+
+        Returns:
+            Number of experiments loaded
+        """
+        if self.result_store is None:
+            return 0
+
+        experiments = self.result_store.load_experiments()
+        for experiment in experiments:
+            for variant in experiment.variants.values():
+                variant.compile()
+            self._experiments[experiment.experiment_id] = experiment
+
+        logger.info(f"Loaded {len(experiments)} prompt experiments")
+        return len(experiments)
+
     def render_prompt_with_experiment(
         self,
         experiment_id: str,
@@ -822,7 +1114,7 @@ Provide the health analysis JSON.""",
         logger.debug(f"Experiment '{experiment_id}' selected variant '{variant_id}'")
 
         # Render prompt
-        system_prompt, user_prompt = prompt.render(variables)
+        system_prompt, user_prompt, _ = self._render_packed(prompt, variables)
 
         return system_prompt, user_prompt, variant_id
 
@@ -857,6 +1149,8 @@ Provide the health analysis JSON.""",
             cost_usd=cost_usd,
             latency_ms=latency_ms,
         )
+        if self.result_store is not None:
+            self.result_store.append(experiment_id, variant_id, success, confidence, cost_usd, latency_ms)
 
     def get_experiment_stats(self, experiment_id: str) -> Optional[Dict[str, Any]]:
         """Get statistics for an experiment.
@@ -872,6 +1166,8 @@ Provide the health analysis JSON.""",
             return None
 
         winner = experiment.get_winner()
+        leader, p_values = experiment.compare()
+        stats = experiment.snapshot()
 
         return {
             "experiment_id": experiment.experiment_id,
@@ -881,6 +1177,9 @@ Provide the health analysis JSON.""",
             "variants": list(experiment.variants.keys()),
             "traffic_split": experiment.traffic_split,
             "winner": winner,
+            "leader": leader,
+            "p_values": p_values,
+            "version": experiment.version,
             "variant_stats": {
                 variant_id: {
                     "uses": stats.uses,
@@ -888,8 +1187,9 @@ Provide the health analysis JSON.""",
                     "success_rate": stats.success_rate(),
                     "avg_cost_usd": stats.avg_cost_usd(),
                     "avg_latency_ms": stats.avg_latency_ms(),
+                    "avg_quality": stats.avg_quality(),
                 }
-                for variant_id, stats in experiment.stats.items()
+                for variant_id, stats in stats.items()
             }
         }
 
@@ -923,6 +1223,8 @@ Provide the health analysis JSON.""",
 
         # Deactivate experiment
         experiment.active = False
+        if self.result_store is not None:
+            self.result_store.save_experiment(experiment)
 
         return winner_id
 
@@ -934,7 +1236,7 @@ Provide the health analysis JSON.""",
                 "base_prompt_id": exp.base_prompt_id,
                 "active": exp.active,
                 "variants": list(exp.variants.keys()),
-                "total_uses": sum(s.uses for s in exp.stats.values()),
+                "total_uses": sum(s.uses for s in exp.snapshot().values()),
             }
             for exp in self._experiments.values()
         ]
@@ -948,5 +1250,6 @@ def get_prompt_registry() -> PromptRegistry:
     """Get or create prompt registry singleton."""
     global _prompt_registry
     if _prompt_registry is None:
-        _prompt_registry = PromptRegistry()
+        from .experiment_store import get_experiment_store
+        _prompt_registry = PromptRegistry(result_store=get_experiment_store())
     return _prompt_registry
@@ -0,0 +1,292 @@
+"""In-process result cache for expensive dashboard computations.
+
+The Aramco summaries, cashflow predictions and CEO dashboard metrics are
+recomputed on every TUI refresh, yet their inputs only change when a sync
+commits. ResultCache memoizes those service methods:
+- Keys are the method name, its arguments and the current data version;
+  syncs call bump_data_version() so later calls recompute
+- Entries expire after a TTL and are evicted least-recently-used beyond
+  max_entries
+- Concurrent misses for the same key share one computation (threads and
+  asyncio tasks alike)
+- Hit/miss/coalesced/eviction counters are exposed through stats()
+
+The cache is dropped when db.read_engine is swapped (tests, engine
+reconfiguration), like the dimension cache.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .. import db
+from ..integrations.config import get_config
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, Hashable, int]
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn call arguments into a hashable key component."""
+    if isinstance(value, BaseModel):
+        return (type(value).__name__, value.model_dump_json())
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        frozen = tuple(_freeze(v) for v in value)
+        return tuple(sorted(frozen, key=repr)) if isinstance(value, (set, frozenset)) else frozen
+    return value
+
+
+class ResultCache:
+    """TTL + LRU memo cache keyed by call arguments and the data version.
+
+    Usage:
+        cache = get_result_cache()
+        value = cache.get_or_compute("aramco.overdue_summary", (pipeline,), compute)
+        value = await cache.get_or_compute_async("cashflow.predictions", (pipeline,), compute)
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Key, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Key, Future] = {}
+        self._inflight_async: Dict[Key, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._engine = None
+        self._version = 0
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    # -------------------------------------------------------------------------
+    # Versioning
+    # -------------------------------------------------------------------------
+
+    @property
+    def data_version(self) -> int:
+        return self._version
+
+    def bump_data_version(self, source: str = "sync") -> int:
+        """Invalidate every entry computed from older data."""
+        with self._lock:
+            self._version += 1
+            dropped = len(self._entries)
+            self._entries.clear()
+        logger.debug(f"Result cache data version {self._version} after {source} ({dropped} entries dropped)")
+        return self._version
+
+    def clear(self) -> None:
+        """Drop all entries and counters."""
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+    # -------------------------------------------------------------------------
+    # Entries
+    # -------------------------------------------------------------------------
+
+    def _key(self, name: str, params: Any) -> Key:
+        return (name, _freeze(params), self._version)
+
+    def _count(self, name: str, event: str) -> None:
+        self._counters[name][event] += 1
+
+    def _lookup(self, name: str, params: Any) -> Tuple[Key, bool, Any]:
+        """Return (key, found, value), counting hits and expirations. Caller holds the lock."""
+        if self._engine is not db.read_engine:
+            self._entries.clear()
+            self._engine = db.read_engine
+        key = self._key(name, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self._count(name, "hits")
+                return key, True, value
+            del self._entries[key]
+            self._count(name, "expirations")
+        return key, False, None
+
+    def _store(self, name: str, key: Key, value: Any, ttl: Optional[float]) -> None:
+        """Store a computed value unless the data version moved meanwhile."""
+        with self._lock:
+            if key[2] != self._version:
+                return
+            ttl = self.ttl_seconds if ttl is None else ttl
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._count(evicted[0], "evictions")
+
+    def get_or_compute(self, name: str, params: Any, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value or compute it once, even under concurrent calls."""
+        with self._lock:
+            key, found, value = self._lookup(name, params)
+            if found:
+                return value
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+                self._count(name, "misses")
+            else:
+                owner = False
+                self._count(name, "coalesced")
+
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        else:
+            self._store(name, key, value, ttl)
+            pending.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def get_or_compute_async(
+        self,
+        name: str,
+        params: Any,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Async variant of get_or_compute; concurrent tasks await one computation."""
+        while True:
+            with self._lock:
+                key, found, value = self._lookup(name, params)
+                if found:
+                    return value
+                pending = self._inflight_async.get(key)
+                # Futures are bound to their loop; callers on another loop compute on their own
+                if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+                    break
+                self._count(name, "coalesced")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The computing task was cancelled; compute (or join) afresh
+
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._inflight_async.setdefault(key, future)
+            self._count(name, "misses")
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        else:
+            self._store(name, key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                if self._inflight_async.get(key) is future:
+                    del self._inflight_async[key]
+
+    # -------------------------------------------------------------------------
+    # Metrics
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters per cached method plus totals."""
+        with self._lock:
+            methods = {name: dict(counts) for name, counts in self._counters.items()}
+            entries = len(self._entries)
+        totals: Dict[str, int] = defaultdict(int)
+        for counts in methods.values():
+            for event, count in counts.items():
+                totals[event] += count
+        lookups = totals["hits"] + totals["misses"] + totals["coalesced"]
+        return {
+            "data_version": self._version,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": totals["hits"],
+            "misses": totals["misses"],
+            "coalesced": totals["coalesced"],
+            "evictions": totals["evictions"],
+            "expirations": totals["expirations"],
+            "hit_ratio": (totals["hits"] + totals["coalesced"]) / lookups if lookups else None,
+            "methods": methods,
+        }
+
+
+def cached_result(name: str, ttl: Optional[float] = None):
+    """Memoize a service method (sync or async) in the shared result cache.
+
+    The bound instance is not part of the key: cached methods belong to
+    process-wide service singletons. The undecorated method stays available
+    as ``method.uncached``.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                return await get_result_cache().get_or_compute_async(
+                    name, (args, kwargs), lambda: func(self, *args, **kwargs), ttl,
+                )
+            async_wrapper.uncached = func
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            return get_result_cache().get_or_compute(
+                name, (args, kwargs), lambda: func(self, *args, **kwargs), ttl,
+            )
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+# Global cache instance
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get or create the result cache singleton."""
+    global _result_cache
+    if _result_cache is None:
+        config = get_config()
+        _result_cache = ResultCache(
+            max_entries=config.result_cache_max_entries,
+            ttl_seconds=config.result_cache_ttl_seconds,
+        )
+    return _result_cache
+
+
+def bump_data_version(source: str = "sync") -> int:
+    """Invalidate cached results after a sync commits new data."""
+    return get_result_cache().bump_data_version(source)
+
+
+__all__ = [
+    "ResultCache",
+    "cached_result",
+    "get_result_cache",
+    "bump_data_version",
+]
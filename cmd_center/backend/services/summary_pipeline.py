@@ -0,0 +1,189 @@
+"""Streaming batch summarizer.
+
+batch_summarize_deals used to await lock-step groups of max_concurrent
+summaries: one slow response left the other slots idle until it returned,
+and nothing came back before the last group finished. stream_summaries()
+runs a worker pool instead:
+- max_concurrent workers share one queue of deals, so a worker picks up
+  the next deal as soon as its previous summary completes and N requests
+  stay in flight until the queue drains
+- Outcomes are yielded in completion order; failures are outcomes too
+- With a run_id (see create_summary_run) each outcome is written to
+  deal_summary_record as it arrives, so GET /deals/summary-runs/{run_id}
+  can render progressively
+- Passing the run_id of an interrupted run resumes it: deals that already
+  have a summary are skipped, failed ones are retried
+- Closing the iterator or cancelling the consuming task cancels the
+  in-flight requests and marks the run cancelled
+
+Requests run in the BATCH lane of the shared LLM gateway, so interactive
+agent chats are served first.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from .. import db
+from ..db import DealSummaryRecord, SummaryRun
+from ..integrations.llm_circuit_breaker import LLMPriority, llm_priority
+from ..models.writer_models import DealSummaryContext, DealSummaryResult, SummaryRunProgress
+
+logger = logging.getLogger(__name__)
+
+Summarizer = Callable[[DealSummaryContext], Awaitable[DealSummaryResult]]
+
+
+@dataclass(frozen=True)
+class SummaryOutcome:
+    """One deal's summary, or the error that replaced it."""
+
+    deal_id: int
+    result: Optional[DealSummaryResult] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def create_summary_run(contexts: Iterable[DealSummaryContext]) -> int:
+    """Register a run for contexts and return its id."""
+    with Session(db.engine) as session:
+        run = SummaryRun(total=len({context.deal_id for context in contexts}))
+        session.add(run)
+        session.commit()
+        return run.id
+
+
+def summarized_deal_ids(run_id: int) -> set[int]:
+    """Deals of a run that already have a successful summary."""
+    with Session(db.engine) as session:
+        return set(session.exec(
+            select(DealSummaryRecord.deal_id)
+            .where(DealSummaryRecord.run_id == run_id, DealSummaryRecord.error.is_(None))
+        ))
+
+
+def record_outcome(run_id: int, outcome: SummaryOutcome) -> None:
+    """Store an outcome, replacing an earlier attempt for the same deal."""
+    with Session(db.engine) as session:
+        session.execute(delete(DealSummaryRecord).where(
+            DealSummaryRecord.run_id == run_id, DealSummaryRecord.deal_id == outcome.deal_id
+        ))
+        session.add(DealSummaryRecord(
+            run_id=run_id,
+            deal_id=outcome.deal_id,
+            result_json=outcome.result.model_dump_json() if outcome.result else None,
+            error=outcome.error,
+        ))
+        session.commit()
+
+
+def finish_summary_run(run_id: int, status: str) -> None:
+    with Session(db.engine) as session:
+        run = session.get(SummaryRun, run_id)
+        if run is None:
+            return
+        run.status = status
+        run.finished_at = datetime.now(timezone.utc)
+        session.add(run)
+        session.commit()
+
+
+def get_summary_run(run_id: int, after: int = 0) -> Optional[SummaryRunProgress]:
+    """Run status with the outcomes recorded after cursor `after`."""
+    with Session(db.read_engine) as session:
+        run = session.get(SummaryRun, run_id)
+        if run is None:
+            return None
+        succeeded, failed = session.exec(
+            select(
+                func.count(DealSummaryRecord.result_json),
+                func.count(DealSummaryRecord.error),
+            ).where(DealSummaryRecord.run_id == run_id)
+        ).one()
+        records = session.exec(
+            select(DealSummaryRecord)
+            .where(DealSummaryRecord.run_id == run_id, DealSummaryRecord.id > after)
+            .order_by(DealSummaryRecord.id)
+        ).all()
+
+    return SummaryRunProgress(
+        run_id=run_id,
+        status=run.status,
+        total=run.total,
+        succeeded=succeeded,
+        failed=failed,
+        results=[
+            DealSummaryResult.model_validate_json(record.result_json)
+            for record in records if record.result_json
+        ],
+        errors={record.deal_id: record.error for record in records if record.error},
+        cursor=records[-1].id if records else after,
+    )
+
+
+async def stream_summaries(
+    summarize: Summarizer,
+    contexts: list[DealSummaryContext],
+    max_concurrent: int = 5,
+    run_id: Optional[int] = None,
+) -> AsyncIterator[SummaryOutcome]:
+    """Summarize contexts with a bounded worker pool, yielding as each completes.
+
+    Args:
+        summarize: Coroutine producing one summary (WriterService.summarize_deal)
+        contexts: Deals to summarize
+        max_concurrent: Requests kept in flight
+        run_id: Persist outcomes under this run, skipping deals it already summarized
+
+    Yields:
+        SummaryOutcome per deal, in completion order
+    """
+    if run_id is not None:
+        done = await asyncio.to_thread(summarized_deal_ids, run_id)
+        contexts = [context for context in contexts if context.deal_id not in done]
+        if done:
+            logger.info(f"Resuming summary run {run_id}: {len(done)} done, {len(contexts)} left")
+
+    queue = iter(contexts)
+    outcomes: asyncio.Queue[SummaryOutcome] = asyncio.Queue()
+
+    async def worker() -> None:
+        # Workers share the iterator; each takes the next deal once it is free
+        for context in queue:
+            try:
+                outcome = SummaryOutcome(context.deal_id, result=await summarize(context))
+            except Exception as e:
+                logger.error(f"Batch summarization error for deal {context.deal_id}: {e}")
+                outcome = SummaryOutcome(context.deal_id, error=str(e) or type(e).__name__)
+            if run_id is not None:
+                try:
+                    await asyncio.to_thread(record_outcome, run_id, outcome)
+                except Exception as e:
+                    logger.error(f"Failed to record summary of deal {context.deal_id}: {e}")
+            outcomes.put_nowait(outcome)
+
+    with llm_priority(LLMPriority.BATCH):
+        workers = [asyncio.create_task(worker()) for _ in range(min(max_concurrent, len(contexts)))]
+
+    status = "cancelled"
+    try:
+        for _ in range(len(contexts)):
+            yield await outcomes.get()
+        status = "completed"
+    except Exception:
+        status = "failed"
+        raise
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if run_id is not None:
+            await asyncio.to_thread(finish_summary_run, run_id, status)
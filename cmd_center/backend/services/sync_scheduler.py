@@ -3,20 +3,30 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from datetime import timedelta
 from typing import Optional
 
-from ..constants import SYNC_PIPELINES
 from ..db import init_db
+from ..integrations.config import get_config
+from ..integrations.openrouter_transport import get_openrouter_transport
+from ..integrations.pipedrive_transport import get_pipedrive_transport
+from ..migrations import run_background_migrations
 from .pipedrive_sync import (
     sync_pipelines,
     sync_stages,
-    sync_deals_for_pipeline,
+    sync_deals,
     sync_notes_for_open_deals,
     sync_stage_history_for_open_deals,
     get_last_sync_time,
     update_sync_metadata,
 )
+from .deal_facts import refresh_deal_facts
 from .email_sync import sync_all_mailboxes
+from .experiment_store import get_experiment_store
+from .prompt_registry import get_prompt_registry
+from .result_cache import bump_data_version
+from .job_scheduler import JobScheduler, SyncJob
+from .sync_status import reset_freshness_cache
 from fastapi import FastAPI
 
 logger = logging.getLogger(__name__)
@@ -27,11 +37,11 @@ notes_lock = asyncio.Lock()
 stage_history_lock = asyncio.Lock()
 email_lock = asyncio.Lock()
 
-# Background tasks
-deals_task: Optional[asyncio.Task] = None
-notes_task: Optional[asyncio.Task] = None
-stage_history_task: Optional[asyncio.Task] = None
-email_task: Optional[asyncio.Task] = None
+# Background sync job scheduler
+scheduler: Optional[JobScheduler] = None
+
+# Bootstrap sync + scheduler start, run in the background at API startup
+startup_task: Optional[asyncio.Task] = None
 
 
 async def bootstrap_sync():
@@ -72,26 +82,41 @@ async def bootstrap_sync():
             update_sync_metadata("stage_history_backfill", "success",
                                records_synced=result['synced_successfully'],
                                records_total=result['total_deals'])
+            bump_data_version("stage_history")
         except Exception as e:
             logger.error(f"Stage history backfill failed: {e}")
 
 
+async def refresh_facts_after_sync(source: str):
+    """Rebuild deal_facts rows for deals changed by a sync; never fails the sync."""
+    try:
+        # Off the event loop: a first backfill rebuilds every deal
+        await asyncio.to_thread(refresh_deal_facts)
+    except Exception as e:
+        logger.error(f"Deal facts refresh after {source} failed: {e}")
+
+
 async def run_deals_sync():
     """Run deals sync for all pipelines."""
     async with deals_lock:
         logger.info("Starting deals sync...")
         start_time = asyncio.get_event_loop().time()
         try:
-            for pipeline_id in SYNC_PIPELINES:
-                await sync_deals_for_pipeline(pipeline_id, status="open", incremental=True)
+            result = await sync_deals(status="open")
+            await refresh_facts_after_sync("deals sync")
+            reset_freshness_cache()
             duration = asyncio.get_event_loop().time() - start_time
-            logger.info(f"Deals sync completed in {duration:.2f}s")
+            logger.info(
+                f"Deals sync ({result['mode']}) completed in {duration:.2f}s: "
+                f"{result['synced']}/{result['total']} deals"
+            )
         # This is to stop the application when cancelled.
         except asyncio.CancelledError:
             raise
         except Exception as e:
             duration = asyncio.get_event_loop().time() - start_time
             logger.error(f"Deals sync failed after {duration:.2f}s: {e}")
+            raise
 
 
 async def run_notes_sync():
@@ -101,6 +126,7 @@ async def run_notes_sync():
         start_time = asyncio.get_event_loop().time()
         try:
             await sync_notes_for_open_deals(limit_per_deal=5, ttl_minutes=30, concurrency=8)
+            await refresh_facts_after_sync("notes sync")
             duration = asyncio.get_event_loop().time() - start_time
             logger.info(f"Notes sync completed in {duration:.2f}s")
         # this is to stop the application and exit cleanly when cancelled.
@@ -109,6 +135,7 @@ async def run_notes_sync():
         except Exception as e:
             duration = asyncio.get_event_loop().time() - start_time
             logger.error(f"Notes sync failed after {duration:.2f}s: {e}")
+            raise
 
 
 async def run_activities_sync():
@@ -130,16 +157,20 @@ async def run_stage_history_sync():
             duration = asyncio.get_event_loop().time() - start_time
             logger.info(
                 f"Stage history sync completed in {duration:.2f}s: "
-                f"{result['synced_successfully']}/{result['total_deals']} deals, "
+                f"{result['synced_successfully']}/{result['total_deals']} deals "
+                f"({result['fetched']} fetched, {result['skipped']} unchanged), "
                 f"{result['total_events']} events, {result['total_spans']} spans"
             )
             if result['errors']:
                 logger.warning(f"Stage history sync had {result['failed']} errors")
+            if result['fetched']:
+                bump_data_version("stage_history")
         except asyncio.CancelledError:
             raise
         except Exception as e:
             duration = asyncio.get_event_loop().time() - start_time
             logger.error(f"Stage history sync failed after {duration:.2f}s: {e}")
+            raise
 
 
 async def run_email_sync():
@@ -159,123 +190,123 @@ async def run_email_sync():
         except Exception as e:
             duration = asyncio.get_event_loop().time() - start_time
             logger.error(f"Email sync failed after {duration:.2f}s: {e}")
+            raise
 
 
-async def deals_loop():
-    """Periodic deals sync loop (every 60 minutes)."""
-    while True:
-        await asyncio.sleep(60 * 60)  # 60 minutes
-        await run_deals_sync()
-
-
-async def notes_loop():
-    """Periodic notes and activities sync loop (every 30 minutes)."""
-    while True:
-        await asyncio.sleep(30 * 60)  # 30 minutes
-        await run_notes_sync()
-        await run_activities_sync()
-
-
-async def stage_history_loop():
-    """Periodic stage history sync loop (every 60 minutes)."""
-    while True:
-        await asyncio.sleep(60 * 60)  # 60 minutes
-        await run_stage_history_sync()
-
-
-async def email_loop():
-    """Periodic email sync loop (every 15 minutes)."""
-    while True:
-        await asyncio.sleep(15 * 60)  # 15 minutes
-        await run_email_sync()
+async def run_notes_and_activities_sync():
+    """Run notes sync followed by the activities placeholder."""
+    await run_notes_sync()
+    await run_activities_sync()
+
+
+def get_scheduler() -> JobScheduler:
+    """Get or create the sync job scheduler with all jobs registered."""
+    global scheduler
+    if scheduler is None:
+        config = get_config()
+        scheduler = JobScheduler(
+            max_concurrency=config.sync_max_concurrent_jobs,
+            max_db_writers=config.sync_max_db_writer_jobs,
+        )
+        scheduler.register(SyncJob(
+            "deals", run_deals_sync, timedelta(minutes=60),
+            priority=0, jitter=timedelta(minutes=2),
+            description="Incremental deal sync for tracked pipelines",
+        ))
+        # Runs after deals so its change detection sees fresh watermarks
+        scheduler.register(SyncJob(
+            "stage_history", run_stage_history_sync, timedelta(minutes=60),
+            priority=1, jitter=timedelta(minutes=2),
+            description="Stage history for changed open deals",
+        ))
+        scheduler.register(SyncJob(
+            "notes", run_notes_and_activities_sync, timedelta(minutes=30),
+            priority=2, jitter=timedelta(minutes=1),
+            description="Recent notes for open deals",
+        ))
+        scheduler.register(SyncJob(
+            "email", run_email_sync, timedelta(minutes=15),
+            priority=3, jitter=timedelta(seconds=30),
+            description="Mailbox sync",
+        ))
+    return scheduler
 
 
 async def start_scheduler():
-    """Start the background scheduler tasks."""
-    global deals_task, notes_task, stage_history_task, email_task
+    """Start the background sync job scheduler."""
+    await get_scheduler().start()
 
-    if deals_task is None or deals_task.done():
-        deals_task = asyncio.create_task(deals_loop())
-        logger.info("Started deals sync loop")
 
-    if notes_task is None or notes_task.done():
-        notes_task = asyncio.create_task(notes_loop())
-        logger.info("Started notes sync loop")
-
-    if stage_history_task is None or stage_history_task.done():
-        stage_history_task = asyncio.create_task(stage_history_loop())
-        logger.info("Started stage history sync loop")
-
-    if email_task is None or email_task.done():
-        email_task = asyncio.create_task(email_loop())
-        logger.info("Started email sync loop")
+async def run_startup_sync():
+    """Apply background schema migrations, bootstrap reference data, then start the job scheduler."""
+    try:
+        # Index builds before the first sync writes, so they never compete for the write lock
+        await run_background_migrations()
+        await bootstrap_sync()
+        # Builds facts for caches created before deal_facts existed and picks up stage renames
+        await refresh_facts_after_sync("bootstrap")
+    finally:
+        # Jobs without a persisted next run start right away
+        await start_scheduler()
+
+
+def startup_sync_state() -> str:
+    """State of the startup sync: not_started, running, done or failed."""
+    if startup_task is None:
+        return "not_started"
+    if not startup_task.done():
+        return "running"
+    if startup_task.cancelled() or startup_task.exception() is not None:
+        return "failed"
+    return "done"
 
 
 async def stop_scheduler():
-    """Stop the background scheduler tasks."""
-    global deals_task, notes_task, stage_history_task, email_task
-
-    if deals_task and not deals_task.done():
-        deals_task.cancel()
-        try:
-            await deals_task
-        except asyncio.CancelledError:
-            pass
-        logger.info("Stopped deals sync loop")
-
-    if notes_task and not notes_task.done():
-        notes_task.cancel()
-        try:
-            await notes_task
-        except asyncio.CancelledError:
-            pass
-        logger.info("Stopped notes sync loop")
-
-    if stage_history_task and not stage_history_task.done():
-        stage_history_task.cancel()
-        try:
-            await stage_history_task
-        except asyncio.CancelledError:
-            pass
-        logger.info("Stopped stage history sync loop")
-
-    if email_task and not email_task.done():
-        email_task.cancel()
-        try:
-            await email_task
-        except asyncio.CancelledError:
-            pass
-        logger.info("Stopped email sync loop")
+    """Stop the background sync job scheduler."""
+    if scheduler is not None:
+        await scheduler.stop()
 
 
 @asynccontextmanager
 async def lifespan_manager(app: FastAPI):
     """Lifespan context manager for FastAPI."""
-    from ..integrations import get_config
+    global startup_task
 
     # Startup
     config = get_config()
     init_db()
     logger.info(f"Command Center API starting on {config.api_host}:{config.api_port}")
-    logger.info("Starting Pipedrive sync scheduler...")
 
-    # Bootstrap
-    await bootstrap_sync()
+    # Prompt experiments survive restarts: rebuild their stats, then batch new results
+    try:
+        get_prompt_registry().load_experiments()
+    except Exception as e:
+        logger.error(f"Failed to load prompt experiments: {e}")
+    await get_experiment_store().start()
 
-    # Run initial syncs
-    await run_deals_sync()
-    await run_notes_sync()
-    await run_stage_history_sync()
-    await run_email_sync()
+    logger.info("Starting Pipedrive sync scheduler...")
 
-    # Start periodic loops
-    await start_scheduler()
+    if config.sync_blocking_startup:
+        await run_startup_sync()
+    else:
+        # Serve from the existing cache while the bootstrap sync runs;
+        # GET /sync/status and the X-Data-As-Of header report freshness
+        startup_task = asyncio.create_task(run_startup_sync())
 
     yield
 
     # Shutdown
     logger.info("Shutting down Pipedrive sync scheduler...")
+    if startup_task is not None and not startup_task.done():
+        startup_task.cancel()
+        try:
+            await startup_task
+        except asyncio.CancelledError:
+            pass
     await stop_scheduler()
+    await get_experiment_store().stop()
+    await get_pipedrive_transport().aclose()
+    await get_openrouter_transport().aclose()
     logger.info("Command Center API shutting down")
 
 
@@ -0,0 +1,173 @@
+"""Readiness and data-freshness reporting built on SyncMetadata.
+
+The API serves from the local cache while syncs run in the background, so
+clients need to know how old the data is rather than wait for a sync:
+- get_sync_status() summarises every sync for GET /sync/status
+- freshness_headers() stamps each response with the age of the deal cache
+"""
+
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlmodel import Session, func, select
+
+from .. import db
+from ..db import Deal, DealSyncState, SyncMetadata
+from .pipedrive_sync import DEALS_SYNC
+
+logger = logging.getLogger(__name__)
+
+# Response headers carrying the freshness of the served data
+DATA_AS_OF_HEADER = "X-Data-As-Of"
+DATA_AGE_HEADER = "X-Data-Age-Seconds"
+
+# How long a looked-up freshness timestamp is reused across responses
+FRESHNESS_CACHE_SECONDS = 5.0
+
+# Per-deal SyncMetadata rows, summarised per family instead of listed
+# (notes_<id> rows are legacy; notes state now lives in DealSyncState)
+_PER_DEAL_ROW = re.compile(r"^(notes|stage_history)_(\d+)$")
+
+_freshness_cache: Optional[Tuple[float, Optional[datetime]]] = None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def get_data_as_of() -> Optional[datetime]:
+    """Time of the last successful deal sync, or None if there has been none."""
+    with Session(db.read_engine) as session:
+        meta = session.exec(
+            select(SyncMetadata).where(SyncMetadata.entity_type == DEALS_SYNC)
+        ).first()
+    if meta is None or meta.status != "success":
+        return None
+    return _as_utc(meta.last_sync_time)
+
+
+def _cached_data_as_of() -> Optional[datetime]:
+    global _freshness_cache
+    now = time.monotonic()
+    if _freshness_cache is None or now - _freshness_cache[0] > FRESHNESS_CACHE_SECONDS:
+        _freshness_cache = (now, get_data_as_of())
+    return _freshness_cache[1]
+
+
+def reset_freshness_cache() -> None:
+    """Forget the cached freshness timestamp (after a sync or in tests)."""
+    global _freshness_cache
+    _freshness_cache = None
+
+
+def freshness_headers() -> Dict[str, str]:
+    """Headers describing how fresh the cached data behind a response is.
+
+    Returns an empty dict when the cache has never been synced or the lookup
+    fails, so a response is never held up by the freshness check.
+    """
+    try:
+        as_of = _cached_data_as_of()
+    except Exception as e:
+        logger.debug(f"Freshness lookup failed: {e}")
+        return {}
+    if as_of is None:
+        return {}
+    age = max(0, int((datetime.now(timezone.utc) - as_of).total_seconds()))
+    return {DATA_AS_OF_HEADER: as_of.isoformat(), DATA_AGE_HEADER: str(age)}
+
+
+def get_sync_status() -> Dict[str, Any]:
+    """Readiness and per-sync state from SyncMetadata and DealSyncState.
+
+    Returns:
+        {
+            'ready': bool,               # cache holds deals and can serve requests
+            'cached_deals': int,
+            'data_as_of': str | None,    # last successful deal sync
+            'data_age_seconds': int | None,
+            'syncs': {entity_type: {...}},             # aggregate syncs
+            'per_deal': {'notes': {...}, 'stage_history': {...}},
+        }
+    """
+    now = datetime.now(timezone.utc)
+    syncs: Dict[str, Dict[str, Any]] = {}
+    per_deal: Dict[str, Dict[str, Any]] = {}
+
+    with Session(db.read_engine) as session:
+        cached_deals = session.exec(select(func.count()).select_from(Deal)).one()
+        rows = session.exec(select(SyncMetadata)).all()
+        notes = session.exec(
+            select(
+                func.count(),
+                func.count().filter(DealSyncState.notes_status == "failed"),
+                func.min(DealSyncState.notes_synced_at),
+                func.max(DealSyncState.notes_synced_at),
+            ).where(DealSyncState.notes_status.is_not(None))
+        ).one()
+
+    if notes[0]:
+        per_deal["notes"] = {
+            "deals": notes[0],
+            "failed": notes[1],
+            "oldest_sync": _as_utc(notes[2]),
+            "newest_sync": _as_utc(notes[3]),
+        }
+
+    for meta in rows:
+        last_sync = _as_utc(meta.last_sync_time)
+        match = _PER_DEAL_ROW.match(meta.entity_type)
+        if match:
+            if match.group(1) == "notes":
+                continue
+            family = per_deal.setdefault(match.group(1), {
+                "deals": 0, "failed": 0, "oldest_sync": None, "newest_sync": None,
+            })
+            family["deals"] += 1
+            family["failed"] += int(meta.status == "failed")
+            if family["oldest_sync"] is None or last_sync < family["oldest_sync"]:
+                family["oldest_sync"] = last_sync
+            if family["newest_sync"] is None or last_sync > family["newest_sync"]:
+                family["newest_sync"] = last_sync
+            continue
+
+        syncs[meta.entity_type] = {
+            "status": meta.status,
+            "last_sync_time": last_sync.isoformat(),
+            "age_seconds": int((now - last_sync).total_seconds()),
+            "records_synced": meta.records_synced,
+            "records_total": meta.records_total,
+            "duration_ms": meta.last_sync_duration_ms,
+            "error": meta.error_message,
+        }
+
+    for family in per_deal.values():
+        for key in ("oldest_sync", "newest_sync"):
+            family[key] = family[key].isoformat() if family[key] else None
+
+    deals = syncs.get(DEALS_SYNC)
+    data_as_of = deals["last_sync_time"] if deals and deals["status"] == "success" else None
+
+    return {
+        "ready": cached_deals > 0,
+        "cached_deals": cached_deals,
+        "data_as_of": data_as_of,
+        "data_age_seconds": deals["age_seconds"] if data_as_of else None,
+        "syncs": dict(sorted(syncs.items())),
+        "per_deal": per_deal,
+    }
+
+
+__all__ = [
+    "DATA_AS_OF_HEADER",
+    "DATA_AGE_HEADER",
+    "get_data_as_of",
+    "freshness_headers",
+    "reset_freshness_cache",
+    "get_sync_status",
+]
@@ -15,7 +15,8 @@ It depends on:
 """
 
 import logging
-from typing import Optional
+from functools import partial
+from typing import AsyncIterator, Optional
 from datetime import datetime
 
 from ..models.writer_models import (
@@ -36,7 +37,9 @@ from ..models.writer_models import (
 )
 from ..integrations.llm_client import get_llm_client, LLMClient, LLMValidationError, LLMError
 from ..integrations.llm_observability import observe_llm_request, get_observability_logger
+from .prompt_context import PackingReport
 from .prompt_registry import get_prompt_registry, PromptRegistry
+from .summary_pipeline import SummaryOutcome, stream_summaries
 
 logger = logging.getLogger(__name__)
 
@@ -91,7 +94,7 @@ class WriterService:
         ) as obs_ctx:
             try:
                 # Get prompt
-                system_prompt, user_prompt = self.prompts.render_prompt(
+                system_prompt, user_prompt, packing = self._render_prompt(
                     "email.followup.v1",
                     {
                         "recipients": context.recipients,
@@ -103,6 +106,9 @@ class WriterService:
                     }
                 )
 
+                obs_ctx.metadata["prompt_tokens_before"] = packing.tokens_before
+                obs_ctx.metadata["prompt_tokens_after"] = packing.tokens_after
+
                 # Call LLM with structured output
                 llm_response = await self.llm.generate_structured_completion(
                     schema=DraftEmailResult,
@@ -158,13 +164,13 @@ class WriterService:
         try:
             # Select prompt based on channel
             prompt_id = f"reminder.{context.channel}.v1"
-            if prompt_id not in [p.id for p in self.prompts._prompts.values()]:
+            if not self.prompts.has_prompt(prompt_id):
                 # Fallback to email template
                 prompt_id = "reminder.email.v1"
                 logger.warning(f"No prompt for channel '{context.channel}', using email template")
 
             # Render prompt
-            system_prompt, user_prompt = self.prompts.render_prompt(
+            system_prompt, user_prompt, _ = self._render_prompt(
                 prompt_id,
                 {
                     "deal_title": context.deal_title,
@@ -208,16 +214,23 @@ class WriterService:
     # DEAL ANALYSIS
     # ========================================================================
 
-    async def summarize_deal(self, context: DealSummaryContext) -> DealSummaryResult:
+    async def summarize_deal(
+        self,
+        context: DealSummaryContext,
+        fallback_on_parse_error: bool = True,
+    ) -> DealSummaryResult:
         """Generate a summary and analysis for a deal.
 
         Args:
             context: Deal summary context
+            fallback_on_parse_error: Return a placeholder summary when the
+                response cannot be parsed instead of raising
 
         Returns:
             DealSummaryResult with summary and recommendations
 
         Raises:
+            LLMValidationError: On unparseable responses when fallback_on_parse_error is False
             LLMError: On LLM failures
         """
         try:
@@ -225,7 +238,7 @@ class WriterService:
             notes = context.notes[:context.max_notes]
 
             # Render prompt
-            system_prompt, user_prompt = self.prompts.render_prompt(
+            system_prompt, user_prompt, _ = self._render_prompt(
                 "deal.summarize.v1",
                 {
                     "deal_title": context.deal_title,
@@ -246,6 +259,7 @@ class WriterService:
                 system_prompt=system_prompt,
                 max_tokens=config["max_tokens"],
                 temperature=config["temperature"],
+                cache_scope=config["cache_scope"],
                 fallback_on_validation_error=True,
             )
 
@@ -269,6 +283,8 @@ class WriterService:
 
         except LLMValidationError as e:
             logger.error(f"Failed to parse deal summary for deal {context.deal_id}: {e}")
+            if not fallback_on_parse_error:
+                raise
             return self._deal_summary_fallback(context, str(e))
 
         except LLMError as e:
@@ -289,7 +305,7 @@ class WriterService:
         """
         try:
             # Render prompt
-            system_prompt, user_prompt = self.prompts.render_prompt(
+            system_prompt, user_prompt, _ = self._render_prompt(
                 "deal.compliance_check.v1",
                 {
                     "deal_title": context.deal_title,
@@ -308,6 +324,7 @@ class WriterService:
                 system_prompt=system_prompt,
                 max_tokens=config["max_tokens"],
                 temperature=config["temperature"],
+                cache_scope=config["cache_scope"],
                 fallback_on_validation_error=True,
             )
 
@@ -343,7 +360,7 @@ class WriterService:
         """
         try:
             # Render prompt
-            system_prompt, user_prompt = self.prompts.render_prompt(
+            system_prompt, user_prompt, _ = self._render_prompt(
                 "deal.order_received_analysis.v1",
                 {
                     "deal_title": context.deal_title,
@@ -361,6 +378,7 @@ class WriterService:
                 system_prompt=system_prompt,
                 max_tokens=config["max_tokens"],
                 temperature=config["temperature"],
+                cache_scope=config["cache_scope"],
                 fallback_on_validation_error=True,
             )
 
@@ -400,7 +418,7 @@ class WriterService:
         """
         try:
             # Render prompt
-            system_prompt, user_prompt = self.prompts.render_prompt(
+            system_prompt, user_prompt, _ = self._render_prompt(
                 "notes.summarize.v1",
                 {
                     "notes": context.notes,
@@ -420,6 +438,7 @@ class WriterService:
                 system_prompt=system_prompt,
                 max_tokens=config["max_tokens"],
                 temperature=config["temperature"],
+                cache_scope=config["cache_scope"],
                 fallback_on_validation_error=True,
             )
 
@@ -456,7 +475,7 @@ class WriterService:
         """
         try:
             # Render prompt
-            system_prompt, user_prompt = self.prompts.render_prompt(
+            system_prompt, user_prompt, _ = self._render_prompt(
                 "deal.health_analysis.v1",
                 {
                     "deal_id": context.deal_id,
@@ -482,6 +501,7 @@ class WriterService:
                 system_prompt=system_prompt,
                 max_tokens=config["max_tokens"],
                 temperature=config["temperature"],
+                cache_scope=config["cache_scope"],
                 fallback_on_validation_error=True,
             )
 
@@ -508,38 +528,56 @@ class WriterService:
     # BATCH OPERATIONS
     # ========================================================================
 
-    async def batch_summarize_deals(
+    def stream_summaries(
         self,
         contexts: list[DealSummaryContext],
         max_concurrent: int = 5,
-    ) -> list[DealSummaryResult]:
-        """Summarize multiple deals concurrently.
+        run_id: Optional[int] = None,
+    ) -> AsyncIterator[SummaryOutcome]:
+        """Summarize multiple deals, yielding each outcome as it completes.
 
         Args:
             contexts: List of deal summary contexts
             max_concurrent: Maximum concurrent LLM requests
+            run_id: Summary run (create_summary_run) to persist outcomes to
+                and resume from
 
         Returns:
-            List of DealSummaryResult
+            Async iterator of SummaryOutcome in completion order
 
         Note:
-            This processes deals in batches to avoid rate limits
+            See summary_pipeline.stream_summaries; requests run in the BATCH
+            lane of the shared LLM budget. Unparseable responses are failed
+            outcomes rather than placeholder summaries, so a resumed run
+            retries them
         """
-        import asyncio
-
-        results = []
-        for i in range(0, len(contexts), max_concurrent):
-            batch = contexts[i:i + max_concurrent]
-            batch_results = await asyncio.gather(
-                *[self.summarize_deal(ctx) for ctx in batch],
-                return_exceptions=True,
-            )
+        summarize = partial(self.summarize_deal, fallback_on_parse_error=False)
+        return stream_summaries(summarize, contexts, max_concurrent=max_concurrent, run_id=run_id)
+
+    async def batch_summarize_deals(
+        self,
+        contexts: list[DealSummaryContext],
+        max_concurrent: int = 5,
+        run_id: Optional[int] = None,
+    ) -> list[DealSummaryResult]:
+        """Summarize multiple deals concurrently.
 
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    logger.error(f"Batch summarization error: {result}")
-                else:
-                    results.append(result)
+        Args:
+            contexts: List of deal summary contexts
+            max_concurrent: Maximum concurrent LLM requests
+            run_id: Summary run to persist outcomes to and resume from
+
+        Returns:
+            List of DealSummaryResult in input order (failed deals omitted;
+            when resuming, only the deals summarized by this call)
+        """
+        position = {context.deal_id: i for i, context in enumerate(contexts)}
+        results = [
+            outcome.result
+            async for outcome in self.stream_summaries(contexts, max_concurrent=max_concurrent, run_id=run_id)
+            if outcome.ok
+        ]
+        results.sort(key=lambda result: position[result.deal_id])
 
         logger.info(f"Batch summarized {len(results)}/{len(contexts)} deals")
         return results
@@ -548,6 +586,15 @@ class WriterService:
     # PRIVATE HELPERS
     # ========================================================================
 
+    def _render_prompt(self, prompt_id: str, variables: dict) -> tuple[str, str, PackingReport]:
+        """Render a packed prompt, logging its prompt tokens before and after packing."""
+        system_prompt, user_prompt, packing = self.prompts.render_prompt_with_report(prompt_id, variables)
+        logger.info(
+            f"Prompt '{prompt_id}': {packing.tokens_before} -> {packing.tokens_after} tokens",
+            extra=packing.to_dict(),
+        )
+        return system_prompt, user_prompt, packing
+
     def _apply_comms_policy(self, text: str, context: EmailDraftContext) -> str:
         """Apply communication policy/guidelines to generated text.
 
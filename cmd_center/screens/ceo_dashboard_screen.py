@@ -164,6 +164,7 @@ class CEODashboardScreen(Screen):
         super().__init__()
         self.api_url = api_url
         self.metrics: Optional[dict] = None
+        self.data_age_seconds: Optional[int] = None
 
     def compose(self) -> ComposeResult:
         yield Header()
@@ -239,6 +240,8 @@ class CEODashboardScreen(Screen):
                 response = await client.get(f"{self.api_url}/ceo-dashboard/metrics")
                 if response.status_code == 200:
                     self.metrics = response.json()
+                    age = response.headers.get("X-Data-Age-Seconds")
+                    self.data_age_seconds = int(age) if age is not None else None
                     self._render_dashboard()
                 else:
                     self._show_error(f"API error: {response.status_code}")
@@ -268,9 +271,18 @@ class CEODashboardScreen(Screen):
             # Format the timestamp
             last_updated = last_updated[:19].replace("T", " ")
         self.query_one("#status-bar", Static).update(
-            f"Press [R] to refresh | Last updated: {last_updated}"
+            f"Press [R] to refresh | Last updated: {last_updated} | {self._format_data_age()}"
         )
 
+    def _format_data_age(self) -> str:
+        """Describe how old the synced Pipedrive data is."""
+        if self.data_age_seconds is None:
+            return "Pipedrive data: syncing..."
+        minutes = self.data_age_seconds // 60
+        if minutes < 60:
+            return f"Pipedrive data: {minutes}m old"
+        return f"Pipedrive data: {minutes // 60}h {minutes % 60}m old (stale)"
+
     def _render_cash_health(self) -> None:
         """Render cash health section."""
         cash = self.metrics.get("cash_health", {})
@@ -86,6 +86,44 @@ class TestAPIRetryLogic:
             assert response.status_code == 200
             assert mock_client.return_value.post.call_count == 2
 
+    @pytest.mark.asyncio
+    async def test_429_counts_as_breaker_failure_and_honours_retry_after(self, agent, mock_messages):
+        """A 429 pauses the shared limiter for Retry-After and is not a breaker success."""
+        from cmd_center.backend.integrations.llm_circuit_breaker import get_llm_resilience
+
+        rate_limit_response = MagicMock()
+        rate_limit_response.status_code = 429
+        rate_limit_response.headers = {"retry-after": "7"}
+
+        success_response = MagicMock()
+        success_response.status_code = 200
+        success_response.json.return_value = {
+            "choices": [{"message": {"content": "Success"}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5}
+        }
+        success_response.raise_for_status = MagicMock()
+
+        resilience = get_llm_resilience()
+        with patch("httpx.AsyncClient") as mock_client, \
+                patch.object(resilience.rate_limiter, "pause") as pause, \
+                patch.object(resilience.circuit_breaker, "_on_failure") as on_failure, \
+                patch.object(resilience.circuit_breaker, "_on_success") as on_success, \
+                patch("cmd_center.agent.core.agent.asyncio.sleep", AsyncMock()):
+            mock_client.return_value.__aenter__ = AsyncMock(
+                return_value=mock_client.return_value
+            )
+            mock_client.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_client.return_value.post = AsyncMock(
+                side_effect=[rate_limit_response, success_response]
+            )
+
+            response = await agent._call_api_with_retry(mock_messages)
+
+        assert response.status_code == 200
+        pause.assert_called_once_with(7.0)
+        assert on_failure.call_count == 1
+        assert on_success.call_count == 1
+
     @pytest.mark.asyncio
     async def test_max_retries_exhausted(self, agent, mock_messages):
         """Should raise after max retries exhausted."""
@@ -53,9 +53,10 @@ def test_session(test_engine) -> Generator[Session, None, None]:
 
 @pytest.fixture(scope="function")
 def override_db(test_engine):
-    """Override the production db.engine with test engine.
+    """Override the production db.engine and db.read_engine with test engine.
 
-    This fixture patches cmd_center.backend.db.engine so that
+    This fixture patches cmd_center.backend.db.engine (and the read-only
+    db.read_engine used by query helpers) so that
     all services and queries use the in-memory test database.
 
     Usage:
@@ -66,9 +67,12 @@ def override_db(test_engine):
     """
     from cmd_center.backend import db
     original_engine = db.engine
+    original_read_engine = db.read_engine
     db.engine = test_engine
+    db.read_engine = test_engine
     yield test_engine
     db.engine = original_engine
+    db.read_engine = original_read_engine
 
 
 # ============================================================================
@@ -182,6 +186,14 @@ def reset_service_singletons():
     # Example (add actual service modules as they're created):
     # from cmd_center.backend.services import employee_service
     # employee_service._employee_service = None
+    from cmd_center.backend.services import result_cache
+    result_cache._result_cache = None
+    from cmd_center.backend.integrations import llm_circuit_breaker, openrouter_transport
+    llm_circuit_breaker._llm_resilience = None
+    openrouter_transport._openrouter_transport = None
+    from cmd_center.backend.services import experiment_store, prompt_registry
+    experiment_store._experiment_store = None
+    prompt_registry._prompt_registry = None
 
 
 # ============================================================================
@@ -0,0 +1,150 @@
+"""Test the set-based SQL Aramco CEO radar summaries."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from cmd_center.backend.db import Deal, DealStageSpan, Note, Pipeline, Stage
+from cmd_center.backend.services.aramco_summary_service import AramcoSummaryService, _days_since
+from cmd_center.backend.services.deal_facts import refresh_deal_facts
+
+ARAMCO = 5
+
+
+@pytest.fixture
+def cache(override_db):
+    """Open Aramco deals for two PMs (and one without an owner)."""
+    now = datetime.now()
+    with Session(override_db) as session:
+        session.add(Pipeline(id=ARAMCO, name="Aramco Projects", order_nr=1))
+        session.add(Stage(id=27, pipeline_id=ARAMCO, name="Order Received", order_nr=1))
+        session.add(Stage(id=30, pipeline_id=ARAMCO, name="Under Progress", order_nr=2))
+        deals = [
+            # id, owner, stage, value, days in stage, days since update, next activity in days
+            (1, "Sara", 27, 100000.0, 50, 40, None),
+            (2, "Sara", 30, 20000.0, 35, 10, 3),
+            (3, "Ali", 30, 70000.0, 65, 35, None),
+            (4, None, 27, 10000.0, 5, 2, 20),
+            (5, "Sara", 27, 5000.0, 20, 20, None),
+        ]
+        for deal_id, owner, stage_id, value, in_stage, since_update, next_activity in deals:
+            session.add(Deal(
+                id=deal_id, title=f"Deal {deal_id}", pipeline_id=ARAMCO, stage_id=stage_id,
+                owner_name=owner, value=value, status="open",
+                stage_change_time=now - timedelta(days=in_stage, hours=1),
+                update_time=now - timedelta(days=since_update, hours=1),
+                next_activity_date=now + timedelta(days=next_activity) if next_activity else None,
+            ))
+        session.add(DealStageSpan(deal_id=1, stage_id=27, entered_at=now - timedelta(days=60)))
+        session.add(DealStageSpan(
+            deal_id=1, stage_id=27, entered_at=now - timedelta(days=45), left_at=now - timedelta(days=5),
+        ))
+        session.add(DealStageSpan(deal_id=5, stage_id=28, entered_at=now - timedelta(days=3)))
+        for n in range(7):
+            session.add(Note(id=100 + n, deal_id=3, content=f"note {n}", add_time=now - timedelta(days=n)))
+        session.commit()
+    refresh_deal_facts()
+    return override_db
+
+
+def _count_selects(engine, statements):
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    return record
+
+
+class TestDaysSince:
+    """Test the SQL timedelta.days equivalent."""
+
+    def test_matches_timedelta_days(self, cache):
+        today = datetime(2026, 3, 10, 12, 0, 0, 500)
+        stamps = [
+            today - timedelta(days=7),
+            today - timedelta(days=7, microseconds=-1),
+            today - timedelta(days=7, microseconds=1),
+            today - timedelta(days=40, hours=13),
+            today + timedelta(hours=1),
+            today,
+        ]
+        with Session(cache) as session:
+            for offset, stamp in enumerate(stamps):
+                session.add(Deal(id=1000 + offset, title="t", pipeline_id=ARAMCO, stage_id=27, update_time=stamp))
+            session.commit()
+            rows = session.exec(
+                select(Deal.update_time, _days_since(Deal.update_time, today)).where(Deal.id >= 1000)
+            ).all()
+
+        assert [days for _, days in rows] == [(today - stamp).days for stamp, _ in rows]
+
+
+class TestSummaries:
+    """Test summary values and the bounded query count."""
+
+    def test_stuck_summary(self, cache):
+        service = AramcoSummaryService()
+        statements = []
+        record = _count_selects(cache, statements)
+        try:
+            summary = service.generate_stuck_summary()
+        finally:
+            event.remove(cache, "before_cursor_execute", record)
+
+        assert len(statements) == 6
+        assert summary.snapshot.bucket_46_60_count == 1
+        assert summary.snapshot.bucket_60_plus_sar == 70000.0
+        assert summary.snapshot.stuck_no_updates_count == 2
+        assert [d["deal_id"] for d in summary.snapshot.oldest_stuck] == [3, 1, 2]
+        assert [(pm.pm_name, pm.stuck_count) for pm in summary.pm_control] == [("Sara", 2), ("Ali", 1)]
+        sara = summary.pm_control[0]
+        assert sara.median_days_since_update == 25.0
+        assert sara.stuck_no_activity_sar == 100000.0
+        assert sara.recovery_rate_30d == 50.0
+        assert summary.top_bottleneck_stage == "Order Received"
+
+    def test_overdue_summary(self, cache):
+        summary = AramcoSummaryService().generate_overdue_summary()
+
+        assert summary.snapshot.overdue_now_count == 4
+        assert summary.snapshot.overdue_soon_sar == 20000.0
+        assert [d.deal_id for d in summary.intervention_list] == [1, 3, 5, 2]
+        by_pm = {pm.pm_name: pm for pm in summary.pm_performance}
+        assert set(by_pm) == {"Sara", "Ali", "Unknown"}
+        assert by_pm["Sara"].avg_days_overdue == pytest.approx(70 / 3)
+        assert by_pm["Unknown"].overdue_now_count == 0
+        assert summary.pm_performance[0].pm_name == "Sara"
+
+    def test_order_received_summary(self, cache):
+        summary = AramcoSummaryService().generate_order_received_summary()
+
+        assert summary.snapshot.open_count == 3
+        assert summary.snapshot.bucket_30_plus_count == 1
+        assert summary.snapshot.oldest_deal == {"deal_id": 1, "title": "Deal 1", "age_days": 50}
+        assert [pm.pm_name for pm in summary.pm_acceleration] == ["Sara", "Unknown"]
+        sara = summary.pm_acceleration[0]
+        assert sara.pct_next_activity_scheduled == 0.0
+        assert (sara.approved_30d_count, sara.approved_30d_sar) == (1, 5000.0)
+        assert [w.deal_id for w in summary.fast_wins] == [1, 5]
+        assert summary.blockers_checklist.missing_end_user_count == 3
+
+
+class TestSessionLifecycle:
+    """Test that the shared service holds no session between calls."""
+
+    def test_sees_writes_made_after_previous_call(self, cache):
+        service = AramcoSummaryService()
+        assert service.generate_order_received_summary().snapshot.open_count == 3
+        assert not hasattr(service, "session")
+
+        with Session(cache) as session:
+            deal = session.get(Deal, 4)
+            deal.status = "won"
+            deal.update_time = datetime.now()
+            session.add(deal)
+            session.commit()
+        refresh_deal_facts()
+
+        assert service.generate_order_received_summary().snapshot.open_count == 2
@@ -0,0 +1,86 @@
+"""Test the bulk UPSERT write path."""
+
+from datetime import datetime, timezone
+from sqlmodel import Session, select
+
+from cmd_center.backend.db import Deal, Note
+from cmd_center.backend.services.bulk_upsert import bulk_upsert
+
+
+def _note(note_id: int, content: str = "hello", day: int = 1) -> dict:
+    return dict(
+        id=note_id,
+        deal_id=1,
+        active_flag=True,
+        user_name="Owner",
+        user_id=7,
+        content=content,
+        add_time=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        update_time=datetime(2026, 1, day, tzinfo=timezone.utc),
+        lead_id=None,
+    )
+
+
+class TestBulkUpsert:
+    """Test insert, update and skip behaviour."""
+
+    def test_inserts_new_rows(self, test_engine):
+        """New keys are inserted."""
+        with Session(test_engine) as session:
+            written = bulk_upsert(session, Note, [_note(1), _note(2)])
+            session.commit()
+
+        assert written == 2
+        with Session(test_engine) as session:
+            assert len(session.exec(select(Note)).all()) == 2
+
+    def test_updates_changed_rows(self, test_engine):
+        """Rows with a newer update_time overwrite the stored values."""
+        with Session(test_engine) as session:
+            bulk_upsert(session, Note, [_note(1)])
+            written = bulk_upsert(session, Note, [_note(1, content="edited", day=2)])
+            session.commit()
+
+        assert written == 1
+        with Session(test_engine) as session:
+            assert session.get(Note, 1).content == "edited"
+
+    def test_skips_rows_with_unchanged_update_time(self, test_engine):
+        """Rows whose update_time matches the stored value are not rewritten."""
+        with Session(test_engine) as session:
+            bulk_upsert(session, Note, [_note(1), _note(2)])
+            written = bulk_upsert(session, Note, [_note(1, content="ignored"), _note(2, day=3)])
+            session.commit()
+
+        assert written == 1
+        with Session(test_engine) as session:
+            assert session.get(Note, 1).content == "hello"
+
+    def test_change_column_none_always_updates(self, test_engine):
+        """Disabling change detection updates every conflicting row."""
+        with Session(test_engine) as session:
+            bulk_upsert(session, Note, [_note(1)])
+            bulk_upsert(session, Note, [_note(1, content="forced")], change_column=None)
+            session.commit()
+
+        with Session(test_engine) as session:
+            assert session.get(Note, 1).content == "forced"
+
+    def test_chunks_large_batches(self, test_engine):
+        """Batches larger than chunk_size are written completely."""
+        rows = [
+            dict(id=i, title=f"Deal {i}", pipeline_id=1, stage_id=1, status="open", update_time=None)
+            for i in range(1, 26)
+        ]
+        with Session(test_engine) as session:
+            written = bulk_upsert(session, Deal, rows, chunk_size=10)
+            session.commit()
+
+        assert written == 25
+        with Session(test_engine) as session:
+            assert len(session.exec(select(Deal)).all()) == 25
+
+    def test_empty_rows(self, test_engine):
+        """An empty batch is a no-op."""
+        with Session(test_engine) as session:
+            assert bulk_upsert(session, Note, []) == 0
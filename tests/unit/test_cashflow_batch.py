@@ -0,0 +1,144 @@
+"""Test the columnar (NumPy) cashflow prediction path."""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal, Pipeline, Stage
+from cmd_center.backend.models.cashflow_models import CashflowPredictionInput, DealForPrediction
+from cmd_center.backend.services.cashflow_batch import load_deal_columns
+from cmd_center.backend.services.cashflow_prediction_service import CashflowPredictionService
+from cmd_center.backend.services.deal_facts import refresh_deal_facts
+
+ARAMCO = 5
+TODAY = datetime(2026, 3, 1, 9, 30)
+
+
+@pytest.fixture
+def cache(override_db):
+    """Open deals covering known, unknown, late and invoiced stages."""
+    stages = {27: "Order Received", 31: "Awaiting MDD", 33: "Invoice Issued", 40: "Site Survey"}
+    deals = [
+        # (id, title, stage, days in stage or None, value)
+        (1, "Aramco pumps", 27, 5, 100.0),
+        (2, "Retail valves", 27, 45, 50.0),
+        (3, "Aramco tanks", 31, 70, 75.0),
+        (4, "Aramco piping", 33, 50, 20.0),
+        (5, "Retail survey", 40, None, 10.0),
+        (6, "Aramco won", 27, 5, 999.0),
+    ]
+    with Session(override_db) as session:
+        session.add(Pipeline(id=ARAMCO, name="Aramco Projects", order_nr=1))
+        for stage_id, name in stages.items():
+            session.add(Stage(id=stage_id, pipeline_id=ARAMCO, name=name, order_nr=stage_id))
+        for deal_id, title, stage_id, days, value in deals:
+            session.add(Deal(
+                id=deal_id, title=title, pipeline_id=ARAMCO, stage_id=stage_id, owner_name="Sara",
+                value=value, status="won" if deal_id == 6 else "open", update_time=TODAY,
+                stage_change_time=TODAY - timedelta(days=days, hours=3) if days is not None else None,
+            ))
+        session.commit()
+    refresh_deal_facts()
+    return override_db
+
+
+def per_deal_predictions(service, deals):
+    """Predictions from the per-deal predict_deal + apply_overrides path."""
+    inputs = [
+        DealForPrediction(
+            deal_id=int(deals.deal_id[i]),
+            title=deals.title[i],
+            stage=deals.stage_names[deals.stage_index[i]],
+            stage_id=0,
+            value_sar=float(deals.value[i]),
+            owner_name=deals.owner_name[i],
+            days_in_stage=(TODAY - deals.stage_change_time[i].item()).days
+            if not np.isnat(deals.stage_change_time[i]) else 0,
+            last_stage_change_date=deals.stage_change_time[i].item(),
+        )
+        for i in range(len(deals))
+    ]
+    return [
+        service.rules.apply_overrides(service.rules.predict_deal(deal, TODAY), deal, TODAY)
+        for deal in inputs
+    ]
+
+
+class TestBatchPrediction:
+    """Test the array rules against the per-deal rules."""
+
+    def test_loads_open_deals_in_one_query(self, cache):
+        deals = load_deal_columns(ARAMCO)
+
+        assert deals.deal_id.tolist() == [1, 2, 3, 4, 5]
+        assert deals.is_aramco.tolist() == [True, False, True, True, False]
+        assert set(deals.stage_names) == {"Order Received", "Awaiting MDD", "Invoice Issued", "Site Survey"}
+
+    def test_matches_per_deal_rules(self, cache):
+        service = CashflowPredictionService()
+        deals = load_deal_columns(ARAMCO)
+
+        batch = service.rules.batch_to_predictions(service.rules.predict_batch(deals, TODAY))
+
+        assert [p.model_dump() for p in batch] == [p.model_dump() for p in per_deal_predictions(service, deals)]
+
+    def test_stage_table_override(self, cache):
+        service = CashflowPredictionService()
+        deals = load_deal_columns(ARAMCO)
+
+        default = service.rules.predict_batch(deals, TODAY)
+        what_if = service.rules.predict_batch(
+            deals, TODAY, stage_days_to_invoice={**service.rules.STAGE_DAYS_TO_INVOICE, "Order Received": 10},
+        )
+
+        assert (what_if.invoice_date[0] - default.invoice_date[0]).item() == timedelta(days=10 - 42)
+        assert what_if.invoice_date[2] == default.invoice_date[2]
+
+
+class TestForecast:
+    """Test horizon filtering, grouped sums and the what-if forecast."""
+
+    @pytest.mark.asyncio
+    async def test_buckets_sum_deal_values(self, cache):
+        service = CashflowPredictionService()
+
+        result = await service.predict_cashflow(
+            CashflowPredictionInput(pipeline_name="Aramco Projects", horizon_days=365, today_date=TODAY)
+        )
+
+        # Deals 2 and 5 fall below the default confidence threshold
+        assert result.metadata.deals_analyzed == 5
+        assert sum(b.deal_count for b in result.aggregated_forecast) == len(result.per_deal_predictions)
+        assert sum(b.expected_invoice_value_sar for b in result.aggregated_forecast) == 195.0
+        assert [b.period for b in result.aggregated_forecast] == sorted(b.period for b in result.aggregated_forecast)
+
+    @pytest.mark.asyncio
+    async def test_horizon_only_builds_returned_rows(self, cache):
+        service = CashflowPredictionService()
+
+        result = await service.predict_cashflow(
+            CashflowPredictionInput(pipeline_name="Aramco Projects", horizon_days=14, today_date=TODAY)
+        )
+
+        assert sorted(p.deal_id for p in result.per_deal_predictions) == [4]
+
+    @pytest.mark.asyncio
+    async def test_what_if_moves_deals_into_horizon(self, cache):
+        service = CashflowPredictionService()
+        input_data = CashflowPredictionInput(pipeline_name="Aramco Projects", horizon_days=30, today_date=TODAY)
+
+        baseline = await service.predict_cashflow(input_data)
+        what_if = await service.predict_cashflow_what_if(input_data, {"Order Received": 7})
+
+        assert 1 not in {p.deal_id for p in baseline.per_deal_predictions}
+        assert 1 in {p.deal_id for p in what_if.per_deal_predictions}
+        assert service.rules.STAGE_DAYS_TO_INVOICE["Order Received"] == 42
+
+    @pytest.mark.asyncio
+    async def test_unknown_pipeline(self, cache):
+        with pytest.raises(ValueError):
+            await CashflowPredictionService().predict_cashflow(
+                CashflowPredictionInput(pipeline_name="Nope", horizon_days=30)
+            )
@@ -0,0 +1,170 @@
+"""Test Monte-Carlo cashflow forecasting from stage-duration history."""
+
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal, DealStageSpan, Pipeline, Stage
+from cmd_center.backend.models.cashflow_models import CashflowPredictionInput
+from cmd_center.backend.services.cashflow_prediction_service import CashflowPredictionService
+from cmd_center.backend.services.cashflow_simulation import run_simulation, run_simulations
+from cmd_center.backend.services.deal_facts import refresh_deal_facts
+from cmd_center.backend.services.result_cache import bump_data_version
+
+ARAMCO = 5
+TODAY = datetime(2026, 3, 1, 9, 30)
+
+STAGES = [
+    (27, "Order Received"), (28, "Approved"), (30, "Under Progress"),
+    (32, "Awaiting GR"), (33, "Invoice Issued"), (34, "Payment Received"),
+]
+
+
+@pytest.fixture
+def cache(override_db):
+    """Stages in board order and one open deal per stage before invoicing."""
+    with Session(override_db) as session:
+        session.add(Pipeline(id=ARAMCO, name="Aramco Projects", order_nr=1))
+        for order, (stage_id, name) in enumerate(STAGES):
+            session.add(Stage(id=stage_id, pipeline_id=ARAMCO, name=name, order_nr=order))
+        for deal_id, stage_id in [(1, 27), (2, 30), (3, 33)]:
+            session.add(Deal(
+                id=deal_id, title=f"Aramco deal {deal_id}", pipeline_id=ARAMCO, stage_id=stage_id,
+                value=100.0 * deal_id, status="open", update_time=TODAY,
+                stage_change_time=TODAY - timedelta(days=5),
+            ))
+        session.commit()
+    refresh_deal_facts()
+    return override_db
+
+
+def add_spans(engine, stage_id, days):
+    """Closed spans of history deals (ids from 100) in one stage."""
+    with Session(engine) as session:
+        for i, duration in enumerate(days):
+            deal_id = 100 + stage_id * 100 + i
+            session.add(Deal(id=deal_id, title="history", pipeline_id=ARAMCO, stage_id=34, status="won"))
+            entered = TODAY - timedelta(days=365)
+            session.add(DealStageSpan(
+                deal_id=deal_id, stage_id=stage_id, entered_at=entered,
+                left_at=entered + timedelta(days=duration), duration_hours=duration * 24.0,
+            ))
+        session.commit()
+
+
+class TestStageDurations:
+    """Test the invoice path and its duration samples."""
+
+    def test_path_stops_at_invoiced_stage(self, cache):
+        durations = CashflowPredictionService().load_stage_durations("Aramco Projects")
+
+        assert durations.stage_names == ("Order Received", "Approved", "Under Progress", "Awaiting GR")
+        assert durations.stages_with_history == 0
+        # Point durations add up to STAGE_DAYS_TO_INVOICE along the path
+        assert durations.fallback_days.tolist() == [13, 17, 5, 7]
+        assert durations.fallback_days.sum() == 42
+
+    def test_samples_need_enough_spans(self, cache):
+        add_spans(cache, 28, [10, 20, 30, 40, 50])
+        add_spans(cache, 30, [3, 4])
+
+        durations = CashflowPredictionService().load_stage_durations("Aramco Projects")
+
+        assert durations.samples[1].tolist() == [10, 20, 30, 40, 50]
+        assert len(durations.samples[2]) == 0
+
+    def test_cached_until_stage_history_sync(self, cache):
+        service = CashflowPredictionService()
+        assert service.load_stage_durations("Aramco Projects").stages_with_history == 0
+
+        add_spans(cache, 28, [10, 20, 30, 40, 50])
+        assert service.load_stage_durations("Aramco Projects").stages_with_history == 0
+
+        bump_data_version("stage_history")
+        assert service.load_stage_durations("Aramco Projects").stages_with_history == 1
+
+
+class TestSimulation:
+    """Test percentile bands over simulated trials."""
+
+    @pytest.mark.asyncio
+    async def test_without_history_matches_point_estimates(self, cache):
+        service = CashflowPredictionService()
+
+        [simulation] = await service.simulate_cashflow([CashflowPredictionInput(
+            pipeline_name="Aramco Projects", horizon_days=60, today_date=TODAY, trials=200, seed=1,
+        )])
+
+        assert simulation.deals_simulated == 3
+        # Deal 1 invoices after 42 days, deal 2 after 12, deal 3 is already invoiced
+        periods = {band.period: band for band in simulation.bands}
+        assert periods[service._get_period_label(TODAY + timedelta(days=42), "week")].invoice_p50_sar == 100.0
+        assert periods[service._get_period_label(TODAY + timedelta(days=12), "week")].invoice_p50_sar == 200.0
+        assert periods[service._get_period_label(TODAY, "week")].invoice_p50_sar == 300.0
+        assert simulation.invoice_total_p10_sar == simulation.invoice_total_p90_sar == 600.0
+
+    @pytest.mark.asyncio
+    async def test_history_spreads_the_bands(self, cache):
+        add_spans(cache, 27, [1, 10, 20, 40, 80, 120])
+        service = CashflowPredictionService()
+        input_data = CashflowPredictionInput(
+            pipeline_name="Aramco Projects", horizon_days=60, today_date=TODAY, trials=2000, seed=7,
+        )
+
+        [simulation] = await service.simulate_cashflow([input_data])
+        [again] = await service.simulate_cashflow([input_data])
+
+        assert simulation.stages_with_history == 1
+        assert simulation.invoice_total_p10_sar < simulation.invoice_total_p90_sar
+        assert simulation == again
+        for band in simulation.bands:
+            assert band.invoice_p10_sar <= band.invoice_p50_sar <= band.invoice_p90_sar
+
+    def test_current_stage_samples_remaining_time(self, cache):
+        add_spans(cache, 27, [1, 2, 3, 4, 30])
+        service = CashflowPredictionService()
+        job, _ = service._simulation_job(CashflowPredictionInput(
+            pipeline_name="Aramco Projects", horizon_days=90, today_date=TODAY, trials=500, seed=3,
+        ))
+        # Only deal 1 (5 days into Order Received) is simulated: its stage can only end after day 30
+        job = replace(job, position=np.array([0, -1, -1]), value=np.array([1.0, 0.0, 0.0]))
+
+        result = run_simulation(job)
+
+        period = job.day_to_period[25 + 17 + 5 + 7]  # 25 days left in stage, then Approved..Awaiting GR
+        assert result.invoice_bands[:, period].tolist() == [1.0, 1.0, 1.0]
+
+    def test_process_pool_matches_in_process(self, cache):
+        add_spans(cache, 27, [1, 10, 20, 40, 80, 120])
+        service = CashflowPredictionService()
+        jobs = [
+            service._simulation_job(CashflowPredictionInput(
+                pipeline_name="Aramco Projects", horizon_days=60, today_date=TODAY, trials=300, seed=seed,
+            ))[0]
+            for seed in (1, 2)
+        ]
+
+        pooled = run_simulations(jobs, processes=2)
+        inline = run_simulations(jobs)
+
+        for a, b in zip(pooled, inline):
+            np.testing.assert_array_equal(a.invoice_bands, b.invoice_bands)
+            np.testing.assert_array_equal(a.payment_totals, b.payment_totals)
+
+    @pytest.mark.asyncio
+    async def test_predict_cashflow_simulation_mode(self, cache):
+        service = CashflowPredictionService()
+
+        deterministic = await service.predict_cashflow(CashflowPredictionInput(
+            pipeline_name="Aramco Projects", horizon_days=60, today_date=TODAY,
+        ))
+        simulated = await service.predict_cashflow(CashflowPredictionInput(
+            pipeline_name="Aramco Projects", horizon_days=60, today_date=TODAY, mode="simulation", trials=100,
+        ))
+
+        assert deterministic.simulation is None
+        assert simulated.simulation.trials == 100
+        assert simulated.per_deal_predictions == deterministic.per_deal_predictions
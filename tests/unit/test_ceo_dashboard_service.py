@@ -0,0 +1,124 @@
+"""Test the snapshot-based CEO dashboard computation."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal, DealStageSpan, Pipeline, Stage
+from cmd_center.backend.models.cashflow_models import CashflowPredictionResult, PredictionMetadata
+from cmd_center.backend.services.ceo_dashboard_service import CEODashboardService
+from cmd_center.backend.services.deal_facts import refresh_deal_facts
+from cmd_center.backend.services.deal_health_service import get_deal_health_service
+
+
+@pytest.fixture
+def dashboard_db(override_db):
+    """Aramco and commercial deals, two key stages with span history."""
+    now = datetime.utcnow()
+    with Session(override_db) as session:
+        session.add(Pipeline(id=1, name="Pipeline", order_nr=1))
+        session.add(Pipeline(id=5, name="Aramco Projects", order_nr=2))
+        session.add(Stage(id=27, pipeline_id=5, name="Order Received", order_nr=1))
+        session.add(Stage(id=28, pipeline_id=5, name="Approved", order_nr=2))
+        session.add(Stage(id=3, pipeline_id=1, name="Proposal", order_nr=1))
+        deals = [
+            # id, pipeline, stage, value, status, days in stage, days since update
+            (1, 5, 27, 100000.0, "open", 40, 20),
+            (2, 5, 27, 50000.0, "open", 10, 8),
+            (3, 5, 28, 30000.0, "open", 35, 1),
+            (4, 5, 28, 20000.0, "open", 2, 1),
+            (5, 1, 3, 40000.0, "open", 3, 1),
+            (6, 1, 3, 25000.0, "won", 3, 1),
+        ]
+        for deal_id, pipeline_id, stage_id, value, status, in_stage, since_update in deals:
+            session.add(Deal(
+                id=deal_id, title=f"Deal {deal_id}", pipeline_id=pipeline_id, stage_id=stage_id,
+                value=value, status=status, owner_name="Sara",
+                stage_change_time=now - timedelta(days=in_stage),
+                update_time=now - timedelta(days=since_update),
+                won_time=now if status == "won" else None,
+            ))
+        for deal_id, hours in [(1, 48.0), (2, 96.0), (3, 0.0)]:
+            session.add(DealStageSpan(
+                deal_id=deal_id, stage_id=27, entered_at=now - timedelta(days=5), duration_hours=hours,
+            ))
+        session.commit()
+    refresh_deal_facts()
+    return override_db
+
+
+@pytest.fixture
+def service():
+    service = CEODashboardService()
+    service.cashflow_service = AsyncMock()
+    service.cashflow_service.predict_cashflow.return_value = CashflowPredictionResult(
+        per_deal_predictions=[],
+        aggregated_forecast=[],
+        metadata=PredictionMetadata(generated_at=datetime.now(), horizon_days=14, deals_analyzed=0,
+                                    deals_with_predictions=0, avg_confidence=0.0),
+    )
+    return service
+
+
+class TestDashboardMetrics:
+    """Test the dashboard built from one shared snapshot."""
+
+    @pytest.mark.asyncio
+    async def test_components_from_snapshot(self, dashboard_db, service):
+        metrics = await service.get_dashboard_metrics()
+
+        stages = {s.stage_id: s for s in metrics.pipeline_velocity.stages}
+        assert (stages[27].deal_count, stages[28].deal_count) == (2, 2)
+        assert stages[27].avg_days == 3.0  # zero-length spans excluded
+        assert stages[28].avg_days == 0.0
+
+        sales = metrics.department_scorecard.sales
+        assert (sales.active_deals_count, sales.pipeline_value) == (5, 240000.0)
+        assert sales.won_value == 25000.0
+        assert sales.overdue_count == 2
+
+        commercial = next(p for p in metrics.strategic_priorities if p.name == "Commercial Share")
+        assert commercial.current == round(40000 / 240000 * 100, 1)
+        assert [d.deal_id for d in metrics.urgent_deals] == [1, 3, 1, 2]  # stuck and overdue both listed
+
+    @pytest.mark.asyncio
+    async def test_matches_deal_health_queries(self, dashboard_db, service):
+        metrics = await service.get_dashboard_metrics()
+
+        health = get_deal_health_service()
+        assert metrics.department_scorecard.sales.overdue_count == len(health.get_overdue_deals("Aramco Projects", 7))
+        stuck_ids = {d.id for d in health.get_stuck_deals("Aramco Projects", 30)}
+        assert stuck_ids <= {d.deal_id for d in metrics.urgent_deals}
+
+    @pytest.mark.asyncio
+    async def test_reports_timing_and_bounded_query_count(self, dashboard_db, service):
+        metrics = await service.get_dashboard_metrics()
+
+        assert metrics.generation_ms is not None and metrics.generation_ms >= 0
+        assert metrics.query_count == 5
+
+    @pytest.mark.asyncio
+    async def test_loads_snapshot_off_the_event_loop(self, dashboard_db, service):
+        with patch("asyncio.to_thread", wraps=asyncio.to_thread) as to_thread:
+            await service.get_dashboard_metrics()
+
+        assert to_thread.call_count == 3
+
+
+class TestCachedMetrics:
+    """Test per-request fields on cached dashboard metrics."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_are_marked_cached(self, dashboard_db, service):
+        first = await service.get_dashboard_metrics()
+        second = await service.get_dashboard_metrics()
+
+        assert first.data_freshness == "live"
+        assert second.data_freshness == "cached"
+        assert second.last_updated == first.last_updated
+        assert (first.query_count, second.query_count) == (5, 0)
+        assert second.generation_ms is not None
+        service.cashflow_service.predict_cashflow.assert_awaited_once()
@@ -0,0 +1,76 @@
+"""Test SQLite engine tuning and the read-only engine."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel
+
+from cmd_center.backend.db import Deal, SQLiteProfile, create_sqlite_engine
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cache.db")
+
+
+class TestSQLiteProfile:
+    """Test pragmas applied through the connect hook."""
+
+    def test_writer_pragmas(self, db_path):
+        """The read-write engine runs in WAL with the configured pragmas."""
+        profile = SQLiteProfile(cache_size_kb=2048, mmap_size_mb=16, busy_timeout_ms=1234)
+        engine = create_sqlite_engine(db_path, profile)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == -2048
+            assert conn.execute(text("PRAGMA mmap_size")).scalar() == 16 * 1024 * 1024
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        engine.dispose()
+
+    def test_no_profile_keeps_defaults(self, db_path):
+        """Without a profile the SQLite defaults are left alone."""
+        engine = create_sqlite_engine(db_path)
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        engine.dispose()
+
+
+class TestReadOnlyEngine:
+    """Test the mode=ro engine used for API reads."""
+
+    def test_rejects_writes(self, db_path):
+        """Connections from the read-only engine cannot modify the cache."""
+        profile = SQLiteProfile()
+        writer = create_sqlite_engine(db_path, profile)
+        SQLModel.metadata.create_all(writer)
+        reader = create_sqlite_engine(db_path, profile, read_only=True)
+
+        with pytest.raises(OperationalError):
+            with Session(reader) as session:
+                session.add(Deal(id=1, title="x", pipeline_id=1, stage_id=1))
+                session.commit()
+
+        writer.dispose()
+        reader.dispose()
+
+    def test_reads_while_writer_holds_lock(self, db_path):
+        """Readers see the last committed data while a write transaction is open."""
+        profile = SQLiteProfile(busy_timeout_ms=100)
+        writer = create_sqlite_engine(db_path, profile)
+        SQLModel.metadata.create_all(writer)
+        with Session(writer) as session:
+            session.add(Deal(id=1, title="committed", pipeline_id=1, stage_id=1))
+            session.commit()
+        reader = create_sqlite_engine(db_path, profile, read_only=True)
+
+        with writer.connect() as conn:
+            conn.execute(text("BEGIN IMMEDIATE"))
+            conn.execute(text("UPDATE deal SET title = 'pending' WHERE id = 1"))
+            with Session(reader) as session:
+                assert session.get(Deal, 1).title == "committed"
+            conn.execute(text("ROLLBACK"))
+
+        writer.dispose()
+        reader.dispose()
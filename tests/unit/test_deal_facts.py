@@ -0,0 +1,122 @@
+"""Test the deal_facts materialization and the services reading it."""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal, DealFact, DealSyncState, Employee, Note, Pipeline, Stage
+from cmd_center.backend.services.aramco_summary_service import AramcoSummaryService
+from cmd_center.backend.services import deal_facts
+from cmd_center.backend.services.deal_facts import END_USER_FIELD_KEY, refresh_deal_facts
+from cmd_center.backend.services.deal_health_service import DealHealthService
+
+ARAMCO = 5
+
+
+@pytest.fixture
+def cache(override_db):
+    """A small cache: two stages, a linked employee and a few notes."""
+    now = datetime.utcnow()
+    with Session(override_db) as session:
+        session.add(Pipeline(id=ARAMCO, name="Aramco Projects", order_nr=1))
+        session.add(Stage(id=27, pipeline_id=ARAMCO, name="Order Received", order_nr=1))
+        session.add(Stage(id=30, pipeline_id=ARAMCO, name="Under Progress", order_nr=2))
+        session.add(Employee(full_name="Sara", role_title="PM", pipedrive_owner_id=7))
+        session.add(Deal(
+            id=1, title="Pumps", pipeline_id=ARAMCO, stage_id=27, owner_id=7, owner_name="Sara",
+            value=100.0, update_time=now - timedelta(days=10), stage_change_time=now - timedelta(days=40),
+            notes_count=2, raw_json=json.dumps({END_USER_FIELD_KEY: {"name": "Ras Tanura"}}),
+        ))
+        session.add(Deal(
+            id=2, title="Valves", pipeline_id=ARAMCO, stage_id=30, owner_name="Ali",
+            value=50.0, update_time=now - timedelta(days=1), raw_json="not json",
+        ))
+        session.add(Note(id=10, deal_id=1, content="older", add_time=now - timedelta(days=5)))
+        session.add(Note(id=11, deal_id=1, content="x" * 300, add_time=now - timedelta(days=2)))
+        session.commit()
+    return override_db
+
+
+class TestRefresh:
+    """Test building and incrementally refreshing fact rows."""
+
+    def test_builds_resolved_rows(self, cache):
+        assert refresh_deal_facts() == 2
+
+        with Session(cache) as session:
+            fact = session.get(DealFact, 1)
+            assert fact.stage_name == "Order Received"
+            assert fact.pipeline_name == "Aramco Projects"
+            assert fact.end_user == "Ras Tanura"
+            assert fact.employee_id is not None
+            assert fact.last_note_snippet == "x" * 100
+            assert fact.stage_entered_at == fact.stage_change_time
+
+            other = session.get(DealFact, 2)
+            assert other.end_user is None
+            assert other.last_note_snippet is None
+            assert other.stage_entered_at == other.update_time
+
+    def test_only_changed_deals_are_rebuilt(self, cache):
+        refresh_deal_facts()
+        assert refresh_deal_facts() == 0
+
+        with Session(cache) as session:
+            deal = session.get(Deal, 2)
+            deal.stage_id = 27
+            deal.update_time = datetime.utcnow()
+            session.add(deal)
+            stage = session.get(Stage, 30)
+            stage.name = "In Progress"
+            session.add(stage)
+            session.commit()
+
+        assert refresh_deal_facts() == 1
+        with Session(cache) as session:
+            assert session.get(DealFact, 2).stage_name == "Order Received"
+
+    def test_notes_sync_triggers_rebuild(self, cache):
+        refresh_deal_facts()
+        with Session(cache) as session:
+            session.add(Note(id=12, deal_id=1, content="newest", add_time=datetime.utcnow()))
+            session.add(DealSyncState(deal_id=1, notes_synced_at=datetime.utcnow() + timedelta(seconds=1), notes_status="success"))
+            session.commit()
+
+        assert refresh_deal_facts() == 1
+        with Session(cache) as session:
+            assert session.get(DealFact, 1).last_note_snippet == "newest"
+
+    def test_backfill_commits_per_chunk(self, cache):
+        """A full rebuild releases the write lock between chunks."""
+        commit = Session.commit
+        with patch.object(deal_facts, "REFRESH_CHUNK_SIZE", 1), \
+                patch.object(Session, "commit", autospec=True, side_effect=commit) as spy:
+            assert refresh_deal_facts() == 2
+
+        assert spy.call_count == 2
+
+
+class TestReaders:
+    """Test that the read services are served from deal_facts."""
+
+    def test_deal_health_reads_facts(self, cache):
+        refresh_deal_facts()
+        service = DealHealthService()
+
+        overdue = service.get_overdue_deals("Aramco Projects", min_days=7)
+        stuck = service.get_stuck_deals("Aramco Projects", min_days=30)
+
+        assert [d.id for d in overdue] == [1]
+        assert overdue[0].stage == "Order Received"
+        assert [d.id for d in stuck] == [1]
+        assert stuck[0].days_in_stage == 40
+
+    def test_order_received_uses_extracted_end_user(self, cache):
+        refresh_deal_facts()
+        summary = AramcoSummaryService().generate_order_received_summary()
+
+        assert summary.snapshot.open_count == 1
+        assert summary.blockers_checklist.missing_end_user_count == 0
@@ -0,0 +1,117 @@
+"""Test the process-wide stage/pipeline dimension cache."""
+
+import httpx
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal, Pipeline, Stage
+from cmd_center.backend.integrations.pipedrive_transport import PipedriveTransport, PipedriveTransportConfig
+from cmd_center.backend.services import pipedrive_sync
+from cmd_center.backend.services.deal_health_service import DealHealthService
+from cmd_center.backend.services.dimension_cache import DimensionCache, get_dimension_cache
+from cmd_center.backend.services.pipedrive_sync import sync_stages, update_sync_metadata
+
+
+@pytest.fixture
+def dims(override_db):
+    with Session(override_db) as session:
+        session.add(Pipeline(id=1, name="PIPELINE", order_nr=1))
+        session.add(Pipeline(id=5, name="Aramco Projects", order_nr=2))
+        session.add(Stage(id=27, pipeline_id=5, name="Order Received", order_nr=2))
+        session.add(Stage(id=26, pipeline_id=5, name="Quotation", order_nr=1))
+        session.commit()
+    return DimensionCache()
+
+
+def _count_selects(engine, statements):
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    return record
+
+
+class TestLookups:
+    """Test id/name resolution."""
+
+    def test_resolves_ids_and_names(self, dims):
+        assert dims.pipeline_id("Pipeline") == 1  # case-insensitive
+        assert dims.pipeline_id("aramco projects") == 5
+        assert dims.pipeline_id("Missing") is None
+        assert dims.pipeline_name(5) == "Aramco Projects"
+        assert dims.pipeline_name(99, "Pipeline 99") == "Pipeline 99"
+        assert dims.stage_name(27) == "Order Received"
+        assert dims.stage_name(99) == "Unknown"
+        assert dims.stage_id(5, "Quotation") == 26
+        assert dims.stage_ids_for_pipeline(5) == [26, 27]
+
+    def test_loads_once(self, dims, override_db):
+        statements = []
+        record = _count_selects(override_db, statements)
+        try:
+            for _ in range(100):
+                dims.stage_name(27)
+                dims.pipeline_id("Aramco Projects")
+        finally:
+            event.remove(override_db, "before_cursor_execute", record)
+
+        assert dims.loads == 1
+        assert len(statements) == 3  # version, stages, pipelines
+
+    def test_reloads_when_sync_time_moves(self, dims, override_db):
+        dims.check_interval = 0
+        assert dims.stage_name(27) == "Order Received"
+        with Session(override_db) as session:
+            stage = session.get(Stage, 27)
+            stage.name = "PO Received"
+            session.add(stage)
+            session.commit()
+        assert dims.stage_name(27) == "Order Received"
+
+        with patch.object(pipedrive_sync, "engine", override_db):
+            update_sync_metadata("stages", "success")
+
+        assert dims.stage_name(27) == "PO Received"
+        assert dims.loads == 2
+
+
+class TestInvalidation:
+    """Test that syncs invalidate the shared cache."""
+
+    @pytest.mark.asyncio
+    async def test_sync_stages_invalidates(self, dims, override_db):
+        shared = get_dimension_cache()
+        assert shared.stage_name(27) == "Order Received"
+
+        transport = PipedriveTransport(
+            PipedriveTransportConfig(max_retries=1, backoff_base=0.001),
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"data": [
+                {"id": 27, "name": "PO Received", "order_nr": 2, "pipeline_id": 5, "update_time": "2026-01-10 10:00:00"},
+            ]})),
+        )
+        with patch.object(pipedrive_sync, "engine", override_db), \
+                patch.object(pipedrive_sync, "_get_token_and_base", lambda: ("token", "https://pd.test/v1")), \
+                patch.object(pipedrive_sync, "get_pipedrive_transport", lambda: transport):
+            await sync_stages()
+
+        assert shared.stage_name(27) == "PO Received"
+
+    def test_deal_health_has_no_per_deal_stage_queries(self, dims, override_db):
+        with Session(override_db) as session:
+            for deal_id in range(1, 21):
+                session.add(Deal(id=deal_id, title=f"Deal {deal_id}", pipeline_id=5, stage_id=27))
+            session.commit()
+        service = DealHealthService()
+        service.get_deal_detail(1)
+
+        statements = []
+        record = _count_selects(override_db, statements)
+        try:
+            details = [service.get_deal_detail(deal_id) for deal_id in range(1, 21)]
+        finally:
+            event.remove(override_db, "before_cursor_execute", record)
+
+        assert {d.stage for d in details} == {"Order Received"}
+        assert len(statements) == 20  # one deal SELECT each, no stage lookups
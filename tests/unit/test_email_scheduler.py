@@ -4,8 +4,8 @@ import pytest
 from unittest.mock import AsyncMock, patch
 
 from cmd_center.backend.services.sync_scheduler import (
+    get_scheduler,
     run_email_sync,
-    email_loop,
 )
 
 
@@ -24,6 +24,8 @@ class TestEmailScheduler:
             await run_email_sync()
             mock_sync.assert_called_once()
 
-    def test_email_loop_exists(self):
-        """email_loop function is defined."""
-        assert callable(email_loop)
+    def test_email_job_registered(self):
+        """The scheduler runs email sync every 15 minutes."""
+        job = get_scheduler().jobs["email"]
+        assert job.func is run_email_sync
+        assert job.interval.total_seconds() == 15 * 60
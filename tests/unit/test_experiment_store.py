@@ -0,0 +1,226 @@
+"""Test persistent, batched prompt experiment results."""
+
+import asyncio
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, select
+
+from cmd_center.backend.api.experiments import experiment_events
+from cmd_center.backend.db import PromptExperimentResult
+from cmd_center.backend.services.experiment_store import ExperimentStore
+from cmd_center.backend.services.prompt_registry import PromptRegistry, PromptTemplate
+
+
+def variant(text):
+    return PromptTemplate(id="test.greet.v1", system_prompt="system", user_prompt_template=text)
+
+
+def make_registry(store=None):
+    registry = PromptRegistry(result_store=store)
+    registry.create_experiment("greeting", "test.greet.v1", {"a": variant("A {{ name }}"), "b": variant("B {{ name }}")})
+    return registry
+
+
+def stored_rows(engine):
+    with Session(engine) as session:
+        return session.exec(select(PromptExperimentResult)).all()
+
+
+def totals(registry):
+    """Per-variant counters without the in-memory creation time."""
+    return {
+        variant_id: {key: value for key, value in vars(stats).items() if key != "created_at"}
+        for variant_id, stats in registry.get_experiment("greeting").snapshot().items()
+    }
+
+
+def record(registry, variant_id, successes, failures, confidence=0.8):
+    for _ in range(successes):
+        registry.record_experiment_result("greeting", variant_id, True, confidence=confidence, cost_usd=0.01,
+                                          latency_ms=500)
+    for _ in range(failures):
+        registry.record_experiment_result("greeting", variant_id, False)
+
+
+class TestPersistence:
+    """Results are buffered, written in batches and rebuilt after a restart."""
+
+    def test_recording_does_no_io(self, override_db):
+        store = ExperimentStore()
+        registry = make_registry(store)
+
+        record(registry, "a", 3, 1)
+
+        assert store.get_stats()["pending"] == 4
+        assert stored_rows(override_db) == []
+        assert registry.get_experiment("greeting").stats["a"].uses == 4
+
+    def test_flush_writes_one_batch(self, override_db):
+        store = ExperimentStore()
+        registry = make_registry(store)
+        record(registry, "a", 3, 1)
+
+        assert store.flush() == 4
+
+        assert len(stored_rows(override_db)) == 4
+        assert store.get_stats() | {"flusher_running": False} == {
+            "pending": 0, "written": 4, "batches": 1, "dropped": 0, "flusher_running": False,
+        }
+
+    def test_stats_survive_a_restart(self, override_db):
+        store = ExperimentStore()
+        before = make_registry(store)
+        record(before, "a", 12, 3, confidence=0.9)
+        record(before, "b", 10, 0, confidence=0.5)
+        store.flush()
+
+        after = PromptRegistry(result_store=ExperimentStore())
+        assert after.load_experiments() == 1
+
+        assert totals(after) == totals(before)
+        assert after.render_prompt_with_experiment("greeting", {"name": "Sara"})[1] in ("A Sara", "B Sara")
+
+    def test_promotion_is_saved(self, override_db):
+        store = ExperimentStore()
+        registry = make_registry(store)
+        record(registry, "a", 30, 0, confidence=0.9)
+        record(registry, "b", 15, 15, confidence=0.9)
+
+        assert registry.promote_winner("greeting") == "a"
+
+        [restored] = ExperimentStore().load_experiments()
+        assert restored.active is False
+
+    def test_failed_flush_keeps_results(self, override_db):
+        store = ExperimentStore()
+        registry = make_registry(store)
+        record(registry, "a", 2, 0)
+
+        with patch("cmd_center.backend.services.experiment_store.insert", side_effect=RuntimeError("locked")):
+            with pytest.raises(RuntimeError):
+                store.flush()
+
+        assert store.get_stats()["pending"] == 2
+        assert store.flush() == 2
+
+    def test_buffer_is_bounded(self):
+        store = ExperimentStore(max_pending=3)
+
+        for _ in range(5):
+            store.append("greeting", "a", True)
+
+        assert store.get_stats()["pending"] == 3
+        assert store.get_stats()["dropped"] == 2
+
+
+class TestBackgroundFlusher:
+    """The flusher batches writes off the request path."""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_flushed_promptly(self, override_db):
+        store = ExperimentStore(batch_size=5, flush_interval=60)
+        registry = make_registry(store)
+        await store.start()
+        try:
+            record(registry, "a", 5, 0)
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                if store.get_stats()["written"]:
+                    break
+            assert store.get_stats()["written"] == 5
+        finally:
+            await store.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_the_rest(self, override_db):
+        store = ExperimentStore(batch_size=100, flush_interval=60)
+        registry = make_registry(store)
+        await store.start()
+
+        record(registry, "a", 3, 0)
+        await store.stop()
+
+        assert len(stored_rows(override_db)) == 3
+
+
+class TestConcurrency:
+    """Counters stay exact under concurrent recording."""
+
+    def test_threads(self, override_db):
+        store = ExperimentStore(max_pending=100_000)
+        registry = make_registry(store)
+
+        threads = [threading.Thread(target=record, args=(registry, "a", 1000, 0)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        experiment = registry.get_experiment("greeting")
+        assert experiment.stats["a"].uses == experiment.version == 8000
+        assert store.get_stats()["pending"] == 8000
+
+
+class TestWinner:
+    """Winner selection requires a significant quality difference."""
+
+    def test_significantly_better_variant_wins(self):
+        registry = make_registry()
+        record(registry, "a", 40, 0, confidence=0.9)
+        record(registry, "b", 20, 20, confidence=0.9)
+
+        assert registry.get_experiment("greeting").get_winner() == "a"
+
+    def test_no_winner_without_significance(self):
+        registry = make_registry()
+        record(registry, "a", 9, 1, confidence=0.8)
+        record(registry, "b", 8, 2, confidence=0.8)
+
+        experiment = registry.get_experiment("greeting")
+        leader, p_values = experiment.compare()
+        assert leader == "a"
+        assert p_values["b"] > 0.05
+        assert experiment.get_winner() is None
+
+    def test_needs_data_for_every_variant(self):
+        registry = make_registry()
+        record(registry, "a", 40, 0)
+
+        assert registry.get_experiment("greeting").get_winner() is None
+
+
+class TestStatsStream:
+    """The SSE stream emits stats on connect and after new results."""
+
+    @pytest.mark.asyncio
+    async def test_emits_on_change(self):
+        registry = make_registry()
+        events = experiment_events(registry, "greeting", interval=0.01)
+
+        first = await events.__anext__()
+        record(registry, "a", 1, 0)
+        second = await asyncio.wait_for(events.__anext__(), timeout=1)
+        await events.aclose()
+
+        assert first.startswith("event: stats\n")
+        payload = json.loads(second.split("data: ", 1)[1])
+        assert payload["variant_stats"]["a"]["uses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_endpoint(self, test_client):
+        from cmd_center.backend.services.prompt_registry import get_prompt_registry
+
+        get_prompt_registry().create_experiment(
+            "greeting", "test.greet.v1", {"a": variant("A {{ name }}"), "b": variant("B {{ name }}")}
+        )
+
+        response = await test_client.get("/experiments/greeting")
+        missing = await test_client.get("/experiments/missing/stream")
+
+        assert response.status_code == 200
+        assert response.json()["variants"] == ["a", "b"]
+        assert missing.status_code == 404
+
@@ -0,0 +1,239 @@
+"""Test the prioritized sync job scheduler."""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session
+
+from cmd_center.backend.db import SyncJobState
+from cmd_center.backend.services import job_scheduler
+from cmd_center.backend.services.job_scheduler import JobScheduler, SyncJob
+
+
+class Recorder:
+    """Job bodies that log start/finish order and can be held open."""
+
+    def __init__(self):
+        self.events = []
+        self.gates = {}
+
+    def job(self, name: str):
+        async def run():
+            self.events.append(("start", name))
+            gate = self.gates.get(name)
+            if gate is not None:
+                await gate.wait()
+            self.events.append(("end", name))
+        return run
+
+    def hold(self, name: str) -> asyncio.Event:
+        self.gates[name] = asyncio.Event()
+        return self.gates[name]
+
+    def started(self):
+        return [name for kind, name in self.events if kind == "start"]
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def persisted(test_engine):
+    with patch.object(job_scheduler.db, "engine", test_engine):
+        yield test_engine
+
+
+def _scheduler(recorder, max_concurrency=1, max_db_writers=1, persist=False, **writes):
+    scheduler = JobScheduler(max_concurrency=max_concurrency, max_db_writers=max_db_writers, persist=persist)
+    for priority, name in enumerate(["deals", "stage_history", "notes", "email"]):
+        scheduler.register(SyncJob(
+            name, recorder.job(name), timedelta(hours=1),
+            priority=priority, writes_db=writes.get(name, True),
+        ))
+    return scheduler
+
+
+class TestDispatch:
+    """Test ordering, budgets and coalescing."""
+
+    async def test_runs_queued_jobs_by_priority(self, recorder):
+        """With one slot, queued jobs start in priority order."""
+        scheduler = _scheduler(recorder)
+        gate = recorder.hold("email")
+        scheduler.trigger("email")
+        scheduler.trigger("notes")
+        scheduler.trigger("deals")
+        scheduler.trigger("stage_history")
+        gate.set()
+        await scheduler.wait_idle()
+
+        assert recorder.started() == ["email", "deals", "stage_history", "notes"]
+
+    async def test_db_writer_budget(self, recorder):
+        """Two writers never overlap, but a non-writer may run alongside one."""
+        scheduler = _scheduler(recorder, max_concurrency=2, email=False)
+        deals_gate = recorder.hold("deals")
+        email_gate = recorder.hold("email")
+        scheduler.trigger("deals")
+        scheduler.trigger("notes")
+        scheduler.trigger("email")
+        await asyncio.sleep(0)
+
+        assert scheduler.status()["running"] == ["deals", "email"]
+        assert scheduler.status()["queued"] == ["notes"]
+        deals_gate.set()
+        email_gate.set()
+        await scheduler.wait_idle()
+        assert recorder.started() == ["deals", "email", "notes"]
+
+    async def test_coalesces_duplicate_triggers(self, recorder):
+        """Repeated triggers collapse into one queued run and one re-run."""
+        scheduler = _scheduler(recorder)
+        gate = recorder.hold("deals")
+        assert scheduler.trigger("deals") == "queued"
+        await asyncio.sleep(0)
+        assert scheduler.trigger("deals") == "coalesced"
+        assert scheduler.trigger("deals") == "coalesced"
+        gate.set()
+        await scheduler.wait_idle()
+
+        assert recorder.started() == ["deals", "deals"]
+        assert scheduler.status()["jobs"]["deals"]["coalesced"] == 2
+        assert scheduler.status()["jobs"]["deals"]["runs"] == 2
+
+    async def test_failures_are_recorded(self, recorder):
+        """A failing job is counted and does not block the queue."""
+        scheduler = _scheduler(recorder)
+
+        async def boom():
+            raise RuntimeError("api down")
+
+        scheduler.register(SyncJob("broken", boom, timedelta(hours=1), priority=-1))
+        scheduler.trigger("broken")
+        scheduler.trigger("deals")
+        await scheduler.wait_idle()
+
+        status = scheduler.status()["jobs"]
+        assert status["broken"]["failures"] == 1
+        assert status["broken"]["last_error"] == "api down"
+        assert recorder.started() == ["deals"]
+
+    async def test_freed_slot_is_not_held_by_state_write(self, recorder, persisted):
+        """The next queued job starts while the finished job's state is still being written."""
+        scheduler = _scheduler(recorder, persist=True)
+        scheduler.next_run.update({name: datetime.now(timezone.utc) for name in scheduler.jobs})
+        write_released = threading.Event()
+        write_state = scheduler._write_state
+
+        def slow_write(row):
+            write_released.wait(timeout=5)
+            write_state(row)
+
+        scheduler._write_state = slow_write
+        scheduler.trigger("deals")
+        scheduler.trigger("notes")
+        for _ in range(50):
+            if recorder.started() == ["deals", "notes"]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert recorder.started() == ["deals", "notes"]
+        assert not scheduler._idle.is_set()
+        write_released.set()
+        await scheduler.wait_idle()
+        with Session(persisted) as session:
+            assert session.get(SyncJobState, "deals").last_status == "success"
+
+    async def test_failing_sync_reported_as_failed(self, recorder, persisted, monkeypatch):
+        """An app sync that raises shows up as a failure in the status and persisted state."""
+        from cmd_center.backend.services import sync_scheduler
+
+        async def api_down(**kwargs):
+            raise RuntimeError("api down")
+
+        monkeypatch.setattr(sync_scheduler, "sync_deals", api_down)
+        scheduler = JobScheduler(persist=True)
+        scheduler.register(SyncJob("deals", sync_scheduler.run_deals_sync, timedelta(hours=1)))
+        scheduler.next_run["deals"] = datetime.now(timezone.utc) + timedelta(hours=1)
+        scheduler.trigger("deals")
+        await scheduler.wait_idle()
+
+        status = scheduler.status()["jobs"]["deals"]
+        assert status["failures"] == 1
+        assert status["last_error"] == "api down"
+        with Session(persisted) as session:
+            state = session.get(SyncJobState, "deals")
+            assert state.last_status == "failed"
+            assert state.last_error == "api down"
+
+    def test_unknown_job(self, recorder):
+        with pytest.raises(KeyError):
+            _scheduler(recorder).trigger("missing")
+
+
+class TestSchedule:
+    """Test the timer and persisted next-run times."""
+
+    async def test_runs_due_jobs_on_start(self, recorder, persisted):
+        """Jobs with no persisted next run start immediately and get rescheduled."""
+        scheduler = _scheduler(recorder, max_concurrency=4, max_db_writers=4, persist=True)
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.wait_idle()
+        await scheduler.stop()
+
+        assert sorted(recorder.started()) == ["deals", "email", "notes", "stage_history"]
+        with Session(persisted) as session:
+            state = session.get(SyncJobState, "deals")
+            assert state.last_status == "success"
+            next_run = state.next_run_at.replace(tzinfo=timezone.utc)
+            assert next_run > datetime.now(timezone.utc) + timedelta(minutes=59)
+
+    async def test_respects_persisted_next_run(self, recorder, persisted):
+        """A restart does not re-run jobs whose next run is in the future."""
+        future = datetime.now(timezone.utc) + timedelta(minutes=30)
+        with Session(persisted) as session:
+            for name in ["deals", "stage_history", "notes"]:
+                session.add(SyncJobState(job_name=name, next_run_at=future))
+            session.commit()
+
+        scheduler = _scheduler(recorder, persist=True)
+        await scheduler.start()
+        await asyncio.sleep(0.05)
+        await scheduler.wait_idle()
+        await scheduler.stop()
+
+        assert recorder.started() == ["email"]
+
+    async def test_reschedule_wakes_timer(self, recorder):
+        """Moving a job's next run into the past runs it without waiting."""
+        scheduler = _scheduler(recorder, persist=False)
+        scheduler._load_state = lambda: scheduler.next_run.update(
+            {name: datetime.now(timezone.utc) + timedelta(hours=1) for name in scheduler.jobs}
+        )
+        await scheduler.start()
+        await scheduler.reschedule("notes", datetime.now(timezone.utc))
+        await asyncio.sleep(0.05)
+        await scheduler.wait_idle()
+        await scheduler.stop()
+
+        assert recorder.started() == ["notes"]
+
+
+class TestRegisteredJobs:
+    """The app's sync jobs are registered with their database access."""
+
+    def test_all_jobs_take_a_writer_slot(self, monkeypatch):
+        from cmd_center.backend.services import sync_scheduler
+        monkeypatch.setattr(sync_scheduler, "scheduler", None)
+
+        jobs = sync_scheduler.get_scheduler().jobs
+
+        assert {name: job.writes_db for name, job in jobs.items()} == {
+            "deals": True, "stage_history": True, "notes": True, "email": True,
+        }
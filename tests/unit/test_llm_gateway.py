@@ -0,0 +1,232 @@
+"""Test the shared LLM gateway: RPM/TPM limiter, priority lanes and circuit breaker."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from cmd_center.agent.core.agent import OmniousAgent
+from cmd_center.backend.api.sync import llm_metrics
+from cmd_center.backend.integrations.llm_circuit_breaker import (
+    CircuitBreakerConfig,
+    CircuitBreakerOpen,
+    LLMPriority,
+    LLMResilience,
+    PrioritySemaphore,
+    RateLimiter,
+    get_llm_resilience,
+    llm_priority,
+)
+from cmd_center.backend.integrations.llm_client import LLMClient, LLMError
+from cmd_center.backend.models.writer_models import DealSummaryContext
+from cmd_center.backend.services.prompt_registry import PromptRegistry
+from cmd_center.backend.services.writer_service import WriterService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient(LLMClient):
+    """LLMClient with a scripted API instead of OpenRouter."""
+
+    def __init__(self, status=200, content='{"summary": "ok", "confidence": 0.9}', **kwargs):
+        super().__init__(api_key="test", api_url="http://llm.test", model="test-model", retry_delay=0, **kwargs)
+        self.status = status
+        self.content = content
+
+    async def _make_api_call(self, payload: dict) -> httpx.Response:
+        if self.status != 200:
+            raise LLMError(f"HTTP error {self.status}")
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": self.content}}],
+            "usage": {"prompt_tokens": 400, "completion_tokens": 100, "total_tokens": 500},
+        })
+
+
+class TestRateLimiter:
+    """Test the request and token buckets."""
+
+    def test_requests_per_minute(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=2, clock=clock)
+
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == 0
+        assert limiter.reserve() == pytest.approx(30.0)
+        # Waiters queue behind each other
+        assert limiter.reserve() == pytest.approx(60.0)
+
+    def test_tokens_per_minute(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000, clock=clock)
+
+        assert limiter.reserve(tokens=800) == 0
+        assert limiter.reserve(tokens=500) == pytest.approx(18.0)  # 300 tokens short at 1000/min
+
+        clock.now = 30.0
+        assert limiter.reserve(tokens=100) == 0
+
+    def test_actual_usage_corrects_the_estimate(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=1000, clock=clock)
+
+        limiter.reserve(tokens=900)
+        limiter.adjust_tokens(-800)  # Only 100 used
+
+        assert limiter.reserve(tokens=800) == 0
+
+    def test_pause(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=100, clock=clock)
+
+        limiter.pause(5)
+
+        assert limiter.reserve() == pytest.approx(5.0)
+
+
+class TestPrioritySemaphore:
+    """Test the concurrency budget's lanes."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_goes_first(self):
+        semaphore = PrioritySemaphore(limit=1)
+        await semaphore.acquire(LLMPriority.BATCH)
+        order = []
+
+        async def wait(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        tasks = [asyncio.create_task(wait(f"batch-{i}", LLMPriority.BATCH)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(wait("chat", LLMPriority.INTERACTIVE)))
+        await asyncio.sleep(0)
+        assert semaphore.get_stats()["waiting"] == {"interactive": 1, "standard": 0, "batch": 3}
+
+        semaphore.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["chat", "batch-0", "batch-1", "batch-2"]
+        assert semaphore.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_frees_its_place(self):
+        semaphore = PrioritySemaphore(limit=1)
+        await semaphore.acquire()
+        waiter = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        semaphore.release()
+
+        assert semaphore.in_use == 0
+        await asyncio.wait_for(semaphore.acquire(), timeout=1)
+
+
+class TestGuard:
+    """Test LLMResilience.guard() and the circuit breaker."""
+
+    @pytest.mark.asyncio
+    async def test_breaker_opens_after_failures(self):
+        resilience = LLMResilience(CircuitBreakerConfig(failure_threshold=2), rate_limit_rpm=1000)
+
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                async with resilience.guard():
+                    raise ValueError("502")
+
+        with pytest.raises(CircuitBreakerOpen):
+            async with resilience.guard():
+                pass
+        assert resilience.concurrency.in_use == 0
+
+    @pytest.mark.asyncio
+    async def test_permit_fail_counts_without_raising(self):
+        resilience = LLMResilience(CircuitBreakerConfig(failure_threshold=1), rate_limit_rpm=1000)
+
+        async with resilience.guard() as permit:
+            permit.fail("API error 500")
+
+        assert resilience.get_stats()["circuit_breaker"]["state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_priority_defaults_to_context(self):
+        resilience = LLMResilience(rate_limit_rpm=1000)
+
+        with llm_priority(LLMPriority.BATCH):
+            await asyncio.gather(*(resilience.execute(AsyncMock(return_value=1)) for _ in range(2)))
+        await resilience.execute(AsyncMock(return_value=1))
+
+        assert resilience.concurrency.acquired == {"interactive": 0, "standard": 1, "batch": 2}
+
+
+class TestCallPaths:
+    """Every LLM caller draws from the shared gateway."""
+
+    @pytest.mark.asyncio
+    async def test_llm_client_uses_gateway_and_reports_tokens(self):
+        client = FakeClient()
+
+        await client.generate_completion("Summarize", max_tokens=200)
+
+        stats = get_llm_resilience().get_stats()
+        assert stats["concurrency"]["acquired"]["standard"] == 1
+        assert stats["circuit_breaker"]["total_successes"] == 1
+        # The estimate was replaced by the 500 tokens reported
+        assert stats["rate_limiter"]["available_tokens"] == pytest.approx(200_000 - 500, abs=5)
+
+    @pytest.mark.asyncio
+    async def test_llm_client_stops_retrying_when_open(self):
+        client = FakeClient(status=502)
+
+        for _ in range(2):  # 3 attempts each; the breaker opens after 5 failures
+            with pytest.raises(LLMError):
+                await client.generate_completion("Summarize")
+
+        assert get_llm_resilience().get_stats()["circuit_breaker"]["state"] == "open"
+        with pytest.raises(LLMError, match="Circuit breaker is OPEN"):
+            await client.generate_completion("Summarize")
+
+    @pytest.mark.asyncio
+    async def test_agent_calls_are_interactive(self):
+        agent = OmniousAgent()
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": 5}}
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_client.return_value)
+            mock_client.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_client.return_value.post = AsyncMock(return_value=response)
+
+            await agent._call_api_with_retry([{"role": "user", "content": "Hi"}])
+
+        assert get_llm_resilience().concurrency.acquired["interactive"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_summaries_use_batch_lane(self):
+        client = FakeClient(content='{"deal_id": 0, "summary": "ok", "confidence": 0.9}')
+        writer = WriterService(llm_client=client, prompt_registry=PromptRegistry())
+        contexts = [
+            DealSummaryContext(deal_id=i, deal_title="Deal", stage="Approved", owner_name="Sara",
+                               days_in_stage=3, notes=["note"])
+            for i in range(3)
+        ]
+
+        results = await writer.batch_summarize_deals(contexts)
+
+        assert len(results) == 3
+        assert get_llm_resilience().concurrency.acquired["batch"] == 3
+
+    def test_stats_endpoint(self, override_db):
+        stats = llm_metrics()
+
+        assert set(stats) == {"circuit_breaker", "rate_limiter", "concurrency", "client", "transport", "prompt_packing"}
@@ -0,0 +1,179 @@
+"""Test the content-addressed LLM response cache."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from pydantic import BaseModel
+from sqlmodel import Session, select
+
+from cmd_center.backend.db import LLMResponseCacheEntry
+from cmd_center.backend.integrations.llm_client import LLMClient, LLMValidationError
+from cmd_center.backend.integrations.llm_response_cache import (
+    CachedCompletion,
+    CacheScope,
+    LLMResponseCache,
+)
+from cmd_center.backend.services.prompt_registry import PromptRegistry
+
+SCOPE = CacheScope("deal.summarize.v1", "v1")
+
+
+class Summary(BaseModel):
+    summary: str
+
+
+class FakeClient(LLMClient):
+    """LLMClient answering from a list of contents instead of OpenRouter."""
+
+    def __init__(self, contents, delay=0.0, **kwargs):
+        super().__init__(api_key="test", api_url="http://llm.test", model="test-model", retry_delay=0, **kwargs)
+        self.contents = list(contents)
+        self.delay = delay
+        self.calls = 0
+
+    async def _make_api_call(self, payload: dict) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": self.contents.pop(0)}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 200, "total_tokens": 1200},
+            "model": "test-model",
+        })
+
+
+def make_cache(ttl_seconds=3600, max_bytes=1 << 20):
+    return LLMResponseCache(ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+
+
+def summarize(client, prompt="Deal: Pump station", cache_scope=SCOPE, temperature=0.5):
+    return client.generate_structured_completion(
+        schema=Summary, prompt=prompt, system_prompt="You are an analyst.",
+        temperature=temperature, cache_scope=cache_scope,
+    )
+
+
+class TestStructuredCompletionCache:
+    """Test caching inside LLMClient.generate_structured_completion."""
+
+    @pytest.mark.asyncio
+    async def test_identical_request_is_served_from_cache(self, override_db):
+        client = FakeClient(['{"summary": "first"}', '{"summary": "second"}'], response_cache=make_cache())
+
+        first = await summarize(client)
+        again = await summarize(client)
+
+        assert first.summary == again.summary == "first"
+        assert client.calls == 1
+        stats = client.get_metrics()["response_cache"]
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+        assert stats["hit_ratio"] == 0.5
+        assert stats["saved_usd"] == pytest.approx(0.006)  # 1000 in @ $3/M + 200 out @ $15/M
+
+    @pytest.mark.asyncio
+    async def test_key_covers_prompt_and_temperature(self, override_db):
+        client = FakeClient(['{"summary": "a"}', '{"summary": "b"}', '{"summary": "c"}'], response_cache=make_cache())
+
+        await summarize(client)
+        await summarize(client, prompt="Deal: Pump station (new note)")
+        await summarize(client, temperature=0.3)
+
+        assert client.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_prompts_opt_in(self, override_db):
+        client = FakeClient(['{"summary": "a"}', '{"summary": "b"}'], response_cache=make_cache())
+
+        await summarize(client, cache_scope=None)
+        await summarize(client, cache_scope=None)
+
+        assert client.calls == 2
+        with Session(override_db) as session:
+            assert session.exec(select(LLMResponseCacheEntry)).all() == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self, override_db):
+        client = FakeClient(['{"summary": "only"}'], delay=0.05, response_cache=make_cache())
+
+        results = await asyncio.gather(*(summarize(client) for _ in range(5)))
+
+        assert [r.summary for r in results] == ["only"] * 5
+        assert client.calls == 1
+        assert client.response_cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_unparseable_response_is_not_replayed(self, override_db):
+        client = FakeClient(["not json", '{"summary": "fixed"}'], response_cache=make_cache())
+
+        with pytest.raises(LLMValidationError):
+            await summarize(client)
+        result = await summarize(client)
+
+        assert result.summary == "fixed"
+        assert client.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_fetch_to_follower(self, override_db):
+        cache = make_cache()
+        leader_started = asyncio.Event()
+
+        async def stalled_fetch():
+            leader_started.set()
+            await asyncio.sleep(3600)
+
+        async def fetch():
+            return CachedCompletion(content='{"summary": "retried"}', model="m")
+
+        leader = asyncio.create_task(cache.get_or_fetch("k", SCOPE, stalled_fetch))
+        await leader_started.wait()
+        follower = asyncio.create_task(cache.get_or_fetch("k", SCOPE, fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        completion, served_without_call = await asyncio.wait_for(follower, timeout=5)
+
+        assert leader.cancelled()
+        assert completion.content == '{"summary": "retried"}'
+        assert served_without_call is False
+        assert cache.lookup("k").content == '{"summary": "retried"}'
+
+
+
+class TestStorage:
+    """Test TTL expiry and LRU eviction of the SQLite entries."""
+
+    def test_expired_entries_miss(self, override_db):
+        cache = make_cache(ttl_seconds=60)
+        cache.store("k", SCOPE, CachedCompletion(content="{}", model="m"))
+        with Session(override_db) as session:
+            entry = session.get(LLMResponseCacheEntry, "k")
+            entry.created_at = datetime.now(timezone.utc) - timedelta(minutes=2)
+            session.add(entry)
+            session.commit()
+
+        assert cache.lookup("k") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_evicts_least_recently_used(self, override_db):
+        cache = make_cache(max_bytes=25)
+        cache.store("a", SCOPE, CachedCompletion(content="x" * 10, model="m"))
+        cache.store("b", SCOPE, CachedCompletion(content="y" * 10, model="m"))
+        assert cache.lookup("a") is not None  # "b" is now the least recently used
+
+        cache.store("c", SCOPE, CachedCompletion(content="z" * 10, model="m"))
+
+        assert cache.lookup("b") is None
+        assert cache.lookup("a").content == "x" * 10
+        assert cache.lookup("c").content == "z" * 10
+        assert cache.stats()["size_bytes"] == 20
+
+
+class TestPromptRegistry:
+    """Test which prompts opt in to the cache."""
+
+    def test_analysis_prompts_are_cacheable(self):
+        registry = PromptRegistry()
+
+        assert registry.get_prompt_config("deal.summarize.v1")["cache_scope"] == SCOPE
+        assert registry.get_prompt_config("email.followup.v1")["cache_scope"] is None
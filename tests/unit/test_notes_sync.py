@@ -0,0 +1,153 @@
+"""Test the batched notes sync for open deals."""
+
+import httpx
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from cmd_center.backend.db import Deal, DealSyncState, Note, Pipeline
+from cmd_center.backend.integrations.pipedrive_transport import PipedriveTransport, PipedriveTransportConfig
+from cmd_center.backend.services import pipedrive_sync
+from cmd_center.backend.services.pipedrive_sync import sync_notes_for_deal, sync_notes_for_open_deals
+
+
+class FakeNotes:
+    """/notes responder returning one note per requested deal."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.deal_ids = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        deal_id = int(request.url.params["deal_id"])
+        self.deal_ids.append(deal_id)
+        if deal_id in self.failing:
+            return httpx.Response(404, json={"success": False})
+        return httpx.Response(200, json={"data": [{
+            "id": deal_id * 100,
+            "deal_id": deal_id,
+            "content": f"Note for {deal_id}",
+            "add_time": "2026-01-10 10:00:00",
+            "update_time": "2026-01-10 10:00:00",
+        }]})
+
+
+@pytest.fixture
+def fake_notes(test_engine):
+    """Patch the sync module's engine, credentials and HTTP transport."""
+    fake = FakeNotes()
+    transport = PipedriveTransport(
+        PipedriveTransportConfig(max_retries=1, backoff_base=0.001),
+        transport=httpx.MockTransport(fake.handler),
+    )
+    with patch.object(pipedrive_sync, "engine", test_engine), \
+            patch.object(pipedrive_sync, "_get_token_and_base", lambda: ("token", "https://pd.test/v1")), \
+            patch.object(pipedrive_sync, "get_pipedrive_transport", lambda: transport):
+        yield fake
+
+
+def _seed(engine, count: int = 3, update_time: datetime = datetime(2026, 1, 10, 10, 0)):
+    with Session(engine) as session:
+        session.add(Pipeline(id=1, name="PIPELINE", order_nr=1))
+        for deal_id in range(1, count + 1):
+            session.add(Deal(
+                id=deal_id, title=f"Deal {deal_id}", pipeline_id=1, stage_id=1,
+                status="open", notes_count=1, update_time=update_time,
+            ))
+        session.add(Deal(id=99, title="Won", pipeline_id=1, stage_id=1, status="won"))
+        session.commit()
+
+
+def _touch(engine, deal_id: int, **changes):
+    with Session(engine) as session:
+        deal = session.get(Deal, deal_id)
+        for name, value in changes.items():
+            setattr(deal, name, value)
+        session.add(deal)
+        session.commit()
+
+
+class TestNotesSync:
+    """Test change detection and batched writes."""
+
+    @pytest.mark.asyncio
+    async def test_first_run_fetches_every_open_deal(self, fake_notes, test_engine):
+        _seed(test_engine)
+
+        result = await sync_notes_for_open_deals()
+
+        assert result["eligible_open_deals"] == 3
+        assert result["synced_deals"] == 3
+        assert sorted(fake_notes.deal_ids) == [1, 2, 3]
+        with Session(test_engine) as session:
+            assert len(session.exec(select(Note)).all()) == 3
+            state = session.get(DealSyncState, 2)
+            assert state.notes_status == "success"
+            assert state.notes_count == 1
+
+    @pytest.mark.asyncio
+    async def test_only_changed_deals_are_refetched(self, fake_notes, test_engine):
+        """Deals whose notes_count or update_time moved are the only ones fetched."""
+        _seed(test_engine)
+        await sync_notes_for_open_deals()
+        fake_notes.deal_ids.clear()
+
+        _touch(test_engine, 1, notes_count=2)
+        _touch(test_engine, 3, update_time=datetime(2026, 1, 11, 9, 0))
+        result = await sync_notes_for_open_deals()
+
+        assert sorted(fake_notes.deal_ids) == [1, 3]
+        assert result["skipped_fresh"] == 1
+
+        fake_notes.deal_ids.clear()
+        result = await sync_notes_for_open_deals()
+        assert fake_notes.deal_ids == []
+        assert result["skipped_fresh"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_deal_is_retried(self, fake_notes, test_engine):
+        _seed(test_engine)
+        fake_notes.failing = {2}
+
+        result = await sync_notes_for_open_deals()
+
+        assert result["synced_deals"] == 2
+        assert [e["deal_id"] for e in result["errors"]] == [2]
+        with Session(test_engine) as session:
+            assert session.get(DealSyncState, 2).notes_status == "failed"
+
+        fake_notes.failing = set()
+        fake_notes.deal_ids.clear()
+        await sync_notes_for_open_deals()
+        assert fake_notes.deal_ids == [2]
+
+    @pytest.mark.asyncio
+    async def test_query_count_does_not_grow_with_deals(self, fake_notes, test_engine):
+        """Freshness is read in one query and state written in one batch."""
+        _seed(test_engine, count=40)
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            await sync_notes_for_open_deals()
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 2  # pipelines, deals joined with sync state
+
+    @pytest.mark.asyncio
+    async def test_single_deal_sync_records_state(self, fake_notes, test_engine):
+        _seed(test_engine)
+
+        assert await sync_notes_for_deal(1) == 1
+
+        with Session(test_engine) as session:
+            state = session.get(DealSyncState, 1)
+            assert state.notes_status == "success"
+            assert state.notes_count == 1
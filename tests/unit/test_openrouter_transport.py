@@ -0,0 +1,197 @@
+"""Test the shared OpenRouter transport against a local stub server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from cmd_center.agent.core.agent import OmniousAgent
+from cmd_center.backend.integrations.llm_client import LLMClient
+from cmd_center.backend.integrations.openrouter_transport import (
+    FirstTokenTimeout,
+    OpenRouterTransport,
+    OpenRouterTransportConfig,
+    get_openrouter_transport,
+)
+
+COMPLETION = {
+    "choices": [{"message": {"role": "assistant", "content": "Hi"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+}
+
+
+class StubOpenRouter:
+    """Local keep-alive HTTP/1.1 server for /chat/completions.
+
+    Streamed requests get chunked SSE: a processing comment, then the
+    data lines after first_token_delay seconds.
+    """
+
+    def __init__(self):
+        self.first_token_delay = 0.0
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _chunk(self, text):
+                data = text.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                stub.client_ports.add(self.client_address[1])
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if not payload.get("stream"):
+                    body = json.dumps(COMPLETION).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self._chunk(": OPENROUTER PROCESSING\n\n")
+                time.sleep(stub.first_token_delay)
+                try:
+                    for token in ("Hel", "lo"):
+                        self._chunk(f'data: {json.dumps({"choices": [{"delta": {"content": token}}]})}\n\n')
+                    self._chunk("data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except BrokenPipeError:
+                    pass  # The client gave up waiting for the first token
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+
+@pytest.fixture
+def stub():
+    server = StubOpenRouter()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def make_transport(**overrides) -> OpenRouterTransport:
+    return OpenRouterTransport(OpenRouterTransportConfig(http2=False, **overrides))
+
+
+async def stream_lines(transport, url):
+    async with transport.stream("POST", f"{url}/chat/completions", json={"stream": True}) as response:
+        return [line async for line in response.aiter_lines() if line]
+
+
+class TestConnectionReuse:
+    """Requests share pooled connections."""
+
+    @pytest.mark.asyncio
+    async def test_sequential_requests_reuse_one_connection(self, stub):
+        transport = make_transport()
+
+        for _ in range(5):
+            response = await transport.post(f"{stub.url}/chat/completions", json={"stream": False})
+            assert response.json() == COMPLETION
+        await transport.aclose()
+
+        assert len(stub.client_ports) == 1
+        metrics = transport.metrics()
+        assert metrics["connections_opened"] == 1
+        assert metrics["connection_reuse_rate"] == 0.8
+
+    @pytest.mark.asyncio
+    async def test_streams_and_requests_share_the_pool(self, stub):
+        transport = make_transport()
+
+        await stream_lines(transport, stub.url)
+        await transport.post(f"{stub.url}/chat/completions", json={"stream": False})
+        await stream_lines(transport, stub.url)
+        await transport.aclose()
+
+        assert len(stub.client_ports) == 1
+
+    @pytest.mark.asyncio
+    async def test_reopens_after_close(self, stub):
+        transport = make_transport()
+        await transport.post(f"{stub.url}/chat/completions", json={})
+        await transport.aclose()
+
+        response = await transport.post(f"{stub.url}/chat/completions", json={})
+        await transport.aclose()
+
+        assert response.status_code == 200
+        assert transport.metrics()["connections_opened"] == 2
+
+
+class TestStreaming:
+    """Streams report time to first token and enforce the first-token timeout."""
+
+    @pytest.mark.asyncio
+    async def test_records_time_to_first_token(self, stub):
+        stub.first_token_delay = 0.05
+        transport = make_transport()
+
+        lines = await stream_lines(transport, stub.url)
+        await transport.aclose()
+
+        assert lines[0] == ": OPENROUTER PROCESSING"
+        assert lines[-1] == "data: [DONE]"
+        metrics = transport.metrics()
+        assert metrics["streams"] == 1
+        assert metrics["ttft_p50_ms"] >= 50
+
+    @pytest.mark.asyncio
+    async def test_first_token_timeout(self, stub):
+        stub.first_token_delay = 0.5
+        transport = make_transport(first_token_timeout=0.1)
+
+        with pytest.raises(FirstTokenTimeout):
+            await stream_lines(transport, stub.url)
+        await transport.aclose()
+
+        assert isinstance(FirstTokenTimeout("x"), httpx.TimeoutException)
+        assert transport.metrics()["first_token_timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_llm_client_stream(self, stub):
+        client = LLMClient(api_key="test", api_url=stub.url, model="test-model", transport=make_transport())
+
+        tokens = [token async for token in client.stream_completion("Hi")]
+        await client.close()
+
+        assert tokens == ["Hel", "lo"]
+
+
+class TestSharedTransport:
+    """The agent and LLMClient use one process-wide transport."""
+
+    def test_llm_client_uses_the_shared_transport(self):
+        client = LLMClient(api_key="test", api_url="http://llm.test", model="test-model")
+
+        assert client.transport is get_openrouter_transport()
+
+    @pytest.mark.asyncio
+    async def test_agent_calls_reuse_a_connection(self, stub, monkeypatch):
+        agent = OmniousAgent()
+        monkeypatch.setattr(agent.config, "openrouter_api_url", stub.url)
+        monkeypatch.setattr(agent.config, "openrouter_api_key", "test")
+
+        for _ in range(3):
+            response = await agent._call_api_with_retry([{"role": "user", "content": "Hi"}])
+            assert response.status_code == 200
+        await get_openrouter_transport().aclose()
+
+        assert len(stub.client_ports) == 1
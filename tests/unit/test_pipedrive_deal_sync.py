@@ -0,0 +1,181 @@
+"""Test the /recents driven incremental deal sync."""
+
+import pytest
+import httpx
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal
+from cmd_center.backend.integrations.pipedrive_transport import PipedriveTransport, PipedriveTransportConfig
+from cmd_center.backend.services import pipedrive_sync
+from cmd_center.backend.services.pipedrive_sync import (
+    DEALS_RECENTS_CURSOR,
+    DEALS_RECONCILE,
+    DEALS_SYNC,
+    PipedriveSyncError,
+    get_last_sync_time,
+    get_sync_cursor,
+    sync_deals,
+    update_sync_metadata,
+)
+
+
+def _deal(
+    deal_id: int,
+    pipeline_id: int = 1,
+    status: str = "open",
+    title: str = None,
+    update_time: str = "2026-01-10 10:00:00",
+) -> dict:
+    return {
+        "id": deal_id,
+        "title": title or f"Deal {deal_id}",
+        "pipeline_id": pipeline_id,
+        "stage_id": 10,
+        "owner_id": {"id": 7, "name": "Owner"},
+        "status": status,
+        "value": 100,
+        "update_time": update_time,
+    }
+
+
+class FakePipedrive:
+    """Minimal /deals and /recents responder that records requested paths."""
+
+    def __init__(self, deals=None, recents=None, last_timestamp="2026-01-10 10:00:00", fail_recents=False):
+        self.deals = deals or []
+        self.recents = recents or []
+        self.last_timestamp = last_timestamp
+        self.fail_recents = fail_recents
+        self.paths = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.rsplit("/", 1)[-1]
+        self.paths.append(path)
+        if path == "deals":
+            pipeline_id = int(request.url.params["pipeline_id"])
+            return httpx.Response(200, json={
+                "data": [d for d in self.deals if d["pipeline_id"] == pipeline_id],
+                "additional_data": {"pagination": {"more_items_in_collection": False}},
+            })
+        if path == "recents":
+            if self.fail_recents:
+                return httpx.Response(500, json={"success": False})
+            return httpx.Response(200, json={
+                "data": [{"item": "deal", "id": d["id"], "data": d} for d in self.recents],
+                "additional_data": {
+                    "last_timestamp_on_page": self.last_timestamp,
+                    "pagination": {"more_items_in_collection": False},
+                },
+            })
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def fake_pipedrive(test_engine):
+    """Patch the sync module's engine, credentials and HTTP transport."""
+    fake = FakePipedrive()
+    transport = PipedriveTransport(
+        PipedriveTransportConfig(max_retries=1, backoff_base=0.001),
+        transport=httpx.MockTransport(fake.handler),
+    )
+    with patch.object(pipedrive_sync, "engine", test_engine), \
+            patch.object(pipedrive_sync, "_get_token_and_base", lambda: ("token", "https://pd.test/v1")), \
+            patch.object(pipedrive_sync, "get_pipedrive_transport", lambda: transport):
+        yield fake
+
+
+def _mark_reconciled(cursor: datetime):
+    update_sync_metadata(DEALS_RECONCILE, "success")
+    update_sync_metadata(DEALS_RECENTS_CURSOR, "success", sync_time=cursor)
+
+
+class TestSyncDeals:
+    """Test mode selection and cursor handling."""
+
+    @pytest.mark.asyncio
+    async def test_first_run_is_full_sweep(self, fake_pipedrive, test_engine):
+        """Without a cursor, every tracked pipeline is swept and a cursor is stored."""
+        fake_pipedrive.deals = [_deal(1, 1), _deal(2, 2)]
+
+        result = await sync_deals([1, 2])
+
+        assert result["mode"] == "full"
+        assert result["synced"] == 2
+        assert fake_pipedrive.paths == ["deals", "deals"]
+        assert get_sync_cursor(DEALS_RECENTS_CURSOR) is not None
+        assert get_last_sync_time(DEALS_SYNC) is not None
+
+    @pytest.mark.asyncio
+    async def test_incremental_run_uses_recents_only(self, fake_pipedrive, test_engine):
+        """With a cursor, only /recents is called and the cursor advances to server time."""
+        _mark_reconciled(datetime(2026, 1, 10, 9, 0, tzinfo=timezone.utc))
+        fake_pipedrive.recents = [_deal(1, 1, title="Renamed"), _deal(3, 99)]
+        fake_pipedrive.last_timestamp = "2026-01-10 10:05:00"
+
+        result = await sync_deals([1, 2])
+
+        assert result["mode"] == "incremental"
+        assert fake_pipedrive.paths == ["recents"]
+        assert result["synced"] == 1  # deal 3 is in an untracked pipeline
+        assert get_sync_cursor(DEALS_RECENTS_CURSOR) == datetime(2026, 1, 10, 10, 5, tzinfo=timezone.utc)
+        # Freshness is wall-clock time, not the server cursor
+        assert get_last_sync_time(DEALS_SYNC) > datetime.now(timezone.utc) - timedelta(minutes=1)
+        with Session(test_engine) as session:
+            assert session.get(Deal, 1).title == "Renamed"
+            assert session.get(Deal, 3) is None
+
+    @pytest.mark.asyncio
+    async def test_incremental_updates_cached_deal_leaving_pipeline(self, fake_pipedrive, test_engine):
+        """A cached deal that was moved out or closed is still updated."""
+        with Session(test_engine) as session:
+            session.add(Deal(**pipedrive_sync._deal_row(_deal(5, 1))))
+            session.commit()
+        _mark_reconciled(datetime(2026, 1, 10, 9, 0, tzinfo=timezone.utc))
+        fake_pipedrive.recents = [_deal(5, 99, status="won", update_time="2026-01-10 11:00:00")]
+
+        await sync_deals([1])
+
+        with Session(test_engine) as session:
+            deal = session.get(Deal, 5)
+            assert deal.pipeline_id == 99
+            assert deal.status == "won"
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_cursor(self, fake_pipedrive):
+        """A failed /recents call does not lose the cursor."""
+        cursor = datetime(2026, 1, 10, 9, 0, tzinfo=timezone.utc)
+        _mark_reconciled(cursor)
+        fake_pipedrive.fail_recents = True
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await sync_deals([1])
+
+        assert get_sync_cursor(DEALS_RECENTS_CURSOR) == cursor
+
+    @pytest.mark.asyncio
+    async def test_weekly_reconciliation_forces_full_sweep(self, fake_pipedrive):
+        """A stale reconciliation timestamp triggers a full sweep."""
+        update_sync_metadata(
+            DEALS_RECONCILE, "success",
+            sync_time=datetime.now(timezone.utc) - timedelta(days=8),
+        )
+        update_sync_metadata(DEALS_RECENTS_CURSOR, "success")
+        fake_pipedrive.deals = [_deal(1, 1)]
+
+        result = await sync_deals([1])
+
+        assert result["mode"] == "full"
+        assert fake_pipedrive.paths == ["deals"]
+
+    @pytest.mark.asyncio
+    async def test_no_tracked_pipelines(self, fake_pipedrive):
+        """Without cached pipelines nothing is fetched and no sync is recorded."""
+        with patch.object(pipedrive_sync, "sync_pipeline_ids", lambda: []):
+            with pytest.raises(PipedriveSyncError):
+                await sync_deals()
+
+        assert fake_pipedrive.paths == []
+        for entity_type in (DEALS_RECONCILE, DEALS_RECENTS_CURSOR, DEALS_SYNC):
+            assert get_last_sync_time(entity_type) is None
@@ -0,0 +1,192 @@
+"""Test the shared Pipedrive transport against a local stub server."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from cmd_center.backend.integrations.pipedrive_client import PipedriveClient
+from cmd_center.backend.integrations.pipedrive_transport import (
+    AdaptiveTokenBucket,
+    PipedriveTransport,
+    PipedriveTransportConfig,
+    endpoint_key,
+    get_pipedrive_transport,
+)
+
+
+class StubPipedrive:
+    """Local HTTP/1.1 server replaying scripted responses per path."""
+
+    def __init__(self):
+        self.scripts = {}
+        self.requests = []
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self):
+                path = self.path.split("?")[0]
+                stub.requests.append((self.command, path, time.monotonic()))
+                stub.client_ports.add(self.client_address[1])
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                script = stub.scripts.get(path) or []
+                status, headers = script.pop(0) if script else (200, {})
+                body = json.dumps({"success": status < 400, "data": []}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def count(self, path: str) -> int:
+        return sum(1 for _, p, _ in self.requests if p == path)
+
+
+@pytest.fixture
+def stub():
+    server = StubPipedrive()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+@pytest.fixture
+async def transport():
+    t = PipedriveTransport(PipedriveTransportConfig(backoff_base=0.01, max_retries=3))
+    yield t
+    await t.aclose()
+
+
+class TestRetries:
+    """Test retry behaviour on 429 and 5xx."""
+
+    async def test_retries_server_errors(self, stub, transport):
+        """A 503 is retried and the eventual 200 is returned."""
+        stub.scripts["/v1/deals"] = [(503, {}), (503, {})]
+
+        response = await transport.get(f"{stub.url}/deals")
+
+        assert response.status_code == 200
+        assert stub.count("/v1/deals") == 3
+        stats = transport.metrics()["endpoints"]["GET deals"]
+        assert stats["requests"] == 3
+        assert stats["errors"] == 2
+        assert stats["retries"] == 2
+
+    async def test_honours_retry_after(self, stub, transport):
+        """A 429 waits for Retry-After before the next attempt."""
+        stub.scripts["/v1/deals"] = [(429, {"Retry-After": "0.3"})]
+
+        response = await transport.get(f"{stub.url}/deals")
+
+        assert response.status_code == 200
+        first, second = [t for _, p, t in stub.requests if p == "/v1/deals"]
+        assert second - first >= 0.25
+        assert transport.metrics()["endpoints"]["GET deals"]["rate_limited"] == 1
+
+    async def test_gives_up_after_max_retries(self, stub, transport):
+        """The last failing response is returned to the caller."""
+        stub.scripts["/v1/deals"] = [(500, {})] * 10
+
+        response = await transport.get(f"{stub.url}/deals")
+
+        assert response.status_code == 500
+        assert stub.count("/v1/deals") == 4
+
+    async def test_post_not_retried_on_server_error(self, stub, transport):
+        """Non-idempotent requests are not resent after a 5xx."""
+        stub.scripts["/v1/notes"] = [(500, {})]
+
+        response = await transport.post(f"{stub.url}/notes", json={"content": "x"})
+
+        assert response.status_code == 500
+        assert stub.count("/v1/notes") == 1
+
+
+class TestRateLimit:
+    """Test adaptation to x-ratelimit-* headers."""
+
+    async def test_exhausted_budget_pauses_all_requests(self, stub, transport):
+        """remaining=0 holds the next request until the window resets."""
+        stub.scripts["/v1/deals"] = [(200, {"x-ratelimit-remaining": "0", "x-ratelimit-reset": "0.3"})]
+
+        await transport.get(f"{stub.url}/deals")
+        await transport.get(f"{stub.url}/stages")
+
+        (_, _, first), (_, _, second) = stub.requests
+        assert second - first >= 0.25
+
+    def test_rate_spreads_remaining_budget(self):
+        """The refill rate follows remaining / reset, capped at the configured rate."""
+        now = [0.0]
+        bucket = AdaptiveTokenBucket(rate=10, capacity=20, clock=lambda: now[0])
+
+        bucket.update_from_headers(httpx.Headers({"x-ratelimit-remaining": "4", "x-ratelimit-reset": "2"}))
+        assert bucket.rate == 2
+        assert bucket.tokens == 4
+
+        bucket.update_from_headers(httpx.Headers({"x-ratelimit-remaining": "80", "x-ratelimit-reset": "2"}))
+        assert bucket.rate == 10
+
+    def test_bucket_limits_burst(self):
+        """Once the burst is spent callers wait for the refill."""
+        now = [0.0]
+        bucket = AdaptiveTokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+
+        assert bucket._wait_time() == 0
+        assert bucket._wait_time() == 0
+        assert bucket._wait_time() == pytest.approx(0.5)
+        now[0] = 0.5
+        assert bucket._wait_time() == 0
+
+
+class TestPooling:
+    """Test connection reuse and sharing."""
+
+    async def test_reuses_keepalive_connection(self, stub, transport):
+        """Sequential requests share one pooled connection."""
+        for _ in range(5):
+            await transport.get(f"{stub.url}/deals")
+
+        assert len(stub.client_ports) == 1
+
+    def test_pipedrive_client_uses_shared_transport(self):
+        """PipedriveClient draws on the process-wide transport."""
+        client = PipedriveClient(api_token="t", api_url="https://pd.test/v1", api_url_v2="https://pd.test/v2")
+
+        assert client.client is get_pipedrive_transport()
+
+    async def test_closing_a_client_keeps_the_shared_pool_open(self, stub, transport):
+        """One caller closing its client does not abort other jobs' requests."""
+        client = PipedriveClient(api_token="t", api_url=stub.url, api_url_v2=stub.url, transport=transport)
+        await transport.get(f"{stub.url}/deals")
+        pool = transport._client
+
+        await client.close()
+
+        assert transport._client is pool and not pool.is_closed
+
+    def test_endpoint_key_groups_ids(self):
+        """Metric keys collapse numeric ids and the version prefix."""
+        assert endpoint_key("get", "https://x.pipedrive.com/v1/deals/42/flow") == "GET deals/{id}/flow"
+        assert endpoint_key("GET", "https://x.pipedrive.com/api/v2/deals") == "GET deals"
@@ -0,0 +1,200 @@
+"""Test token counting and token-budgeted prompt packing."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from cmd_center.backend.integrations.llm_client import compact_schema
+from cmd_center.backend.integrations.token_counter import count_tokens, truncate_to_tokens
+from cmd_center.backend.models.writer_models import DealSummaryContext, DealSummaryResult, EmailDraftContext
+from cmd_center.backend.services.prompt_context import pack_variables, strip_html
+from cmd_center.backend.services.prompt_registry import PromptRegistry, PromptTemplate
+from cmd_center.backend.services.writer_service import WriterService
+
+
+def notes_prompt(**overrides):
+    fields = dict(
+        id="test.notes.v1",
+        system_prompt="system",
+        user_prompt_template="{% for note in notes %}- {{ note }}\n{% endfor %}",
+        required_variables=["notes"],
+        packed_variables=["notes"],
+    )
+    return PromptTemplate(**(fields | overrides))
+
+
+def long_note(topic, words=200):
+    return f"{topic}: " + " ".join(["update"] * words)
+
+
+class TestTokenCounter:
+    """The local estimate tracks BPE token counts, not characters."""
+
+    def test_english(self):
+        assert count_tokens("Hello world, how are you?") == 7
+
+    def test_empty(self):
+        assert count_tokens("") == 0
+
+    def test_arabic_costs_more_per_character(self):
+        arabic = "العميل أكد تعديل أمر الشراء"
+        assert count_tokens(arabic) > len(arabic) // 4
+
+    def test_truncate(self):
+        text = long_note("Site visit")
+
+        truncated = truncate_to_tokens(text, 20)
+
+        assert truncated.endswith("…")
+        assert count_tokens(truncated) <= 20
+        assert truncate_to_tokens("short", 20) == "short"
+
+
+class TestStripHtml:
+    """Pipedrive note HTML becomes plain text."""
+
+    def test_tags_and_entities(self):
+        html = "<div><p>PO&nbsp;received</p><p>Awaiting <b>site</b> &amp; materials</p></div>"
+
+        assert strip_html(html) == "PO received\nAwaiting site & materials"
+
+    def test_lists_and_breaks(self):
+        assert strip_html("Items:<ul><li>Paint</li><li>Tiles</li></ul>Done<br/>ok") == \
+            "Items:\n- Paint\n- Tiles\nDone\nok"
+
+    def test_style_blocks_are_removed(self):
+        assert strip_html("<style>p { color: red; }</style><p>Call back</p>") == "Call back"
+
+
+class TestPacking:
+    """List variables are cleaned, deduplicated and fitted to the budget."""
+
+    def test_duplicates_and_blanks_are_removed(self):
+        packed, report = pack_variables(notes_prompt(), {"notes": ["<p>Call PM</p>", "call  pm", "", "Send PO"]})
+
+        assert packed["notes"] == ["Call PM", "Send PO"]
+        assert report.duplicates == 1
+
+    def test_items_are_capped(self):
+        packed, report = pack_variables(notes_prompt(max_item_tokens=30), {"notes": [long_note("Visit")]})
+
+        assert count_tokens(packed["notes"][0]) <= 30
+        assert report.truncated == 1
+
+    def test_budget_keeps_leading_items(self):
+        notes = [long_note(f"Note {i}", words=60) for i in range(10)]
+
+        packed, report = pack_variables(notes_prompt(token_budget=170), {"notes": notes})
+
+        assert packed["notes"][:2] == notes[:2]
+        assert packed["notes"][2].startswith("Note 2") and packed["notes"][2].endswith("…")
+        assert report.dropped == 7
+        assert count_tokens(notes_prompt().render(packed)[1]) <= 170
+
+    def test_dict_items(self):
+        prompt = notes_prompt(
+            user_prompt_template="{% for note in notes %}[{{ note.date }}] {{ note.content }}\n{% endfor %}",
+            packed_variables=["notes.content"],
+        )
+        notes = [
+            {"date": "2026-03-01", "content": "<p>Paid</p>"},
+            {"date": "2026-03-01", "content": "paid"},
+            {"date": "2026-02-20", "content": "PAID"},
+        ]
+
+        packed, report = pack_variables(prompt, {"notes": notes})
+
+        assert packed["notes"] == [{"date": "2026-03-01", "content": "Paid"}, {"date": "2026-02-20", "content": "PAID"}]
+        assert report.duplicates == 1
+        assert notes[0]["content"] == "<p>Paid</p>"
+
+    def test_repeated_follow_ups_are_kept(self):
+        """The health prompt reads repeated dated follow-ups as a communication gap."""
+        notes = [
+            {"date": f"2026-03-0{day}", "author": "Sara", "content": "Followed up, no response"}
+            for day in (1, 4, 7)
+        ]
+
+        variables = {"deal_id": 1, "deal_title": "Pump station", "stage": "Awaiting Payment", "stage_code": "AP",
+                     "days_in_stage": 19, "owner_name": "Sara", "value_sar": 480000.0, "days_since_last_note": 6,
+                     "stage_history": [], "notes": notes}
+
+        packed, report = pack_variables(PromptRegistry().get_prompt("deal.health_analysis.v1"), variables)
+
+        assert packed["notes"] == notes
+        assert report.duplicates == 0
+
+    def test_prompt_without_packed_variables_is_untouched(self):
+        variables = {"notes": ["<p>x</p>"]}
+
+        packed, _ = pack_variables(notes_prompt(packed_variables=[]), variables)
+
+        assert packed is variables
+
+
+class TestRegistryReport:
+    """Renders report prompt tokens before and after packing."""
+
+    def test_report_and_totals(self):
+        registry = PromptRegistry()
+        notes = [f"<p>{long_note('Awaiting payment', words=400)}</p>"] * 3 + ["Site ready"]
+        variables = {"deal_title": "Pump station", "stage": "AP", "days_in_stage": 9, "owner_name": "Sara",
+                     "notes": notes}
+
+        system_prompt, user_prompt, report = registry.render_prompt_with_report("deal.summarize.v1", variables)
+
+        assert report.tokens_after == count_tokens(system_prompt) + count_tokens(user_prompt)
+        assert report.tokens_before > 3 * 400 > report.tokens_after
+        assert report.duplicates == 2
+        assert "Site ready" in user_prompt
+        assert registry.get_packing_stats()["deal.summarize.v1"] == {
+            "requests": 1, "tokens_before": report.tokens_before, "tokens_after": report.tokens_after,
+        }
+
+    def test_budget_in_prompt_config(self):
+        assert PromptRegistry().get_prompt_config("deal.summarize.v1")["token_budget"] == 1500
+
+    @pytest.mark.asyncio
+    async def test_writer_sends_packed_notes(self):
+        llm = MagicMock()
+        llm.generate_structured_completion = AsyncMock(return_value=DealSummaryResult(
+            deal_id=1, summary="ok", confidence=0.9,
+        ))
+        writer = WriterService(llm_client=llm, prompt_registry=PromptRegistry())
+
+        await writer.summarize_deal(DealSummaryContext(
+            deal_id=1, deal_title="Pump station", stage="AP", owner_name="Sara", days_in_stage=3,
+            notes=["<b>Paid</b>", "paid"],
+        ))
+
+        prompt = llm.generate_structured_completion.call_args.kwargs["prompt"]
+        assert "- Paid" in prompt and "<b>" not in prompt
+
+    @pytest.mark.asyncio
+    async def test_email_draft_is_counted(self):
+        llm = MagicMock()
+        llm.generate_structured_completion = AsyncMock(side_effect=RuntimeError("stop"))
+        writer = WriterService(llm_client=llm, prompt_registry=PromptRegistry())
+        context = EmailDraftContext(
+            recipients=["pm@example.com"], subject_intent="Follow up",
+            deal_contexts=[{"title": "Deal", "pipeline": "P", "stage": "S", "issue": long_note("Late")}],
+        )
+
+        with pytest.raises(RuntimeError):
+            await writer.draft_email(context)
+
+        assert writer.prompts.get_packing_stats()["email.followup.v1"]["requests"] == 1
+
+
+class TestCompactSchema:
+    """Structured output instructions carry a compact, cached schema."""
+
+    def test_cached_per_model(self):
+        assert compact_schema(DealSummaryResult) is compact_schema(DealSummaryResult)
+
+    def test_smaller_than_the_full_schema(self):
+        compact = compact_schema(DealSummaryResult)
+
+        assert '"title"' not in compact
+        assert '"type":["string","null"]' in compact
+        assert count_tokens(compact) < count_tokens(str(DealSummaryResult.model_json_schema()))
@@ -0,0 +1,105 @@
+"""Test compiled templates and lazy registration in PromptRegistry."""
+
+from unittest.mock import patch
+
+import pytest
+from jinja2 import Template
+
+from cmd_center.backend.services import prompt_registry
+from cmd_center.backend.services.prompt_registry import (
+    DEFAULT_PROMPTS,
+    PromptRegistry,
+    PromptTemplate,
+    compile_template,
+    get_template_environment,
+)
+
+
+def make_prompt(template="Hello {{ name }}", prompt_id="test.greet.v1"):
+    return PromptTemplate(id=prompt_id, system_prompt="system", user_prompt_template=template,
+                          required_variables=["name"])
+
+
+class TestCompiledTemplates:
+    """Templates compile once through the shared environment."""
+
+    def test_render_reuses_the_compiled_template(self):
+        registry = PromptRegistry()
+        registry.register_prompt(make_prompt())
+
+        with patch.object(prompt_registry, "compile_template", wraps=compile_template) as compile_spy:
+            assert registry.render_prompt("test.greet.v1", {"name": "Sara"}) == ("system", "Hello Sara")
+            registry.render_prompt("test.greet.v1", {"name": "Omar"})
+
+        compile_spy.assert_not_called()
+
+    def test_identical_sources_share_one_template(self):
+        assert compile_template("Deal {{ deal_id }}") is compile_template("Deal {{ deal_id }}")
+
+    def test_source_change_recompiles(self):
+        prompt = make_prompt()
+        prompt.compile()
+
+        prompt.user_prompt_template = "Hi {{ name }}"
+
+        assert prompt.render({"name": "Sara"})[1] == "Hi Sara"
+
+    def test_output_matches_uncompiled_rendering(self):
+        registry = PromptRegistry()
+        variables = {
+            "deal_title": "Pump station", "stage": "Approved", "days_in_stage": 4,
+            "owner_name": "Sara", "notes": ["Site visit done", "Awaiting PO"],
+        }
+        prompt = registry.get_prompt("deal.summarize.v1")
+
+        assert prompt.render(variables)[1] == Template(prompt.user_prompt_template).render(**variables)
+
+    def test_syntax_error_fails_at_registration(self):
+        registry = PromptRegistry()
+
+        with pytest.raises(ValueError, match="Invalid template for prompt 'test.greet.v1'"):
+            registry.register_prompt(make_prompt("Hello {{ name "))
+
+    def test_experiment_variants_are_compiled(self):
+        registry = PromptRegistry()
+        variants = {"a": make_prompt("A {{ name }}"), "b": make_prompt("B {{ name }}")}
+
+        registry.create_experiment("greeting", "test.greet.v1", variants)
+
+        assert all(variant._compiled is not None for variant in variants.values())
+
+    def test_environment_has_bytecode_cache(self):
+        assert get_template_environment().bytecode_cache is not None
+
+
+class TestLazyRegistration:
+    """Default prompts are built on first use."""
+
+    def test_construction_builds_nothing(self):
+        registry = PromptRegistry()
+
+        assert registry._prompts == {}
+        assert registry.has_prompt("email.followup.v1")
+        assert not registry.has_prompt("reminder.sms.v1")
+
+    def test_first_use_builds_only_that_prompt(self):
+        registry = PromptRegistry()
+
+        registry.get_prompt("email.followup.v1")
+
+        assert list(registry._prompts) == ["email.followup.v1"]
+
+    def test_list_prompts_includes_lazy_ones(self):
+        registry = PromptRegistry()
+
+        assert {p["id"] for p in registry.list_prompts()} == set(DEFAULT_PROMPTS)
+
+    def test_define_prompt(self):
+        registry = PromptRegistry()
+        registry.define_prompt("test.greet.v1", make_prompt)
+
+        assert registry.render_prompt("test.greet.v1", {"name": "Sara"})[1] == "Hello Sara"
+
+    def test_unknown_prompt(self):
+        with pytest.raises(KeyError):
+            PromptRegistry().get_prompt("missing.v1")
@@ -0,0 +1,188 @@
+"""Query-plan regression tests for the hot read queries.
+
+Each test records the SELECTs a real query function runs, then checks
+EXPLAIN QUERY PLAN: no full table scan, the expected index, and no temporary
+sort where the index already provides the order.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func
+from sqlmodel import Session, SQLModel, select
+
+from cmd_center.backend.db import Deal, DealFact, DealStageSpan, LoopFinding, Pipeline, ensure_indexes
+from cmd_center.backend.services import db_queries
+from cmd_center.backend.services.aramco_summary_service import AramcoSummaryService
+from cmd_center.backend.services.loop_engine import BaseLoop
+from cmd_center.backend.services.msgraph_email_service import MSGraphEmailService
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+TABLES = set(SQLModel.metadata.tables)
+
+
+@pytest.fixture
+def engine(override_db):
+    with Session(override_db) as session:
+        session.add(Pipeline(id=5, name="Aramco Projects", order_nr=1))
+        session.commit()
+    return override_db
+
+
+def query_plans(engine, call) -> list[list[str]]:
+    """EXPLAIN QUERY PLAN details of every SELECT executed by call()."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    with engine.connect() as connection:
+        return [
+            [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            for statement, parameters in statements
+        ]
+
+
+def statement_plan(engine, statement) -> list[str]:
+    """EXPLAIN QUERY PLAN details of a SQLAlchemy statement."""
+    with Session(engine) as session:
+        return query_plans(engine, lambda: session.exec(statement).all())[0]
+
+
+def table_scans(plan: list[str]) -> list[str]:
+    """Full scans of real tables (scans of subqueries and CTEs are fine)."""
+    return [step for step in plan if (match := FULL_SCAN.match(step)) and match.group(1) in TABLES]
+
+
+def assert_uses(plan: list[str], index: str, ordered: bool = False) -> None:
+    """The plan reads through `index`, scans no table and (if ordered) needs no sort."""
+    assert not table_scans(plan), plan
+    assert any(f"INDEX {index}" in step for step in plan), plan
+    if ordered:
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+class TestDealQueries:
+    """Deal filters used by the overdue/stuck/owner views."""
+
+    def test_overdue(self, engine):
+        # The last statement is the fact query (earlier ones load the dimension cache)
+        plan = query_plans(engine, lambda: db_queries.get_overdue_deal_facts("Aramco Projects"))[-1]
+        assert_uses(plan, "ix_deal_facts_status_pipeline_update", ordered=True)
+
+    def test_stuck(self, engine):
+        plan = query_plans(engine, lambda: db_queries.get_stuck_deal_facts("Aramco Projects"))[-1]
+        assert_uses(plan, "ix_deal_facts_status_pipeline_stage_entered", ordered=True)
+
+    def test_open_totals_per_pipeline(self, engine):
+        plan = statement_plan(engine, (
+            select(DealFact.pipeline_id, func.count(), func.sum(DealFact.value))
+            .where(DealFact.status == "open")
+            .group_by(DealFact.pipeline_id)
+        ))
+        assert not table_scans(plan), plan
+
+    def test_open_deals_per_stage(self, engine):
+        plan = statement_plan(engine, (
+            select(Deal.stage_id, func.count())
+            .where(Deal.stage_id.in_([27, 28, 29]))
+            .where(Deal.status == "open")
+            .group_by(Deal.stage_id)
+        ))
+        assert_uses(plan, "ix_deal_status_stage")
+
+    def test_by_owner_name(self, engine):
+        [plan] = query_plans(engine, lambda: db_queries.get_deals_by_owner("Sara"))
+        assert_uses(plan, "ix_deal_owner_status")
+
+    def test_by_owner_id(self, engine):
+        plan = statement_plan(engine, (
+            select(func.count(Deal.id), func.coalesce(func.sum(Deal.value), 0))
+            .where(Deal.owner_id == 7)
+            .where(Deal.status == "open")
+        ))
+        assert_uses(plan, "ix_deal_owner_id_status")
+
+
+class TestNoteQueries:
+    """Latest-notes lookups."""
+
+    def test_notes_for_deal(self, engine):
+        [plan] = query_plans(engine, lambda: db_queries.get_notes_for_deal(1, limit=5))
+        assert_uses(plan, "ix_note_deal_add_time", ordered=True)
+
+    def test_recent_notes_ranked(self, engine):
+        service = AramcoSummaryService()
+        with Session(engine) as session:
+            plans = query_plans(engine, lambda: service._recent_notes(session, [1, 2, 3], limit=5))
+        assert_uses(plans[0], "ix_note_deal_add_time")
+
+
+class TestStageSpanQueries:
+    """Stage-history lookups."""
+
+    def test_current_span(self, engine):
+        [plan] = query_plans(engine, lambda: db_queries.get_current_stage_span(1))
+        assert_uses(plan, "ix_deal_stage_span_deal_left")
+
+    def test_stuck_in_stage(self, engine):
+        [plan] = query_plans(engine, lambda: db_queries.get_deals_stuck_in_stage(27))
+        assert_uses(plan, "ix_deal_stage_span_stage_entered")
+
+    def test_duration_stats(self, engine):
+        [plan] = query_plans(engine, lambda: db_queries.get_stage_duration_stats(27))
+        assert_uses(plan, "ix_deal_stage_span_stage_entered")
+
+    def test_approved_in_window(self, engine):
+        plan = statement_plan(engine, select(DealStageSpan.deal_id).where(
+            DealStageSpan.stage_id == 28,
+            DealStageSpan.entered_at >= datetime.now() - timedelta(days=30),
+        ))
+        assert_uses(plan, "ix_deal_stage_span_stage_entered")
+
+
+class TestOtherQueries:
+    """Loop deduplication and the cached mailbox listing."""
+
+    def test_loop_finding_dedup(self, engine):
+        class Loop(BaseLoop):
+            def execute(self, session):
+                pass
+
+        with Session(engine) as session:
+            [plan] = query_plans(engine, lambda: Loop()._is_duplicate(session, "abc"))
+        assert_uses(plan, "ix_loop_finding_signature_created")
+
+    def test_cached_emails(self, engine):
+        service = MSGraphEmailService(default_mailbox="info@example.com")
+        [plan] = query_plans(engine, lambda: service.get_cached_emails(limit=20))
+        assert_uses(plan, "ix_cached_email_mailbox_received", ordered=True)
+
+
+class TestEnsureIndexes:
+    """Indexes added to models reach existing databases."""
+
+    def test_creates_missing_indexes(self, engine):
+        with engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_note_deal_add_time")
+            connection.exec_driver_sql("DROP INDEX ix_loop_finding_signature_created")
+
+        assert sorted(ensure_indexes(engine)) == [
+            "ix_loop_finding_signature_created", "ix_note_deal_add_time",
+        ]
+        assert ensure_indexes(engine) == []
+
+    def test_skips_missing_tables(self, engine):
+        LoopFinding.__table__.drop(engine)
+
+        assert ensure_indexes(engine) == []
+        with engine.connect() as connection:
+            assert not engine.dialect.has_table(connection, "loop_finding")
@@ -0,0 +1,192 @@
+"""Test the shared TTL + data-version result cache."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session
+
+from cmd_center.backend.db import Pipeline
+from cmd_center.backend.models.cashflow_models import CashflowPredictionInput
+from cmd_center.backend.services import cashflow_prediction_service, result_cache
+from cmd_center.backend.services.cashflow_prediction_service import CashflowPredictionService
+from cmd_center.backend.services.result_cache import ResultCache, cached_result, get_result_cache
+
+
+@pytest.fixture
+def cache(override_db):
+    return ResultCache(max_entries=3, ttl_seconds=60)
+
+
+class Counter:
+    """Counts how often each computation runs."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value="value"):
+        self.calls += 1
+        return value
+
+
+class TestEntries:
+    """Test hits, expiry, eviction and invalidation."""
+
+    def test_hit_after_miss(self, cache):
+        compute = Counter()
+        assert cache.get_or_compute("summary", ("Aramco",), compute) == "value"
+        assert cache.get_or_compute("summary", ("Aramco",), compute) == "value"
+        cache.get_or_compute("summary", ("Pipeline",), compute)
+
+        assert compute.calls == 2
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+        assert stats["methods"]["summary"]["hits"] == 1
+
+    def test_expires_after_ttl(self, cache):
+        compute = Counter()
+        cache.get_or_compute("summary", (), compute, ttl=0.01)
+        time.sleep(0.02)
+        cache.get_or_compute("summary", (), compute)
+
+        assert compute.calls == 2
+        assert cache.stats()["expirations"] == 1
+
+    def test_evicts_least_recently_used(self, cache):
+        compute = Counter()
+        for n in range(3):
+            cache.get_or_compute("summary", (n,), compute)
+        cache.get_or_compute("summary", (0,), compute)  # refresh 0
+        cache.get_or_compute("summary", (3,), compute)  # evicts 1
+
+        cache.get_or_compute("summary", (0,), compute)
+        cache.get_or_compute("summary", (1,), compute)
+        assert compute.calls == 5
+        assert cache.stats()["evictions"] == 2
+
+    def test_version_bump_invalidates(self, cache):
+        compute = Counter()
+        cache.get_or_compute("summary", (), compute)
+        assert cache.bump_data_version("test") == 1
+        cache.get_or_compute("summary", (), compute)
+
+        assert compute.calls == 2
+        assert cache.stats()["data_version"] == 1
+
+    def test_result_computed_before_bump_is_not_stored(self, cache):
+        def compute():
+            cache.bump_data_version("sync during compute")
+            return "stale"
+
+        cache.get_or_compute("summary", (), compute)
+        assert cache.stats()["entries"] == 0
+
+    def test_exceptions_are_not_cached(self, cache):
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("summary", (), fail)
+        assert cache.get_or_compute("summary", (), Counter()) == "value"
+
+
+class TestConcurrentMisses:
+    """Test that concurrent misses share one computation."""
+
+    def test_threads_share_one_computation(self, cache):
+        compute = Counter()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.05)
+            return compute()
+
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(cache.get_or_compute("summary", (), slow)))]
+        workers[0].start()
+        started.wait()
+        workers += [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("summary", (), slow)))
+            for _ in range(4)
+        ]
+        for worker in workers[1:]:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert results == ["value"] * 5
+        assert compute.calls == 1
+        assert cache.stats()["coalesced"] + cache.stats()["hits"] == 4
+
+    @pytest.mark.asyncio
+    async def test_tasks_share_one_computation(self, cache):
+        compute = Counter()
+
+        async def slow():
+            await asyncio.sleep(0.01)
+            return compute()
+
+        results = await asyncio.gather(*[
+            cache.get_or_compute_async("summary", (), slow) for _ in range(10)
+        ])
+
+        assert results == ["value"] * 10
+        assert compute.calls == 1
+        assert cache.stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_waiters_see_the_error(self, cache):
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *[cache.get_or_compute_async("summary", (), fail) for _ in range(3)],
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+
+
+class TestDecorator:
+    """Test cached service methods."""
+
+    @pytest.mark.asyncio
+    async def test_keys_on_arguments_not_instance(self, override_db):
+        class Service:
+            calls = 0
+
+            @cached_result("test.method")
+            async def method(self, name, days=30):
+                Service.calls += 1
+                return f"{name}:{days}"
+
+        assert await Service().method("Aramco") == "Aramco:30"
+        assert await Service().method("Aramco") == "Aramco:30"
+        assert await Service().method("Aramco", days=7) == "Aramco:7"
+        assert Service.calls == 2
+
+        result_cache.bump_data_version("test")
+        await Service().method("Aramco")
+        assert Service.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_cashflow_endpoints_share_predictions(self, override_db):
+        with Session(override_db) as session:
+            session.add(Pipeline(id=5, name="Aramco Projects", order_nr=1))
+            session.commit()
+        service = CashflowPredictionService()
+
+        with patch.object(cashflow_prediction_service, "load_deal_columns",
+                          wraps=cashflow_prediction_service.load_deal_columns) as load_deals:
+            projection, critical = await asyncio.gather(
+                service.predict_cashflow(CashflowPredictionInput(pipeline_name="Aramco Projects", horizon_days=90)),
+                service.predict_cashflow(CashflowPredictionInput(pipeline_name="Aramco Projects", horizon_days=14)),
+            )
+
+        assert load_deals.call_count == 1
+        assert projection.metadata.horizon_days == 90
+        assert critical.metadata.horizon_days == 14
+        assert get_result_cache().stats()["methods"]["cashflow.pipeline_predictions"]["misses"] == 1
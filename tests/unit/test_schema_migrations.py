@@ -0,0 +1,158 @@
+"""Test the versioned schema migration runner."""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from cmd_center.backend.db import Deal, DealChangeEvent, SchemaMigration
+from cmd_center.backend.migrations import MIGRATIONS, Migration, MigrationRunner
+
+
+def recorder(calls, name):
+    return lambda connection: calls.append(name)
+
+
+@pytest.fixture
+def steps():
+    calls = []
+    migrations = [
+        Migration(version=1, name="first", apply=recorder(calls, "first")),
+        Migration(version=2, name="heavy", apply=recorder(calls, "heavy"), background=True, tables=("deal",),
+                  rows_per_second=10),
+        Migration(version=3, name="third", apply=recorder(calls, "third")),
+    ]
+    return calls, migrations
+
+
+class TestMigrationRunner:
+    """Test ordering, idempotency and version tracking."""
+
+    def test_foreground_steps_in_order(self, test_engine, steps):
+        calls, migrations = steps
+        runner = MigrationRunner(test_engine, migrations)
+
+        assert runner.run() == [1, 3]
+        assert calls == ["first", "third"]
+        # The background step is still pending, so the version stops before it
+        assert runner.schema_version() == 1
+        assert [m.version for m in runner.pending()] == [2]
+
+    def test_idempotent(self, test_engine, steps):
+        calls, migrations = steps
+        runner = MigrationRunner(test_engine, migrations)
+
+        runner.run(background=True)
+        assert runner.run(background=True) == []
+        assert MigrationRunner(test_engine, migrations).apply(migrations[0]) is False
+
+        assert calls == ["first", "heavy", "third"]
+        assert runner.schema_version() == 3
+        with Session(test_engine) as session:
+            assert [row.name for row in session.exec(select(SchemaMigration))] == ["first", "heavy", "third"]
+
+    @pytest.mark.asyncio
+    async def test_background_steps(self, test_engine, steps):
+        calls, migrations = steps
+        runner = MigrationRunner(test_engine, migrations)
+        runner.run()
+
+        assert await runner.run_background() == [2]
+        assert calls == ["first", "third", "heavy"]
+        assert runner.schema_version() == 3
+
+    def test_failed_step_is_not_recorded(self, test_engine):
+        def fail(connection):
+            connection.exec_driver_sql("CREATE TABLE half_done (id INTEGER)")
+            raise RuntimeError("boom")
+
+        runner = MigrationRunner(test_engine, [Migration(version=1, name="fails", apply=fail)])
+
+        with pytest.raises(RuntimeError):
+            runner.run()
+        assert runner.schema_version() == 0
+        with test_engine.connect() as connection:
+            assert not test_engine.dialect.has_table(connection, "half_done")
+
+
+class TestDryRun:
+    """Test the pending-step cost report."""
+
+    def test_plan_estimates_from_row_counts(self, test_engine, steps):
+        _, migrations = steps
+        with Session(test_engine) as session:
+            for deal_id in range(1, 51):
+                session.add(Deal(id=deal_id, title="deal", pipeline_id=1, stage_id=1))
+            session.commit()
+        runner = MigrationRunner(test_engine, migrations)
+        runner.run()
+
+        [plan] = runner.plan()
+
+        assert (plan.version, plan.background, plan.rows, plan.estimated_seconds) == (2, True, 50, 5.0)
+
+    def test_plan_does_not_apply(self, test_engine):
+        runner = MigrationRunner(test_engine)
+
+        assert [plan.version for plan in runner.plan()] == [m.version for m in MIGRATIONS]
+        assert runner.schema_version() == 0
+
+
+class TestDefaultMigrations:
+    """The shipped steps run cleanly on an existing cache."""
+
+    def test_index_step_restores_dropped_indexes(self, test_engine):
+        with test_engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_deal_status_stage")
+            connection.exec_driver_sql("DROP INDEX ix_deal_facts_status_pipeline_update")
+
+        MigrationRunner(test_engine).run(background=True)
+
+        with test_engine.connect() as connection:
+            indexes = set(connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).scalars())
+            assert {"ix_deal_status_stage", "ix_deal_facts_status_pipeline_update"} <= indexes
+            # ANALYZE ran
+            assert test_engine.dialect.has_table(connection, "sqlite_stat1")
+
+    def test_event_id_index_becomes_unique(self, test_engine):
+        """A cache from before the unique constraint is deduplicated and constrained."""
+        with test_engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_deal_change_event_pipedrive_event_id")
+            connection.exec_driver_sql(
+                "CREATE INDEX ix_deal_change_event_pipedrive_event_id ON deal_change_event (pipedrive_event_id)"
+            )
+            connection.execute(insert(DealChangeEvent), [
+                dict(pipedrive_event_id=event_id, deal_id=1, timestamp=datetime(2026, 1, 1),
+                     log_time=datetime(2026, 1, 1), field_key="stage_id", raw_json="{}")
+                for event_id in (100, 100, 101, 100)
+            ])
+
+        MigrationRunner(test_engine).run(background=True)
+
+        with test_engine.begin() as connection:
+            assert list(connection.exec_driver_sql(
+                "SELECT id, pipedrive_event_id FROM deal_change_event ORDER BY id"
+            )) == [(1, 100), (3, 101)]
+            connection.execute(insert(DealChangeEvent).prefix_with("OR IGNORE"), dict(
+                pipedrive_event_id=100, deal_id=1, timestamp=datetime(2026, 1, 1),
+                log_time=datetime(2026, 1, 1), field_key="stage_id", raw_json="{}",
+            ))
+            assert connection.exec_driver_sql("SELECT COUNT(*) FROM deal_change_event").scalar() == 2
+
+    @pytest.mark.asyncio
+    async def test_indexes_declared_later_reach_migrated_caches(self, test_engine):
+        runner = MigrationRunner(test_engine)
+        runner.run(background=True)
+        # An index added to a model after every step was applied
+        with test_engine.begin() as connection:
+            connection.exec_driver_sql("DROP INDEX ix_deal_owner_status")
+
+        assert await runner.run_background() == []
+
+        with test_engine.connect() as connection:
+            indexes = set(connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).scalars())
+        assert "ix_deal_owner_status" in indexes
@@ -0,0 +1,286 @@
+"""Test the batched stage history sync."""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from unittest.mock import patch
+from sqlmodel import Session, select
+
+from cmd_center.backend.db import Deal, DealChangeEvent, DealStageSpan, Pipeline, SyncMetadata
+from cmd_center.backend.integrations.pipedrive_client import PipedriveDealFlowDTO
+from cmd_center.backend.services import pipedrive_sync
+from cmd_center.backend.services.pipedrive_sync import (
+    sync_stage_history_for_deal,
+    sync_stage_history_for_deals,
+    sync_stage_history_for_open_deals,
+)
+
+
+def _stage_change(event_id: int, deal_id: int, old_stage, new_stage: int, log_time: str) -> list:
+    """stage_id + stage_change_time events as returned by /deals/{id}/flow."""
+    return [
+        {
+            "object": "dealChange",
+            "timestamp": log_time,
+            "data": {
+                "id": event_id,
+                "item_id": deal_id,
+                "field_key": "stage_id",
+                "old_value": old_stage,
+                "new_value": new_stage,
+                "log_time": log_time,
+                "user_id": 7,
+                "change_source": "app",
+            },
+        },
+        {
+            "object": "dealChange",
+            "timestamp": log_time,
+            "data": {
+                "id": event_id + 1,
+                "item_id": deal_id,
+                "field_key": "stage_change_time",
+                "old_value": None,
+                "new_value": log_time,
+                "log_time": log_time,
+                "user_id": 7,
+                "change_source": "app",
+            },
+        },
+    ]
+
+
+class FakeFlowClient:
+    """Stands in for PipedriveClient.get_deal_flow, serving flows newest first."""
+
+    def __init__(self, flows=None, failing=(), page_size=100):
+        self.flows = flows or {}
+        self.failing = set(failing)
+        self.missing_pages = set()  # (deal_id, start) pages answered with None, like an HTTP error
+        self.page_size = page_size
+        self.calls = []
+
+    async def get_deal_flow(self, deal_id: int, start: int = 0):
+        self.calls.append((deal_id, start))
+        if deal_id in self.failing:
+            raise RuntimeError("flow unavailable")
+        if (deal_id, start) in self.missing_pages:
+            return None
+        events = list(reversed(self.flows.get(deal_id, [])))
+        page = events[start:start + self.page_size]
+        more = start + self.page_size < len(events)
+        return PipedriveDealFlowDTO(
+            success=True,
+            data=page,
+            additional_data={"pagination": {
+                "more_items_in_collection": more,
+                "next_start": start + self.page_size,
+            }},
+        )
+
+
+@pytest.fixture
+def flow_client(test_engine):
+    client = FakeFlowClient()
+    with patch.object(pipedrive_sync, "engine", test_engine), \
+         patch("cmd_center.backend.integrations.pipedrive_client.get_pipedrive_client", return_value=client):
+        yield client
+
+
+def _cache_deal(engine, deal_id: int, update_time: datetime, pipeline_id: int = 1):
+    with Session(engine) as session:
+        session.merge(Deal(
+            id=deal_id, title=f"Deal {deal_id}", pipeline_id=pipeline_id, stage_id=10,
+            status="open", update_time=update_time, stage_change_time=update_time,
+        ))
+        session.commit()
+
+
+class TestStageHistorySync:
+    """Test events, spans and metadata written by the batched sync."""
+
+    async def test_creates_events_and_spans(self, flow_client, test_engine):
+        """Each transition stores its events and closes the previous span."""
+        flow_client.flows[1] = (
+            _stage_change(100, 1, None, 10, "2026-01-01 08:00:00")
+            + _stage_change(102, 1, 10, 11, "2026-01-03 08:00:00")
+        )
+
+        result = await sync_stage_history_for_deal(1)
+
+        assert result == {
+            "deal_id": 1, "events_synced": 4, "spans_created": 2, "spans_updated": 1,
+            "skipped": False, "errors": [],
+        }
+        with Session(test_engine) as session:
+            spans = session.exec(select(DealStageSpan).order_by(DealStageSpan.id)).all()
+            assert [(s.stage_id, s.next_stage_id) for s in spans] == [(10, 11), (11, None)]
+            assert spans[0].duration_hours == pytest.approx(48.0)
+            assert spans[1].left_at is None
+
+    async def test_closes_stored_open_span(self, flow_client, test_engine):
+        """A later run closes the span left open by the previous one."""
+        flow_client.flows[1] = _stage_change(100, 1, None, 10, "2026-01-01 08:00:00")
+        await sync_stage_history_for_deal(1)
+
+        flow_client.flows[1] += _stage_change(102, 1, 10, 11, "2026-01-02 08:00:00")
+        result = await sync_stage_history_for_deal(1)
+
+        assert result["events_synced"] == 2
+        assert result["spans_created"] == 1
+        assert result["spans_updated"] == 1
+        with Session(test_engine) as session:
+            first = session.exec(select(DealStageSpan).where(DealStageSpan.stage_id == 10)).one()
+            assert first.next_stage_id == 11
+            assert first.duration_hours == pytest.approx(24.0)
+
+    async def test_rerun_is_idempotent(self, flow_client, test_engine):
+        """Re-syncing an unchanged flow writes no new events or spans."""
+        flow_client.flows[1] = _stage_change(100, 1, None, 10, "2026-01-01 08:00:00")
+        await sync_stage_history_for_deal(1)
+        result = await sync_stage_history_for_deal(1)
+
+        assert result["events_synced"] == 0
+        assert result["spans_created"] == 0
+        with Session(test_engine) as session:
+            assert len(session.exec(select(DealChangeEvent)).all()) == 2
+            assert len(session.exec(select(DealStageSpan)).all()) == 1
+
+    async def test_writes_metadata_per_deal(self, flow_client, test_engine):
+        """Every deal gets its stage_history_<id> row, failures included."""
+        flow_client.flows[1] = _stage_change(100, 1, None, 10, "2026-01-01 08:00:00")
+        flow_client.flows[2] = _stage_change(200, 2, None, 20, "2026-01-01 08:00:00")
+        flow_client.failing.add(3)
+
+        results = await sync_stage_history_for_deals([1, 2, 3])
+
+        assert [r["errors"] for r in results] == [[], [], ["flow unavailable"]]
+        with Session(test_engine) as session:
+            meta = {m.entity_type: m for m in session.exec(select(SyncMetadata)).all()}
+            assert meta["stage_history_1"].status == "success"
+            assert meta["stage_history_1"].records_synced == 2
+            assert meta["stage_history_3"].status == "failed"
+            assert meta["stage_history_3"].error_message == "flow unavailable"
+
+    async def test_query_count_is_constant_per_chunk(self, flow_client, test_engine):
+        """A chunk issues the same number of statements regardless of its size."""
+        async def count_statements(deal_ids):
+            for deal_id in deal_ids:
+                flow_client.flows[deal_id] = (
+                    _stage_change(deal_id * 10, deal_id, None, 10, "2026-01-01 08:00:00")
+                    + _stage_change(deal_id * 10 + 2, deal_id, 10, 11, "2026-01-02 08:00:00")
+                )
+            statements = []
+
+            def record(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(test_engine, "before_cursor_execute", record)
+            try:
+                await sync_stage_history_for_deals(deal_ids)
+            finally:
+                event.remove(test_engine, "before_cursor_execute", record)
+            return len(statements)
+
+        assert await count_statements([1, 2]) == await count_statements(list(range(10, 30)))
+
+
+class TestStageHistoryChangeDetection:
+    """Test that unchanged deals skip the flow API."""
+
+    async def test_skips_deals_with_unchanged_watermark(self, flow_client, test_engine):
+        """A deal is only re-fetched after its update_time moves."""
+        _cache_deal(test_engine, 1, datetime(2026, 1, 1, 8))
+        _cache_deal(test_engine, 2, datetime(2026, 1, 1, 8))
+        flow_client.flows[1] = _stage_change(100, 1, None, 10, "2026-01-01 08:00:00")
+        flow_client.flows[2] = _stage_change(200, 2, None, 10, "2026-01-01 08:00:00")
+        await sync_stage_history_for_deals([1, 2])
+        flow_client.calls.clear()
+
+        _cache_deal(test_engine, 2, datetime(2026, 1, 2, 8))
+        results = await sync_stage_history_for_deals([1, 2])
+
+        assert [r["skipped"] for r in results] == [True, False]
+        assert flow_client.calls == [(2, 0)]
+
+    async def test_failed_deals_are_retried(self, flow_client, test_engine):
+        """A failed sync does not record a watermark."""
+        _cache_deal(test_engine, 1, datetime(2026, 1, 1, 8))
+        flow_client.failing.add(1)
+        await sync_stage_history_for_deals([1])
+        flow_client.failing.clear()
+
+        results = await sync_stage_history_for_deals([1])
+
+        assert results[0]["skipped"] is False
+        assert results[0]["errors"] == []
+
+    async def test_failed_page_is_not_stored(self, flow_client, test_engine):
+        """A page the client could not fetch fails the deal instead of storing a partial flow."""
+        _cache_deal(test_engine, 1, datetime(2026, 1, 1, 8))
+        _cache_deal(test_engine, 2, datetime(2026, 1, 1, 8))
+        flow_client.page_size = 2
+        for deal_id in (1, 2):
+            flow_client.flows[deal_id] = (
+                _stage_change(deal_id * 100, deal_id, None, 10, "2026-01-01 08:00:00")
+                + _stage_change(deal_id * 100 + 2, deal_id, 10, 11, "2026-01-02 08:00:00")
+            )
+        flow_client.missing_pages = {(1, 0), (2, 2)}
+
+        results = await sync_stage_history_for_deals([1, 2])
+
+        assert all(r["errors"] for r in results)
+        with Session(test_engine) as session:
+            assert session.exec(select(DealChangeEvent)).all() == []
+            assert session.exec(select(DealStageSpan)).all() == []
+            meta = {m.entity_type: m for m in session.exec(select(SyncMetadata)).all()}
+            assert meta["stage_history_1"].status == "failed"
+            assert meta["stage_history_2"].status == "failed"
+
+        flow_client.missing_pages.clear()
+        flow_client.calls.clear()
+        results = await sync_stage_history_for_deals([1, 2])
+
+        assert [r["skipped"] for r in results] == [False, False]
+        assert [r["events_synced"] for r in results] == [4, 4]
+
+    async def test_paging_stops_at_stored_events(self, flow_client, test_engine):
+        """Only pages newer than the last stored event are requested."""
+        flow_client.page_size = 2
+        flow_client.flows[1] = (
+            _stage_change(100, 1, None, 10, "2026-01-01 08:00:00")
+            + _stage_change(102, 1, 10, 11, "2026-01-02 08:00:00")
+        )
+        await sync_stage_history_for_deal(1)
+        assert [start for _, start in flow_client.calls] == [0, 2]
+        flow_client.calls.clear()
+
+        flow_client.flows[1] += (
+            _stage_change(104, 1, 11, 12, "2026-01-03 08:00:00")
+            + _stage_change(106, 1, 12, 13, "2026-01-04 08:00:00")
+        )
+        result = await sync_stage_history_for_deal(1)
+
+        assert [start for _, start in flow_client.calls] == [0, 2, 4]
+        assert result["events_synced"] == 4
+        with Session(test_engine) as session:
+            spans = session.exec(select(DealStageSpan).order_by(DealStageSpan.id)).all()
+            assert [(s.stage_id, s.next_stage_id) for s in spans] == [
+                (10, 11), (11, 12), (12, 13), (13, None),
+            ]
+
+    async def test_open_deals_result_reports_skips(self, flow_client, override_db, test_engine):
+        """The open-deals sync reports fetched and skipped counts."""
+        with Session(test_engine) as session:
+            session.add(Pipeline(id=1, name="Pipeline", order_nr=1))
+            session.commit()
+        _cache_deal(test_engine, 1, datetime(2026, 1, 1, 8))
+        _cache_deal(test_engine, 2, datetime(2026, 1, 1, 8))
+        await sync_stage_history_for_open_deals(pipeline_names=["Pipeline"])
+
+        _cache_deal(test_engine, 1, datetime(2026, 1, 5, 8))
+        result = await sync_stage_history_for_open_deals(pipeline_names=["Pipeline"])
+
+        assert result["total_deals"] == 2
+        assert result["fetched"] == 1
+        assert result["skipped"] == 1
@@ -0,0 +1,201 @@
+"""Test the streaming batch summarizer."""
+
+import asyncio
+
+import pytest
+
+from cmd_center.backend.api.deals import get_summary_run_progress
+from cmd_center.backend.integrations.llm_client import LLMValidationError
+from cmd_center.backend.models.writer_models import DealSummaryContext, DealSummaryResult
+from cmd_center.backend.services.summary_pipeline import (
+    create_summary_run,
+    get_summary_run,
+    stream_summaries,
+)
+from cmd_center.backend.services.prompt_registry import PromptRegistry
+from cmd_center.backend.services.writer_service import WriterService
+
+
+def make_contexts(count):
+    return [
+        DealSummaryContext(deal_id=i, deal_title=f"Deal {i}", stage="Approved", owner_name="Sara",
+                           days_in_stage=3, notes=["note"])
+        for i in range(1, count + 1)
+    ]
+
+
+class FakeSummarizer:
+    """summarize_deal stand-in with a per-deal latency and failures."""
+
+    def __init__(self, delays=None, failing=()):
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, context, **kwargs):
+        self.calls.append(context.deal_id)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(context.deal_id, 0.01))
+        finally:
+            self.in_flight -= 1
+        if context.deal_id in self.failing:
+            raise RuntimeError("LLM unavailable")
+        return DealSummaryResult(deal_id=context.deal_id, summary=f"summary {context.deal_id}", confidence=0.8)
+
+
+async def collect(iterator):
+    return [outcome async for outcome in iterator]
+
+
+class TestStreaming:
+    """Test the worker pool and completion-order streaming."""
+
+    @pytest.mark.asyncio
+    async def test_slow_deal_does_not_stall_the_others(self):
+        summarize = FakeSummarizer(delays={1: 0.3})
+
+        outcomes = await collect(stream_summaries(summarize, make_contexts(8), max_concurrent=3))
+
+        # Deals 2-8 flow through the two free workers while deal 1 is pending
+        assert [o.deal_id for o in outcomes][-1] == 1
+        assert sorted(o.deal_id for o in outcomes) == list(range(1, 9))
+        assert summarize.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_results_arrive_before_the_batch_finishes(self):
+        summarize = FakeSummarizer(delays={2: 0.3})
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        iterator = stream_summaries(summarize, make_contexts(3), max_concurrent=3)
+        first = await iterator.__anext__()
+
+        assert first.deal_id in (1, 3)
+        assert loop.time() - started < 0.2
+        await iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_outcomes(self):
+        summarize = FakeSummarizer(failing={2})
+
+        outcomes = {o.deal_id: o for o in await collect(stream_summaries(summarize, make_contexts(3)))}
+
+        assert not outcomes[2].ok
+        assert outcomes[2].error == "LLM unavailable"
+        assert outcomes[1].ok and outcomes[1].result.summary == "summary 1"
+
+    @pytest.mark.asyncio
+    async def test_closing_cancels_in_flight_requests(self):
+        summarize = FakeSummarizer(delays={i: 0.01 if i == 1 else 10 for i in range(1, 6)})
+
+        iterator = stream_summaries(summarize, make_contexts(5), max_concurrent=3)
+        await iterator.__anext__()
+        await iterator.aclose()
+
+        assert summarize.in_flight == 0
+        assert len(summarize.calls) == 4  # deal 1's worker took one more before the close
+
+
+class TestPersistence:
+    """Test per-deal persistence, progress polling and resume."""
+
+    @pytest.mark.asyncio
+    async def test_outcomes_are_recorded_as_they_arrive(self, override_db):
+        contexts = make_contexts(3)
+        run_id = create_summary_run(contexts)
+        summarize = FakeSummarizer(delays={3: 0.2}, failing={2})
+
+        iterator = stream_summaries(summarize, contexts, max_concurrent=3, run_id=run_id)
+        await iterator.__anext__()
+        await iterator.__anext__()
+        progress = get_summary_run(run_id)
+
+        assert (progress.status, progress.total, progress.succeeded, progress.failed) == ("running", 3, 1, 1)
+        assert [r.deal_id for r in progress.results] == [1]
+        assert progress.errors == {2: "LLM unavailable"}
+
+        await iterator.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await iterator.__anext__()
+        newer = get_summary_run(run_id, after=progress.cursor)
+        assert newer.status == "completed"
+        assert [r.deal_id for r in newer.results] == [3]
+        assert newer.errors == {}
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_summarized_deals(self, override_db):
+        contexts = make_contexts(5)
+        run_id = create_summary_run(contexts)
+        first = FakeSummarizer(delays={4: 10, 5: 10}, failing={3})
+
+        iterator = stream_summaries(first, contexts, max_concurrent=5, run_id=run_id)
+        for _ in range(3):
+            await iterator.__anext__()
+        await iterator.aclose()
+        assert get_summary_run(run_id).status == "cancelled"
+
+        second = FakeSummarizer()
+        outcomes = await collect(stream_summaries(second, contexts, run_id=run_id))
+
+        # Deal 3 failed, 4 and 5 were cancelled in flight
+        assert sorted(second.calls) == [3, 4, 5]
+        assert all(o.ok for o in outcomes)
+        progress = get_summary_run(run_id)
+        assert (progress.status, progress.succeeded, progress.failed) == ("completed", 5, 0)
+
+    @pytest.mark.asyncio
+    async def test_progress_endpoint(self, override_db):
+        from fastapi import HTTPException
+
+        run_id = create_summary_run(make_contexts(2))
+
+        progress = await get_summary_run_progress(run_id, after=0)
+
+        assert (progress.status, progress.total, progress.results) == ("running", 2, [])
+        with pytest.raises(HTTPException):
+            await get_summary_run_progress(run_id + 1, after=0)
+
+
+class TestWriterService:
+    """Test batch_summarize_deals on top of the pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_batch_keeps_input_order_and_drops_failures(self):
+        writer = WriterService(llm_client=object(), prompt_registry=object())
+        writer.summarize_deal = FakeSummarizer(delays={1: 0.1}, failing={3})
+
+        results = await writer.batch_summarize_deals(make_contexts(4), max_concurrent=2)
+
+        assert [r.deal_id for r in results] == [1, 2, 4]
+
+    @pytest.mark.asyncio
+    async def test_unparseable_summary_fails_and_is_retried(self, override_db):
+        class FlakyParseClient:
+            """Returns an unparseable response for the deals in `broken`."""
+
+            def __init__(self, broken):
+                self.broken = set(broken)
+
+            async def generate_structured_completion(self, schema, prompt, **kwargs):
+                if any(f"Deal: Deal {deal_id}\n" in prompt for deal_id in self.broken):
+                    raise LLMValidationError("not json")
+                return DealSummaryResult(deal_id=0, summary="summary", confidence=0.8)
+
+        contexts = make_contexts(3)
+        run_id = create_summary_run(contexts)
+        writer = WriterService(llm_client=FlakyParseClient(broken={2}), prompt_registry=PromptRegistry())
+
+        outcomes = await collect(writer.stream_summaries(contexts, run_id=run_id))
+
+        assert {o.deal_id for o in outcomes if not o.ok} == {2}
+        assert get_summary_run(run_id).failed == 1
+
+        writer.llm = FlakyParseClient(broken=())
+        retried = await collect(writer.stream_summaries(contexts, run_id=run_id))
+
+        assert [o.deal_id for o in retried] == [2]
+        assert (get_summary_run(run_id).succeeded, get_summary_run(run_id).failed) == (3, 0)
@@ -0,0 +1,116 @@
+"""Test sync readiness, freshness headers and non-blocking startup."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from sqlmodel import Session
+
+from cmd_center.backend.db import Deal, DealSyncState, SyncMetadata
+from cmd_center.backend.services import sync_scheduler, sync_status
+from cmd_center.backend.services.sync_status import (
+    DATA_AGE_HEADER,
+    DATA_AS_OF_HEADER,
+    get_sync_status,
+    reset_freshness_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    reset_freshness_cache()
+    yield
+    reset_freshness_cache()
+
+
+def _meta(session, entity_type: str, minutes_ago: int, status: str = "success"):
+    session.add(SyncMetadata(
+        entity_type=entity_type,
+        last_sync_time=datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+        status=status,
+    ))
+
+
+class TestSyncStatus:
+    """Test the /sync/status summary."""
+
+    def test_empty_cache_is_not_ready(self, override_db):
+        status = get_sync_status()
+
+        assert status["ready"] is False
+        assert status["data_as_of"] is None
+        assert status["syncs"] == {}
+
+    def test_summarises_per_deal_rows(self, override_db):
+        """Per-deal notes and stage_history state is counted, not listed."""
+        now = datetime.now(timezone.utc)
+        with Session(override_db) as session:
+            session.add(Deal(id=1, title="A", pipeline_id=1, stage_id=1))
+            _meta(session, "deals", 10)
+            _meta(session, "deals_5", 600)
+            _meta(session, "notes_9", 20)  # legacy row, ignored
+            session.add(DealSyncState(deal_id=1, notes_synced_at=now - timedelta(minutes=20), notes_status="success"))
+            session.add(DealSyncState(deal_id=2, notes_synced_at=now - timedelta(minutes=40), notes_status="failed"))
+            _meta(session, "stage_history_1", 30)
+            session.commit()
+
+        status = get_sync_status()
+
+        assert status["ready"] is True
+        assert sorted(status["syncs"]) == ["deals", "deals_5"]
+        assert status["data_age_seconds"] == pytest.approx(600, abs=5)
+        assert status["per_deal"]["notes"]["deals"] == 2
+        assert status["per_deal"]["notes"]["failed"] == 1
+        assert status["per_deal"]["stage_history"]["deals"] == 1
+
+    def test_failed_deal_sync_has_no_freshness(self, override_db):
+        with Session(override_db) as session:
+            _meta(session, "deals", 5, status="failed")
+            session.commit()
+
+        assert get_sync_status()["data_as_of"] is None
+
+
+class TestFreshnessHeaders:
+    """Test the per-response freshness headers."""
+
+    async def test_headers_on_api_responses(self, test_client, override_db):
+        with Session(override_db) as session:
+            _meta(session, "deals", 90)
+            session.commit()
+
+        response = await test_client.get("/sync/status")
+
+        assert response.status_code == 200
+        assert int(response.headers[DATA_AGE_HEADER]) == pytest.approx(90 * 60, abs=5)
+        assert response.headers[DATA_AS_OF_HEADER] == response.json()["data_as_of"]
+
+    async def test_no_headers_before_first_sync(self, test_client):
+        response = await test_client.get("/sync/status")
+
+        assert DATA_AS_OF_HEADER not in response.headers
+
+    def test_lookup_failure_is_ignored(self):
+        with patch.object(sync_status, "get_data_as_of", side_effect=RuntimeError("locked")):
+            assert sync_status.freshness_headers() == {}
+
+
+class TestNonBlockingStartup:
+    """Test that startup does not wait for the bootstrap sync."""
+
+    async def test_serves_before_startup_sync_finishes(self):
+        release = asyncio.Event()
+
+        async def slow_startup():
+            await release.wait()
+
+        with patch.object(sync_scheduler, "init_db"), \
+                patch.object(sync_scheduler, "run_startup_sync", slow_startup):
+            async with sync_scheduler.lifespan_manager(FastAPI()):
+                assert sync_scheduler.startup_sync_state() == "running"
+                release.set()
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+                assert sync_scheduler.startup_sync_state() == "done"